@@ -0,0 +1,28 @@
+"""Add content checksum to room images
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-11-20
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Content hash of the uploaded image, used to reuse prior analyses
+    with op.batch_alter_table('room_images') as batch_op:
+        batch_op.add_column(sa.Column('checksum', sa.String(length=128), nullable=True))
+        batch_op.create_index('ix_room_images_checksum', ['checksum'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('room_images') as batch_op:
+        batch_op.drop_index('ix_room_images_checksum')
+        batch_op.drop_column('checksum')
@@ -0,0 +1,53 @@
+"""Add workflow checkpoint tables
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Bounded LangGraph checkpoints (CHAT_CHECKPOINTER=sql)
+    op.create_table(
+        'workflow_checkpoints',
+        sa.Column('thread_id', sa.String(length=128), nullable=False),
+        sa.Column('checkpoint_ns', sa.String(length=255), nullable=False),
+        sa.Column('checkpoint_id', sa.String(length=64), nullable=False),
+        sa.Column('parent_checkpoint_id', sa.String(length=64), nullable=True),
+        sa.Column('checkpoint_type', sa.String(length=32), nullable=False),
+        sa.Column('checkpoint', sa.LargeBinary(), nullable=False),
+        sa.Column('metadata_type', sa.String(length=32), nullable=False),
+        sa.Column('checkpoint_metadata', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('thread_id', 'checkpoint_ns', 'checkpoint_id'),
+    )
+    op.create_index('idx_workflow_checkpoints_created', 'workflow_checkpoints', ['created_at'])
+    op.create_table(
+        'workflow_checkpoint_writes',
+        sa.Column('thread_id', sa.String(length=128), nullable=False),
+        sa.Column('checkpoint_ns', sa.String(length=255), nullable=False),
+        sa.Column('checkpoint_id', sa.String(length=64), nullable=False),
+        sa.Column('task_id', sa.String(length=64), nullable=False),
+        sa.Column('idx', sa.Integer(), nullable=False),
+        sa.Column('channel', sa.String(length=255), nullable=False),
+        sa.Column('value_type', sa.String(length=32), nullable=False),
+        sa.Column('value', sa.LargeBinary(), nullable=False),
+        sa.Column('task_path', sa.String(length=255), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('thread_id', 'checkpoint_ns', 'checkpoint_id', 'task_id', 'idx'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('workflow_checkpoint_writes')
+    op.drop_index('idx_workflow_checkpoints_created', table_name='workflow_checkpoints')
+    op.drop_table('workflow_checkpoints')
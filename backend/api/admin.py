@@ -7,7 +7,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 import os
 
-from backend.database import get_async_db
+from backend.database import get_async_read_db
 from backend.models.user import User
 from backend.models.message_feedback import MessageFeedback
 from backend.api.auth import get_current_user, get_current_user_optional
@@ -91,7 +91,7 @@ async def get_agent_lightning_stats(
 async def get_feedback_stats(
     days: int = 7,
     current_user: Optional[User] = Depends(require_admin_optional),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> Dict[str, Any]:
     """
     Get feedback statistics from the database.
@@ -173,7 +173,7 @@ async def get_feedback_stats(
 async def get_recent_feedback(
     limit: int = 20,
     current_user: Optional[User] = Depends(require_admin_optional),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> List[Dict[str, Any]]:
     """
     Get recent feedback submissions.
@@ -212,7 +212,7 @@ async def get_recent_feedback(
 @router.get("/dashboard")
 async def get_dashboard_summary(
     current_user: Optional[User] = Depends(require_admin_optional),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> Dict[str, Any]:
     """
     Get comprehensive dashboard summary combining all metrics.
@@ -4,13 +4,14 @@ Chat API endpoints for HomeView AI.
 Provides conversational AI interface with context-aware responses.
 """
 
+import asyncio
 import logging
-from typing import Optional, List, AsyncGenerator
+from typing import Any, Dict, Optional, List, AsyncGenerator
 from uuid import UUID, uuid4
 from datetime import datetime
 import json
 
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, File, UploadFile, Form
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
@@ -20,12 +21,14 @@ from backend.api.auth import get_current_user, get_current_user_optional
 from backend.models.user import User, UserType
 from backend.models.conversation import Conversation, ConversationMessage
 from backend.models.message_feedback import MessageFeedback
-from backend.models.base import get_async_db
-from backend.workflows.chat_workflow import ChatWorkflow
+from backend.models.base import get_async_db, get_async_read_db
+from backend.workflows.chat_workflow import POST_RESPONSE_WAIT_SECONDS, ChatWorkflow
 from backend.services.conversation_service import ConversationService
+from backend.services.conversation_memory import HISTORY_MAX_MESSAGES, get_summary_updater
 from backend.services.rag_service import RAGService
 from backend.integrations.gemini.client import GeminiClient
 from backend.services.document_parser_service import DocumentParserService, DocumentParseError
+from backend.utils.image_hash import content_hash, remember_file_hash
 from backend.integrations.agentlightning.rewards import RewardCalculator, FeedbackType
 from backend.integrations.agentlightning.tracker import AgentTracker
 
@@ -38,6 +41,26 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/chat", tags=["chat"])
 
 
+# Development fallback user for unauthenticated requests
+DEFAULT_USER_ID = UUID("550e8400-e29b-41d4-a716-446655440000")
+
+
+def resolve_user_id(current_user: Optional[User]) -> UUID:
+    """
+    Id of the requesting user, for read-only endpoints.
+
+    Read endpoints run on the replica session, so unlike
+    get_or_create_default_user this never touches (or creates) the user row.
+
+    Args:
+        current_user: Current authenticated user (may be None)
+
+    Returns:
+        The authenticated user's id, or the default development user's id
+    """
+    return current_user.id if current_user else DEFAULT_USER_ID
+
+
 async def get_or_create_default_user(db: AsyncSession, current_user: Optional[User]) -> User:
     """
     Get or create a default test user for development when no user is authenticated.
@@ -53,14 +76,12 @@ async def get_or_create_default_user(db: AsyncSession, current_user: Optional[Us
         return current_user
 
     # For development: use a default user if not authenticated
-    from uuid import UUID
-    default_user_id = UUID("550e8400-e29b-41d4-a716-446655440000")
-    test_user = await db.get(User, default_user_id)
+    test_user = await db.get(User, DEFAULT_USER_ID)
 
     if not test_user:
         # Create a default test user
         test_user = User(
-            id=default_user_id,
+            id=DEFAULT_USER_ID,
             email="test@homeview.ai",
             full_name="Test User",
             password_hash="",  # No password for test user
@@ -99,6 +120,7 @@ class ChatMessageResponse(BaseModel):
     youtube_videos: List[dict] = []    # Tutorial videos
     web_sources: List[dict] = []       # Product links
 
+    dropped_steps: List[str] = []      # Optional parts skipped at the request deadline
     metadata: dict = {}
 
 
@@ -120,6 +142,8 @@ class ConversationHistoryResponse(BaseModel):
     conversation_id: str
     messages: List[dict]
     total_messages: int
+    prev_cursor: Optional[str] = None  # pass as `before` to load older messages
+    next_cursor: Optional[str] = None  # pass as `after` to load newer messages
 
 # Local helpers for file handling and URLs (mirror digital_twin behavior)
 def _portable_url(url: str) -> str:
@@ -140,6 +164,8 @@ async def _save_upload_file(upload_file: UploadFile, destination: Path) -> str:
         with open(destination, "wb") as buffer:
             content = await upload_file.read()
             buffer.write(content)
+        # Hash once here so vision cache keys and RoomImage.checksum never re-read the file
+        remember_file_hash(destination, content_hash(content))
         return str(destination)
     except Exception as e:
         logger.error(f"Error saving file: {str(e)}")
@@ -492,7 +518,7 @@ async def execute_action(
             # Refine the most recent DIY plan using additional constraints
             try:
                 # Locate the latest DIY plan in the conversation
-                prev_messages = await conversation_service.get_messages(str(conversation.id), limit=100)
+                prev_messages = await conversation_service.get_last_messages(str(conversation.id), count=100)
                 base_plan = None
                 for m in reversed(prev_messages):
                     try:
@@ -685,7 +711,7 @@ async def execute_action(
         elif action_type == "export_pdf":
             # Export the most recent DIY plan to a PDF and return a downloadable link
             try:
-                prev_messages = await conversation_service.get_messages(str(conversation.id), limit=100)
+                prev_messages = await conversation_service.get_last_messages(str(conversation.id), count=100)
                 diy_plan = None
                 for m in reversed(prev_messages):
                     try:
@@ -820,7 +846,7 @@ async def execute_action(
         elif action_type == "make_shopping_list":
             # Consolidate tools and materials from the most recent DIY plan into a checklist
             try:
-                prev_messages = await conversation_service.get_messages(str(conversation.id), limit=100)
+                prev_messages = await conversation_service.get_last_messages(str(conversation.id), count=100)
                 diy_plan = None
                 for m in reversed(prev_messages):
                     try:
@@ -1119,66 +1145,20 @@ async def send_message(
                 detail=error_msg
             )
 
-        # Get AI response from workflow result
+        # Id of the assistant message, only if the save node queued it (it is
+        # spooled before the response; the write-behind writer persists it)
         ai_response = result.get("ai_response", "")
 
-        # Save messages to database
-        user_message = await conversation_service.add_message(
-            conversation_id=str(conversation.id),
-            role="user",
-            content=request.message,
-            metadata={
-                "intent": result.get("intent", "unknown"),
-                "persona": request.persona,
-                "scenario": request.scenario,
-            }
-        )
-
-        # Build assistant message metadata with multimodal content
-        assistant_metadata = {
-            "intent": result.get("intent", "unknown"),
-            "suggested_actions": result.get("suggested_actions", []),
-            "suggested_questions": result.get("suggested_questions", []),
-            "persona": request.persona,
-            "scenario": request.scenario,
-        }
-
-        # Add multimodal content if present (Agent mode only)
-        response_metadata = result.get("response_metadata", {})
-        if response_metadata.get("web_search_results"):
-            assistant_metadata["web_search_results"] = response_metadata["web_search_results"]
-        if response_metadata.get("web_sources"):
-            assistant_metadata["web_sources"] = response_metadata["web_sources"]
-        if response_metadata.get("youtube_videos"):
-            assistant_metadata["youtube_videos"] = response_metadata["youtube_videos"]
-        if response_metadata.get("contractors"):
-            assistant_metadata["contractors"] = response_metadata["contractors"]
-        if response_metadata.get("generated_images"):
-            assistant_metadata["generated_images"] = response_metadata["generated_images"]
-
-        assistant_message = await conversation_service.add_message(
-            conversation_id=str(conversation.id),
-            role="assistant",
-            content=ai_response,
-            metadata=assistant_metadata
-        )
-
-        # Update conversation title if it's the first message
-        if conversation.message_count == 0:
-            await conversation_service.update_conversation_title(
-                conversation_id=str(conversation.id),
-                user_message=request.message
-            )
-
         return ChatMessageResponse(
             conversation_id=str(conversation.id),
-            message_id=str(assistant_message.id),
+            message_id=result.get("assistant_message_id") or "",
             response=ai_response,
             intent=result.get("intent", "unknown"),
             suggested_actions=result.get("suggested_actions", []),
             generated_images=result.get("generated_images", []),
             youtube_videos=result.get("youtube_videos", []),
             web_sources=result.get("web_sources", []),
+            dropped_steps=result.get("dropped_steps", []),
             metadata=result.get("response_metadata", {})
         )
 
@@ -1256,303 +1236,45 @@ async def stream_message(
                 except Exception:
                     await db.rollback()
 
-            # Build context and history, then stream via Gemini
-            rag_service = RAGService(use_gemini=True)
-            gemini_client = GeminiClient()
-
-            # Digital Twin context temporarily disabled; proceed without RAG context
-            context = None
-            context_sources: List[str] = []
-
-            # Save user message immediately (enables title auto-gen on first message)
-            await conversation_service.add_message(
-                conversation_id=str(conversation.id),
-                role="user",
-                content=request.message,
-                metadata={
-                    "persona": request.persona,
-                    "scenario": request.scenario,
-                },
-                context_sources=context_sources,
-            )
-
-            # Load recent history (now includes the just-saved user message)
-            history = await conversation_service.get_recent_messages(
-                conversation_id=str(conversation.id),
-                count=10,
-            )
-
-            # Build prompt using the same helper as the workflow for consistency
-            # Lightweight intent guess for skills context during streaming
-            _um = (request.message or "").lower()
-            _intent_guess = None
-            try:
-                if any(k in _um for k in ["estimate", "cost", "budget"]):
-                    _intent_guess = "cost_estimate"
-                elif any(k in _um for k in ["product", "sofa", "appliance", "faucet", "recommend"]):
-                    _intent_guess = "product_recommendation"
-                elif any(k in _um for k in ["guide", "step-by-step", "how do i"]):
-                    _intent_guess = "diy_guide"
-                elif any(k in _um for k in ["pdf", "export", "document", "download", "printable", "print"]):
-                    _intent_guess = "pdf_request"
-                elif any(k in _um for k in ["design", "paint", "flooring", "cabinets", "mockup", "staging"]):
-                    _intent_guess = "design_idea"
-            except Exception:
-                _intent_guess = None
-
-            prompt = chat_workflow._build_response_prompt(
-                request.message,
-                context,
-                history,
-                request.persona,
-                request.scenario,
-                _intent_guess,
-            )
-
-            full_text = ""
-            try:
-                async for token in gemini_client.generate_text_stream(
-                    prompt=prompt,
-                    temperature=0.7,
-                    max_tokens=2048,
-                ):
-                    full_text += token
-                    yield f"data: {json.dumps({'type': 'token', 'content': token})}\n\n"
-            except Exception as e:
-                logger.error(f"Streaming from Gemini failed: {e}")
-                yield f"data: {json.dumps({'type': 'error', 'error': 'Streaming failed'})}\n\n"
-                return
-
-            # Classify intent (post-stream) for metadata/suggestions
-            intent = "question"
-            try:
-                classification_prompt = f"""Classify the user's intent from this message. Return ONLY a JSON object.
-
-User message: "{request.message}"
-
-Classify into ONE of these intents:
-- "question": User is asking a question about their home
-- "cost_estimate": User wants cost estimation for a project
-- "product_recommendation": User wants product recommendations
-- "design_idea": User wants design or style suggestions
-- "design_transformation": User requests transforming an image (paint, flooring, cabinets, furniture, staging)
-- "diy_guide": User wants a step-by-step DIY guide with materials/tools/safety
-- "pdf_request": User wants a PDF export of a plan/guide or the conversation
-- "general_chat": General conversation or greeting
-
-Return JSON:
-{{
-    "intent": "<intent>",
-    "confidence": <0.0-1.0>,
-    "requires_home_data": <true/false>
-}}"""
-                classification_resp = await gemini_client.generate_text(
-                    prompt=classification_prompt,
-                    temperature=0.1,
-                )
-                classification = chat_workflow._parse_json_response(classification_resp)
-                intent = classification.get("intent", "question")
-            except Exception as e:
-                logger.warning(f"Intent classification failed, defaulting to 'question': {e}")
-                intent = "question"
-
-            # Heuristic nudge based on phrasing in the user's message (post-classification)
-            try:
-                um = (request.message or "").lower()
-                if intent == "question":
-                    if any(k in um for k in ["pdf", "export", "document", "download", "printable", "print"]):
-                        intent = "pdf_request"
-                    elif ("guide" in um or "step-by-step" in um):
-                        intent = "diy_guide"
-                    elif ("image" in um or "mockup" in um or "visual" in um):
-                        intent = "design_idea"
-            except Exception:
-                pass
-
-            # Initialize suggested questions list (ensure defined)
-            suggested_questions: List[str] = []
-
-            # Build suggested actions (mirrors workflow logic)
-            suggested_actions: List[dict] = []
-
-            # Helper to avoid repeating the same action in recent messages
-            def _has_recent_action(action_key: str, lookback: int = 3) -> bool:
-                """Check if action was shown in last N messages (default: 3)."""
-                try:
-                    recent = history[-lookback:] if len(history) >= lookback else history
-                    for msg in reversed(recent):
-                        if (msg.get("role") == "assistant"):
-                            acts = ((msg.get("metadata") or {}).get("suggested_actions") or [])
-                            for a in acts:
-                                if (a.get("action") or a.get("type")) == action_key:
-                                    return True
-                    return False
-                except Exception:
-                    return False
-
-            # Intent-based actions (universal, not persona-dependent)
-            if intent == "cost_estimate":
-                suggested_actions.append({
-                    "action": "get_detailed_estimate",
-                    "label": "Get Detailed Cost Estimate",
-                    "description": "Get a comprehensive cost breakdown for your project",
-                    "agent": "cost_estimation",
-                })
-            elif intent == "product_recommendation":
-                suggested_actions.append({
-                    "action": "find_products",
-                    "label": "Find Matching Products",
-                    "description": "Search for products that fit your space and style",
-                    "agent": "product_matching",
-                })
-            elif intent == "design_idea":
-                suggested_actions.append({
-                    "action": "generate_design",
-                    "label": "Generate Design Mockup",
-                    "description": "Create AI-generated design visualizations",
-                    "agent": "design_studio",
-                })
-            elif intent == "diy_guide" and not _has_recent_action("create_diy_plan"):
-                # User is asking for DIY guidance - offer DIY plan
-                suggested_actions.append({
-                    "action": "create_diy_plan",
-                    "label": "Create DIY Step-by-Step Plan",
-                    "description": "Get a detailed plan with tools, materials, and safety tips",
-                    "agent": "diy_planner",
-                })
-            elif intent == "pdf_request":
-                # User wants PDF export
-                suggested_actions.append({
-                    "action": "export_pdf",
-                    "label": "Export as PDF",
-                    "description": "Download your plan as a PDF document",
-                    "agent": "pdf_export",
-                })
-
-            # Universal workflow actions (based on conversation context, not persona)
-            # Only suggest these if they haven't been recently offered and are contextually relevant
-            s = request.scenario
-
-            # Suggest contractor quotes if scenario is contractor_quotes OR if user hasn't been offered it recently
-            if (s == "contractor_quotes" or intent in ["cost_estimate", "question"]) and not _has_recent_action("start_contractor_quotes"):
-                # Check if user is asking about hiring/contractors in their message
-                um_lower = (request.message or "").lower()
-                if any(k in um_lower for k in ["contractor", "hire", "quote", "bid", "professional"]) or s == "contractor_quotes":
-                    suggested_actions.append({
-                        "action": "start_contractor_quotes",
-                        "label": "Get Contractor Quotes",
-                        "description": "Prepare a brief and collect bids from contractors",
-                        "agent": "contractor_quotes",
-                    })
-
-            # Suggest DIY plan if scenario is diy_project_plan OR if user is asking DIY-related questions
-            if (s == "diy_project_plan" or intent in ["diy_guide", "question"]) and not _has_recent_action("create_diy_plan"):
-                um_lower = (request.message or "").lower()
-                if any(k in um_lower for k in ["diy", "myself", "do it myself", "step", "guide", "how to", "how do i"]) or s == "diy_project_plan":
-                    suggested_actions.append({
-                        "action": "create_diy_plan",
-                        "label": "Create My DIY Project Plan",
-                        "description": "Get a step-by-step plan with tools and materials",
-                        "agent": "diy_planner",
-                    })
-
-            # Suggested follow-up questions (context-aware, avoid repetition)
-            suggested_questions: List[str] = []
+            # Run the chat workflow in streaming mode: response tokens as they
+            # arrive, then one event per node (enrichment, actions, save)
+            workflow_input = {
+                "user_message": request.message,
+                "conversation_id": str(conversation.id),
+                "user_id": str(current_user.id),
+                "home_id": str(resolved_home_uuid) if resolved_home_uuid else "",
+                "persona": request.persona,
+                "scenario": request.scenario,
+                "mode": request.mode or "agent",
+            }
+            result: Dict[str, Any] = {}
+            post_response = None
+            async for event in chat_workflow.stream(workflow_input):
+                if event["type"] == "complete":
+                    result = event["state"]
+                    post_response = event.get("post_response")
+                else:
+                    yield f"data: {json.dumps(event, default=str)}\n\n"
+
+            # Send completion event right after the answer: suggestions were made
+            # while it streamed and the turn is already queued for persistence
+            complete = {
+                "conversation_id": str(conversation.id),
+                "message_id": result.get("assistant_message_id"),
+                "intent": result.get("intent"),
+                "suggested_actions": result.get("suggested_actions", []),
+                "suggested_questions": result.get("suggested_questions", []),
+                "dropped_steps": result.get("dropped_steps", []),
+            }
+            yield f"data: {json.dumps({'type': 'complete', 'message': complete}, default=str)}\n\n"
 
-            # Helper to check if a question was recently asked
-            def _has_recent_question(q_text: str) -> bool:
+            # Close once the turn is in the database, so a refetch on [DONE] finds
+            # it (shielded: a disconnect must not cancel the background job)
+            if post_response is not None:
                 try:
-                    recent = history[-6:] if history else []
-                    for msg in reversed(recent):
-                        if msg.get("role") == "assistant":
-                            qs = ((msg.get("metadata") or {}).get("suggested_questions") or [])
-                            if q_text in qs:
-                                return True
-                    return False
-                except Exception:
-                    return False
-
-            # Build intent-specific questions
-            candidate_questions: List[str] = []
-            if intent == "cost_estimate":
-                candidate_questions.extend([
-                    "What are the room dimensions (L x W x H)?",
-                    "Include labor or materials only?",
-                    "What material quality/tier and budget range?",
-                    "What is your location (for Canada pricing)?",
-                ])
-            elif intent == "product_recommendation":
-                candidate_questions.extend([
-                    "Which room and its dimensions?",
-                    "What budget range and style preference?",
-                    "Any must-have materials or brands (.ca vendors preferred)?",
-                    "Do you need eco-friendly or low-VOC options?",
-                ])
-            elif intent == "design_idea":
-                candidate_questions.extend([
-                    "Which room photo should I reference?",
-                    "What styles or color palettes do you like?",
-                    "Any elements to keep (flooring, cabinets, furniture)?",
-                ])
-            elif intent == "design_transformation":
-                candidate_questions.extend([
-                    "Which attached photo should I use?",
-                    "What exact edits (paint color, flooring type, cabinets)?",
-                    "Should I preserve existing furniture and layout?",
-                ])
-            elif intent == "diy_guide":
-                candidate_questions.extend([
-                    "What is your skill level and available time?",
-                    "Do you already have any of the required tools?",
-                    "What is your budget and deadline?",
-                ])
-            elif intent == "pdf_request":
-                candidate_questions.extend([
-                    "Include images and a materials checklist?",
-                    "What title should I use for the PDF?",
-                    "Do you want a Canadian vendor list appended?",
-                ])
-
-            # Filter out recently asked questions
-            for q in candidate_questions:
-                if not _has_recent_question(q):
-                    suggested_questions.append(q)
-
-            # Fallback only if no questions survived filtering
-            if not suggested_questions:
-                fallback = [
-                    "Which room or area are we focusing on?",
-                    "What are the dimensions and current materials?",
-                    "What is your budget and timeline?",
-                ]
-                for q in fallback:
-                    if not _has_recent_question(q):
-                        suggested_questions.append(q)
-
-
-            # Limit suggestions to avoid clutter (max 3 actions, max 4 questions)
-            suggested_actions = suggested_actions[:3]
-            suggested_questions = suggested_questions[:4]
-
-            # Save assistant message
-            await conversation_service.add_message(
-                conversation_id=str(conversation.id),
-                role="assistant",
-                content=full_text,
-                metadata={
-                    "intent": intent,
-                    "suggested_actions": suggested_actions,
-                    "suggested_questions": suggested_questions,
-                    "persona": request.persona,
-                    "scenario": request.scenario,
-                    "model": "gemini-2.5-flash",
-                    "generated_at": datetime.utcnow().isoformat(),
-                },
-                context_sources=context_sources,
-            )
-
-            # Send completion event; frontend will refetch messages
-            yield f"data: {json.dumps({'type': 'complete', 'message': {'conversation_id': str(conversation.id)}})}\n\n"
+                    await asyncio.wait_for(asyncio.shield(post_response), timeout=POST_RESPONSE_WAIT_SECONDS)
+                except Exception as e:
+                    logger.warning(f"Post-response work not finished for stream: {e}")
             yield "data: [DONE]\n\n"
 
         except Exception as e:
@@ -1576,7 +1298,7 @@ async def list_conversations(
     limit: int = 20,
     offset: int = 0,
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     List user's conversations.
@@ -1592,13 +1314,13 @@ async def list_conversations(
         List of conversations
     """
     try:
-        # Get or create default user for development
-        current_user = await get_or_create_default_user(db, current_user)
+        # Default user for development (read-only session: never created here)
+        user_id = resolve_user_id(current_user)
 
         conversation_service = ConversationService(db)
 
         conversations = await conversation_service.list_conversations(
-            user_id=str(current_user.id),
+            user_id=str(user_id),
             home_id=home_id,
             limit=limit,
             offset=offset
@@ -1678,10 +1400,11 @@ async def update_conversation(
 @router.get("/conversations/{conversation_id}/history", response_model=ConversationHistoryResponse)
 async def get_conversation_history(
     conversation_id: str,
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get conversation history.
@@ -1689,16 +1412,17 @@ async def get_conversation_history(
     Args:
         conversation_id: Conversation ID
         limit: Maximum number of messages to return
-        offset: Offset for pagination
+        before: Cursor from `prev_cursor`; return older messages
+        after: Cursor from `next_cursor`; return newer messages
         current_user: Current authenticated user (optional for development)
         db: Database session
 
     Returns:
-        Conversation history with messages
+        Conversation history with messages (newest page by default)
     """
     try:
-        # Get or create default user for development
-        current_user = await get_or_create_default_user(db, current_user)
+        # Default user for development (read-only session: never created here)
+        user_id = resolve_user_id(current_user)
 
         conversation_service = ConversationService(db)
 
@@ -1711,17 +1435,20 @@ async def get_conversation_history(
                 detail="Conversation not found"
             )
 
-        if conversation.user_id != current_user.id:
+        if conversation.user_id != user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Access denied to this conversation"
             )
 
-        # Get messages
-        messages = await conversation_service.get_conversation_history(
-            conversation_id=conversation_id,
-            limit=limit
-        )
+        # Get messages (keyset page)
+        try:
+            page = await conversation_service.get_messages_page(
+                conversation_id, limit=limit, before=before, after=after
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        messages = page["messages"]
 
         return ConversationHistoryResponse(
             conversation_id=conversation_id,
@@ -1730,12 +1457,14 @@ async def get_conversation_history(
                     "id": str(msg.id),
                     "role": msg.role,
                     "content": msg.content,
-                    "metadata": msg.metadata or {},
+                    "metadata": msg.message_metadata or {},
                     "created_at": msg.created_at.isoformat()
                 }
                 for msg in messages
             ],
-            total_messages=conversation.message_count
+            total_messages=conversation.message_count,
+            prev_cursor=page["prev_cursor"],
+            next_cursor=page["next_cursor"]
         )
 
     except HTTPException:
@@ -1751,23 +1480,31 @@ async def get_conversation_history(
 @router.get("/conversations/{conversation_id}/messages")
 async def get_conversation_messages(
     conversation_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
-    Get all messages for a conversation.
+    Get a page of messages for a conversation.
 
     Args:
         conversation_id: Conversation ID
+        response: Response (carries X-Prev-Cursor / X-Next-Cursor headers)
+        limit: Maximum number of messages to return
+        before: Cursor from X-Prev-Cursor; return older messages
+        after: Cursor from X-Next-Cursor; return newer messages
         current_user: Current authenticated user (optional for development)
         db: Database session
 
     Returns:
-        List of messages in the conversation
+        Page of messages in the conversation, oldest first
     """
     try:
-        # Get or create default user for development
-        current_user = await get_or_create_default_user(db, current_user)
+        # Default user for development (read-only session: never created here)
+        user_id = resolve_user_id(current_user)
 
         conversation_service = ConversationService(db)
 
@@ -1782,14 +1519,24 @@ async def get_conversation_messages(
 
         # Ownership: if conversation is tied to a user, require that user; anonymous conversations are open
         if conversation.user_id:
-            if not current_user or conversation.user_id != current_user.id:
+            if conversation.user_id != user_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Access denied to this conversation"
                 )
 
-        # Get messages
-        messages = await conversation_service.get_messages(conversation_id)
+        # Get messages (newest page by default; keyset cursors in headers)
+        try:
+            page = await conversation_service.get_messages_page(
+                conversation_id, limit=limit, before=before, after=after
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        messages = page["messages"]
+        if page["prev_cursor"]:
+            response.headers["X-Prev-Cursor"] = page["prev_cursor"]
+        if page["next_cursor"]:
+            response.headers["X-Next-Cursor"] = page["next_cursor"]
 
         # Return plain list of messages to match frontend typings
         return [
@@ -1862,25 +1609,33 @@ async def delete_conversation(
 @router.get("/messages")
 async def get_messages_by_query(
     conversation_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
     current_user: Optional[User] = Depends(get_current_user_optional),
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
-    Get all messages for a conversation using query parameter.
+    Get a page of messages for a conversation using query parameter.
     This endpoint provides an alternative to /conversations/{conversation_id}/messages
     for frontend compatibility.
 
     Args:
         conversation_id: Conversation ID (query parameter)
+        response: Response (carries X-Prev-Cursor / X-Next-Cursor headers)
+        limit: Maximum number of messages to return
+        before: Cursor from X-Prev-Cursor; return older messages
+        after: Cursor from X-Next-Cursor; return newer messages
         current_user: Current authenticated user (optional for development)
         db: Database session
 
     Returns:
-        List of messages in the conversation
+        Page of messages in the conversation, oldest first
     """
     try:
-        # Get or create default user for development
-        current_user = await get_or_create_default_user(db, current_user)
+        # Default user for development (read-only session: never created here)
+        user_id = resolve_user_id(current_user)
 
         conversation_service = ConversationService(db)
 
@@ -1895,14 +1650,24 @@ async def get_messages_by_query(
 
         # Ownership: if conversation is tied to a user, require that user; anonymous conversations are open
         if conversation.user_id:
-            if not current_user or conversation.user_id != current_user.id:
+            if conversation.user_id != user_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Access denied to this conversation"
                 )
 
-        # Get messages
-        messages = await conversation_service.get_messages(conversation_id)
+        # Get messages (newest page by default; keyset cursors in headers)
+        try:
+            page = await conversation_service.get_messages_page(
+                conversation_id, limit=limit, before=before, after=after
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        messages = page["messages"]
+        if page["prev_cursor"]:
+            response.headers["X-Prev-Cursor"] = page["prev_cursor"]
+        if page["next_cursor"]:
+            response.headers["X-Next-Cursor"] = page["next_cursor"]
 
         # Return plain list of messages to match frontend typings
         return [
@@ -2135,11 +1900,12 @@ async def stream_message_multipart(
                 context_sources=context_sources,
             )
 
-            # Load history
-            history = await conversation_service.get_recent_messages(
+            # Load rolling summary + recent history
+            memory = await conversation_service.get_history_context(
                 conversation_id=str(conversation.id),
-                count=10,
+                max_messages=HISTORY_MAX_MESSAGES,
             )
+            history = memory["messages"]
 
             # Build prompt and stream
             # Lightweight intent guess for skills context during streaming
@@ -2166,6 +1932,7 @@ async def stream_message_multipart(
                 persona,
                 scenario,
                 _intent_guess,
+                summary=memory["summary"],
             )
 
             full_text = ""
@@ -2392,6 +2159,7 @@ Scenario: {scenario or ""}
                 },
                 context_sources=context_sources,
             )
+            get_summary_updater().schedule(str(conversation.id))
 
             yield f"data: {json.dumps({'type': 'complete', 'message': {'conversation_id': str(conversation.id)}})}\n\n"
             yield "data: [DONE]\n\n"
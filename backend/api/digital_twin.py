@@ -14,12 +14,13 @@ from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 
-from backend.models.base import get_async_db
+from backend.models.base import get_async_db, get_async_read_db
 from backend.models import Home, Room, RoomImage, User, UserType, HomeType
 from backend.services import DigitalTwinService
 from backend.services.rag_service import RAGService
 from backend.utils.room_type_normalizer import get_unknown_room_types, add_room_type_synonym
 from backend.utils.linking import rank_candidates
+from backend.utils.image_hash import content_hash, remember_file_hash
 # Avoid importing heavy chat stack at module import time; import inside endpoint when needed
 
 logger = logging.getLogger(__name__)
@@ -444,6 +445,8 @@ async def save_upload_file(upload_file: UploadFile, destination: Path) -> str:
         with open(destination, "wb") as buffer:
             content = await upload_file.read()
             buffer.write(content)
+        # Hash once here so vision cache keys and RoomImage.checksum never re-read the file
+        remember_file_hash(destination, content_hash(content))
 
         return str(destination)
     except Exception as e:
@@ -1190,7 +1193,7 @@ async def upload_room_image(
 @router.get("/homes/{home_id}", response_model=DigitalTwinResponse)
 async def get_home_digital_twin(
     home_id: UUID,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get complete digital twin data for a home.
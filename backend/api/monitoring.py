@@ -12,21 +12,30 @@ from typing import Dict, Any, List
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.database import get_db
+from backend.database import get_db, get_pool_status, replica_async_engine
+from backend.models.replica import get_replica_router
+from backend.models.instrumentation import get_query_metrics
 from backend.services.cache_service import get_cache_service
 from backend.services.analytics_service import get_analytics_service
 from backend.services.cost_tracking_service import get_cost_tracking_service
 from backend.services.event_bus import get_event_bus
 from backend.services.feature_flags import get_feature_flag_service
 from backend.services.journey_manager import get_journey_manager
+from backend.services.message_writer import get_message_writer
+from backend.services.background_tasks import get_background_tasks
+from backend.services.intent_classifier import get_intent_classifier
+from backend.workflows.chat_workflow import get_chat_workflow_runtime
+from backend.workflows.base import get_workflow_metrics
 from backend.services.persona_service import get_persona_service
 from backend.services.template_service import get_template_service
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/monitoring", tags=["monitoring"])
+# Mounted under /api/v1/monitoring (and the legacy /api/monitoring) in main.py
+router = APIRouter(tags=["monitoring"])
 
 
 @router.get("/health")
@@ -288,7 +297,7 @@ async def get_cache_stats() -> Dict[str, Any]:
     Get cache statistics.
     
     Returns:
-        Cache hit/miss rates and other metrics
+        Cache hit/miss rates, per-cache-type counters and latency percentiles
     """
     try:
         cache_service = get_cache_service()
@@ -306,3 +315,229 @@ async def get_cache_stats() -> Dict[str, Any]:
             detail=f"Failed to get cache stats: {str(e)}"
         )
 
+
+@router.get("/cache/metrics", response_class=PlainTextResponse)
+async def get_cache_metrics() -> PlainTextResponse:
+    """
+    Get cache metrics in Prometheus text format.
+    
+    Returns:
+        Per-cache-type request/set/eviction counters, byte gauges and
+        get/set latency histograms
+    """
+    try:
+        cache_service = get_cache_service()
+        return PlainTextResponse(
+            cache_service.get_prometheus_metrics(),
+            media_type="text/plain; version=0.0.4"
+        )
+        
+    except Exception as e:
+        logger.error(f"Failed to get cache metrics: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get cache metrics: {str(e)}"
+        )
+
+
+@router.get("/db/pool")
+async def get_db_pool_status() -> Dict[str, Any]:
+    """
+    Get database connection pool status.
+    
+    Returns:
+        Per-engine checked-out/overflow connections, configured limits and
+        connection checkout wait times
+    """
+    try:
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "pools": get_pool_status()
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to get DB pool status: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get DB pool status: {str(e)}"
+        )
+
+
+@router.get("/db/replica")
+async def get_db_replica_status() -> Dict[str, Any]:
+    """
+    Get read-replica routing status.
+    
+    Returns:
+        Whether a replica is configured, replica/primary read counts,
+        read-your-writes pins and replication lag
+    """
+    try:
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "configured": replica_async_engine is not None,
+            "stats": get_replica_router().get_stats()
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to get DB replica status: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get DB replica status: {str(e)}"
+        )
+
+
+@router.get("/db/queries")
+async def get_db_query_stats() -> Dict[str, Any]:
+    """
+    Get SQL query statistics.
+    
+    Returns:
+        Query counts and DB time, slow-query count and the most frequent
+        likely N+1 patterns by endpoint
+    """
+    try:
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "stats": get_query_metrics().get_stats()
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to get DB query stats: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get DB query stats: {str(e)}"
+        )
+
+
+@router.get("/chat/write-behind")
+async def get_chat_write_behind_stats() -> Dict[str, Any]:
+    """
+    Get write-behind chat message persistence statistics.
+    
+    Returns:
+        Buffered message count and enqueue/flush/replay counters
+    """
+    try:
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "stats": get_message_writer().get_stats()
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to get write-behind stats: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get write-behind stats: {str(e)}"
+        )
+
+
+@router.get("/chat/intent-classifier")
+async def get_intent_classifier_stats() -> Dict[str, Any]:
+    """
+    Get local intent classifier statistics.
+    
+    Returns:
+        Fast-path rate, LLM fallbacks and local/LLM label agreement
+    """
+    try:
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "stats": get_intent_classifier().get_stats()
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to get intent classifier stats: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get intent classifier stats: {str(e)}"
+        )
+
+
+@router.get("/chat/checkpoints")
+async def get_chat_checkpoint_stats() -> Dict[str, Any]:
+    """
+    Get chat workflow checkpointer statistics.
+    
+    Returns:
+        Checkpointer limits, size and pruning counters
+    """
+    try:
+        checkpointer = get_chat_workflow_runtime().checkpointer
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "stats": checkpointer.get_stats() if checkpointer is not None else {"backend": None}
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to get checkpoint stats: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get checkpoint stats: {str(e)}"
+        )
+
+
+@router.get("/background-tasks")
+async def get_background_task_stats() -> Dict[str, Any]:
+    """
+    Get post-response background task queue statistics.
+    
+    Returns:
+        Queue depth, retries, failures and average wait/run times
+    """
+    try:
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "stats": get_background_tasks().get_stats()
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to get background task stats: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get background task stats: {str(e)}"
+        )
+
+
+@router.get("/workflows/latency")
+async def get_workflow_latency() -> Dict[str, Any]:
+    """
+    Get per-workflow, per-node latency percentiles.
+    
+    Returns:
+        Wall-time and LLM-time summaries (p50/p95/p99) per node, slowest first
+    """
+    try:
+        return {
+            "timestamp": datetime.utcnow().isoformat(),
+            "stats": get_workflow_metrics().get_stats()
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to get workflow latency stats: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get workflow latency stats: {str(e)}"
+        )
+
+
+@router.get("/workflows/metrics", response_class=PlainTextResponse)
+async def get_workflow_metrics_text() -> PlainTextResponse:
+    """
+    Get workflow node metrics in Prometheus text format.
+    
+    Returns:
+        Per-node wall-time and LLM-time histograms and error counters
+    """
+    try:
+        return PlainTextResponse(
+            get_workflow_metrics().get_prometheus_metrics(),
+            media_type="text/plain; version=0.0.4"
+        )
+        
+    except Exception as e:
+        logger.error(f"Failed to get workflow metrics: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get workflow metrics: {str(e)}"
+        )
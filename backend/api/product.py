@@ -17,7 +17,7 @@ from backend.api.auth import get_current_user
 from backend.models.user import User
 from backend.models.product import ProductCatalog, ProductMatch, ProductCategory
 from backend.models.home import Room
-from backend.models.base import get_async_db
+from backend.models.base import get_async_db, get_async_read_db
 from backend.agents.intelligence.product_matching_agent import ProductMatchingAgent
 
 logger = logging.getLogger(__name__)
@@ -146,7 +146,7 @@ async def list_products(
     style: Optional[str] = None,
     limit: int = Query(50, le=100),
     offset: int = 0,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     List products with optional filters.
@@ -213,7 +213,7 @@ async def list_products(
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: str,
-    db: AsyncSession = Depends(get_async_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get product by ID.
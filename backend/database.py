@@ -10,12 +10,15 @@ from backend.models.base import (
     Base,
     engine,
     async_engine,
+    replica_async_engine,
     SessionLocal,
     AsyncSessionLocal,
     get_db,
     get_async_db,
+    get_async_read_db,
     init_db,
     init_db_async,
+    get_pool_status,
     DATABASE_URL,
     DATABASE_URL_ASYNC,
     USE_SQLITE,
@@ -26,12 +29,15 @@ __all__ = [
     "Base",
     "engine",
     "async_engine",
+    "replica_async_engine",
     "SessionLocal",
     "AsyncSessionLocal",
     "get_db",
     "get_async_db",
+    "get_async_read_db",
     "init_db",
     "init_db_async",
+    "get_pool_status",
     "DATABASE_URL",
     "DATABASE_URL_ASYNC",
     "USE_SQLITE",
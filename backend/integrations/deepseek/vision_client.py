@@ -19,6 +19,7 @@ from pathlib import Path
 from PIL import Image
 from backend.services.cost_tracking_service import get_cost_tracking_service
 from backend.services.event_bus import get_event_bus
+from backend.services.monitoring_service import llm_timed
 
 
 class DeepSeekVisionClient:
@@ -38,6 +39,7 @@ class DeepSeekVisionClient:
         self.cost_service = get_cost_tracking_service()
         self.event_bus = get_event_bus()
 
+    @llm_timed
     async def analyze_image(
         self,
         image: Union[str, Path, Image.Image, bytes],
@@ -90,6 +92,7 @@ class DeepSeekVisionClient:
             )
             raise
 
+    @llm_timed
     async def segment_image(
         self,
         reference_image: Union[str, Path, Image.Image, bytes],
@@ -37,6 +37,7 @@ from PIL import Image
 
 from backend.services.cost_tracking_service import get_cost_tracking_service
 from backend.services.event_bus import get_event_bus
+from backend.services.monitoring_service import llm_timed
 
 logger = logging.getLogger(__name__)
 # Brand preferences and per-category constraints to guide PDP selection
@@ -148,6 +149,7 @@ class GeminiClient:
             safety_settings=self.safety_settings
         )
 
+    @llm_timed
     async def generate_text(
         self,
         prompt: str,
@@ -214,6 +216,7 @@ class GeminiClient:
             logger.error(f"Error generating text: {str(e)}")
             raise
 
+    @llm_timed
     async def generate_text_stream(
         self,
         prompt: str,
@@ -269,6 +272,7 @@ class GeminiClient:
             logger.error(f"Error streaming text: {str(e)}", exc_info=True)
             raise
 
+    @llm_timed
     async def analyze_image(
         self,
         image: Union[str, Path, Image.Image, bytes],
@@ -322,6 +326,7 @@ class GeminiClient:
         except Exception as e:
             logger.error(f"Error analyzing image: {str(e)}")
             raise
+    @llm_timed
     async def analyze_design(
         self,
         image: Union[str, Path, Image.Image, bytes],
@@ -359,6 +364,7 @@ class GeminiClient:
             logger.error(f"Error in analyze_design: {e}", exc_info=True)
             return {"error": str(e)}
 
+    @llm_timed
     async def suggest_products_with_grounding(
         self,
         summary_or_grounding: Dict[str, Any],
@@ -651,6 +657,7 @@ class GeminiClient:
             logger.error(f"Error in suggest_products_with_grounding: {e}", exc_info=True)
             return {"error": str(e)}
 
+    @llm_timed
     async def suggest_products_without_grounding_function_calling(
         self,
         summary_or_grounding: Dict[str, Any],
@@ -825,6 +832,7 @@ class GeminiClient:
             return {"error": str(e), "products": [], "sources": []}
 
 
+    @llm_timed
     async def generate_transformation_ideas(
         self,
         summary: Dict[str, Any],
@@ -895,6 +903,7 @@ class GeminiClient:
             logger.error(f"Error in generate_transformation_ideas: {e}", exc_info=True)
             return {"color": [], "flooring": [], "lighting": [], "decor": [], "other": []}
 
+    @llm_timed
     async def generate_style_transformations(
         self,
         summary: Dict[str, Any],
@@ -955,6 +964,7 @@ class GeminiClient:
 
 
 
+    @llm_timed
     async def generate_image(
         self,
         prompt: str,
@@ -1046,6 +1056,7 @@ Only modify the specific elements mentioned in the transformation request."""
             logger.error(f"Error generating image with Imagen: {str(e)}", exc_info=True)
             raise
 
+    @llm_timed
     async def get_embeddings(
         self,
         texts: Union[str, List[str]],
@@ -1099,6 +1110,7 @@ Only modify the specific elements mentioned in the transformation request."""
             logger.error(f"Error generating embeddings: {str(e)}")
             raise
 
+    @llm_timed
     async def chat(
         self,
         messages: List[Dict[str, str]],
@@ -1145,6 +1157,7 @@ Only modify the specific elements mentioned in the transformation request."""
             logger.error(f"Error in chat: {str(e)}")
             raise
 
+    @llm_timed
     async def edit_image(
         self,
         prompt: str,
@@ -1199,6 +1212,7 @@ Only modify the specific elements mentioned in the transformation request."""
             raise
 
 
+    @llm_timed
     async def edit_image_masked(
         self,
         prompt: str,
@@ -1269,6 +1283,7 @@ Only modify the specific elements mentioned in the transformation request."""
             logger.error(f"Error in edit_image_masked: {e}", exc_info=True)
             raise
 
+    @llm_timed
     async def segment_image(
         self,
         reference_image: Union[str, Path, Image.Image, bytes],
@@ -19,9 +19,20 @@ from backend.api.documents import router as documents_router
 from backend.api.admin import router as admin_router
 from backend.api.monitoring import router as monitoring_router
 from backend.api.journey import router as journey_router
-from backend.models.base import init_db_async
-from backend.middleware import RateLimitMiddleware, MonitoringMiddleware
+from backend.models.base import AsyncSessionLocal, init_db_async, replica_async_engine
+from backend.models.replica import get_replica_router
+from backend.middleware import (
+    RateLimitMiddleware,
+    MonitoringMiddleware,
+    ReadYourWritesMiddleware,
+    QueryInstrumentationMiddleware,
+)
 from backend.services.monitoring_service import get_monitoring_service
+from backend.services.cache_service import get_cache_service
+from backend.services.message_writer import get_message_writer
+from backend.services.background_tasks import get_background_tasks
+from backend.services.intent_classifier import get_intent_classifier
+from backend.workflows.chat_workflow import get_chat_workflow_runtime
 from pathlib import Path
 
 # Configure logging
@@ -42,11 +53,44 @@ async def lifespan(app: FastAPI):
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.warning(f"Database initialization skipped: {str(e)}")
+
+    cache_service = get_cache_service()
+    cache_service.start_background_tasks()
+
+    replica_router = get_replica_router()
+    if replica_async_engine is not None:
+        replica_router.start_lag_monitor(replica_async_engine)
+
+    # Compile the chat graph and build its shared services once, up front
+    try:
+        get_chat_workflow_runtime()
+    except Exception as e:
+        logger.warning(f"Chat workflow warm-up skipped: {str(e)}")
+
+    # Fold LLM-labeled history into the local intent classifier
+    try:
+        async with AsyncSessionLocal() as db:
+            await get_intent_classifier().fit_from_history(db)
+    except Exception as e:
+        logger.warning(f"Intent classifier history fit skipped: {str(e)}")
+
+    # Replays chat messages spooled before the last shutdown/crash
+    message_writer = get_message_writer()
+    await message_writer.start()
+
+    # Post-response work (suggestions, persistence, tracking)
+    background_tasks = get_background_tasks()
+    background_tasks.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down HomeVision AI API...")
+    # Drain post-response jobs first: they still enqueue chat messages
+    await background_tasks.stop()
+    await message_writer.stop()
+    await cache_service.stop_background_tasks()
+    await replica_router.stop_lag_monitor()
 
 
 # Create FastAPI app with comprehensive documentation
@@ -163,14 +207,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursors and debug DB timings are sent as headers
+    expose_headers=["X-Prev-Cursor", "X-Next-Cursor", "X-DB-Queries", "X-DB-Time"],
 )
 
 # Add monitoring middleware (first to track all requests)
 app.add_middleware(MonitoringMiddleware)
 
+# Count queries / DB time per request and flag likely N+1 patterns
+app.add_middleware(QueryInstrumentationMiddleware)
+
 # Add rate limiting middleware
 app.add_middleware(RateLimitMiddleware)
 
+# Route reads to the replica with read-your-writes pinning (only when configured)
+if replica_async_engine is not None:
+    app.add_middleware(ReadYourWritesMiddleware)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(chat_router)
@@ -180,7 +233,8 @@ app.include_router(intelligence_router)
 app.include_router(design_router)
 app.include_router(documents_router)
 app.include_router(admin_router)
-app.include_router(monitoring_router)  # NEW: Monitoring and health checks
+app.include_router(monitoring_router, prefix="/api/v1/monitoring")  # NEW: Monitoring and health checks
+app.include_router(monitoring_router, prefix="/api/monitoring", include_in_schema=False)  # Legacy path
 app.include_router(journey_router)  # NEW: Journey management
 
 # Mount static files for frontend
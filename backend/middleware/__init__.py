@@ -2,6 +2,14 @@
 
 from backend.middleware.rate_limiter import RateLimitMiddleware, IPRateLimitMiddleware
 from backend.middleware.monitoring import MonitoringMiddleware
+from backend.middleware.read_your_writes import ReadYourWritesMiddleware
+from backend.middleware.db_instrumentation import QueryInstrumentationMiddleware
 
-__all__ = ["RateLimitMiddleware", "IPRateLimitMiddleware", "MonitoringMiddleware"]
+__all__ = [
+    "RateLimitMiddleware",
+    "IPRateLimitMiddleware",
+    "MonitoringMiddleware",
+    "ReadYourWritesMiddleware",
+    "QueryInstrumentationMiddleware",
+]
 
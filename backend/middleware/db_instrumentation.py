@@ -0,0 +1,66 @@
+"""
+SQL instrumentation middleware for HomeView AI API.
+
+Attributes database queries to the request that issued them, reports
+likely N+1 query patterns and, in debug mode, exposes per-request query
+counts and DB time as response headers.
+"""
+
+import os
+import logging
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from backend.models.instrumentation import (
+    end_request_stats,
+    get_query_metrics,
+    start_request_stats,
+)
+
+logger = logging.getLogger(__name__)
+
+DEBUG_HEADERS = os.getenv("DEBUG", "false").lower() == "true"
+
+
+class QueryInstrumentationMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware to track SQL activity per request.
+    
+    Records:
+    - Query count and total DB time
+    - Repeated statement shapes (likely N+1)
+    - X-DB-Queries / X-DB-Time headers when DEBUG=true
+    """
+
+    def __init__(self, app, debug_headers: bool = DEBUG_HEADERS):
+        super().__init__(app)
+        self.debug_headers = debug_headers
+
+    async def dispatch(self, request: Request, call_next):
+        """
+        Process request with query tracking.
+        
+        Args:
+            request: Incoming request
+            call_next: Next middleware/handler
+            
+        Returns:
+            Response
+        """
+        stats, token = start_request_stats()
+        try:
+            response = await call_next(request)
+        finally:
+            end_request_stats(token)
+
+        route = request.scope.get("route")
+        endpoint = f"{request.method} {getattr(route, 'path', request.url.path)}"
+        for shape, count in get_query_metrics().record_request(endpoint, stats):
+            logger.warning(
+                f"Possible N+1 query in {endpoint}: statement ran {count} times: {shape[:300]}"
+            )
+
+        if self.debug_headers:
+            response.headers["X-DB-Queries"] = str(stats.queries)
+            response.headers["X-DB-Time"] = f"{stats.total_ms:.2f}ms"
+        return response
@@ -0,0 +1,72 @@
+"""
+Read-your-writes middleware for read-replica routing.
+
+Binds per-request routing state so that read-only endpoints using
+get_async_read_db stay on the primary after the client's own writes.
+"""
+
+import time
+import logging
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from backend.models.replica import (
+    PRIMARY_PIN_COOKIE,
+    RequestDbContext,
+    client_key_for,
+    get_replica_router,
+    reset_request_db_context,
+    set_request_db_context,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware that pins clients to the primary after a write.
+
+    - Identifies the client (Authorization header or client address)
+    - Honors the primary-pin cookie set by a previous write
+    - Sets the pin cookie when this request committed a write
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        """
+        Process request with read-your-writes routing state.
+
+        Args:
+            request: Incoming request
+            call_next: Next middleware/handler
+
+        Returns:
+            Response
+        """
+        try:
+            pinned_until = float(request.cookies.get(PRIMARY_PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0.0
+
+        ctx = RequestDbContext(
+            client_key=client_key_for(
+                request.headers.get("authorization"),
+                request.client.host if request.client else None,
+            ),
+            pinned_until=pinned_until,
+        )
+        token = set_request_db_context(ctx)
+        try:
+            response = await call_next(request)
+        finally:
+            reset_request_db_context(token)
+
+        if ctx.wrote:
+            sticky_seconds = get_replica_router().sticky_seconds
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                f"{time.time() + sticky_seconds:.3f}",
+                max_age=max(int(sticky_seconds), 1),
+                httponly=True,
+                samesite="lax",
+            )
+        return response
@@ -42,6 +42,7 @@ from backend.models.conversation import (
     ConversationMessage,
     ConversationSummary,
 )
+from backend.models.checkpoint import WorkflowCheckpoint, WorkflowCheckpointWrite
 from backend.models.design import (
     DesignProject,
     DesignTransformation,
@@ -103,6 +104,8 @@ __all__ = [
     "Conversation",
     "ConversationMessage",
     "ConversationSummary",
+    "WorkflowCheckpoint",
+    "WorkflowCheckpointWrite",
     "DesignProject",
     "DesignTransformation",
     "DesignVariation",
@@ -1,17 +1,34 @@
 """Base database configuration and utilities."""
 
 import os
+import time
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Generator, AsyncGenerator
-from sqlalchemy import create_engine, Column, DateTime, JSON, text
+from typing import Any, Dict, Generator, AsyncGenerator
+from sqlalchemy import create_engine, Column, DateTime, JSON, text, make_url
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.dialects.postgresql import JSONB
 from dotenv import load_dotenv
+from fastapi import Depends
 
 load_dotenv()
 
+# Imported after load_dotenv() so its settings see values from .env
+from backend.models.sqlite_mode import (  # noqa: E402
+    SQLITE_PRODUCTION_MODE,
+    configure_sqlite_engine,
+    reader_pool_options,
+    routing_session_class,
+    writer_pool_options,
+)
+from backend.models.replica import WriteTrackingSession, get_replica_router  # noqa: E402
+from backend.models.instrumentation import instrument_engine  # noqa: E402
+
 # Database URLs
 # Railway provides DATABASE_URL automatically for PostgreSQL
 # Use SQLite for local development if DATABASE_URL is not set
@@ -35,23 +52,221 @@ else:
     DATABASE_URL = "sqlite:///./homevision.db"
     DATABASE_URL_ASYNC = "sqlite+aiosqlite:///./homevision.db"
 
+# Optional read replica for read-heavy endpoints (PostgreSQL only)
+DATABASE_URL_READ = None if USE_SQLITE else os.getenv("DATABASE_URL_READ")
+DATABASE_URL_READ_ASYNC = None
+if DATABASE_URL_READ:
+    if DATABASE_URL_READ.startswith("postgres://"):
+        DATABASE_URL_READ = DATABASE_URL_READ.replace("postgres://", "postgresql://", 1)
+    DATABASE_URL_READ_ASYNC = DATABASE_URL_READ.replace("postgresql://", "postgresql+asyncpg://", 1)
+
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
+# Engine / pool configuration (environment driven)
+DB_ECHO = _env_bool("DB_ECHO", False)
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)  # seconds to wait for a connection
+DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)  # seconds; -1 disables
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+DB_STATEMENT_CACHE_SIZE = _env_int("DB_STATEMENT_CACHE_SIZE", 100)  # asyncpg; 0 behind pgbouncer
+
+
+@dataclass
+class PoolWaitStats:
+    """Connection checkout wait times for one engine's pool."""
+    checkouts: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    timeouts: int = 0
+
+    def observe(self, wait_ms: float) -> None:
+        self.checkouts += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "avg_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+            "timeouts": self.timeouts,
+        }
+
+
+class _TimedPoolMixin:
+    """Records how long each connection checkout waited on the pool."""
+
+    wait_stats: PoolWaitStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except sa_exc.TimeoutError:
+            self.wait_stats.timeouts += 1
+            raise
+        self.wait_stats.observe((time.perf_counter() - start) * 1000)
+        return conn
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Build create_engine keyword arguments for a database URL.
+
+    Args:
+        url: Database URL
+        is_async: Whether the options are for an async engine
+
+    Returns:
+        Keyword arguments for create_engine / create_async_engine
+    """
+    options: Dict[str, Any] = {
+        "echo": DB_ECHO,
+        "poolclass": TimedAsyncQueuePool if is_async else TimedQueuePool,
+    }
+    if url.startswith("sqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+        return options
+
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+    if is_async and "+asyncpg" in url:
+        options["connect_args"] = {"statement_cache_size": DB_STATEMENT_CACHE_SIZE}
+    return options
+
+
+def create_db_engine(url: str, **overrides: Any) -> Engine:
+    """Create a synchronous engine configured from the environment."""
+    db_engine = create_engine(url, **{**engine_options(url), **overrides})
+    instrument_engine(db_engine)
+    return db_engine
+
+
+def create_async_db_engine(url: str, **overrides: Any) -> AsyncEngine:
+    """Create an async engine configured from the environment."""
+    if "+asyncpg" in url:
+        # SQLAlchemy's own prepared statement cache for the asyncpg dialect
+        url = make_url(url).update_query_dict(
+            {"prepared_statement_cache_size": str(DB_STATEMENT_CACHE_SIZE)}
+        ).render_as_string(hide_password=False)
+    db_engine = create_async_engine(url, **{**engine_options(url, is_async=True), **overrides})
+    instrument_engine(db_engine.sync_engine)
+    return db_engine
+
+
 # Create engines
-if USE_SQLITE:
-    engine = create_engine(DATABASE_URL, echo=True, connect_args={"check_same_thread": False})
-    async_engine = create_async_engine(DATABASE_URL_ASYNC, echo=True, connect_args={"check_same_thread": False})
+if USE_SQLITE and SQLITE_PRODUCTION_MODE:
+    # One serialized writer connection plus a pool of WAL readers
+    engine = create_db_engine(DATABASE_URL, **writer_pool_options())
+    async_engine = create_async_db_engine(DATABASE_URL_ASYNC, **writer_pool_options())
+    read_engine = create_db_engine(DATABASE_URL, **reader_pool_options())
+    async_read_engine = create_async_db_engine(DATABASE_URL_ASYNC, **reader_pool_options())
+    for _sqlite_engine in (engine, read_engine, async_engine.sync_engine, async_read_engine.sync_engine):
+        configure_sqlite_engine(_sqlite_engine)
 else:
-    engine = create_engine(DATABASE_URL, echo=True, pool_pre_ping=True)
-    async_engine = create_async_engine(DATABASE_URL_ASYNC, echo=True, pool_pre_ping=True)
+    engine = create_db_engine(DATABASE_URL)
+    async_engine = create_async_db_engine(DATABASE_URL_ASYNC)
+    read_engine = None
+    async_read_engine = None
+
+# Replica engine (async only; read endpoints are all async)
+replica_async_engine = create_async_db_engine(DATABASE_URL_READ_ASYNC) if DATABASE_URL_READ_ASYNC else None
+
+
+def get_pool_status() -> Dict[str, Any]:
+    """
+    Report connection pool usage for the sync and async engines.
+
+    Returns:
+        Per-engine pool size, checked-in/out and overflow connections,
+        configured limits and checkout wait times
+    """
+    status: Dict[str, Any] = {}
+    engines = [("async", async_engine), ("sync", engine)]
+    if async_read_engine is not None:
+        engines.append(("async_read", async_read_engine))
+    if read_engine is not None:
+        engines.append(("sync_read", read_engine))
+    if replica_async_engine is not None:
+        engines.append(("replica", replica_async_engine))
+
+    for name, db_engine in engines:
+        pool = db_engine.pool
+        info: Dict[str, Any] = {"pool_class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            info.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+                timeout_seconds=pool.timeout(),
+            )
+        wait_stats = getattr(pool, "wait_stats", None)
+        if wait_stats is not None:
+            info["wait"] = wait_stats.to_dict()
+        status[name] = info
+    return status
+
 
 # Create session factories
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+_sync_session_options: Dict[str, Any] = {}
+_async_session_options: Dict[str, Any] = {}
+if read_engine is not None and async_read_engine is not None:
+    _sync_session_options["class_"] = routing_session_class(engine, read_engine)
+    _async_session_options["sync_session_class"] = routing_session_class(
+        async_engine.sync_engine, async_read_engine.sync_engine
+    )
+
+elif replica_async_engine is not None:
+    # Primary sessions report committed writes for read-your-writes routing
+    _async_session_options["sync_session_class"] = WriteTrackingSession
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, **_sync_session_options)
 AsyncSessionLocal = async_sessionmaker(
     async_engine,
     class_=AsyncSession,
     expire_on_commit=False,
     autocommit=False,
-    autoflush=False
+    autoflush=False,
+    **_async_session_options
 )
+AsyncReadSessionLocal = async_sessionmaker(
+    replica_async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False
+) if replica_async_engine is not None else None
 
 # Base class for all models
 Base = declarative_base()
@@ -81,6 +296,25 @@ async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+async def get_async_read_db(
+    primary: AsyncSession = Depends(get_async_db),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Get asynchronous session for read-only endpoints.
+
+    Uses the read replica when DATABASE_URL_READ is configured, unless the
+    client wrote recently (read-your-writes) or the replica is lagging; in
+    those cases (and without a replica) the primary session is used.
+    """
+    if AsyncReadSessionLocal is None or not get_replica_router().use_replica():
+        yield primary
+        return
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 def init_db():
     """Initialize database - create all tables."""
     Base.metadata.create_all(bind=engine)
@@ -104,6 +338,11 @@ async def init_db_async():
                 cols = [row[1] for row in res.all()]
                 if "floor_plan_id" not in cols:
                     await conn.exec_driver_sql("ALTER TABLE rooms ADD COLUMN floor_plan_id TEXT")
+                res = await conn.exec_driver_sql("PRAGMA table_info(room_images)")
+                cols = [row[1] for row in res.all()]
+                if "checksum" not in cols:
+                    await conn.exec_driver_sql("ALTER TABLE room_images ADD COLUMN checksum VARCHAR(128)")
+                    await conn.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_room_images_checksum ON room_images (checksum)")
             except Exception:
                 # Best-effort; if it fails, the API may still work where the column isn't used
                 pass
@@ -0,0 +1,52 @@
+"""Workflow checkpoint models for resumable LangGraph runs."""
+
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, LargeBinary, Index
+
+from backend.models.base import Base
+
+
+class WorkflowCheckpoint(Base):
+    """
+    Serialized LangGraph checkpoint.
+
+    One row per checkpoint of a workflow thread; only the newest few per
+    thread are kept (see backend.workflows.checkpointing).
+    """
+
+    __tablename__ = "workflow_checkpoints"
+
+    thread_id = Column(String(128), primary_key=True)
+    checkpoint_ns = Column(String(255), primary_key=True, default="")
+    checkpoint_id = Column(String(64), primary_key=True)
+    parent_checkpoint_id = Column(String(64), nullable=True)
+
+    # Compact (optionally zlib-compressed) serde payloads
+    checkpoint_type = Column(String(32), nullable=False)
+    checkpoint = Column(LargeBinary, nullable=False)
+    metadata_type = Column(String(32), nullable=False)
+    checkpoint_metadata = Column(LargeBinary, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("idx_workflow_checkpoints_created", "created_at"),
+    )
+
+
+class WorkflowCheckpointWrite(Base):
+    """Pending write of a task against a checkpoint (for resuming mid-step)."""
+
+    __tablename__ = "workflow_checkpoint_writes"
+
+    thread_id = Column(String(128), primary_key=True)
+    checkpoint_ns = Column(String(255), primary_key=True, default="")
+    checkpoint_id = Column(String(64), primary_key=True)
+    task_id = Column(String(64), primary_key=True)
+    idx = Column(Integer, primary_key=True)
+    channel = Column(String(255), nullable=False)
+    value_type = Column(String(32), nullable=False)
+    value = Column(LargeBinary, nullable=False)
+    task_path = Column(String(255), nullable=False, default="")
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
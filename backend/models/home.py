@@ -180,6 +180,7 @@ class RoomImage(Base, TimestampMixin):
     # Metadata
     file_size = Column(Integer)  # in bytes
     dimensions = Column(JSONType, default={})  # {width, height} in pixels
+    checksum = Column(String(128), index=True)  # content hash of the image bytes (utils.image_hash)
 
     # Relationships
     room = relationship("Room", back_populates="images")
@@ -0,0 +1,220 @@
+"""Per-request SQL instrumentation.
+
+Engine event hooks time every statement and attribute it to the current
+request (bound by QueryInstrumentationMiddleware through a context
+variable). Per request we keep the query count, total DB time and how often
+each statement *shape* ran; a shape repeated DB_N_PLUS_ONE_THRESHOLD times
+or more is reported as a likely N+1 query. Statements slower than
+DB_SLOW_QUERY_MS are logged with their parameters redacted to type/length.
+"""
+
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "5"))
+MAX_TRACKED_N_PLUS_ONE = 200
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_IN_LIST_RE = re.compile(r"\(\s*(?:\?|%\(\w+\)s|\$\d+|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+|:\w+))*\s*\)")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Normalize a SQL statement so repeated executions compare equal.
+
+    Collapses whitespace, literals and expanded IN/VALUES parameter lists.
+
+    Args:
+        statement: SQL as sent to the driver
+
+    Returns:
+        Normalized statement
+    """
+    shape = _WHITESPACE_RE.sub(" ", statement).strip()
+    shape = _STRING_RE.sub("?", shape)
+    shape = _IN_LIST_RE.sub("(?)", shape)
+    return _NUMBER_RE.sub("N", shape)
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Replace parameter values with their type (and length for sized values)."""
+    if isinstance(parameters, dict):
+        return {k: redact_parameters(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact_parameters(v) for v in parameters]
+    if parameters is None:
+        return None
+    if isinstance(parameters, (str, bytes)):
+        return f"<{type(parameters).__name__}:{len(parameters)}>"
+    return f"<{type(parameters).__name__}>"
+
+
+@dataclass
+class RequestQueryStats:
+    """SQL activity attributed to one request."""
+    queries: int = 0
+    total_ms: float = 0.0
+    slow_queries: int = 0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, shape: str, elapsed_ms: float, slow: bool) -> None:
+        self.queries += 1
+        self.total_ms += elapsed_ms
+        self.shapes[shape] += 1
+        if slow:
+            self.slow_queries += 1
+
+    def repeated_shapes(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least ``threshold`` times (likely N+1)."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+_request_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def start_request_stats() -> Tuple[RequestQueryStats, Any]:
+    """Begin attributing queries to a new request; returns (stats, reset token)."""
+    stats = RequestQueryStats()
+    return stats, _request_query_stats.set(stats)
+
+
+def end_request_stats(token: Any) -> None:
+    _request_query_stats.reset(token)
+
+
+def get_request_stats() -> Optional[RequestQueryStats]:
+    return _request_query_stats.get()
+
+
+class QueryMetrics:
+    """Process-wide SQL counters and detected N+1 patterns."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.total_ms = 0.0
+        self.slow_queries = 0
+        self.requests = 0
+        self.n_plus_one_requests = 0
+        # (endpoint, shape) -> {"occurrences", "max_repeats"}
+        self.n_plus_one: "OrderedDict[Tuple[str, str], Dict[str, int]]" = OrderedDict()
+
+    def record_query(self, elapsed_ms: float, slow: bool) -> None:
+        with self._lock:
+            self.queries += 1
+            self.total_ms += elapsed_ms
+            if slow:
+                self.slow_queries += 1
+
+    def record_request(self, endpoint: str, stats: RequestQueryStats) -> List[Tuple[str, int]]:
+        """
+        Record a finished request and return its likely N+1 shapes.
+
+        Args:
+            endpoint: "METHOD /path" of the request
+            stats: Query stats collected for the request
+
+        Returns:
+            List of (shape, repeat count) above the N+1 threshold
+        """
+        repeated = stats.repeated_shapes()
+        with self._lock:
+            self.requests += 1
+            if not repeated:
+                return repeated
+            self.n_plus_one_requests += 1
+            for shape, count in repeated:
+                key = (endpoint, shape)
+                entry = self.n_plus_one.pop(key, None) or {"occurrences": 0, "max_repeats": 0}
+                entry["occurrences"] += 1
+                entry["max_repeats"] = max(entry["max_repeats"], count)
+                self.n_plus_one[key] = entry
+                while len(self.n_plus_one) > MAX_TRACKED_N_PLUS_ONE:
+                    self.n_plus_one.popitem(last=False)
+        return repeated
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get aggregate query counters and the most frequent N+1 patterns."""
+        with self._lock:
+            patterns = sorted(self.n_plus_one.items(), key=lambda kv: kv[1]["occurrences"], reverse=True)
+            return {
+                "queries": self.queries,
+                "total_ms": round(self.total_ms, 2),
+                "avg_ms": round(self.total_ms / self.queries, 3) if self.queries else 0.0,
+                "slow_queries": self.slow_queries,
+                "slow_query_threshold_ms": SLOW_QUERY_MS,
+                "requests": self.requests,
+                "n_plus_one_requests": self.n_plus_one_requests,
+                "n_plus_one_threshold": N_PLUS_ONE_THRESHOLD,
+                "n_plus_one_patterns": [
+                    {"endpoint": endpoint, "statement": shape[:300], **entry}
+                    for (endpoint, shape), entry in patterns[:20]
+                ],
+            }
+
+
+_query_metrics = QueryMetrics()
+
+
+def get_query_metrics() -> QueryMetrics:
+    """Get global query metrics."""
+    return _query_metrics
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    slow = elapsed_ms >= SLOW_QUERY_MS
+
+    _query_metrics.record_query(elapsed_ms, slow)
+    stats = _request_query_stats.get()
+    if stats is not None:
+        stats.record(statement_shape(statement), elapsed_ms, slow)
+
+    if slow:
+        logger.warning(
+            f"Slow query ({elapsed_ms:.1f}ms): {_WHITESPACE_RE.sub(' ', statement)[:1000]} "
+            f"params={redact_parameters(parameters)}"
+        )
+
+
+def _handle_error(exception_context):
+    # Drop the start time of a statement that failed so timings stay paired
+    starts = exception_context.connection.info.get("query_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Install query timing hooks on a (sync) engine.
+
+    Args:
+        engine: Engine, or ``AsyncEngine.sync_engine`` for async engines
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,262 @@
+"""Read-replica routing.
+
+When DATABASE_URL_READ is set, read-only endpoints take their session from
+``get_async_read_db`` and query the replica instead of the primary.
+
+Read-your-writes: a client that committed a write is pinned to the primary
+for DB_READ_YOUR_WRITES_SECONDS, so it never reads a replica that has not
+replayed its own write yet. Clients are identified by their Authorization
+header (or client address), and the pin is also sent back as a cookie so
+it holds across worker processes.
+
+Replica lag is sampled periodically; reads fall back to the primary while
+the lag exceeds DB_REPLICA_MAX_LAG_SECONDS.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "10"))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("DB_REPLICA_LAG_CHECK_SECONDS", "15"))
+
+PRIMARY_PIN_COOKIE = "hv_db_primary_until"
+MAX_TRACKED_CLIENTS = 10000
+
+# Caught up (everything received is replayed) counts as no lag: the replay
+# timestamp only moves with new writes, so an idle primary would otherwise
+# look like a replica falling ever further behind
+REPLICA_LAG_SQL = (
+    "SELECT CASE "
+    "WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM (now() - pg_last_xact_replay_timestamp())), 0) "
+    "END"
+)
+
+
+@dataclass
+class RequestDbContext:
+    """Per-request routing state set by ReadYourWritesMiddleware."""
+    client_key: Optional[str] = None
+    pinned_until: float = 0.0  # wall-clock epoch from the pin cookie
+    wrote: bool = False
+
+
+_request_db_context: ContextVar[Optional[RequestDbContext]] = ContextVar("request_db_context", default=None)
+
+
+def client_key_for(authorization: Optional[str], client_host: Optional[str]) -> Optional[str]:
+    """Derive a stable, non-reversible client key for read-your-writes tracking."""
+    source = authorization or client_host
+    if not source:
+        return None
+    return hashlib.sha1(source.encode()).hexdigest()[:16]
+
+
+def set_request_db_context(ctx: Optional[RequestDbContext]):
+    """Bind routing state to the current request; returns a reset token."""
+    return _request_db_context.set(ctx)
+
+
+def reset_request_db_context(token) -> None:
+    _request_db_context.reset(token)
+
+
+def get_request_db_context() -> Optional[RequestDbContext]:
+    return _request_db_context.get()
+
+
+class ReplicaRouter:
+    """Decides whether a read may go to the replica and tracks replica lag."""
+
+    def __init__(
+        self,
+        sticky_seconds: float = READ_YOUR_WRITES_SECONDS,
+        max_lag_seconds: float = REPLICA_MAX_LAG_SECONDS,
+        max_tracked_clients: int = MAX_TRACKED_CLIENTS,
+    ):
+        """
+        Initialize router.
+
+        Args:
+            sticky_seconds: How long a client stays on the primary after a write
+            max_lag_seconds: Replica lag above which all reads use the primary
+            max_tracked_clients: Bound on remembered client write times
+        """
+        self.sticky_seconds = sticky_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.max_tracked_clients = max_tracked_clients
+        self._last_write: "OrderedDict[str, float]" = OrderedDict()
+
+        self.lag_seconds: Optional[float] = None
+        self.lag_checked_at: Optional[float] = None
+        self.max_observed_lag_seconds = 0.0
+        self.lag_checks = 0
+        self.lag_check_errors = 0
+
+        self.replica_reads = 0
+        self.primary_reads_sticky = 0
+        self.primary_reads_lagging = 0
+        self.writes_recorded = 0
+
+        self._lag_task: Optional[asyncio.Task] = None
+
+    def record_write(self, client_key: Optional[str]) -> None:
+        """Pin a client to the primary after it committed a write."""
+        self.writes_recorded += 1
+        if not client_key:
+            return
+        self._last_write[client_key] = time.monotonic()
+        self._last_write.move_to_end(client_key)
+        while len(self._last_write) > self.max_tracked_clients:
+            self._last_write.popitem(last=False)
+
+    def use_replica(self, ctx: Optional[RequestDbContext] = None) -> bool:
+        """
+        Decide whether the current read may be served by the replica.
+
+        Args:
+            ctx: Request routing state (defaults to the current request's)
+
+        Returns:
+            True for the replica, False to read from the primary
+        """
+        ctx = ctx if ctx is not None else get_request_db_context()
+        if ctx is not None and self._is_pinned(ctx):
+            self.primary_reads_sticky += 1
+            return False
+        if self.lag_seconds is not None and self.lag_seconds > self.max_lag_seconds:
+            self.primary_reads_lagging += 1
+            return False
+        self.replica_reads += 1
+        return True
+
+    def _is_pinned(self, ctx: RequestDbContext) -> bool:
+        if ctx.wrote or ctx.pinned_until > time.time():
+            return True
+        if ctx.client_key:
+            last = self._last_write.get(ctx.client_key)
+            if last is not None:
+                if time.monotonic() - last < self.sticky_seconds:
+                    return True
+                self._last_write.pop(ctx.client_key, None)
+        return False
+
+    async def check_lag(self, read_engine) -> Optional[float]:
+        """
+        Sample replication lag from the replica.
+
+        Args:
+            read_engine: Async engine connected to the replica
+
+        Returns:
+            Lag in seconds, or None if it could not be measured
+        """
+        self.lag_checks += 1
+        try:
+            async with read_engine.connect() as conn:
+                lag = float((await conn.execute(text(REPLICA_LAG_SQL))).scalar() or 0.0)
+        except Exception as e:
+            self.lag_check_errors += 1
+            logger.warning(f"Replica lag check failed: {e}")
+            return None
+        self.lag_seconds = lag
+        self.lag_checked_at = time.time()
+        self.max_observed_lag_seconds = max(self.max_observed_lag_seconds, lag)
+        return lag
+
+    def start_lag_monitor(self, read_engine, interval: float = REPLICA_LAG_CHECK_SECONDS) -> None:
+        """Start sampling replica lag in the background."""
+        if self._lag_task is not None:
+            return
+
+        async def _loop():
+            while True:
+                await self.check_lag(read_engine)
+                await asyncio.sleep(interval)
+
+        self._lag_task = asyncio.create_task(_loop())
+
+    async def stop_lag_monitor(self) -> None:
+        """Stop the background lag sampler."""
+        if self._lag_task is None:
+            return
+        self._lag_task.cancel()
+        try:
+            await self._lag_task
+        except asyncio.CancelledError:
+            pass
+        self._lag_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing counters and replica lag."""
+        return {
+            "replica_reads": self.replica_reads,
+            "primary_reads_sticky": self.primary_reads_sticky,
+            "primary_reads_lagging": self.primary_reads_lagging,
+            "writes_recorded": self.writes_recorded,
+            "pinned_clients": len(self._last_write),
+            "read_your_writes_seconds": self.sticky_seconds,
+            "lag": {
+                "seconds": self.lag_seconds,
+                "max_observed_seconds": self.max_observed_lag_seconds,
+                "max_allowed_seconds": self.max_lag_seconds,
+                "checked_at": self.lag_checked_at,
+                "checks": self.lag_checks,
+                "errors": self.lag_check_errors,
+            },
+        }
+
+
+class WriteTrackingSession(Session):
+    """Primary session that reports committed writes to the replica router."""
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _mark_flush_write(session: Session, _flush_context: Any) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _mark_dml_write(orm_execute_state: Any) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(WriteTrackingSession, "after_commit")
+def _record_commit(session: Session) -> None:
+    if not session.info.pop("wrote", False):
+        return
+    ctx = get_request_db_context()
+    if ctx is not None:
+        ctx.wrote = True
+    get_replica_router().record_write(ctx.client_key if ctx else None)
+
+
+@event.listens_for(WriteTrackingSession, "after_rollback")
+def _clear_write(session: Session) -> None:
+    session.info.pop("wrote", None)
+
+
+_replica_router: Optional[ReplicaRouter] = None
+
+
+def get_replica_router() -> ReplicaRouter:
+    """Get or create global replica router."""
+    global _replica_router
+    if _replica_router is None:
+        _replica_router = ReplicaRouter()
+    return _replica_router
@@ -0,0 +1,133 @@
+"""SQLite production mode.
+
+Single-node and edge installs run on SQLite. With the default rollback
+journal, concurrent writers (chat messages, analysis ingests) contend for
+the database lock and fail with "database is locked". Production mode:
+
+- Applies pragmas on every new connection: WAL journaling,
+  synchronous=NORMAL, a sized mmap and page cache, and busy_timeout.
+- Funnels all writes through a single writer connection. The writer
+  engine's pool holds exactly one connection, so write transactions queue
+  (FIFO, up to the pool timeout) in-process instead of racing for the
+  file lock.
+- Serves reads from a separate pool of read connections, which WAL lets
+  run concurrently with the writer.
+
+A session starts on the read pool and moves to the writer connection as
+soon as it issues a write, staying there until the transaction ends so it
+reads its own uncommitted changes.
+
+Because there is one writer connection per process, code must not open a
+second session and write through it while another session in the same
+task still holds uncommitted writes; the second write would wait for the
+first to commit.
+
+Enable with SQLITE_PRODUCTION_MODE=true.
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import TextClause
+
+SQLITE_PRODUCTION_MODE = os.getenv("SQLITE_PRODUCTION_MODE", "false").lower() == "true"
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_MMAP_SIZE_MB = int(os.getenv("SQLITE_MMAP_SIZE_MB", "256"))
+SQLITE_CACHE_SIZE_MB = int(os.getenv("SQLITE_CACHE_SIZE_MB", "64"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", "4"))
+
+_READ_ONLY_SQL_PREFIXES = ("select", "with", "pragma", "explain")
+
+
+def sqlite_pragmas() -> List[str]:
+    """Pragmas applied to each new SQLite connection in production mode."""
+    return [
+        "PRAGMA journal_mode=WAL",
+        f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE_MB * 1024 * 1024}",
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_MB * 1024}",  # negative = KiB
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def _apply_pragmas(dbapi_connection: Any, _connection_record: Any) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in sqlite_pragmas():
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def configure_sqlite_engine(engine: Engine) -> None:
+    """
+    Install the production pragmas on a (sync) SQLite engine.
+
+    Args:
+        engine: Engine, or ``AsyncEngine.sync_engine`` for async engines
+    """
+    event.listen(engine, "connect", _apply_pragmas)
+
+
+def writer_pool_options() -> Dict[str, Any]:
+    """Pool options for the single serialized writer connection."""
+    return {"pool_size": 1, "max_overflow": 0, "pool_timeout": max(SQLITE_BUSY_TIMEOUT_MS / 1000, 30)}
+
+
+def reader_pool_options() -> Dict[str, Any]:
+    """Pool options for the concurrent read connections."""
+    return {"pool_size": SQLITE_READ_POOL_SIZE, "max_overflow": 0}
+
+
+def is_write_statement(clause: Any) -> bool:
+    """Whether a statement needs the writer connection."""
+    if clause is None:
+        return False
+    if isinstance(clause, TextClause):
+        return not clause.text.lstrip().lower().startswith(_READ_ONLY_SQL_PREFIXES)
+    return bool(getattr(clause, "is_dml", False))
+
+
+class SQLiteRoutingSession(Session):
+    """
+    Session that reads from the read pool and writes through the writer.
+
+    Once a transaction issues a write it stays on the writer connection
+    until commit/rollback, so later reads see its uncommitted changes.
+    """
+
+    writer: Optional[Engine] = None
+    reader: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not self.info.get("sqlite_writer") and (self._flushing or is_write_statement(clause)):
+            self.info["sqlite_writer"] = True
+        if self.info.get("sqlite_writer") or self.reader is None:
+            return self.writer
+        return self.reader
+
+
+@event.listens_for(SQLiteRoutingSession, "after_transaction_end")
+def _release_writer(session: Session, transaction: Any) -> None:
+    if transaction.parent is None:
+        session.info.pop("sqlite_writer", None)
+
+
+def routing_session_class(writer: Engine, reader: Engine) -> type:
+    """
+    Build a SQLiteRoutingSession subclass bound to a writer/reader pair.
+
+    Args:
+        writer: Sync engine with a single-connection pool
+        reader: Sync engine for concurrent reads
+
+    Returns:
+        Session class for ``sessionmaker(class_=...)`` or
+        ``async_sessionmaker(sync_session_class=...)``
+    """
+    return type("BoundSQLiteRoutingSession", (SQLiteRoutingSession,), {"writer": writer, "reader": reader})
@@ -0,0 +1,230 @@
+"""In-process queue for work that runs after the response is sent.
+
+Persistence, analytics and tracking that the user does not wait for are
+submitted here instead of being awaited on the request path. A fixed pool
+of worker tasks takes jobs from a bounded queue, so a burst of requests
+cannot spawn unbounded background work:
+
+- ``submit`` never blocks. When the queue is full (or the queue is
+  shutting down) it returns None and the caller runs the job itself,
+  which applies backpressure to the request instead of dropping work.
+- A failing job is retried with exponential backoff, up to
+  BACKGROUND_TASK_MAX_ATTEMPTS, so jobs should be safe to run again.
+- ``stop`` drains the queue (bounded by a timeout) before cancelling the
+  workers; the FastAPI lifespan calls it on shutdown.
+
+Each submitted job gets a future that resolves to its result, for callers
+that want to pick the outcome up later (for example to finish a stream).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_TASK_WORKERS = int(os.getenv("BACKGROUND_TASK_WORKERS", "4"))
+BACKGROUND_TASK_QUEUE_SIZE = int(os.getenv("BACKGROUND_TASK_QUEUE_SIZE", "1000"))
+BACKGROUND_TASK_MAX_ATTEMPTS = int(os.getenv("BACKGROUND_TASK_MAX_ATTEMPTS", "3"))
+BACKGROUND_TASK_RETRY_BACKOFF_MS = int(os.getenv("BACKGROUND_TASK_RETRY_BACKOFF_MS", "200"))
+BACKGROUND_TASK_DRAIN_SECONDS = float(os.getenv("BACKGROUND_TASK_DRAIN_SECONDS", "10"))
+
+
+@dataclass
+class BackgroundJob:
+    """A queued call and the future its result is delivered to."""
+
+    name: str
+    func: Callable[..., Awaitable[Any]]
+    args: tuple
+    kwargs: Dict[str, Any]
+    future: asyncio.Future
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class BackgroundTaskQueue:
+    """Bounded worker pool for post-response jobs."""
+
+    def __init__(
+        self,
+        workers: int = BACKGROUND_TASK_WORKERS,
+        max_size: int = BACKGROUND_TASK_QUEUE_SIZE,
+        max_attempts: int = BACKGROUND_TASK_MAX_ATTEMPTS,
+        retry_backoff_ms: int = BACKGROUND_TASK_RETRY_BACKOFF_MS,
+    ):
+        """
+        Initialize queue.
+
+        Args:
+            workers: Number of worker tasks (jobs running at once)
+            max_size: Queued jobs beyond which submit() refuses new ones
+            max_attempts: Runs of a failing job before it is given up
+            retry_backoff_ms: Delay before the first retry; doubles per attempt
+        """
+        self.workers = workers
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff_ms / 1000
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.abandoned = 0
+        self._total_wait_ms = 0.0
+        self._total_run_ms = 0.0
+
+    # ---- lifecycle -------------------------------------------------------
+
+    @property
+    def running(self) -> bool:
+        # Workers of a closed loop (e.g. a previous test's) never finish, but are dead
+        return (
+            self._loop is not None and not self._loop.is_closed()
+            and any(not task.done() for task in self._tasks)
+        )
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"background-task-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} background task workers")
+
+    async def stop(self, timeout: float = BACKGROUND_TASK_DRAIN_SECONDS) -> None:
+        """Stop accepting jobs, drain the queue, then stop the workers."""
+        if not self.running:
+            self._tasks = []
+            return
+        self._stopping = True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Background task drain timed out; {self._queue.qsize()} jobs left")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            self.abandoned += 1
+            job.future.cancel()
+            logger.warning(f"Abandoned background job {job.name} at shutdown")
+
+    # ---- submit ----------------------------------------------------------
+
+    def submit(self, name: str, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Optional[asyncio.Future]:
+        """
+        Queue ``func(*args, **kwargs)`` to run after the response.
+
+        Args:
+            name: Job name for logs and stats
+            func: Coroutine function; may run more than once if it fails
+
+        Returns:
+            Future with the job's result, or None if the queue is full or
+            shutting down (the caller should run the job itself)
+        """
+        if self._stopping:
+            self.rejected += 1
+            return None
+        if not self.running:
+            self.start()
+
+        future = asyncio.get_running_loop().create_future()
+        # Callers may never look at the outcome; don't warn about unread exceptions
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            self._queue.put_nowait(BackgroundJob(name, func, args, kwargs, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            logger.warning(f"Background task queue full ({self.max_size}); running {name} inline")
+            return None
+        self.submitted += 1
+        return future
+
+    # ---- workers ---------------------------------------------------------
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: BackgroundJob) -> None:
+        self._total_wait_ms += (time.perf_counter() - job.enqueued_at) * 1000
+        while True:
+            job.attempts += 1
+            started = time.perf_counter()
+            try:
+                result = await job.func(*job.args, **job.kwargs)
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except Exception as e:
+                self._total_run_ms += (time.perf_counter() - started) * 1000
+                if job.attempts >= self.max_attempts:
+                    self.failed += 1
+                    logger.error(f"Background job {job.name} failed after {job.attempts} attempts: {e}", exc_info=True)
+                    job.future.set_exception(e)
+                    return
+                self.retried += 1
+                delay = self.retry_backoff * 2 ** (job.attempts - 1)
+                logger.warning(f"Background job {job.name} failed (attempt {job.attempts}), retrying in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+                continue
+
+            self._total_run_ms += (time.perf_counter() - started) * 1000
+            self.completed += 1
+            if not job.future.done():
+                job.future.set_result(result)
+            return
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and job counters."""
+        finished = self.completed + self.failed
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_size": self.max_size,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "abandoned": self.abandoned,
+            "avg_wait_ms": round(self._total_wait_ms / finished, 2) if finished else 0.0,
+            "avg_run_ms": round(self._total_run_ms / (finished + self.retried), 2) if finished else 0.0,
+        }
+
+
+_background_tasks: Optional[BackgroundTaskQueue] = None
+
+
+def get_background_tasks() -> BackgroundTaskQueue:
+    """Get or create global background task queue."""
+    global _background_tasks
+    if _background_tasks is None:
+        _background_tasks = BackgroundTaskQueue()
+    return _background_tasks
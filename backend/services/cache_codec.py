@@ -0,0 +1,237 @@
+"""
+Value codecs for the Redis cache backend.
+
+Encodes cached values to compact bytes and back. Every encoded value starts
+with a single format byte identifying the serializer and compression used,
+so the codec configuration can change without invalidating existing entries:
+
+    0x01 / 0x02          JSON / msgpack, uncompressed
+    0x11 / 0x12          JSON / msgpack, zstd-compressed
+    0x15 / 0x16          JSON / msgpack, zlib-compressed
+
+Values written before the codec layer existed are plain JSON text. Their
+first byte is always printable (>= 0x20) while format bytes never are, so
+legacy entries are still decoded as JSON.
+
+orjson, msgpack and zstandard are optional; without them the codec falls
+back to the standard library json and zlib modules.
+"""
+
+import json
+import logging
+import zlib
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, Tuple, Union
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+
+# Serializer ids (low two bits of the format byte)
+SERIALIZER_MASK = 0x03
+SERIALIZER_JSON = 0x01
+SERIALIZER_MSGPACK = 0x02
+
+# Compression ids (bits 2-4 of the format byte; keeps every header < 0x20)
+COMPRESSION_MASK = 0x1C
+COMPRESSION_NONE = 0x00
+COMPRESSION_ZSTD = 0x10
+COMPRESSION_ZLIB = 0x14
+
+
+def to_serializable(value: Any) -> Any:
+    """
+    Convert common non-JSON types into JSON-compatible values.
+
+    Used as the ``default`` hook of the JSON and msgpack serializers, so
+    datetimes, UUIDs, Decimals, enums, sets, dataclasses and pydantic models
+    can be cached instead of failing to serialize.
+
+    Args:
+        value: Value the serializer could not handle
+
+    Returns:
+        JSON-compatible representation
+    """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type {type(value).__name__} is not cacheable")
+
+
+def _json_dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, default=to_serializable, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=to_serializable, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=to_serializable, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+def _zstd_compress(data: bytes, level: int) -> bytes:
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+# name -> (id, dumps, loads)
+SERIALIZERS: Dict[str, Tuple[int, Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "json": (SERIALIZER_JSON, _json_dumps, _json_loads),
+}
+if msgpack is not None:
+    SERIALIZERS["msgpack"] = (SERIALIZER_MSGPACK, _msgpack_dumps, _msgpack_loads)
+
+# name -> (id, compress, decompress)
+COMPRESSORS: Dict[str, Tuple[int, Callable[[bytes, int], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (COMPRESSION_ZLIB, zlib.compress, zlib.decompress),
+}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = (COMPRESSION_ZSTD, _zstd_compress, _zstd_decompress)
+
+
+class CacheCodec:
+    """
+    Serializer + compression pipeline for cached values.
+
+    Values are serialized with the configured serializer and compressed
+    when the serialized payload is at least ``compress_min_bytes`` long
+    and compression actually makes it smaller.
+    """
+
+    def __init__(
+        self,
+        serializer: str = "json",
+        compression: str = "zstd",
+        compress_min_bytes: int = 1024,
+        compression_level: int = 3
+    ):
+        """
+        Initialize codec.
+
+        Args:
+            serializer: "json" (orjson when installed) or "msgpack"
+            compression: "zstd", "zlib" or "none"
+            compress_min_bytes: Minimum serialized size before compressing
+            compression_level: Compressor level
+        """
+        if serializer not in SERIALIZERS:
+            logger.warning(f"Cache serializer '{serializer}' unavailable, using json")
+            serializer = "json"
+        if compression != "none" and compression not in COMPRESSORS:
+            logger.warning(f"Cache compression '{compression}' unavailable, using zlib")
+            compression = "zlib"
+
+        self.serializer = serializer
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+        self.compression_level = compression_level
+
+    def encode(self, value: Any) -> Tuple[bytes, int]:
+        """
+        Encode a value for storage.
+
+        Args:
+            value: Value to encode
+
+        Returns:
+            Tuple of (encoded bytes including format byte, serialized size
+            before compression)
+        """
+        serializer_id, dumps, _ = SERIALIZERS[self.serializer]
+        payload = dumps(value)
+        raw_size = len(payload)
+
+        if self.compression != "none" and raw_size >= self.compress_min_bytes:
+            compression_id, compress, _ = COMPRESSORS[self.compression]
+            compressed = compress(payload, self.compression_level)
+            if len(compressed) < raw_size:
+                return bytes([compression_id | serializer_id]) + compressed, raw_size
+
+        return bytes([serializer_id]) + payload, raw_size
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        """
+        Decode a stored value written by any codec configuration.
+
+        Args:
+            data: Stored bytes (or legacy JSON text)
+
+        Returns:
+            Decoded value
+        """
+        if isinstance(data, str):
+            return json.loads(data)
+        if not data:
+            return None
+
+        header = data[0]
+        if header >= 0x20 or header == 0:
+            # Legacy plain JSON text
+            return _json_loads(data)
+
+        serializer_id = header & SERIALIZER_MASK
+        compression_id = header & COMPRESSION_MASK
+        payload = data[1:]
+
+        if compression_id != COMPRESSION_NONE:
+            for cid, _, decompress in COMPRESSORS.values():
+                if cid == compression_id:
+                    payload = decompress(payload)
+                    break
+            else:
+                raise ValueError(f"Unsupported cache compression 0x{compression_id:02x}")
+
+        for sid, _, loads in SERIALIZERS.values():
+            if sid == serializer_id:
+                return loads(payload)
+        raise ValueError(f"Unsupported cache serializer 0x{serializer_id:02x}")
+
+    def describe(self) -> Dict[str, Any]:
+        """Describe the active codec configuration."""
+        return {
+            "serializer": "orjson" if self.serializer == "json" and orjson is not None else self.serializer,
+            "compression": self.compression,
+            "compress_min_bytes": self.compress_min_bytes,
+        }
@@ -2,94 +2,367 @@
 Caching service for HomeView AI API.
 
 Supports both Redis and in-memory caching with automatic fallback.
+The in-memory backend is a bounded LRU with approximate memory accounting
+and a background expiry sweeper.
+
+With Redis available the service can run in tiered mode: a small in-process
+L1 cache sits in front of Redis (L2), and writes broadcast invalidation
+messages over Redis pub/sub so every replica drops its stale L1 entries.
+
+Entries can be tagged on set (e.g. ``home:{id}``, ``conversation:{id}``) and
+later dropped with ``invalidate_tags`` in O(tagged keys) on either backend.
+Glob pattern invalidation uses non-blocking ``SCAN`` on Redis.
+
+``get_or_compute`` protects expensive entries against cache stampedes:
+concurrent misses for a key are coalesced behind a per-key lock (and an
+optional Redis lease across replicas), hot keys are refreshed early with
+probabilistic early expiration (XFetch), and recently expired values are
+served stale while a single background refresh runs.
+
+Redis values are encoded by a pluggable codec (see cache_codec): orjson or
+msgpack, compressed above a size threshold, with a leading format byte so
+entries written by older configurations still decode.
 """
 
+import asyncio
+import fnmatch
+import inspect
 import json
 import logging
-import pickle
-from typing import Any, Optional
-from datetime import timedelta
+import math
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
 from functools import wraps
 import hashlib
 
+from backend.services.cache_codec import CacheCodec
+from backend.services.monitoring_service import LatencyHistogram
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class CacheEntry:
+    """A single in-memory cache entry."""
+    value: Any
+    expires_at: Optional[float]  # Monotonic deadline, None = no expiry
+    size: int  # Approximate size in bytes
+    tags: Tuple[str, ...] = ()
+    cache_type: str = "default"
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Approximate the memory footprint of a cached value.
+
+    Walks containers a few levels deep; this is intentionally cheap rather
+    than exact, it only needs to be good enough to enforce a memory ceiling.
+
+    Args:
+        value: Value to measure
+        _depth: Current recursion depth (internal)
+
+    Returns:
+        Approximate size in bytes
+    """
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += estimate_size(item, _depth + 1)
+
+    return size
+
+
 class InMemoryCache:
-    """Simple in-memory cache implementation."""
-    
-    def __init__(self):
-        """Initialize in-memory cache."""
-        self._cache = {}
-        self._expiry = {}
-    
+    """
+    Bounded in-memory LRU cache.
+
+    Entries are evicted least-recently-used first once either the entry
+    count or the approximate byte total exceeds its ceiling. Expired
+    entries are dropped lazily on read and by a periodic sweeper task.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        sweep_interval: float = 60.0
+    ):
+        """
+        Initialize in-memory cache.
+
+        Args:
+            max_entries: Maximum number of entries (0 = unbounded)
+            max_bytes: Approximate memory ceiling in bytes (0 = unbounded)
+            sweep_interval: Seconds between background expiry sweeps
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+
+        self._cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+        self._sweeper_task: Optional[asyncio.Task] = None
+        self.total_bytes = 0
+
+        # Metrics
+        self.evictions = 0
+        self.expirations = 0
+        self.bytes_by_type: Dict[str, int] = defaultdict(int)
+        self.evictions_by_type: Dict[str, int] = defaultdict(int)
+
     def get(self, key: str) -> Optional[Any]:
         """
         Get value from cache.
-        
+
         Args:
             key: Cache key
-            
+
         Returns:
             Cached value or None
         """
-        import time
-        
-        if key not in self._cache:
-            return None
-        
-        # Check expiry
-        if key in self._expiry and self._expiry[key] < time.time():
-            del self._cache[key]
-            del self._expiry[key]
-            return None
-        
-        return self._cache[key]
-    
-    def set(self, key: str, value: Any, ttl: int = 300):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+
+            # Check expiry
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                return None
+
+            self._cache.move_to_end(key)
+            return entry.value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: int = 300,
+        tags: Optional[Iterable[str]] = None,
+        cache_type: str = "default"
+    ):
         """
         Set value in cache.
-        
+
         Args:
             key: Cache key
             value: Value to cache
-            ttl: Time to live in seconds
+            ttl: Time to live in seconds (0 = no expiry)
+            tags: Tags to index the entry under for invalidate-by-tag
+            cache_type: Type of cache the entry belongs to (for metrics)
         """
-        import time
-        
-        self._cache[key] = value
-        if ttl > 0:
-            self._expiry[key] = time.time() + ttl
-    
+        tags = tuple(tags or ())
+        size = estimate_size(key) + estimate_size(value)
+        if self.max_bytes and size > self.max_bytes:
+            logger.warning(f"Value for {key} ({size} bytes) exceeds memory ceiling, not cached")
+            self.delete(key)
+            return
+
+        expires_at = time.monotonic() + ttl if ttl > 0 else None
+
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+            self._cache[key] = CacheEntry(
+                value=value, expires_at=expires_at, size=size, tags=tags, cache_type=cache_type
+            )
+            self.total_bytes += size
+            self.bytes_by_type[cache_type] += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._evict()
+
     def delete(self, key: str):
         """
         Delete value from cache.
-        
+
         Args:
             key: Cache key
         """
-        if key in self._cache:
-            del self._cache[key]
-        if key in self._expiry:
-            del self._expiry[key]
-    
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+
     def clear(self):
         """Clear all cached values."""
-        self._cache.clear()
-        self._expiry.clear()
-    
+        with self._lock:
+            self._cache.clear()
+            self._tags.clear()
+            self.bytes_by_type.clear()
+            self.total_bytes = 0
+
     def exists(self, key: str) -> bool:
         """
         Check if key exists in cache.
-        
+
         Args:
             key: Cache key
-            
+
         Returns:
             True if key exists and not expired
         """
         return self.get(key) is not None
 
+    def delete_tags(self, tags: Iterable[str]) -> int:
+        """
+        Delete every entry indexed under any of the given tags.
+
+        Args:
+            tags: Tags to invalidate
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    if key in self._cache:
+                        self._remove(key)
+                        removed += 1
+                self._tags.pop(tag, None)
+        return removed
+
+    def delete_pattern(self, pattern: str) -> int:
+        """
+        Delete every entry whose key matches a glob pattern.
+
+        Args:
+            pattern: Glob pattern (e.g. "rag_query:*")
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            matched = [key for key in self._cache if fnmatch.fnmatchcase(key, pattern)]
+            for key in matched:
+                self._remove(key)
+        return len(matched)
+
+    def purge_expired(self) -> int:
+        """
+        Remove all expired entries.
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                key for key, entry in self._cache.items()
+                if entry.expires_at is not None and entry.expires_at <= now
+            ]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+
+        if expired:
+            logger.debug(f"Expiry sweep removed {len(expired)} entries")
+        return len(expired)
+
+    def start_sweeper(self):
+        """Start the periodic expiry sweeper on the running event loop."""
+        if self._sweeper_task is not None and not self._sweeper_task.done():
+            return
+        self._sweeper_task = asyncio.get_running_loop().create_task(self._sweep_loop())
+
+    async def stop_sweeper(self):
+        """Stop the periodic expiry sweeper."""
+        task, self._sweeper_task = self._sweeper_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _sweep_loop(self):
+        """Background loop that purges expired entries every sweep_interval."""
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                self.purge_expired()
+            except Exception as e:
+                logger.error(f"Cache expiry sweep failed: {e}")
+
+    def _remove(self, key: str):
+        """Remove an entry and release its accounted size and tags. Caller holds the lock."""
+        entry = self._cache.pop(key)
+        self.total_bytes -= entry.size
+        self.bytes_by_type[entry.cache_type] -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _evict(self):
+        """Evict least-recently-used entries until within limits. Caller holds the lock."""
+        while self._cache and (
+            (self.max_entries and len(self._cache) > self.max_entries)
+            or (self.max_bytes and self.total_bytes > self.max_bytes)
+        ):
+            key = next(iter(self._cache))
+            self.evictions_by_type[self._cache[key].cache_type] += 1
+            self._remove(key)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get in-memory cache statistics.
+
+        Returns:
+            Dictionary with size, limits and eviction counters
+        """
+        return {
+            "entries": len(self._cache),
+            "max_entries": self.max_entries,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "tags": len(self._tags),
+            "sweeper_running": self._sweeper_task is not None and not self._sweeper_task.done(),
+        }
+
+
+@dataclass
+class CacheTypeStats:
+    """Counters and latency histograms for one cache type."""
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    get_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    set_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    @property
+    def hit_rate(self) -> float:
+        """Hit rate as a percentage."""
+        total = self.hits + self.misses
+        return self.hits / total * 100 if total else 0.0
+
 
 class CacheService:
     """
@@ -110,27 +383,103 @@ class CacheService:
         "default": 300,             # 5 minutes
     }
 
-    def __init__(self, redis_url: Optional[str] = None):
+    # Pub/sub channel used to broadcast L1 invalidations between replicas
+    INVALIDATION_CHANNEL = "homeview:cache:invalidate"
+
+    # Redis key prefix for tag -> member-key sets
+    TAG_KEY_PREFIX = "homeview:cache:tag:"
+
+    # Batch size for SCAN iteration and bulk deletes
+    SCAN_BATCH_SIZE = 500
+
+    # Redis key prefix for stampede-protection leases
+    LEASE_KEY_PREFIX = "homeview:cache:lease:"
+
+    # Marker key identifying values written by get_or_compute
+    ENVELOPE_MARKER = "__cache_envelope__"
+
+    # Delete the lease only if we still own it
+    RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        memory_cache: Optional[InMemoryCache] = None,
+        tiered: Optional[bool] = None,
+        codec: Optional[CacheCodec] = None
+    ):
         """
         Initialize cache service.
 
         Args:
             redis_url: Redis connection URL (optional)
+            memory_cache: In-memory cache to use (defaults to a bounded LRU
+                sized from CACHE_MEMORY_MAX_ENTRIES / CACHE_MEMORY_MAX_MB)
+            tiered: Keep an in-process L1 in front of Redis (defaults to
+                CACHE_TIERED, enabled unless set to "false")
+            codec: Codec for Redis values (defaults to CACHE_SERIALIZER /
+                CACHE_COMPRESSION / CACHE_COMPRESS_MIN_BYTES)
         """
         self.redis_client = None
-        self.memory_cache = InMemoryCache()
+        if memory_cache is None:
+            memory_cache = InMemoryCache(
+                max_entries=int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "10000")),
+                max_bytes=int(float(os.getenv("CACHE_MEMORY_MAX_MB", "64")) * 1024 * 1024),
+                sweep_interval=float(os.getenv("CACHE_SWEEP_INTERVAL_SECONDS", "60")),
+            )
+        self.memory_cache = memory_cache
         self.use_redis = False
 
+        if codec is None:
+            codec = CacheCodec(
+                serializer=os.getenv("CACHE_SERIALIZER", "json"),
+                compression=os.getenv("CACHE_COMPRESSION", "zstd"),
+                compress_min_bytes=int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024")),
+            )
+        self.codec = codec
+        # Per cache type: values written to Redis, serialized vs stored bytes
+        self.codec_stats: Dict[str, Dict[str, int]] = {}
+        self.type_stats: Dict[str, CacheTypeStats] = defaultdict(CacheTypeStats)
+
         # Metrics
         self.hits = 0
         self.misses = 0
         self.sets = 0
         self.deletes = 0
+        self.l1_hits = 0
+        self.l1_misses = 0
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self.invalidations_received = 0
+        self.coalesced = 0
+        self.early_refreshes = 0
+        self.stale_served = 0
+
+        # Stampede protection
+        self.stale_ttl = int(os.getenv("CACHE_STALE_SECONDS", "60"))
+        self.xfetch_beta = float(os.getenv("CACHE_XFETCH_BETA", "1.0"))
+        self.lease_seconds = float(os.getenv("CACHE_LEASE_SECONDS", "30"))
+        self.use_leases = os.getenv("CACHE_LEASE_LOCKS", "true").lower() != "false"
+        self._key_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._refreshing: Set[str] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+
+        # Tiered mode state
+        self.l1_cache: Optional[InMemoryCache] = None
+        self.l1_max_ttl = int(os.getenv("CACHE_L1_TTL_SECONDS", "30"))
+        self.instance_id = uuid.uuid4().hex
+        self._pubsub = None
+        self._pubsub_thread = None
 
         if redis_url:
             try:
                 import redis
-                self.redis_client = redis.from_url(redis_url, decode_responses=True)
+                self.redis_client = redis.from_url(redis_url, decode_responses=False)
                 self.redis_client.ping()
                 self.use_redis = True
                 logger.info("Redis cache initialized successfully")
@@ -139,26 +488,86 @@ class CacheService:
                 self.use_redis = False
         else:
             logger.info("Using in-memory cache (Redis URL not provided)")
+
+        if tiered is None:
+            tiered = os.getenv("CACHE_TIERED", "true").lower() != "false"
+        if tiered and self.use_redis:
+            self.l1_cache = InMemoryCache(
+                max_entries=int(os.getenv("CACHE_L1_MAX_ENTRIES", "1000")),
+                max_bytes=int(float(os.getenv("CACHE_L1_MAX_MB", "16")) * 1024 * 1024),
+                sweep_interval=float(os.getenv("CACHE_SWEEP_INTERVAL_SECONDS", "60")),
+            )
+            logger.info("Tiered cache enabled (in-process L1 in front of Redis)")
     
-    def get(self, key: str) -> Optional[Any]:
+    def get(self, key: str, cache_type: str = "default") -> Optional[Any]:
         """
         Get value from cache.
 
         Args:
             key: Cache key
+            cache_type: Type of cache (rag_query, vision_analysis, etc.)
 
         Returns:
             Cached value or None
         """
+        value = self._get_raw(key, cache_type, serve_stale=False)
+        return value["value"] if self._is_envelope(value) else value
+
+    def _get_raw(self, key: str, cache_type: str = "default", serve_stale: bool = True) -> Optional[Any]:
+        """
+        Read a stored value (including get_or_compute envelopes) and record metrics.
+
+        Args:
+            key: Cache key
+            cache_type: Type of cache (rag_query, vision_analysis, etc.)
+            serve_stale: Return envelopes past their logical expiry; when False
+                they are treated (and counted) as a miss
+
+        Returns:
+            Stored value or None
+        """
+        start = time.perf_counter()
+        value = self._lookup(key, cache_type)
+        if not serve_stale and self._is_envelope(value) and value["expires_at"] <= time.time():
+            # Entries written by get_or_compute linger past their logical expiry
+            # only so get_or_compute can serve them stale; plain reads miss.
+            self.hits -= 1
+            self.misses += 1
+            value = None
+
+        stats = self.type_stats[cache_type]
+        stats.get_latency.observe((time.perf_counter() - start) * 1000)
+        if value is None:
+            stats.misses += 1
+        else:
+            stats.hits += 1
+        return value
+
+    def _lookup(self, key: str, cache_type: str) -> Optional[Any]:
+        """Read a stored value from L1, Redis or memory and record global hit/miss."""
         try:
+            if self.l1_cache is not None:
+                value = self.l1_cache.get(key)
+                if value is not None:
+                    self.hits += 1
+                    self.l1_hits += 1
+                    logger.debug(f"Cache HIT (L1): {key}")
+                    return value
+                self.l1_misses += 1
+
             if self.use_redis and self.redis_client:
                 value = self.redis_client.get(key)
                 if value:
                     self.hits += 1
+                    self.l2_hits += 1
                     logger.debug(f"Cache HIT (Redis): {key}")
-                    return json.loads(value)
+                    value = self.codec.decode(value)
+                    if self.l1_cache is not None:
+                        self.l1_cache.set(key, value, self.l1_max_ttl, cache_type=cache_type)
+                    return value
                 else:
                     self.misses += 1
+                    self.l2_misses += 1
                     logger.debug(f"Cache MISS (Redis): {key}")
                     return None
             else:
@@ -175,22 +584,52 @@ class CacheService:
             self.misses += 1
             return None
     
-    def set(self, key: str, value: Any, ttl: int = 300):
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        cache_type: str = "default",
+        tags: Optional[List[str]] = None
+    ):
         """
         Set value in cache.
 
         Args:
             key: Cache key
             value: Value to cache
-            ttl: Time to live in seconds (default: 5 minutes)
+            ttl: Time to live in seconds (defaults to the TTL for cache_type)
+            cache_type: Type of cache (rag_query, vision_analysis, etc.)
+            tags: Tags to record the key under (e.g. "home:{id}")
         """
+        if ttl is None:
+            ttl = self.get_ttl_for_type(cache_type)
+        start = time.perf_counter()
         try:
             if self.use_redis and self.redis_client:
-                self.redis_client.setex(key, ttl, json.dumps(value))
+                data, raw_size = self.codec.encode(value)
+                self._record_encoding(cache_type, raw_size, len(data))
+                if tags:
+                    # Tag sets outlive their members; stale members are harmless on invalidation
+                    tag_ttl = max(ttl, max(self.DEFAULT_TTLS.values()))
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    pipe.setex(key, ttl, data)
+                    for tag in tags:
+                        pipe.sadd(self.TAG_KEY_PREFIX + tag, key)
+                        pipe.expire(self.TAG_KEY_PREFIX + tag, tag_ttl)
+                    pipe.execute()
+                else:
+                    self.redis_client.setex(key, ttl, data)
+                if self.l1_cache is not None:
+                    self.l1_cache.set(key, value, min(ttl, self.l1_max_ttl), tags=tags, cache_type=cache_type)
+                    self._publish_invalidation(keys=[key])
             else:
-                self.memory_cache.set(key, value, ttl)
+                self.memory_cache.set(key, value, ttl, tags=tags, cache_type=cache_type)
 
             self.sets += 1
+            stats = self.type_stats[cache_type]
+            stats.sets += 1
+            stats.set_latency.observe((time.perf_counter() - start) * 1000)
             logger.debug(f"Cache SET: {key} (TTL: {ttl}s)")
         except Exception as e:
             logger.error(f"Cache set error: {e}")
@@ -205,6 +644,9 @@ class CacheService:
         try:
             if self.use_redis and self.redis_client:
                 self.redis_client.delete(key)
+                if self.l1_cache is not None:
+                    self.l1_cache.delete(key)
+                    self._publish_invalidation(keys=[key])
             else:
                 self.memory_cache.delete(key)
 
@@ -218,6 +660,9 @@ class CacheService:
         try:
             if self.use_redis and self.redis_client:
                 self.redis_client.flushdb()
+                if self.l1_cache is not None:
+                    self.l1_cache.clear()
+                    self._publish_invalidation(clear=True)
             else:
                 self.memory_cache.clear()
         except Exception as e:
@@ -262,6 +707,242 @@ class CacheService:
         self.set(key, value, ttl)
         return value
 
+    async def get_or_compute(
+        self,
+        key: str,
+        factory: Callable[[], Union[Any, Awaitable[Any]]],
+        ttl: Optional[int] = None,
+        cache_type: str = "default",
+        tags: Optional[List[str]] = None,
+        stale_ttl: Optional[int] = None,
+        beta: Optional[float] = None,
+        background_refresh: bool = True
+    ) -> Any:
+        """
+        Get value from cache or compute it once, protecting against stampedes.
+
+        - Concurrent misses for the same key in this process wait on a
+          per-key lock; with Redis, a lease lock extends this across replicas.
+        - Before expiry, each read refreshes early with a probability that
+          grows as expiry nears and with the cost of the last computation
+          (XFetch), so hot keys rarely expire at all.
+        - For stale_ttl seconds after expiry the old value is served while one
+          refresh runs in the background.
+
+        With background_refresh, the factory may run after the caller has
+        returned, so it must not capture request-scoped resources such as a
+        DB session. Pass background_refresh=False to recompute inline instead.
+
+        Args:
+            key: Cache key
+            factory: Callable (sync or async) producing the value
+            ttl: Time to live in seconds (defaults to the TTL for cache_type)
+            cache_type: Type of cache (rag_query, vision_analysis, etc.)
+            tags: Tags to record the key under
+            stale_ttl: Seconds a value may be served stale (default CACHE_STALE_SECONDS)
+            beta: XFetch aggressiveness, >1 refreshes earlier (default CACHE_XFETCH_BETA)
+            background_refresh: Refresh early/stale entries in a background task
+
+        Returns:
+            Cached or computed value
+        """
+        if ttl is None:
+            ttl = self.get_ttl_for_type(cache_type)
+        if stale_ttl is None:
+            stale_ttl = self.stale_ttl if background_refresh else 0
+        if beta is None:
+            beta = self.xfetch_beta
+
+        entry = self._get_raw(key, cache_type)
+        if entry is not None and not self._is_envelope(entry):
+            # Plain value written by set(); nothing to refresh
+            return entry
+
+        if entry is not None:
+            now = time.time()
+            expires_at = entry["expires_at"]
+            # XFetch: -log(u) is exponentially distributed, so early refresh
+            # becomes likely within a few compute-durations of expiry.
+            if now - entry["delta"] * beta * math.log(1.0 - random.random()) < expires_at:
+                return entry["value"]
+
+            if background_refresh:
+                if now >= expires_at:
+                    self.stale_served += 1
+                else:
+                    self.early_refreshes += 1
+                self._schedule_refresh(key, factory, ttl, cache_type, tags, stale_ttl)
+                return entry["value"]
+            if now < expires_at:
+                self.early_refreshes += 1
+
+        lock = self._key_locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._key_locks[key] = lock
+
+        async with lock:
+            # Another coroutine may have refreshed the key while we waited
+            current = self._peek(key)
+            if current is not None and not self._is_envelope(current):
+                self.coalesced += 1
+                return current
+            if self._is_envelope(current) and (
+                entry is None or current["expires_at"] > entry["expires_at"]
+            ):
+                self.coalesced += 1
+                return current["value"]
+
+            return await self._compute_and_store(
+                key, factory, ttl, cache_type, tags, stale_ttl, wait_for_lease=True
+            )
+
+    async def _compute_and_store(
+        self,
+        key: str,
+        factory: Callable[[], Union[Any, Awaitable[Any]]],
+        ttl: int,
+        cache_type: str,
+        tags: Optional[List[str]],
+        stale_ttl: int,
+        wait_for_lease: bool
+    ) -> Optional[Any]:
+        """
+        Run the factory and store its result as a get_or_compute envelope.
+
+        When another replica holds the lease for key, either wait for its
+        result (wait_for_lease) or give up and return None.
+        """
+        token = self._acquire_lease(key)
+        if token is False:
+            if not wait_for_lease:
+                return None
+            value = await self._wait_for_lease_holder(key)
+            if value is not None:
+                self.coalesced += 1
+                return value
+            # Holder is slow or died; compute it ourselves
+            token = None
+
+        try:
+            start = time.perf_counter()
+            value = factory()
+            if inspect.isawaitable(value):
+                value = await value
+            delta = time.perf_counter() - start
+
+            if value is not None:
+                envelope = {
+                    self.ENVELOPE_MARKER: 1,
+                    "value": value,
+                    "delta": round(delta, 4),
+                    "expires_at": time.time() + ttl,
+                }
+                self.set(key, envelope, ttl=ttl + stale_ttl, cache_type=cache_type, tags=tags)
+            return value
+        finally:
+            if token:
+                self._release_lease(key, token)
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        factory: Callable[[], Union[Any, Awaitable[Any]]],
+        ttl: int,
+        cache_type: str,
+        tags: Optional[List[str]],
+        stale_ttl: int
+    ):
+        """Start a single background refresh for key unless one is running."""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                await self._compute_and_store(
+                    key, factory, ttl, cache_type, tags, stale_ttl, wait_for_lease=False
+                )
+            except Exception as e:
+                logger.warning(f"Background cache refresh failed for {key}: {e}")
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    def _acquire_lease(self, key: str) -> Union[str, bool, None]:
+        """
+        Try to take the cross-replica compute lease for key.
+
+        Returns:
+            Lease token if acquired, False if another replica holds it,
+            None if leases are not in use
+        """
+        if not (self.use_leases and self.use_redis and self.redis_client):
+            return None
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.redis_client.set(
+                self.LEASE_KEY_PREFIX + key, token, nx=True, px=int(self.lease_seconds * 1000)
+            )
+        except Exception as e:
+            logger.error(f"Cache lease acquire error: {e}")
+            return None
+        return token if acquired else False
+
+    def _release_lease(self, key: str, token: str):
+        """Release the lease for key if it is still ours."""
+        try:
+            self.redis_client.eval(self.RELEASE_LEASE_SCRIPT, 1, self.LEASE_KEY_PREFIX + key, token)
+        except Exception as e:
+            logger.error(f"Cache lease release error: {e}")
+
+    async def _wait_for_lease_holder(self, key: str) -> Optional[Any]:
+        """Poll for the value another replica is computing, up to the lease duration."""
+        deadline = time.monotonic() + self.lease_seconds
+        delay = 0.05
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            value = self._peek(key)
+            if value is not None:
+                return value["value"] if self._is_envelope(value) else value
+            delay = min(delay * 2, 0.5)
+        return None
+
+    def _peek(self, key: str) -> Optional[Any]:
+        """Read a stored value without touching hit/miss metrics."""
+        try:
+            if self.l1_cache is not None:
+                value = self.l1_cache.get(key)
+                if value is not None:
+                    return value
+            if self.use_redis and self.redis_client:
+                value = self.redis_client.get(key)
+                return self.codec.decode(value) if value else None
+            return self.memory_cache.get(key)
+        except Exception as e:
+            logger.error(f"Cache peek error: {e}")
+            return None
+
+    def _is_envelope(self, value: Any) -> bool:
+        """Whether value was written by get_or_compute."""
+        return isinstance(value, dict) and value.get(self.ENVELOPE_MARKER) == 1
+
+    def _record_encoding(self, cache_type: str, raw_size: int, stored_size: int):
+        """Accumulate serialized vs stored byte counts for a cache type."""
+        stats = self.codec_stats.get(cache_type)
+        if stats is None:
+            stats = self.codec_stats[cache_type] = {
+                "values": 0, "compressed": 0, "raw_bytes": 0, "stored_bytes": 0,
+            }
+        stats["values"] += 1
+        stats["raw_bytes"] += raw_size
+        stats["stored_bytes"] += stored_size
+        if stored_size <= raw_size:
+            stats["compressed"] += 1
+
     def get_ttl_for_type(self, cache_type: str) -> int:
         """
         Get TTL for a specific cache type.
@@ -274,26 +955,172 @@ class CacheService:
         """
         return self.DEFAULT_TTLS.get(cache_type, self.DEFAULT_TTLS["default"])
 
-    def invalidate_pattern(self, pattern: str):
+    def invalidate_tags(self, *tags: str) -> int:
+        """
+        Invalidate all keys recorded under any of the given tags.
+
+        Args:
+            *tags: Tags to invalidate (e.g., "home:{id}")
+
+        Returns:
+            Number of keys invalidated
+        """
+        removed = 0
+        try:
+            if self.use_redis and self.redis_client:
+                for tag in tags:
+                    tag_key = self.TAG_KEY_PREFIX + tag
+                    keys = [
+                        k.decode() if isinstance(k, bytes) else k
+                        for k in self.redis_client.smembers(tag_key)
+                    ]
+                    for i in range(0, len(keys), self.SCAN_BATCH_SIZE):
+                        removed += self.redis_client.delete(*keys[i:i + self.SCAN_BATCH_SIZE])
+                    self.redis_client.delete(tag_key)
+                    if keys and self.l1_cache is not None:
+                        self._drop_local(keys=keys)
+                        self._publish_invalidation(keys=keys)
+            else:
+                removed = self.memory_cache.delete_tags(tags)
+
+            self.deletes += removed
+            logger.info(f"Invalidated {removed} cache keys tagged: {', '.join(tags)}")
+        except Exception as e:
+            logger.error(f"Error invalidating tags: {e}")
+        return removed
+
+    def invalidate_pattern(self, pattern: str) -> int:
         """
         Invalidate all keys matching pattern.
 
+        Uses incremental SCAN on Redis so the server is never blocked
+        walking the whole keyspace. Prefer invalidate_tags when the
+        affected keys can be tagged on set.
+
         Args:
             pattern: Pattern to match (e.g., "rag_query:*")
+
+        Returns:
+            Number of keys invalidated
         """
+        removed = 0
         try:
             if self.use_redis and self.redis_client:
-                keys = self.redis_client.keys(pattern)
-                if keys:
-                    self.redis_client.delete(*keys)
-                    logger.info(f"Invalidated {len(keys)} Redis keys matching: {pattern}")
-
-            # For memory cache, we'd need to iterate (not efficient, but works)
-            # This is a limitation of the simple in-memory implementation
-            logger.warning("Pattern invalidation not fully supported for in-memory cache")
+                batch = []
+                for key in self.redis_client.scan_iter(match=pattern, count=self.SCAN_BATCH_SIZE):
+                    batch.append(key)
+                    if len(batch) >= self.SCAN_BATCH_SIZE:
+                        removed += self.redis_client.delete(*batch)
+                        batch = []
+                if batch:
+                    removed += self.redis_client.delete(*batch)
+                if self.l1_cache is not None:
+                    self._drop_local(pattern=pattern)
+                    self._publish_invalidation(pattern=pattern)
+            else:
+                removed = self.memory_cache.delete_pattern(pattern)
 
+            self.deletes += removed
+            logger.info(f"Invalidated {removed} cache keys matching: {pattern}")
         except Exception as e:
             logger.error(f"Error invalidating pattern: {e}")
+        return removed
+
+    def _publish_invalidation(
+        self,
+        keys: Optional[List[str]] = None,
+        pattern: Optional[str] = None,
+        clear: bool = False
+    ):
+        """
+        Broadcast an L1 invalidation to other replicas over Redis pub/sub.
+
+        Args:
+            keys: Exact keys to drop
+            pattern: Glob pattern of keys to drop
+            clear: Drop the whole L1
+        """
+        message = {"origin": self.instance_id}
+        if keys:
+            message["keys"] = keys
+        if pattern:
+            message["pattern"] = pattern
+        if clear:
+            message["clear"] = True
+
+        try:
+            self.redis_client.publish(self.INVALIDATION_CHANNEL, json.dumps(message))
+        except Exception as e:
+            logger.error(f"Cache invalidation publish error: {e}")
+
+    def _handle_invalidation(self, message: Dict[str, Any]):
+        """Apply an invalidation message received from the pub/sub channel."""
+        try:
+            payload = json.loads(message.get("data") or "{}")
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed cache invalidation: {message!r}")
+            return
+
+        if payload.get("origin") == self.instance_id:
+            return
+
+        self.invalidations_received += 1
+        self._drop_local(
+            keys=payload.get("keys"),
+            pattern=payload.get("pattern"),
+            clear=payload.get("clear", False),
+        )
+
+    def _drop_local(
+        self,
+        keys: Optional[List[str]] = None,
+        pattern: Optional[str] = None,
+        clear: bool = False
+    ):
+        """Drop entries from this replica's L1 cache."""
+        if self.l1_cache is None:
+            return
+        if clear:
+            self.l1_cache.clear()
+            return
+        for key in keys or []:
+            self.l1_cache.delete(key)
+        if pattern:
+            self.l1_cache.delete_pattern(pattern)
+
+    def start_background_tasks(self):
+        """Start background maintenance (expiry sweepers, L1 invalidation listener)."""
+        self.memory_cache.start_sweeper()
+
+        if self.l1_cache is not None:
+            self.l1_cache.start_sweeper()
+            if self._pubsub_thread is None:
+                try:
+                    self._pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+                    self._pubsub.subscribe(**{self.INVALIDATION_CHANNEL: self._handle_invalidation})
+                    self._pubsub_thread = self._pubsub.run_in_thread(sleep_time=0.5, daemon=True)
+                    logger.info("Subscribed to cache invalidation channel")
+                except Exception as e:
+                    # Without the listener L1 staleness is still bounded by CACHE_L1_TTL_SECONDS
+                    logger.warning(f"Cache invalidation listener not started: {e}")
+
+    async def stop_background_tasks(self):
+        """Stop background maintenance tasks."""
+        await self.memory_cache.stop_sweeper()
+
+        for task in list(self._refresh_tasks):
+            task.cancel()
+
+        if self.l1_cache is not None:
+            await self.l1_cache.stop_sweeper()
+        if self._pubsub_thread is not None:
+            try:
+                self._pubsub_thread.stop()
+                self._pubsub.close()
+            except Exception as e:
+                logger.error(f"Error stopping cache invalidation listener: {e}")
+            self._pubsub_thread = None
+            self._pubsub = None
 
     def get_stats(self) -> dict:
         """
@@ -317,18 +1144,142 @@ class CacheService:
             except Exception:
                 redis_info = {"connected": False}
 
+        l1_requests = self.l1_hits + self.l1_misses
+        l2_requests = self.l2_hits + self.l2_misses
+        tiers = {}
+        if self.l1_cache is not None:
+            tiers["l1"] = {
+                "hits": self.l1_hits,
+                "misses": self.l1_misses,
+                "hit_rate_percent": round(self.l1_hits / l1_requests * 100, 2) if l1_requests else 0,
+                "invalidations_received": self.invalidations_received,
+                **self.l1_cache.get_stats(),
+            }
+        if self.use_redis:
+            tiers["l2"] = {
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "hit_rate_percent": round(self.l2_hits / l2_requests * 100, 2) if l2_requests else 0,
+            }
+
         return {
             "backend": "redis" if self.use_redis else "memory",
+            "tiered": self.l1_cache is not None,
             "hits": self.hits,
             "misses": self.misses,
             "sets": self.sets,
             "deletes": self.deletes,
             "total_requests": total_requests,
             "hit_rate_percent": round(hit_rate, 2),
-            "memory_cache_size": len(self.memory_cache._cache),
+            "memory_cache_size": len(self.memory_cache),
+            "memory_cache": self.memory_cache.get_stats(),
+            "tiers": tiers,
+            "by_type": self.get_type_stats(),
+            "codec": {
+                **self.codec.describe(),
+                "by_type": {
+                    cache_type: {
+                        **stats,
+                        "compression_ratio": round(stats["raw_bytes"] / stats["stored_bytes"], 3)
+                        if stats["stored_bytes"] else 0,
+                    }
+                    for cache_type, stats in self.codec_stats.items()
+                },
+            },
+            "stampede": {
+                "coalesced": self.coalesced,
+                "early_refreshes": self.early_refreshes,
+                "stale_served": self.stale_served,
+                "refreshes_in_flight": len(self._refreshing),
+            },
             "redis": redis_info
         }
 
+    def get_type_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-cache-type counters and latency summaries.
+
+        "bytes" is the approximate size currently held in process (memory
+        backend or L1); "bytes_written" is the encoded size written to Redis.
+
+        Returns:
+            Dictionary keyed by cache type
+        """
+        local = self.l1_cache if self.l1_cache is not None else self.memory_cache
+        cache_types = set(self.type_stats) | set(self.codec_stats)
+
+        result = {}
+        for cache_type in sorted(cache_types):
+            stats = self.type_stats[cache_type]
+            result[cache_type] = {
+                "hits": stats.hits,
+                "misses": stats.misses,
+                "hit_rate_percent": round(stats.hit_rate, 2),
+                "sets": stats.sets,
+                "evictions": local.evictions_by_type.get(cache_type, 0),
+                "bytes": local.bytes_by_type.get(cache_type, 0),
+                "bytes_written": self.codec_stats.get(cache_type, {}).get("stored_bytes", 0),
+                "get_latency_ms": stats.get_latency.summary(),
+                "set_latency_ms": stats.set_latency.summary(),
+            }
+        return result
+
+    def get_prometheus_metrics(self) -> str:
+        """
+        Render per-cache-type metrics in the Prometheus text exposition format.
+
+        Returns:
+            Prometheus text format payload
+        """
+        local = self.l1_cache if self.l1_cache is not None else self.memory_cache
+        lines = [
+            "# HELP homeview_cache_requests_total Cache lookups by cache type and result.",
+            "# TYPE homeview_cache_requests_total counter",
+        ]
+        for cache_type, stats in sorted(self.type_stats.items()):
+            lines.append(f'homeview_cache_requests_total{{cache_type="{cache_type}",result="hit"}} {stats.hits}')
+            lines.append(f'homeview_cache_requests_total{{cache_type="{cache_type}",result="miss"}} {stats.misses}')
+
+        lines += [
+            "# HELP homeview_cache_sets_total Cache writes by cache type.",
+            "# TYPE homeview_cache_sets_total counter",
+        ]
+        for cache_type, stats in sorted(self.type_stats.items()):
+            lines.append(f'homeview_cache_sets_total{{cache_type="{cache_type}"}} {stats.sets}')
+
+        lines += [
+            "# HELP homeview_cache_evictions_total In-process LRU evictions by cache type.",
+            "# TYPE homeview_cache_evictions_total counter",
+        ]
+        for cache_type, count in sorted(local.evictions_by_type.items()):
+            lines.append(f'homeview_cache_evictions_total{{cache_type="{cache_type}"}} {count}')
+
+        lines += [
+            "# HELP homeview_cache_bytes Approximate bytes held in process by cache type.",
+            "# TYPE homeview_cache_bytes gauge",
+        ]
+        for cache_type, size in sorted(local.bytes_by_type.items()):
+            lines.append(f'homeview_cache_bytes{{cache_type="{cache_type}"}} {size}')
+
+        lines += [
+            "# HELP homeview_cache_written_bytes_total Encoded bytes written to Redis by cache type.",
+            "# TYPE homeview_cache_written_bytes_total counter",
+        ]
+        for cache_type, stats in sorted(self.codec_stats.items()):
+            lines.append(f'homeview_cache_written_bytes_total{{cache_type="{cache_type}"}} {stats["stored_bytes"]}')
+
+        for op in ("get", "set"):
+            name = f"homeview_cache_{op}_duration_seconds"
+            lines += [
+                f"# HELP {name} Cache {op} latency by cache type.",
+                f"# TYPE {name} histogram",
+            ]
+            for cache_type, stats in sorted(self.type_stats.items()):
+                histogram = stats.get_latency if op == "get" else stats.set_latency
+                lines += histogram.to_prometheus(name, {"cache_type": cache_type})
+
+        return "\n".join(lines) + "\n"
+
 
 # Global cache instance
 _cache_service: Optional[CacheService] = None
@@ -344,7 +1295,6 @@ def get_cache_service() -> CacheService:
     global _cache_service
     
     if _cache_service is None:
-        import os
         redis_url = os.getenv("REDIS_URL")
         _cache_service = CacheService(redis_url)
     
@@ -392,20 +1342,14 @@ def cached(ttl: int = 300, key_prefix: str = ""):
             # Generate cache key
             key = f"{key_prefix}:{func.__name__}:{cache_key(*args, **kwargs)}"
             
-            # Try to get from cache
-            cached_value = cache.get(key)
-            if cached_value is not None:
-                logger.debug(f"Cache hit: {key}")
-                return cached_value
-            
-            # Compute value
-            logger.debug(f"Cache miss: {key}")
-            result = await func(*args, **kwargs)
-            
-            # Cache result
-            cache.set(key, result, ttl)
-            
-            return result
+            # Arguments may be request-scoped, so refresh inline rather than
+            # in the background; concurrent misses still compute only once.
+            return await cache.get_or_compute(
+                key,
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                background_refresh=False,
+            )
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
@@ -430,7 +1374,6 @@ def cached(ttl: int = 300, key_prefix: str = ""):
             return result
         
         # Return appropriate wrapper based on function type
-        import asyncio
         if asyncio.iscoroutinefunction(func):
             return async_wrapper
         else:
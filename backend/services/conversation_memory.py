@@ -0,0 +1,217 @@
+"""Token-budgeted conversation memory.
+
+Prompts carry a rolling summary of older turns (ConversationSummary) plus
+as many recent turns as fit in CHAT_HISTORY_TOKEN_BUDGET, newest first,
+instead of a fixed number of raw messages of unbounded length.
+
+The summary is rolled forward off the hot path: after each turn
+SummaryUpdater folds messages that have left the recent window into the
+latest summary, in a background task with its own DB session. A new
+conversation's title is generated the same way.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1200"))
+HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "20"))
+ROLLING_SUMMARY_ENABLED = os.getenv("CHAT_ROLLING_SUMMARY", "true").lower() == "true"
+SUMMARY_KEEP_RECENT = int(os.getenv("CHAT_SUMMARY_KEEP_RECENT", "6"))
+SUMMARY_MIN_MESSAGES = int(os.getenv("CHAT_SUMMARY_MIN_MESSAGES", "4"))
+
+# Share of the history budget the summary may take; recent turns get the rest
+SUMMARY_BUDGET_SHARE = 0.35
+CHARS_PER_TOKEN = 4
+TRUNCATION_MARKER = " …"
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Cheap token estimate (~4 characters per token); no model round trip."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly ``max_tokens`` tokens, keeping the beginning."""
+    max_chars = max(max_tokens, 0) * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max(max_chars - len(TRUNCATION_MARKER), 0)].rstrip() + TRUNCATION_MARKER
+
+
+def drop_summarized(history: List[Dict[str, Any]], end_message_id: Optional[str]) -> List[Dict[str, Any]]:
+    """Drop messages up to and including the last one covered by the summary."""
+    if not end_message_id:
+        return history
+    for i, msg in enumerate(history):
+        if msg.get("id") == end_message_id:
+            return history[i + 1:]
+    return history
+
+
+def budget_history(
+    history: List[Dict[str, Any]],
+    summary: Optional[str] = None,
+    budget_tokens: int = HISTORY_TOKEN_BUDGET,
+) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """
+    Fit a summary and recent turns into a token budget.
+
+    The summary takes at most SUMMARY_BUDGET_SHARE of the budget. Recent
+    turns fill the rest newest first; the newest turn is truncated rather
+    than dropped if it alone exceeds what is left.
+
+    Args:
+        history: Messages (``role``/``content`` dicts), oldest first
+        summary: Rolling summary of older turns
+        budget_tokens: Total tokens for summary plus turns
+
+    Returns:
+        (summary or None, turns that fit, oldest first)
+    """
+    remaining = budget_tokens
+    if summary:
+        summary = truncate_to_tokens(summary, int(budget_tokens * SUMMARY_BUDGET_SHARE))
+        remaining -= estimate_tokens(summary)
+
+    selected: List[Dict[str, Any]] = []
+    for msg in reversed(history):
+        content = msg.get("content") or ""
+        cost = estimate_tokens(content)
+        if cost > remaining:
+            if not selected and remaining > 0:
+                selected.append({**msg, "content": truncate_to_tokens(content, remaining)})
+            break
+        selected.append(msg)
+        remaining -= cost
+
+    selected.reverse()
+    return summary or None, selected
+
+
+class SummaryUpdater:
+    """Rolls conversation summaries forward and titles new conversations in background tasks."""
+
+    def __init__(self, session_factory: Optional[Callable[[], Any]] = None, gemini_client: Optional[Any] = None):
+        """
+        Initialize updater.
+
+        Args:
+            session_factory: Async session factory (defaults to AsyncSessionLocal)
+            gemini_client: Client for summaries and titles (created on first use)
+        """
+        self._session_factory = session_factory
+        self._gemini_client = gemini_client
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.updates = 0
+        self.failures = 0
+        self.titles = 0
+
+    def get_gemini_client(self) -> Any:
+        """Gemini client shared by the background conversation services."""
+        if self._gemini_client is None:
+            from backend.integrations.gemini.client import GeminiClient
+            self._gemini_client = GeminiClient()
+        return self._gemini_client
+
+    def _get_session_factory(self) -> Callable[[], Any]:
+        if self._session_factory is None:
+            from backend.models.base import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory
+
+    def _spawn(self, coro) -> Optional[asyncio.Task]:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            coro.close()
+            return None
+        task = loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def schedule(self, conversation_id: str) -> Optional[asyncio.Task]:
+        """
+        Roll the summary of a conversation forward unless already running.
+
+        Args:
+            conversation_id: Conversation ID
+
+        Returns:
+            The background task, or None if skipped
+        """
+        if not ROLLING_SUMMARY_ENABLED or not conversation_id or conversation_id in self._running:
+            return None
+        self._running.add(conversation_id)
+        task = self._spawn(self._update(conversation_id))
+        if task is None:
+            self._running.discard(conversation_id)
+        return task
+
+    def schedule_title(self, conversation_id: str, first_message: str) -> Optional[asyncio.Task]:
+        """
+        Title a conversation from its first user message.
+
+        Args:
+            conversation_id: Conversation ID
+            first_message: Opening user message
+
+        Returns:
+            The background task, or None without a running loop
+        """
+        return self._spawn(self._set_title(conversation_id, first_message))
+
+    async def _set_title(self, conversation_id: str, first_message: str) -> None:
+        from backend.services.conversation_service import ConversationService
+
+        try:
+            async with self._get_session_factory()() as db:
+                service = ConversationService(db, gemini_client=self.get_gemini_client())
+                await service.set_initial_title(uuid.UUID(conversation_id), first_message)
+            self.titles += 1
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Title update failed for {conversation_id}: {e}")
+
+    async def _update(self, conversation_id: str) -> None:
+        from backend.services.conversation_service import ConversationService
+
+        try:
+            async with self._get_session_factory()() as db:
+                service = ConversationService(db, gemini_client=self.get_gemini_client())
+                summary = await service.update_rolling_summary(
+                    conversation_id,
+                    keep_recent=SUMMARY_KEEP_RECENT,
+                    min_messages=SUMMARY_MIN_MESSAGES,
+                )
+            if summary is not None:
+                self.updates += 1
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Rolling summary update failed for {conversation_id}: {e}")
+        finally:
+            self._running.discard(conversation_id)
+
+    async def wait_idle(self) -> None:
+        """Wait for in-flight summary updates to finish."""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+_summary_updater: Optional[SummaryUpdater] = None
+
+
+def get_summary_updater() -> SummaryUpdater:
+    """Get or create global summary updater."""
+    global _summary_updater
+    if _summary_updater is None:
+        _summary_updater = SummaryUpdater()
+    return _summary_updater
@@ -1,12 +1,14 @@
 """Conversation Service - Manage conversation history and memory."""
 
+import base64
+import json
 import logging
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, desc, func, text
+from sqlalchemy import select, insert, update, and_, desc, func, text, tuple_
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import OperationalError
 
@@ -16,6 +18,27 @@ from backend.integrations.gemini.client import GeminiClient
 logger = logging.getLogger(__name__)
 
 
+def encode_message_cursor(message: ConversationMessage) -> str:
+    """Encode a message's (created_at, id) position as an opaque cursor."""
+    raw = json.dumps([message.created_at.isoformat(), str(message.id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_message_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """
+    Decode a cursor produced by encode_message_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, message_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), uuid.UUID(message_id)
+    except Exception as e:
+        raise ValueError(f"Invalid message cursor: {cursor!r}") from e
+
+
 class ConversationService:
     """
     Service for managing conversations and message history.
@@ -28,9 +51,9 @@ class ConversationService:
     - Manage conversation context window
     """
     
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, gemini_client: Optional[GeminiClient] = None):
         self.db = db
-        self.gemini_client = GeminiClient()
+        self.gemini_client = gemini_client or GeminiClient()
     
     async def create_conversation(
         self,
@@ -230,58 +253,142 @@ class ConversationService:
         context_sources: Optional[List[str]] = None
     ) -> ConversationMessage:
         """Add a message to a conversation."""
-        try:
-            # Create message
-            message = ConversationMessage(
-                id=uuid.uuid4(),
-                conversation_id=uuid.UUID(conversation_id),
-                role=role,
-                content=content,
-                intent=intent,
-                message_metadata=metadata or {},
-                context_sources=context_sources or []
+        messages = await self.add_messages(
+            conversation_id,
+            [{
+                "role": role,
+                "content": content,
+                "intent": intent,
+                "metadata": metadata,
+                "context_sources": context_sources,
+            }],
+        )
+        return messages[0]
+
+    async def add_messages(
+        self,
+        conversation_id: str,
+        messages: List[Dict[str, Any]],
+        skip_existing: bool = False,
+        on_first_exchange: Optional[Callable[[str, str], None]] = None
+    ) -> List[ConversationMessage]:
+        """
+        Append messages to a conversation in one transaction.
+
+        Issues a single multi-row INSERT plus one
+        ``UPDATE conversations ... RETURNING`` for the counters, without
+        loading the Conversation row. Messages get strictly increasing
+        ``created_at`` values so a user/assistant pair keeps its order.
+
+        Args:
+            conversation_id: Conversation ID
+            messages: Dicts with ``role`` and ``content`` and optional
+                ``intent``, ``metadata`` and ``context_sources``; ``id`` and
+                ``created_at`` may be preassigned (write-behind replay)
+            skip_existing: Drop messages whose id is already stored, so a
+                replayed batch is not inserted or counted twice
+            on_first_exchange: Called with (conversation_id, first user message)
+                instead of titling the conversation here, for callers that
+                must not wait on the title LLM call
+
+        Returns:
+            The stored messages, in the given order
+        """
+        if not messages:
+            return []
+
+        conv_uuid = uuid.UUID(conversation_id)
+        now = datetime.utcnow()
+        stored = [
+            ConversationMessage(
+                id=m.get("id") or uuid.uuid4(),
+                conversation_id=conv_uuid,
+                role=m["role"],
+                content=m["content"],
+                intent=m.get("intent"),
+                message_metadata=m.get("metadata") or {},
+                context_sources=m.get("context_sources") or [],
+                created_at=m.get("created_at") or now + timedelta(microseconds=i),
             )
-            
-            self.db.add(message)
+            for i, m in enumerate(messages)
+        ]
+
+        if skip_existing:
+            existing = set((await self.db.execute(
+                select(ConversationMessage.id).where(ConversationMessage.id.in_([m.id for m in stored]))
+            )).scalars().all())
+            stored = [m for m in stored if m.id not in existing]
+            if not stored:
+                return []
+        last_at = stored[-1].created_at
 
-            # Update conversation
-            conversation = await self.get_conversation(conversation_id)
-            if conversation:
-                conversation.message_count += 1
-                conversation.last_message_at = datetime.utcnow()
-                conversation.updated_at = datetime.utcnow()
+        try:
+            # Core insert on the table: every row carries the same keys, so the
+            # batch goes out as one executemany (the ORM bulk path would split
+            # rows whose optional columns are None).
+            await self.db.execute(
+                insert(ConversationMessage.__table__),
+                [
+                    {
+                        "id": msg.id,
+                        "conversation_id": msg.conversation_id,
+                        "role": msg.role,
+                        "content": msg.content,
+                        "intent": msg.intent,
+                        "message_metadata": msg.message_metadata,
+                        "context_sources": msg.context_sources,
+                        "created_at": msg.created_at,
+                    }
+                    for msg in stored
+                ],
+            )
+            result = await self.db.execute(
+                update(Conversation)
+                .where(Conversation.id == conv_uuid)
+                .values(
+                    message_count=func.coalesce(Conversation.message_count, 0) + len(stored),
+                    last_message_at=last_at,
+                    updated_at=last_at,
+                )
+                .returning(Conversation.message_count, Conversation.title)
+            )
+            counters = result.first()
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to add messages: {e}", exc_info=True)
+            raise
 
-                # Auto-generate title from first user message
-                if not conversation.title and role == "user" and conversation.message_count == 1:
-                    conversation.title = await self._generate_title(content)
+        if counters is None:
+            logger.warning(f"Conversation {conversation_id} not found while adding messages")
+        elif counters[0] == len(stored) and counters[1] is None and stored[0].role == "user":
+            # First exchange: title from the opening user message. Done after the
+            # commit so a slow title generation never holds the write transaction.
+            if on_first_exchange is not None:
+                on_first_exchange(conversation_id, stored[0].content)
             else:
-                # Fallback for older DB schemas: raw SQL increment without touching new columns
-                try:
-                    now = datetime.utcnow()
-                    await self.db.execute(
-                        text("""
-                            UPDATE conversations
-                            SET message_count = COALESCE(message_count, 0) + 1,
-                                last_message_at = :now,
-                                updated_at = :now
-                            WHERE id = :id
-                        """),
-                        {"now": now, "id": str(uuid.UUID(conversation_id))}
-                    )
-                except Exception as ue:
-                    logger.debug(f"Fallback update of conversation counters failed: {ue}")
+                await self.set_initial_title(conv_uuid, stored[0].content)
 
-            await self.db.commit()
-            await self.db.refresh(message)
+        logger.info(
+            f"Added {len(stored)} message(s) ({', '.join(m.role for m in stored)}) "
+            f"to conversation {conversation_id}"
+        )
+        return stored
 
-            logger.info(f"Added {role} message to conversation {conversation_id}")
-            return message
-            
+    async def set_initial_title(self, conversation_id: uuid.UUID, first_message: str) -> None:
+        """Set the title of an untitled conversation from its first message."""
+        try:
+            title = await self._generate_title(first_message)
+            await self.db.execute(
+                update(Conversation)
+                .where(Conversation.id == conversation_id, Conversation.title.is_(None))
+                .values(title=title)
+            )
+            await self.db.commit()
         except Exception as e:
             await self.db.rollback()
-            logger.error(f"Failed to add message: {e}", exc_info=True)
-            raise
-    
+            logger.warning(f"Failed to set conversation title: {e}")
+
     async def get_messages(
         self,
         conversation_id: str,
@@ -307,6 +414,80 @@ class ConversationService:
             logger.error(f"Failed to get messages: {e}", exc_info=True)
             return []
     
+    async def get_last_messages(
+        self,
+        conversation_id: str,
+        count: int = 10
+    ) -> List[ConversationMessage]:
+        """Get the last ``count`` messages of a conversation, oldest first.
+
+        Reads the tail of the thread through idx_messages_conversation_created
+        instead of scanning from the start.
+        """
+        page = await self.get_messages_page(conversation_id, limit=count)
+        return page["messages"]
+
+    async def get_messages_page(
+        self,
+        conversation_id: str,
+        limit: int = 50,
+        before: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Keyset-paginate messages on (created_at, id).
+
+        Without a cursor the newest ``limit`` messages are returned. ``before``
+        pages towards older messages and ``after`` towards newer ones; both
+        take cursors returned by a previous page.
+
+        Args:
+            conversation_id: Conversation ID
+            limit: Page size
+            before: Cursor; return messages older than it
+            after: Cursor; return messages newer than it
+
+        Returns:
+            Dict with ``messages`` (oldest first), ``prev_cursor`` (for older
+            messages, None at the start of the thread) and ``next_cursor``
+            (for newer messages, None at the end)
+
+        Raises:
+            ValueError: If a cursor is malformed or both are given
+        """
+        if before and after:
+            raise ValueError("Pass either 'before' or 'after', not both")
+
+        columns = (ConversationMessage.created_at, ConversationMessage.id)
+        query = select(ConversationMessage).where(
+            ConversationMessage.conversation_id == uuid.UUID(conversation_id)
+        )
+
+        if after:
+            query = query.where(tuple_(*columns) > tuple_(*decode_message_cursor(after)))
+            query = query.order_by(ConversationMessage.created_at.asc(), ConversationMessage.id.asc())
+        else:
+            if before:
+                query = query.where(tuple_(*columns) < tuple_(*decode_message_cursor(before)))
+            query = query.order_by(ConversationMessage.created_at.desc(), ConversationMessage.id.desc())
+
+        # Fetch one extra row to learn whether another page exists
+        result = await self.db.execute(query.limit(limit + 1))
+        messages = list(result.scalars().all())
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if not after:
+            messages.reverse()
+
+        has_older = has_more if not after else True
+        has_newer = has_more if after else bool(before)
+
+        return {
+            "messages": messages,
+            "prev_cursor": encode_message_cursor(messages[0]) if messages and has_older else None,
+            "next_cursor": encode_message_cursor(messages[-1]) if messages and has_newer else None,
+        }
+
     async def get_recent_messages(
         self,
         conversation_id: str,
@@ -314,12 +495,13 @@ class ConversationService:
     ) -> List[Dict[str, Any]]:
         """Get recent messages formatted for chat context."""
         try:
-            messages = await self.get_messages(conversation_id, limit=count)
+            messages = await self.get_last_messages(conversation_id, count=count)
             
             # Format for chat context
             formatted = []
-            for msg in messages[-count:]:  # Last N messages
+            for msg in messages:
                 formatted.append({
+                    "id": str(msg.id),
                     "role": msg.role,
                     "content": msg.content,
                     "timestamp": msg.created_at.isoformat() if msg.created_at else None
@@ -460,7 +642,7 @@ class ConversationService:
     ) -> Optional[ConversationSummary]:
         """Generate a summary of recent messages."""
         try:
-            messages = await self.get_messages(conversation_id, limit=message_count)
+            messages = await self.get_last_messages(conversation_id, count=message_count)
             
             if len(messages) < 5:  # Need at least 5 messages to summarize
                 logger.info("Not enough messages to summarize")
@@ -536,6 +718,140 @@ Return ONLY a JSON array like: ["topic1", "topic2", "topic3"]"""
             logger.error(f"Failed to generate summary: {e}", exc_info=True)
             return None
     
+    async def get_latest_summary(self, conversation_id: str) -> Optional[ConversationSummary]:
+        """Get the most recent (rolling) summary of a conversation."""
+        result = await self.db.execute(
+            select(ConversationSummary)
+            .where(ConversationSummary.conversation_id == uuid.UUID(conversation_id))
+            .order_by(ConversationSummary.created_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_history_context(
+        self,
+        conversation_id: str,
+        max_messages: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Load prompt history: the rolling summary plus the turns after it.
+
+        Args:
+            conversation_id: Conversation ID
+            max_messages: Most recent messages to load
+
+        Returns:
+            Dict with ``summary`` (text or None) and ``messages`` (formatted
+            like get_recent_messages, excluding turns the summary covers)
+        """
+        from backend.services.conversation_memory import drop_summarized
+
+        summary = None
+        try:
+            summary = await self.get_latest_summary(conversation_id)
+        except Exception as e:
+            logger.debug(f"Conversation summary unavailable: {e}")
+
+        messages = await self.get_recent_messages(conversation_id, count=max_messages)
+        if summary is None:
+            return {"summary": None, "messages": messages}
+        return {
+            "summary": summary.summary_text,
+            "messages": drop_summarized(messages, str(summary.end_message_id)),
+        }
+
+    async def update_rolling_summary(
+        self,
+        conversation_id: str,
+        keep_recent: int = 6,
+        min_messages: int = 4,
+        max_batch: int = 40
+    ) -> Optional[ConversationSummary]:
+        """
+        Fold messages that left the recent window into the rolling summary.
+
+        Messages after the latest summary, except the newest ``keep_recent``,
+        are merged with the previous summary text into a new
+        ConversationSummary covering the thread from its first message.
+
+        Args:
+            conversation_id: Conversation ID
+            keep_recent: Newest messages left out (they go into prompts verbatim)
+            min_messages: Minimum new messages worth a summarization call
+            max_batch: Most messages folded per update
+
+        Returns:
+            The new summary, or None if nothing was folded
+        """
+        conv_uuid = uuid.UUID(conversation_id)
+        previous = await self.get_latest_summary(conversation_id)
+
+        query = select(ConversationMessage).where(ConversationMessage.conversation_id == conv_uuid)
+        if previous is not None:
+            end = await self.db.get(ConversationMessage, previous.end_message_id)
+            if end is not None:
+                query = query.where(
+                    tuple_(ConversationMessage.created_at, ConversationMessage.id)
+                    > tuple_(end.created_at, end.id)
+                )
+        query = query.order_by(
+            ConversationMessage.created_at.asc(), ConversationMessage.id.asc()
+        ).limit(max_batch + keep_recent)
+        pending = list((await self.db.execute(query)).scalars().all())
+
+        to_fold = pending[:max(len(pending) - keep_recent, 0)]
+        if len(to_fold) < min_messages:
+            return None
+
+        conversation_text = "\n".join(f"{msg.role.upper()}: {msg.content}" for msg in to_fold)
+        previous_text = previous.summary_text if previous is not None else "(none yet)"
+        summary_prompt = f"""Update the running summary of a home improvement conversation.
+
+Current summary:
+{previous_text}
+
+New messages:
+{conversation_text}
+
+Write the updated summary in at most 150 words. Keep facts about the home, rooms,
+measurements, budget, decisions and open questions; drop pleasantries.
+Return ONLY the summary text."""
+
+        try:
+            summary_text = (await self.gemini_client.generate_text(
+                prompt=summary_prompt,
+                temperature=0.2,
+                max_tokens=300
+            )).strip()
+        except Exception as e:
+            logger.warning(f"Failed to summarize conversation {conversation_id}: {e}")
+            return None
+        if not summary_text:
+            return None
+
+        summary = ConversationSummary(
+            id=uuid.uuid4(),
+            conversation_id=conv_uuid,
+            summary_text=summary_text,
+            start_message_id=previous.start_message_id if previous is not None else to_fold[0].id,
+            end_message_id=to_fold[-1].id,
+            message_count=(previous.message_count if previous is not None else 0) + len(to_fold),
+            key_topics=previous.key_topics if previous is not None else [],
+            entities_mentioned=previous.entities_mentioned if previous is not None else {},
+        )
+        try:
+            self.db.add(summary)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        logger.info(
+            f"Rolled summary for conversation {conversation_id} "
+            f"forward by {len(to_fold)} messages ({summary.message_count} total)"
+        )
+        return summary
+
     async def _generate_title(self, first_message: str) -> str:
         """Generate a title from the first message."""
         try:
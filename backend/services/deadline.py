@@ -0,0 +1,101 @@
+"""Request deadlines shared by workflow nodes and the calls they make.
+
+A workflow run gets an absolute deadline (unix time, so it survives a
+checkpoint and a resume on another replica) that is kept in its state.
+While a node runs, the deadline is also held in a context variable, so an
+LLM or HTTP call deep in the stack can bound itself by the time that is
+left without the deadline being threaded through every signature:
+
+- ``deadline_scope`` sets the current deadline for a block
+- ``remaining_seconds`` is the time left (None when there is no deadline)
+- ``call_with_deadline`` awaits a call within the time left and raises
+  DeadlineExceeded when it runs out (the call is cancelled)
+
+LLM clients get this through ``llm_timed``; other outbound calls use
+``call_with_deadline`` directly.
+"""
+
+import asyncio
+import inspect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Iterator, Optional
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The request's deadline passed before a call finished."""
+
+
+# Absolute deadline (time.time()) of the work the current task is doing
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def deadline_after(seconds: Optional[float]) -> Optional[float]:
+    """Deadline ``seconds`` from now (None for no deadline)."""
+    return time.time() + seconds if seconds else None
+
+
+def get_deadline() -> Optional[float]:
+    """Deadline of the current context, if any."""
+    return _deadline.get()
+
+
+def set_deadline(deadline: Optional[float]) -> None:
+    """Set the deadline for the rest of the current context (e.g. a workflow node)."""
+    _deadline.set(deadline)
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """Run a block under ``deadline`` (None lifts any outer deadline)."""
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_seconds(deadline: Optional[float] = None) -> Optional[float]:
+    """
+    Time left until a deadline.
+
+    Args:
+        deadline: Absolute deadline (defaults to the current context's)
+
+    Returns:
+        Seconds left (negative once passed), or None without a deadline
+    """
+    if deadline is None:
+        deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.time()
+
+
+async def call_with_deadline(awaitable: Awaitable[Any], name: str = "call") -> Any:
+    """
+    Await ``awaitable`` within the current deadline.
+
+    Args:
+        awaitable: Call to bound
+        name: Call name for the error message
+
+    Raises:
+        DeadlineExceeded: If the deadline passes first (the call is cancelled)
+    """
+    remaining = remaining_seconds()
+    if remaining is None:
+        return await awaitable
+    if remaining <= 0:
+        if inspect.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded(f"No time left for {name}")
+
+    try:
+        async with asyncio.timeout(remaining) as scope:
+            return await awaitable
+    except TimeoutError as e:
+        if scope.expired():
+            raise DeadlineExceeded(f"{name} cancelled at the request deadline ({remaining:.1f}s budget)") from e
+        raise
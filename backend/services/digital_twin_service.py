@@ -18,7 +18,9 @@ from backend.models import (
     FloorPlanAnalysis, RoomAnalysis, ImageAnalysis
 )
 from backend.agents.digital_twin import FloorPlanAnalysisAgent, RoomAnalysisAgent
+from backend.services.rag_service import RAGService
 from backend.utils.image_filename_parser import parse_image_filename
+from backend.utils.image_hash import file_content_hash
 from backend.utils.room_type_normalizer import normalize_room_type
 
 logger = logging.getLogger(__name__)
@@ -31,6 +33,11 @@ class DigitalTwinService:
         # Initialize analysis agents used by this service
         self.floor_plan_agent = FloorPlanAnalysisAgent()
         self.room_analysis_agent = RoomAnalysisAgent()
+        self.rag_service = RAGService()
+
+    def _invalidate_home_cache(self, home_id: Any) -> None:
+        """Drop cached results (RAG queries etc.) tagged with this home after a write."""
+        self.rag_service.invalidate_cached_queries(str(home_id))
 
     async def analyze_and_save_floor_plan(
         self,
@@ -166,6 +173,7 @@ class DigitalTwinService:
                     created_room_ids.append(str(room.id))
 
             await db.commit()
+            self._invalidate_home_cache(home_id)
             return {
                 "floor_plan_ids": created_fp_ids,
                 "room_ids": created_room_ids,
@@ -184,10 +192,16 @@ class DigitalTwinService:
         room_id: uuid.UUID,
         image_path: str,
         view_angle: Optional[str] = None,
+        checksum: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Analyze a single room image with AI and persist results to the DB.
 
         Creates RoomImage, ImageAnalysis, Materials, Fixtures and Products.
+
+        Images are content-addressed by checksum: if the same image was
+        already analyzed, that analysis is reused instead of calling the AI
+        again, and re-importing an image already attached to this room
+        returns the existing record without creating duplicates.
         """
         try:
             # Verify room exists
@@ -196,6 +210,19 @@ class DigitalTwinService:
             if not room:
                 raise ValueError(f"Room {room_id} not found")
 
+            checksum = checksum or file_content_hash(image_path)
+            prior = await self._find_prior_image_analysis(db, checksum, room_id) if checksum else None
+            if prior is not None and prior[0].room_id == room_id:
+                logger.info(f"Room image {image_path} already analyzed for room {room_id} as {prior[0].id}")
+                return {
+                    "image_id": str(prior[0].id),
+                    "analysis": self._analysis_from_record(*prior),
+                    "materials_created": 0,
+                    "fixtures_created": 0,
+                    "products_created": 0,
+                    "reused": True,
+                }
+
             # Create RoomImage record
             room_image = RoomImage(
                 room_id=room_id,
@@ -204,21 +231,34 @@ class DigitalTwinService:
                 view_angle=view_angle,
                 is_analyzed=True,
                 analysis_metadata={},
+                checksum=checksum,
             )
             db.add(room_image)
             await db.flush()
 
-            # Run AI analysis
-            ai_resp = await self.room_analysis_agent.execute({
-                "image": image_path,
-                "room_type": room.room_type.value if hasattr(room.room_type, 'value') else str(room.room_type),
-                "analysis_type": "comprehensive",
-            })
+            if prior is not None:
+                # Same image content analyzed for another room; skip the AI call
+                analysis_data = self._analysis_from_record(*prior)
+                logger.info(f"Reusing analysis of room image {prior[0].id} for {image_path}")
+            else:
+                # Run AI analysis
+                ai_resp = await self.room_analysis_agent.execute({
+                    "image": image_path,
+                    "room_type": room.room_type.value if hasattr(room.room_type, 'value') else str(room.room_type),
+                    "analysis_type": "comprehensive",
+                })
 
-            if not ai_resp.success:
-                raise RuntimeError(ai_resp.error or "Room analysis failed")
+                if not ai_resp.success:
+                    raise RuntimeError(ai_resp.error or "Room analysis failed")
 
-            analysis_data = ai_resp.data or {}
+                analysis_data = ai_resp.data or {}
+
+            # Keep the fields ImageAnalysis has no column for, so the analysis can be reused
+            room_image.analysis_metadata = {
+                "room_type": analysis_data.get("room_type"),
+                "room_style": analysis_data.get("room_style"),
+                "dimensions": analysis_data.get("dimensions"),
+            }
 
             # Create ImageAnalysis
             img_analysis = ImageAnalysis(
@@ -310,6 +350,7 @@ class DigitalTwinService:
                 room.area = dims.get("estimated_area_sqft")
 
             await db.commit()
+            self._invalidate_home_cache(room.home_id)
 
             logger.info(
                 f"Successfully saved room image analysis with {len(materials_created)} materials, "
@@ -322,6 +363,7 @@ class DigitalTwinService:
                 "materials_created": len(materials_created),
                 "fixtures_created": len(fixtures_created),
                 "products_created": len(products_created),
+                "reused": prior is not None,
             }
 
         except Exception as e:
@@ -329,6 +371,51 @@ class DigitalTwinService:
             logger.error(f"Error in analyze_and_save_room_image: {str(e)}", exc_info=True)
             raise
 
+    async def _find_prior_image_analysis(
+        self,
+        db: AsyncSession,
+        checksum: str,
+        room_id: uuid.UUID,
+    ) -> Optional[tuple]:
+        """Find an analyzed RoomImage with the given checksum, preferring this room.
+
+        Returns:
+            (RoomImage, ImageAnalysis) tuple, or None if the image is new
+        """
+        result = await db.execute(
+            select(RoomImage, ImageAnalysis)
+            .join(ImageAnalysis, ImageAnalysis.room_image_id == RoomImage.id)
+            .where(RoomImage.checksum == checksum, RoomImage.is_analyzed.is_(True))
+            .order_by((RoomImage.room_id == room_id).desc(), ImageAnalysis.created_at.desc())
+            .limit(1)
+        )
+        row = result.first()
+        return tuple(row) if row else None
+
+    @staticmethod
+    def _analysis_from_record(room_image: RoomImage, image_analysis: ImageAnalysis) -> Dict[str, Any]:
+        """Rebuild room analysis data (agent output shape) from stored records."""
+        summary = room_image.analysis_metadata or {}
+        return {
+            "room_type": summary.get("room_type"),
+            "room_style": summary.get("room_style"),
+            "dimensions": summary.get("dimensions"),
+            "keywords": image_analysis.keywords or [],
+            "visual_characteristics": {
+                "dominant_colors": image_analysis.dominant_colors or [],
+                "lighting_quality": image_analysis.lighting_quality,
+            },
+            "detected_materials": image_analysis.materials_visible or [],
+            "detected_fixtures": image_analysis.fixtures_visible or [],
+            "detected_products": image_analysis.objects_detected or [],
+            "confidence_score": image_analysis.confidence_score or 0.0,
+            "analysis_notes": image_analysis.analysis_notes or "",
+            "metadata": {
+                "model_used": image_analysis.analysis_model,
+                "reused_from_image": str(room_image.id),
+            },
+        }
+
     async def import_and_analyze_room_images(
         self,
         db: AsyncSession,
@@ -369,6 +456,7 @@ class DigitalTwinService:
 
         matched = 0
         analyzed = 0
+        reused = 0  # analyzed from a prior analysis of identical image content
         skipped = 0
         errors: list[str] = []
 
@@ -405,6 +493,8 @@ class DigitalTwinService:
                 res = await self.analyze_and_save_room_image(db, room.id, path)
                 if res.get("image_id"):
                     analyzed += 1
+                    if res.get("reused"):
+                        reused += 1
             except Exception as e:
                 errors.append(f"{os.path.basename(path)}: {e}")
 
@@ -413,6 +503,7 @@ class DigitalTwinService:
             "total_found": len(files),
             "matched": matched,
             "analyzed": analyzed,
+            "reused": reused,
             "skipped": skipped,
             "errors": errors,
         }
@@ -554,6 +645,7 @@ class DigitalTwinService:
                 await _create_for_floor(doc, section_index=0)
 
             await db.commit()
+            self._invalidate_home_cache(home_id)
             return {
                 "floor_plan_ids": floor_plan_ids,
                 "rooms_created": len(created_rooms),
@@ -829,6 +921,8 @@ class DigitalTwinService:
                 skipped += 1
 
         await db.commit()
+        if ingested:
+            self._invalidate_home_cache(home_id)
 
         return {"ingested": ingested, "skipped": skipped, "errors": errors}
 
@@ -1205,6 +1299,8 @@ class DigitalTwinService:
                 # Commit per item to maximize resilience
                 await db.commit()
 
+        if ingested:
+            self._invalidate_home_cache(home_id)
         return {"ingested": ingested, "skipped": skipped, "errors": errors}
 
     async def ingest_links_and_analyses_objects(
@@ -1394,5 +1490,7 @@ class DigitalTwinService:
             else:
                 await db.commit()
 
+        if ingested:
+            self._invalidate_home_cache(home_id)
         return {"ingested": ingested, "skipped": skipped, "errors": errors}
 
@@ -0,0 +1,474 @@
+"""In-process intent classification with an LLM fallback.
+
+Most chat turns are classified locally in microseconds: keyword rules plus
+nearest-centroid over hashed bag-of-words vectors of labeled example
+utterances. Only predictions below INTENT_FAST_PATH_THRESHOLD go to the
+LLM. Whenever both labels are available the pair is logged to the
+``backend.services.intent_classifier.agreement`` logger (with a hash of the
+message; its text only with INTENT_AGREEMENT_LOG_TEXT) and counted, and
+LLM-labeled user messages in ConversationMessage history can be folded
+back in with fit_from_history().
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+agreement_logger = logging.getLogger(f"{__name__}.agreement")
+
+FAST_PATH_ENABLED = os.getenv("INTENT_FAST_PATH", "true").lower() == "true"
+FAST_PATH_THRESHOLD = float(os.getenv("INTENT_FAST_PATH_THRESHOLD", "0.7"))
+HISTORY_FIT_LIMIT = int(os.getenv("INTENT_HISTORY_FIT_LIMIT", "5000"))
+# Include raw user messages in agreement logs (opt-in: it is user chat text)
+AGREEMENT_LOG_TEXT = os.getenv("INTENT_AGREEMENT_LOG_TEXT", "false").lower() == "true"
+
+DEFAULT_INTENT = "question"
+FEATURE_DIM = 1024
+KEYWORD_WEIGHT = 0.35
+# Margin between the best and second-best score that maps to ~0.76 confidence
+MARGIN_SCALE = 0.25
+# Best scores below this are scaled down: nothing looked like the message
+MIN_SCORE = 0.35
+
+INTENT_DESCRIPTIONS = {
+    "question": "User is asking a question about their home",
+    "cost_estimate": "User wants cost estimation for a project",
+    "product_recommendation": "User wants product recommendations",
+    "design_idea": "User wants design or style suggestions",
+    "design_visualization": (
+        "User wants to SEE/VISUALIZE design options (keywords: \"show me\", \"visualize\", "
+        "\"what would it look like\", \"generate\", \"create mockup\")"
+    ),
+    "design_transformation": "User requests transforming an image (paint, flooring, cabinets, furniture, staging)",
+    "before_after": "User wants to see before/after comparisons or transformations",
+    "material_comparison": "User wants to compare materials or finishes visually",
+    "diy_guide": "User wants a step-by-step DIY guide with materials/tools/safety",
+    "pdf_request": "User wants a PDF export of a plan/guide or the conversation",
+    "general_chat": "General conversation or greeting",
+}
+
+# Phrase rules (regex, weight); a match is strong evidence, not a verdict
+KEYWORD_RULES: Dict[str, List[Tuple[str, float]]] = {
+    "cost_estimate": [
+        (r"\b(cost|costs|estimate|estimates|budget|price|pricing|quote)\b", 1.0),
+        (r"\bhow much\b", 1.0),
+        (r"\bafford\b", 0.5),
+    ],
+    "product_recommendation": [
+        (r"\brecommend(ation|ations|ed)?\b", 1.0),
+        (r"\b(best|which) (brand|model|product)s?\b", 1.0),
+        (r"\b(sofa|couch|appliance|appliances|faucet|dishwasher|refrigerator|fridge|vacuum)\b", 0.5),
+        (r"\bshould i buy\b", 1.0),
+    ],
+    "design_idea": [
+        (r"\b(design|style|decor|aesthetic|color scheme|colou?r palette)\b", 0.75),
+        (r"\bideas?\b", 0.5),
+        (r"\b(modern|farmhouse|minimalist|scandinavian|rustic|industrial)\b", 0.5),
+    ],
+    "design_visualization": [
+        (r"\bshow me\b", 1.0),
+        (r"\bvisuali[sz]e\b", 1.0),
+        (r"\bwhat (would|will) (it|this|that)( room)? look like\b", 1.0),
+        (r"\b(mockup|mock-up|render|rendering)\b", 1.0),
+        (r"\b(generate|create) (an? )?(image|picture)\b", 1.0),
+    ],
+    "design_transformation": [
+        (r"\b(repaint|paint|restain)\b.*\b(walls?|cabinets?|room|photo|image|picture)\b", 1.0),
+        (r"\b(change|replace|swap)\b.*\b(flooring|floors?|cabinets?|countertops?|furniture)\b.*\b(photo|image|picture)\b", 1.0),
+        (r"\b(virtual(ly)? stag(e|ing)|staging)\b", 1.0),
+        (r"\b(this|my) (photo|image|picture)\b", 0.5),
+    ],
+    "before_after": [
+        (r"\bbefore( and |/| & )after\b", 1.5),
+        (r"\bbefore\b.*\bafter\b", 0.75),
+    ],
+    "material_comparison": [
+        (r"\bcompare\b", 1.0),
+        (r"\b(vs\.?|versus)\b", 1.0),
+        (r"\b(difference|differences) between\b", 1.0),
+        (r"\b(quartz|granite|laminate|vinyl|hardwood|tile|marble)\b.*\bor\b", 0.5),
+    ],
+    "diy_guide": [
+        (r"\bstep[- ]by[- ]step\b", 1.0),
+        (r"\bhow (do|can|should) i\b", 0.75),
+        (r"\b(diy|do it myself|myself|guide|tutorial|instructions)\b", 1.0),
+    ],
+    "pdf_request": [
+        (r"\bpdf\b", 1.5),
+        (r"\b(export|download|printable|print out|print)\b", 1.0),
+    ],
+    "general_chat": [
+        (r"^\s*(hi|hello|hey|thanks|thank you|good (morning|afternoon|evening))\b", 1.0),
+        (r"\b(how are you|who are you|what can you do)\b", 1.0),
+    ],
+    "question": [
+        (r"\b(my|our) (home|house|roof|basement|attic|kitchen|bathroom|furnace|hvac|water heater)\b", 0.5),
+        (r"\b(is|are|does|do|should|can|why|when|what)\b.*\?\s*$", 0.35),
+    ],
+}
+
+# Seed utterances per intent; LLM-labeled history is added by fit_from_history()
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "question": [
+        "How old is my water heater",
+        "What is the square footage of my living room",
+        "Why is there condensation on my windows",
+        "Is my roof due for replacement",
+        "When was the furnace last serviced",
+        "What kind of insulation is in the attic",
+    ],
+    "cost_estimate": [
+        "How much would it cost to remodel my kitchen",
+        "Give me an estimate for replacing the bathroom floor",
+        "What is the budget for painting the whole house",
+        "How much do new cabinets cost",
+        "Price to install hardwood floors in the bedroom",
+        "Can I afford a deck addition",
+    ],
+    "product_recommendation": [
+        "Recommend a good dishwasher",
+        "Which faucet should I buy for the kitchen sink",
+        "What is the best brand of vinyl plank flooring",
+        "Suggest a durable sofa for a family with kids",
+        "Which refrigerator fits a small kitchen",
+        "Recommend energy efficient appliances",
+    ],
+    "design_idea": [
+        "Give me design ideas for a small bathroom",
+        "What style would suit my living room",
+        "Ideas to make the kitchen feel more modern",
+        "What color scheme works with oak floors",
+        "Farmhouse decor ideas for the dining room",
+        "How can I make the bedroom cozier",
+    ],
+    "design_visualization": [
+        "Show me what the kitchen would look like with white cabinets",
+        "Visualize a modern living room",
+        "Generate an image of the bathroom with dark tile",
+        "Create a mockup of the patio",
+        "What would it look like with an open floor plan",
+        "Show me some design options for the bedroom",
+    ],
+    "design_transformation": [
+        "Paint the walls in this photo light gray",
+        "Change the flooring in this picture to hardwood",
+        "Replace the cabinets in my photo with navy ones",
+        "Virtually stage this empty room",
+        "Swap the furniture in this image for a modern set",
+        "Restain the deck in this picture",
+    ],
+    "before_after": [
+        "Show me a before and after of the kitchen remodel",
+        "Before and after comparison for the bathroom",
+        "What will the room look like before and after painting",
+        "Compare before and after of the new floors",
+    ],
+    "material_comparison": [
+        "Compare quartz and granite countertops",
+        "Laminate vs vinyl flooring",
+        "What is the difference between tile and hardwood for a kitchen",
+        "Should I choose marble or quartz",
+        "Compare matte and glossy cabinet finishes",
+    ],
+    "diy_guide": [
+        "How do I install a backsplash myself",
+        "Step by step guide to replacing a toilet",
+        "Give me DIY instructions for painting cabinets",
+        "How can I fix a leaky faucet",
+        "Tutorial for laying vinyl plank flooring",
+        "What tools do I need to tile a shower",
+    ],
+    "pdf_request": [
+        "Export this plan as a PDF",
+        "Can I download the guide",
+        "Make a printable version of the shopping list",
+        "Send me a PDF of this conversation",
+        "Print the project plan",
+    ],
+    "general_chat": [
+        "Hi there",
+        "Hello",
+        "Thanks for the help",
+        "What can you do",
+        "Good morning",
+        "Who are you",
+    ],
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def featurize(text: str) -> Dict[int, float]:
+    """Hashed, L2-normalized bag of words and bigrams (sparse index -> weight)."""
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    vec: Dict[int, float] = {}
+    for term in terms:
+        index = zlib.crc32(term.encode("utf-8")) % FEATURE_DIM
+        vec[index] = vec.get(index, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+    return {i: v / norm for i, v in vec.items()}
+
+
+def _dot(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(i, 0.0) for i, v in a.items())
+
+
+def build_intent_prompt(message: str) -> str:
+    """LLM prompt for the fallback classification."""
+    intents = "\n".join(f"- \"{name}\": {desc}" for name, desc in INTENT_DESCRIPTIONS.items())
+    return f"""Classify the user's intent from this message. Return ONLY a JSON object.
+
+User message: "{message}"
+
+Classify into ONE of these intents:
+{intents}
+
+Return JSON:
+{{
+    "intent": "<intent>",
+    "confidence": <0.0-1.0>,
+    "requires_home_data": <true/false>
+}}"""
+
+
+@dataclass
+class IntentPrediction:
+    """An intent label with its confidence and where it came from."""
+    intent: str
+    confidence: float
+    source: str  # 'local' | 'llm' | 'default'
+    local_intent: Optional[str] = None
+    local_confidence: Optional[float] = None
+    latency_us: float = 0.0
+
+
+@dataclass
+class IntentClassifierStats:
+    """Fast-path and agreement counters."""
+    local: int = 0
+    fallbacks: int = 0
+    llm_failures: int = 0
+    agreements: int = 0
+    disagreements: int = 0
+    confusion: Dict[str, int] = field(default_factory=dict)  # "local->llm" -> count
+
+
+class IntentClassifier:
+    """Keyword rules plus nearest-centroid classifier with an LLM fallback."""
+
+    def __init__(self, threshold: float = FAST_PATH_THRESHOLD, enabled: bool = FAST_PATH_ENABLED):
+        """
+        Initialize classifier with the seed examples.
+
+        Args:
+            threshold: Minimum local confidence to skip the LLM
+            enabled: If False every message goes to the LLM (labels are still compared)
+        """
+        self.threshold = threshold
+        self.enabled = enabled
+        self.stats = IntentClassifierStats()
+        self._rules = {
+            intent: [(re.compile(pattern), weight) for pattern, weight in rules]
+            for intent, rules in KEYWORD_RULES.items()
+        }
+        self._sums: Dict[str, Dict[int, float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._centroids: Dict[str, Dict[int, float]] = {}
+        self.fit((text, intent) for intent, texts in SEED_EXAMPLES.items() for text in texts)
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> int:
+        """
+        Add labeled examples to the centroids.
+
+        Args:
+            examples: (text, intent) pairs; unknown intents are ignored
+
+        Returns:
+            Number of examples added
+        """
+        added = 0
+        touched = set()
+        for text, intent in examples:
+            if intent not in INTENT_DESCRIPTIONS or not text:
+                continue
+            acc = self._sums.setdefault(intent, {})
+            for i, v in featurize(text).items():
+                acc[i] = acc.get(i, 0.0) + v
+            self._counts[intent] = self._counts.get(intent, 0) + 1
+            touched.add(intent)
+            added += 1
+
+        for intent in touched:
+            acc = self._sums[intent]
+            norm = math.sqrt(sum(v * v for v in acc.values())) or 1.0
+            self._centroids[intent] = {i: v / norm for i, v in acc.items()}
+        return added
+
+    def predict(self, message: str) -> IntentPrediction:
+        """
+        Classify locally, without any I/O.
+
+        Args:
+            message: User message
+
+        Returns:
+            Prediction with source 'local'
+        """
+        started = time.perf_counter()
+        text = (message or "").lower()
+        vec = featurize(text)
+
+        scores: Dict[str, float] = {}
+        for intent in INTENT_DESCRIPTIONS:
+            score = _dot(vec, self._centroids.get(intent, {}))
+            for pattern, weight in self._rules.get(intent, ()):
+                if pattern.search(text):
+                    score += KEYWORD_WEIGHT * weight
+            scores[intent] = score
+
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        (best, top), (_, second) = ranked[0], ranked[1]
+        confidence = math.tanh((top - second) / MARGIN_SCALE) * min(1.0, top / MIN_SCORE)
+        if top <= 0:
+            best, confidence = DEFAULT_INTENT, 0.0
+
+        return IntentPrediction(
+            intent=best,
+            confidence=round(max(confidence, 0.0), 3),
+            source="local",
+            local_intent=best,
+            local_confidence=round(max(confidence, 0.0), 3),
+            latency_us=round((time.perf_counter() - started) * 1_000_000, 1),
+        )
+
+    async def classify(
+        self,
+        message: str,
+        llm_classify: Optional[Callable[[str], Awaitable[Dict[str, Any]]]] = None,
+    ) -> IntentPrediction:
+        """
+        Classify locally and fall back to the LLM below the confidence threshold.
+
+        Args:
+            message: User message
+            llm_classify: Coroutine returning ``{"intent", "confidence"}`` for a message
+
+        Returns:
+            Local prediction, or the LLM's label when the fallback ran
+        """
+        local = self.predict(message)
+        if (self.enabled and local.confidence >= self.threshold) or llm_classify is None:
+            self.stats.local += 1
+            return local
+
+        self.stats.fallbacks += 1
+        try:
+            classification = await llm_classify(message)
+            intent = classification.get("intent") or DEFAULT_INTENT
+            confidence = float(classification.get("confidence", 0.5))
+        except Exception as e:
+            self.stats.llm_failures += 1
+            logger.warning(f"LLM intent classification failed, using local '{local.intent}': {e}")
+            return local
+
+        self.record_llm_label(message, local, intent)
+        return IntentPrediction(
+            intent=intent,
+            confidence=confidence,
+            source="llm",
+            local_intent=local.intent,
+            local_confidence=local.confidence,
+            latency_us=local.latency_us,
+        )
+
+    def record_llm_label(self, message: str, local: IntentPrediction, llm_intent: str) -> None:
+        """Count and log whether the local prediction matched the LLM label."""
+        agreed = local.intent == llm_intent
+        if agreed:
+            self.stats.agreements += 1
+        else:
+            self.stats.disagreements += 1
+            key = f"{local.intent}->{llm_intent}"
+            self.stats.confusion[key] = self.stats.confusion.get(key, 0) + 1
+
+        record = {
+            "message_sha256": hashlib.sha256(message.encode()).hexdigest()[:16],
+            "message_chars": len(message),
+            "local_intent": local.intent,
+            "local_confidence": local.confidence,
+            "llm_intent": llm_intent,
+            "agreed": agreed,
+        }
+        if AGREEMENT_LOG_TEXT:
+            record["message"] = message
+        agreement_logger.info(json.dumps(record))
+
+    async def fit_from_history(self, db, limit: int = HISTORY_FIT_LIMIT) -> int:
+        """
+        Add LLM-labeled user messages from ConversationMessage history.
+
+        Messages labeled by this classifier's fast path are skipped so it
+        doesn't train on its own output.
+
+        Args:
+            db: Async database session
+            limit: Most recent labeled messages to read
+
+        Returns:
+            Number of examples added
+        """
+        from sqlalchemy import select
+        from backend.models.conversation import ConversationMessage
+
+        result = await db.execute(
+            select(ConversationMessage.content, ConversationMessage.intent, ConversationMessage.message_metadata)
+            .where(ConversationMessage.role == "user", ConversationMessage.intent.is_not(None))
+            .order_by(ConversationMessage.created_at.desc())
+            .limit(limit)
+        )
+        examples = [
+            (content, intent)
+            for content, intent, metadata in result.all()
+            if (metadata or {}).get("intent_source", "llm") == "llm"
+        ]
+        added = self.fit(examples)
+        logger.info(f"Intent classifier fitted {added} examples from history")
+        return added
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Fast-path rate and LLM agreement."""
+        total = self.stats.local + self.stats.fallbacks
+        compared = self.stats.agreements + self.stats.disagreements
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "examples": dict(self._counts),
+            "local": self.stats.local,
+            "fallbacks": self.stats.fallbacks,
+            "llm_failures": self.stats.llm_failures,
+            "fast_path_rate": round(self.stats.local / total * 100, 2) if total else 0.0,
+            "agreement_rate": round(self.stats.agreements / compared * 100, 2) if compared else None,
+            "confusion": dict(self.stats.confusion),
+        }
+
+
+_intent_classifier: Optional[IntentClassifier] = None
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """Get or create global intent classifier."""
+    global _intent_classifier
+    if _intent_classifier is None:
+        _intent_classifier = IntentClassifier()
+    return _intent_classifier
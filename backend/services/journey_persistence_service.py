@@ -26,7 +26,14 @@ class JourneyPersistenceService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.journey_manager = JourneyManager()
+        self._journey_manager: Optional[JourneyManager] = None
+
+    @property
+    def journey_manager(self) -> JourneyManager:
+        """In-memory journey manager (templates), created on first use."""
+        if self._journey_manager is None:
+            self._journey_manager = JourneyManager()
+        return self._journey_manager
     
     async def create_journey(
         self,
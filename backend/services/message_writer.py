@@ -0,0 +1,516 @@
+"""Write-behind persistence for chat messages.
+
+Streaming chat should not wait on the database before the first token or
+before closing the stream. Messages are instead:
+
+1. Assigned their id and ``created_at`` up front, so ordering is fixed at
+   enqueue time (strictly increasing per process).
+2. Appended to a local spool file (JSON lines, fsynced by default) before
+   enqueue returns, which makes them durable across a crash or restart.
+3. Buffered in memory, where the stream can read them right away as part
+   of the conversation history.
+4. Flushed in batches by a background task. Each flush writes one
+   ``add_messages`` call per conversation, and the spool is then rewritten
+   with whatever is still pending. Titles of new conversations and summary
+   updates are scheduled after the flush, so no LLM call holds it up.
+
+On start the spool is replayed in file order. Replayed and retried
+batches are deduplicated by message id, so delivery is at least once
+and never stored twice. A failed batch waits out an exponential backoff
+before its conversation is retried:
+
+- Transient failures (database unreachable, connection dropped, lock or
+  statement timeouts) keep it in the spool and are retried until they
+  succeed; they never dead-letter a message.
+- Other failures (for example an integrity error because its
+  conversation was deleted) move it to a ``.dead`` file after
+  CHAT_WRITE_BEHIND_MAX_ATTEMPTS, so it cannot block the rest.
+
+Reads stay consistent with the buffered writes: enqueue pins the requesting
+client to the primary (as a committed write would), and the pin is renewed
+when the batch is actually written, so a refetch of the conversation never
+reads a replica that has not replayed those messages yet.
+
+Each worker process locks its own spool file (``<spool>``, ``<spool>.1``,
+...). After a restart, workers pick up the lowest unlocked spools, so a
+restarted deployment with at least as many workers replays all of them.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+
+from backend.models.replica import get_replica_router, get_request_db_context
+
+try:
+    import fcntl
+except ImportError:  # Windows dev machines: no cross-process spool locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_SPOOL = os.getenv("CHAT_WRITE_BEHIND_SPOOL", "data/chat_message_spool.jsonl")
+WRITE_BEHIND_FLUSH_MS = int(os.getenv("CHAT_WRITE_BEHIND_FLUSH_MS", "100"))
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BEHIND_BATCH_SIZE", "200"))
+WRITE_BEHIND_FSYNC = os.getenv("CHAT_WRITE_BEHIND_FSYNC", "true").lower() == "true"
+WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv("CHAT_WRITE_BEHIND_MAX_ATTEMPTS", "5"))
+WRITE_BEHIND_PERSIST_WAIT_SECONDS = float(os.getenv("CHAT_WRITE_BEHIND_PERSIST_WAIT_SECONDS", "2"))
+WRITE_BEHIND_RETRY_BACKOFF_MS = int(os.getenv("CHAT_WRITE_BEHIND_RETRY_BACKOFF_MS", "200"))
+WRITE_BEHIND_RETRY_MAX_SECONDS = float(os.getenv("CHAT_WRITE_BEHIND_RETRY_MAX_SECONDS", "30"))
+MAX_SPOOL_SLOTS = 64
+
+
+class MessageWriteBehind:
+    """Durable in-process buffer that persists chat messages in batches."""
+
+    def __init__(
+        self,
+        spool_path: str = WRITE_BEHIND_SPOOL,
+        session_factory: Optional[Callable[[], Any]] = None,
+        flush_interval_ms: int = WRITE_BEHIND_FLUSH_MS,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        fsync: bool = WRITE_BEHIND_FSYNC,
+        max_attempts: int = WRITE_BEHIND_MAX_ATTEMPTS,
+        retry_backoff_ms: int = WRITE_BEHIND_RETRY_BACKOFF_MS,
+        retry_max_seconds: float = WRITE_BEHIND_RETRY_MAX_SECONDS,
+    ):
+        """
+        Initialize writer.
+
+        Args:
+            spool_path: Base path of the local spool file
+            session_factory: Async session factory (defaults to AsyncSessionLocal)
+            flush_interval_ms: Longest time a message waits in the buffer
+            batch_size: Messages per flush; a full batch flushes immediately
+            fsync: fsync the spool on every enqueue
+            max_attempts: Failed flushes (other than transient ones) before a
+                batch is dead-lettered
+            retry_backoff_ms: Delay before the first retry; doubles per failure
+            retry_max_seconds: Longest delay between retries
+        """
+        self.base_spool_path = Path(spool_path)
+        self.spool_path: Optional[Path] = None
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval_ms / 1000
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff_ms / 1000
+        self.retry_max = retry_max_seconds
+
+        self._pending: List[Dict[str, Any]] = []
+        self._dead_ids: Set[str] = set()
+        self._seq = 0
+        self._last_created_at: Optional[datetime] = None
+        self._lock_file = None
+
+        self._spool_lock: Optional[asyncio.Lock] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flushed: Optional[asyncio.Condition] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.enqueued = 0
+        self.persisted = 0
+        self.replayed = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.dead_lettered = 0
+
+    # ---- lifecycle -------------------------------------------------------
+
+    async def start(self) -> None:
+        """Claim a spool file, replay it and start the background flusher."""
+        if self._task is not None and not self._task.done():
+            return
+        self._spool_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._flushed = asyncio.Condition()
+        self._wakeup = asyncio.Event()
+
+        if self.spool_path is None:
+            await asyncio.to_thread(self._claim_spool)
+            # The spool is authoritative: it holds everything still buffered
+            recovered = await asyncio.to_thread(self._read_spool)
+            self._pending = recovered
+            if recovered:
+                for record in recovered:
+                    record["replayed"] = True
+                self._seq = max(r["seq"] for r in recovered)
+                self._last_created_at = max(datetime.fromisoformat(r["created_at"]) for r in recovered)
+                self.replayed += len(recovered)
+                logger.info(f"Replaying {len(recovered)} spooled chat messages from {self.spool_path}")
+
+        self._task = asyncio.create_task(self._run())
+        if self._pending:
+            self._wakeup.set()
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop the flusher after draining the buffer (what remains stays spooled)."""
+        if self._task is None:
+            return
+        # Let an in-flight flush finish rather than cancelling it mid-commit
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        self._stopping = False
+
+        try:
+            await asyncio.wait_for(self._drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Write-behind drain timed out; {len(self._pending)} messages left in spool")
+        if self._pending:
+            logger.warning(f"{len(self._pending)} chat messages left in spool {self.spool_path} for next start")
+        self._release_spool()
+
+    async def _drain(self) -> None:
+        while self._pending:
+            before = len(self._pending)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Write-behind drain failed: {e}")
+                break
+            if len(self._pending) >= before:
+                break  # Nothing could be written; keep the rest spooled
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if not self._pending or self._stopping:
+                continue
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Write-behind flush failed: {e}", exc_info=True)
+
+    # ---- enqueue / read --------------------------------------------------
+
+    async def enqueue(self, conversation_id: str, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Durably buffer messages for a conversation.
+
+        Args:
+            conversation_id: Conversation ID
+            messages: Dicts with ``role`` and ``content`` and optional
+                ``id``, ``intent``, ``metadata`` and ``context_sources``;
+                a message whose ``id`` is already buffered is skipped
+
+        Returns:
+            Spooled records (with assigned ``id`` and ``created_at``), in order
+        """
+        if self._task is None or self._task.done():
+            await self.start()
+
+        # The flush runs outside this request, so pin the client here
+        ctx = get_request_db_context()
+        client_key = ctx.client_key if ctx else None
+
+        async with self._spool_lock:
+            now = datetime.utcnow()
+            if self._last_created_at is not None and now <= self._last_created_at:
+                now = self._last_created_at + timedelta(microseconds=1)
+            buffered = {r["id"] for r in self._pending}
+            records = []
+            for i, m in enumerate(messages):
+                if m.get("id") and str(m["id"]) in buffered:
+                    continue
+                self._seq += 1
+                records.append({
+                    "seq": self._seq,
+                    "id": str(m.get("id") or uuid.uuid4()),
+                    "conversation_id": conversation_id,
+                    "role": m["role"],
+                    "content": m["content"],
+                    "intent": m.get("intent"),
+                    "metadata": m.get("metadata") or {},
+                    "context_sources": m.get("context_sources") or [],
+                    "created_at": (now + timedelta(microseconds=i)).isoformat(),
+                    "client_key": client_key,
+                })
+            if records:
+                self._last_created_at = datetime.fromisoformat(records[-1]["created_at"])
+                await asyncio.to_thread(self._append_spool, records)
+                self._pending.extend(records)
+                self.enqueued += len(records)
+
+        if records:
+            if ctx is not None:
+                ctx.wrote = True
+            get_replica_router().record_write(client_key)
+
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return records
+
+    def pending_messages(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """Buffered (not yet persisted) messages of a conversation, formatted like get_recent_messages."""
+        return [format_record(r) for r in self._pending if r["conversation_id"] == conversation_id]
+
+    async def wait_persisted(self, message_ids: Iterable[str], timeout: float = WRITE_BEHIND_PERSIST_WAIT_SECONDS) -> bool:
+        """
+        Wait until the given messages have been written to the database.
+
+        Args:
+            message_ids: Ids returned by enqueue
+            timeout: Seconds to wait; the messages stay durable in the spool either way
+
+        Returns:
+            True if all were persisted within the timeout; False on timeout
+            or if any of them was dead-lettered
+        """
+        ids = set(message_ids)
+
+        def _done() -> bool:
+            return not any(r["id"] in ids for r in self._pending)
+
+        if not _done():
+            self._wakeup.set()
+            try:
+                async with self._flushed:
+                    await asyncio.wait_for(self._flushed.wait_for(_done), timeout=timeout)
+            except asyncio.TimeoutError:
+                return False
+        return not (ids & self._dead_ids)
+
+    # ---- flushing --------------------------------------------------------
+
+    async def flush(self) -> int:
+        """
+        Write one batch of buffered messages to the database.
+
+        Returns:
+            Number of messages persisted
+        """
+        from backend.services.conversation_memory import get_summary_updater
+        from backend.services.conversation_service import ConversationService
+
+        async with self._flush_lock:
+            # Conversations backing off after a failure wait as a whole, so
+            # their later messages are not written ahead of the failed ones
+            now = time.time()
+            waiting = {r["conversation_id"] for r in self._pending if r.get("retry_at", 0) > now}
+            batch = [r for r in self._pending if r["conversation_id"] not in waiting][:self.batch_size]
+            if not batch:
+                return 0
+
+            groups: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+            for record in batch:
+                groups.setdefault(record["conversation_id"], []).append(record)
+
+            done: List[Dict[str, Any]] = []
+            dead: List[Dict[str, Any]] = []
+            flushed_conversations: List[str] = []
+            # Titled after the lock is released: a title is an LLM round trip
+            untitled: List[Tuple[str, str]] = []
+            self.flushes += 1
+            updater = get_summary_updater()
+            async with self._get_session_factory()() as db:
+                service = ConversationService(db, gemini_client=updater.get_gemini_client())
+                for conversation_id, records in groups.items():
+                    try:
+                        await service.add_messages(
+                            conversation_id,
+                            [record_to_message(r) for r in records],
+                            skip_existing=any(r.get("replayed") or r.get("attempts") for r in records),
+                            on_first_exchange=lambda cid, text: untitled.append((cid, text)),
+                        )
+                        done.extend(records)
+                        flushed_conversations.append(conversation_id)
+                    except Exception as e:
+                        self.flush_failures += 1
+                        transient = is_transient_error(e)
+                        for r in records:
+                            r["failures"] = r.get("failures", 0) + 1
+                            if not transient:
+                                r["attempts"] = r.get("attempts", 0) + 1
+                        if not transient and records[0]["attempts"] >= self.max_attempts:
+                            logger.error(
+                                f"Dead-lettering {len(records)} chat messages for conversation "
+                                f"{conversation_id} after {records[0]['attempts']} attempts: {e}"
+                            )
+                            dead.extend(records)
+                        else:
+                            delay = min(self.retry_max, self.retry_backoff * 2 ** (records[0]["failures"] - 1))
+                            for r in records:
+                                r["retry_at"] = time.time() + delay
+                            logger.warning(
+                                f"Write-behind flush for conversation {conversation_id} failed"
+                                f"{' (transient)' if transient else ''}, retrying in {delay:.1f}s: {e}"
+                            )
+
+            finished = {r["seq"] for r in done} | {r["seq"] for r in dead}
+            async with self._spool_lock:
+                self._pending = [r for r in self._pending if r["seq"] not in finished]
+                if dead:
+                    self._dead_ids.update(r["id"] for r in dead)
+                    await asyncio.to_thread(self._append_dead_letters, dead)
+                await asyncio.to_thread(self._rewrite_spool, list(self._pending))
+
+            self.persisted += len(done)
+            self.dead_lettered += len(dead)
+
+        # The sticky window starts at the commit, not at enqueue
+        router = get_replica_router()
+        for client_key in {r.get("client_key") for r in done if r.get("client_key")}:
+            router.record_write(client_key)
+
+        async with self._flushed:
+            self._flushed.notify_all()
+
+        for conversation_id, first_message in untitled:
+            updater.schedule_title(conversation_id, first_message)
+        for conversation_id in flushed_conversations:
+            updater.schedule(conversation_id)
+        return len(done)
+
+    def _get_session_factory(self) -> Callable[[], Any]:
+        if self._session_factory is None:
+            from backend.models.base import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory
+
+    # ---- spool file ------------------------------------------------------
+
+    def _claim_spool(self) -> None:
+        self.base_spool_path.parent.mkdir(parents=True, exist_ok=True)
+        for slot in range(MAX_SPOOL_SLOTS):
+            path = self.base_spool_path if slot == 0 else self.base_spool_path.with_name(
+                f"{self.base_spool_path.name}.{slot}"
+            )
+            if fcntl is None:
+                self.spool_path = path
+                return
+            lock_file = open(f"{path}.lock", "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                continue
+            self._lock_file = lock_file
+            self.spool_path = path
+            return
+        raise RuntimeError(f"No free write-behind spool slot next to {self.base_spool_path}")
+
+    def _release_spool(self) -> None:
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+        self.spool_path = None
+
+    def _read_spool(self) -> List[Dict[str, Any]]:
+        if not self.spool_path.exists():
+            return []
+        records = []
+        with open(self.spool_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Torn final line from a crash mid-append: that enqueue never returned
+                    logger.warning(f"Skipping unreadable spool line in {self.spool_path}")
+        records.sort(key=lambda r: r["seq"])
+        return records
+
+    def _write_lines(self, f, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            f.write(json.dumps(record, default=str) + "\n")
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+
+    def _append_spool(self, records: List[Dict[str, Any]]) -> None:
+        with open(self.spool_path, "a", encoding="utf-8") as f:
+            self._write_lines(f, records)
+
+    def _rewrite_spool(self, records: List[Dict[str, Any]]) -> None:
+        tmp_path = self.spool_path.with_name(self.spool_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            self._write_lines(f, records)
+        os.replace(tmp_path, self.spool_path)
+
+    def _append_dead_letters(self, records: List[Dict[str, Any]]) -> None:
+        with open(self.spool_path.with_name(self.spool_path.name + ".dead"), "a", encoding="utf-8") as f:
+            self._write_lines(f, records)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get buffer and flush counters."""
+        return {
+            "pending": len(self._pending),
+            "enqueued": self.enqueued,
+            "persisted": self.persisted,
+            "replayed": self.replayed,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "dead_lettered": self.dead_lettered,
+            "spool_path": str(self.spool_path) if self.spool_path else None,
+            "running": self._task is not None and not self._task.done(),
+        }
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Whether a failed write is worth retrying indefinitely (the database was unavailable, not the data bad)."""
+    if isinstance(error, (OperationalError, InterfaceError)):
+        return True
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+    # Connection refused/reset and timeouts raised below SQLAlchemy
+    return isinstance(error, (OSError, asyncio.TimeoutError))
+
+
+def record_to_message(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a spool record into an add_messages() message dict."""
+    return {
+        "id": uuid.UUID(record["id"]),
+        "role": record["role"],
+        "content": record["content"],
+        "intent": record.get("intent"),
+        "metadata": record.get("metadata") or {},
+        "context_sources": record.get("context_sources") or [],
+        "created_at": datetime.fromisoformat(record["created_at"]),
+    }
+
+
+def format_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Format a spool record like ConversationService.get_recent_messages()."""
+    return {
+        "id": record["id"],
+        "role": record["role"],
+        "content": record["content"],
+        "timestamp": record["created_at"],
+    }
+
+
+def merge_pending(history: List[Dict[str, Any]], pending: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Append buffered messages to DB history, skipping any already persisted."""
+    seen = {m.get("id") for m in history}
+    return history + [m for m in pending if m["id"] not in seen]
+
+
+_message_writer: Optional[MessageWriteBehind] = None
+
+
+def get_message_writer() -> MessageWriteBehind:
+    """Get or create global write-behind message writer."""
+    global _message_writer
+    if _message_writer is None:
+        _message_writer = MessageWriteBehind()
+    return _message_writer
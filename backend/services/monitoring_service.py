@@ -5,12 +5,18 @@ Tracks API metrics, performance, and errors.
 """
 
 import time
+import functools
+import inspect
 import logging
-from typing import Dict, List, Optional
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
 from collections import defaultdict, deque
 from datetime import datetime, timezone
 from dataclasses import dataclass, field
 
+from backend.services.deadline import call_with_deadline
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,6 +58,174 @@ class EndpointStats:
         return self.total_errors / self.total_requests
 
 
+# Default latency bucket upper bounds in milliseconds
+DEFAULT_LATENCY_BUCKETS_MS = (
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000
+)
+
+
+@dataclass
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Cheap to update on hot paths (one bisect per observation) and mergeable
+    into Prometheus histograms; percentiles are estimated by linear
+    interpolation within the bucket that contains them.
+    """
+    buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS_MS
+    counts: List[int] = field(default_factory=list)
+    count: int = 0
+    sum_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def __post_init__(self):
+        if not self.counts:
+            # One slot per bucket plus the +Inf overflow bucket
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, duration_ms: float):
+        """Record a single observation in milliseconds."""
+        self.counts[bisect_left(self.buckets, duration_ms)] += 1
+        self.count += 1
+        self.sum_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+
+    def percentile(self, q: float) -> float:
+        """
+        Estimate the q-th percentile (0-100) in milliseconds.
+
+        Args:
+            q: Percentile to estimate
+
+        Returns:
+            Estimated latency, 0 when empty
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max_ms
+                fraction = (rank - seen) / bucket_count
+                return min(lower + (upper - lower) * fraction, self.max_ms)
+            seen += bucket_count
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        """Summarize the histogram for JSON APIs."""
+        return {
+            "count": self.count,
+            "avg_ms": round(self.sum_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+    def to_prometheus(self, name: str, labels: Dict[str, str]) -> List[str]:
+        """
+        Render as Prometheus text-format histogram sample lines (in seconds).
+
+        Args:
+            name: Metric name, e.g. "homeview_cache_get_duration_seconds"
+            labels: Label set for this series
+
+        Returns:
+            Sample lines (without HELP/TYPE headers)
+        """
+        label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+        sep = "," if label_str else ""
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{label_str}{sep}le="{bound / 1000:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{label_str}{sep}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{label_str}}} {self.sum_ms / 1000:.6f}")
+        lines.append(f"{name}_count{{{label_str}}} {self.count}")
+        return lines
+
+
+@dataclass
+class LLMTimer:
+    """Time spent waiting on LLM calls within one scope (e.g. a workflow node)."""
+    total_ms: float = 0.0
+    calls: int = 0
+
+
+# Timer of the scope the current task is in; child tasks share it
+_llm_timer: ContextVar[Optional[LLMTimer]] = ContextVar("llm_timer", default=None)
+# Set while inside an llm_timed call, so nested calls aren't counted twice
+_in_llm_call: ContextVar[bool] = ContextVar("in_llm_call", default=False)
+
+
+def start_llm_timer() -> LLMTimer:
+    """Start attributing LLM call time in the current context to a new timer."""
+    timer = LLMTimer()
+    _llm_timer.set(timer)
+    return timer
+
+
+def stop_llm_timer(timer: LLMTimer) -> None:
+    """Stop attributing LLM call time to ``timer`` (if it is still current)."""
+    if _llm_timer.get() is timer:
+        _llm_timer.set(None)
+
+
+def llm_timed(func: Callable) -> Callable:
+    """
+    Decorate an LLM client coroutine or async generator to add its duration
+    to the current LLMTimer. Concurrent calls each count in full, so a scope
+    that fans out can report more LLM time than wall time.
+
+    The call is also bounded by the current request deadline (each chunk of
+    a stream by the time left) and raises DeadlineExceeded when it passes.
+    """
+    name = func.__qualname__
+
+    if inspect.isasyncgenfunction(func):
+        @functools.wraps(func)
+        async def stream_wrapper(*args, **kwargs):
+            agen = func(*args, **kwargs)
+            timer = _llm_timer.get()
+            if timer is not None:
+                timer.calls += 1
+            try:
+                while True:
+                    # Only time spent waiting on the model, not on the consumer
+                    started = time.perf_counter()
+                    try:
+                        item = await call_with_deadline(agen.__anext__(), name)
+                    except StopAsyncIteration:
+                        return
+                    finally:
+                        if timer is not None:
+                            timer.total_ms += (time.perf_counter() - started) * 1000
+                    yield item
+            finally:
+                await agen.aclose()
+        return stream_wrapper
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        timer = _llm_timer.get()
+        if timer is None or _in_llm_call.get():
+            return await call_with_deadline(func(*args, **kwargs), name)
+        token = _in_llm_call.set(True)
+        started = time.perf_counter()
+        try:
+            return await call_with_deadline(func(*args, **kwargs), name)
+        finally:
+            timer.total_ms += (time.perf_counter() - started) * 1000
+            timer.calls += 1
+            _in_llm_call.reset(token)
+    return wrapper
+
+
 class MonitoringService:
     """
     Service for monitoring API metrics and performance.
@@ -99,6 +99,11 @@ class RAGService:
 
     model_name: str = "text-embedding-004"
 
+    # Cache tags for query results: every entry carries RAG_INDEX_TAG plus
+    # either "home:{id}" or RAG_UNSCOPED_TAG for queries across all homes.
+    RAG_INDEX_TAG = "rag_index"
+    RAG_UNSCOPED_TAG = "rag_index:unscoped"
+
     def __init__(self, use_gemini: bool = True) -> None:
         """
         Initialize RAG service.
@@ -428,13 +433,28 @@ class RAGService:
                 created_docs += 1
 
         await db.commit()
+        self.invalidate_cached_queries(home_id)
         return {"documents": created_docs, "chunks": created_chunks}
 
+    def _cache_tags(self, home_id: Optional[str]) -> List[str]:
+        """Cache tags for a query scoped to home_id (or to all homes)."""
+        return [self.RAG_INDEX_TAG, f"home:{home_id}" if home_id else self.RAG_UNSCOPED_TAG]
+
+    def invalidate_cached_queries(self, home_id: Optional[str] = None) -> int:
+        """Drop cached query results affected by a change to home_id (or to everything).
+
+        Unscoped queries search across all homes, so they are dropped too.
+        """
+        if home_id:
+            return self.cache_service.invalidate_tags(f"home:{home_id}", self.RAG_UNSCOPED_TAG)
+        return self.cache_service.invalidate_tags(self.RAG_INDEX_TAG)
+
     async def query(self, db: AsyncSession, query: str, home_id: Optional[str] = None, room_id: Optional[str] = None, floor_level: Optional[int] = None, k: int = 8) -> Dict[str, Any]:
         """Simple cosine similarity over stored embeddings with filters."""
         # Check cache first
         cache_key = f"rag_query:{query}:{home_id}:{room_id}:{floor_level}:{k}"
-        cached_result = await self.cache_service.get(cache_key, cache_type="rag_query")
+        cache_tags = self._cache_tags(home_id)
+        cached_result = self.cache_service.get(cache_key, cache_type="rag_query")
         if cached_result:
             logger.debug(f"RAG cache hit for query: {query[:50]}...")
             return cached_result
@@ -449,7 +469,7 @@ class RAGService:
         if not results:
             empty_result = {"matches": []}
             # Cache empty results too (shorter TTL)
-            await self.cache_service.set(cache_key, empty_result, cache_type="rag_query", ttl=60)
+            self.cache_service.set(cache_key, empty_result, cache_type="rag_query", ttl=60, tags=cache_tags)
             return empty_result
 
         # If pgvector is available and DB is Postgres, do in-DB cosine distance ordering
@@ -601,7 +621,7 @@ class RAGService:
             result = {"matches": out[:k]}
 
             # Cache the result
-            await self.cache_service.set(cache_key, result, cache_type="rag_query")
+            self.cache_service.set(cache_key, result, cache_type="rag_query", tags=cache_tags)
             return result
 
         # Fallback: in-Python cosine
@@ -649,7 +669,7 @@ class RAGService:
         result = {"matches": payload}
 
         # Cache the result
-        await self.cache_service.set(cache_key, result, cache_type="rag_query")
+        self.cache_service.set(cache_key, result, cache_type="rag_query", tags=cache_tags)
         return result
 
     async def assemble_context(
@@ -14,7 +14,7 @@ from __future__ import annotations
 
 import os
 import time
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 from pathlib import Path
 
 from PIL import Image
@@ -22,6 +22,7 @@ from PIL import Image
 from backend.integrations.gemini import GeminiClient
 from backend.integrations.deepseek.vision_client import DeepSeekVisionClient
 from backend.services.cache_service import get_cache_service
+from backend.utils.image_hash import content_hash, file_content_hash, image_content_hash, perceptual_hash
 import hashlib
 import logging
 
@@ -44,45 +45,51 @@ class UnifiedVisionService:
 
         # Cache service
         self.cache_service = get_cache_service()
+        self._perceptual_cache_keys = os.getenv("VISION_CACHE_PERCEPTUAL", "false").lower() == "true"
 
     @property
     def last_metadata(self) -> Dict[str, Any]:
         return self._last_meta
 
-    def _set_meta(self, provider: str, start_ts: float, **extra: Any) -> None:
+    @staticmethod
+    def _meta(provider: str, start_ts: float, **extra: Any) -> Dict[str, Any]:
         elapsed_ms = (time.perf_counter() - start_ts) * 1000.0
         meta = {
             "provider": provider,
             "processing_time_ms": round(elapsed_ms, 2),
         }
         meta.update({k: v for k, v in extra.items() if v is not None})
-        self._last_meta = meta
+        return meta
+
+    def _set_meta(self, provider: str, start_ts: float, **extra: Any) -> None:
+        self._last_meta = self._meta(provider, start_ts, **extra)
 
     def _create_cache_key(self, image: Union[str, Path, Image.Image, bytes], prompt: str) -> str:
-        """Create a cache key for image analysis."""
-        # Hash the prompt
+        """Create a content-addressed cache key for image analysis.
+
+        The image part of the key is derived from the image content, so the
+        same photo uploaded twice (different filename, path or mtime) reuses
+        the cached analysis. With VISION_CACHE_PERCEPTUAL enabled a dHash is
+        used instead, which also matches re-encoded/resized copies.
+        """
         prompt_hash = hashlib.md5(prompt.encode()).hexdigest()[:16]
 
-        # Hash the image content
-        if isinstance(image, (str, Path)):
-            # For file paths, use the path + file modification time
-            image_path = Path(image)
-            if image_path.exists():
-                mtime = image_path.stat().st_mtime
-                image_hash = hashlib.md5(f"{image_path}:{mtime}".encode()).hexdigest()[:16]
+        image_hash = None
+        if self._perceptual_cache_keys and not (isinstance(image, (str, Path)) and not Path(image).exists()):
+            phash = perceptual_hash(image)
+            if phash:
+                image_hash = f"p{phash}"
+
+        if image_hash is None:
+            if isinstance(image, (str, Path)):
+                # Memoized per (path, mtime, size); upload handlers pre-record it
+                image_hash = file_content_hash(image) or content_hash(str(image).encode())
+            elif isinstance(image, bytes):
+                image_hash = content_hash(image)
+            elif isinstance(image, Image.Image):
+                image_hash = image_content_hash(image)
             else:
-                image_hash = hashlib.md5(str(image).encode()).hexdigest()[:16]
-        elif isinstance(image, bytes):
-            # Hash the bytes directly
-            image_hash = hashlib.md5(image).hexdigest()[:16]
-        elif isinstance(image, Image.Image):
-            # Convert PIL image to bytes and hash
-            import io
-            buf = io.BytesIO()
-            image.save(buf, format='PNG')
-            image_hash = hashlib.md5(buf.getvalue()).hexdigest()[:16]
-        else:
-            image_hash = "unknown"
+                image_hash = "unknown"
 
         return f"vision:{image_hash}:{prompt_hash}"
 
@@ -97,43 +104,59 @@ class UnifiedVisionService:
 
         If provider is 'deepseek', try DeepSeek first and fallback to Gemini on error.
         """
-        # Check cache first
+        # Cached with stampede protection: concurrent requests for the same
+        # image+prompt share one provider call. The provider metadata is cached
+        # with the text; it is reported only if this call's own factory produced
+        # the value (not a coalesced leader or a background refresh), else "cache".
         cache_key = self._create_cache_key(image, prompt)
-        cached_result = await self.cache_service.get(cache_key, cache_type="vision_analysis")
-        if cached_result:
-            logger.debug(f"Vision cache hit for prompt: {prompt[:50]}...")
+        start = time.perf_counter()
+        produced: Dict[str, Any] = {}
+
+        async def compute() -> Dict[str, Any]:
+            text, meta = await self._analyze_image_uncached(image, prompt, temperature)
+            produced["value"] = {"text": text, "meta": meta}
+            return produced["value"]
+
+        try:
+            result = await self.cache_service.get_or_compute(cache_key, compute, cache_type="vision_analysis")
+        except Exception as e:
+            self._last_meta = self._meta("gemini", start, fallback_reason=f"failed: {str(e)[:120]}")
+            raise
+
+        if not isinstance(result, dict):
+            # Entry cached before metadata was stored alongside the text
+            self._last_meta = {"provider": "cache", "processing_time_ms": 0}
+            return result
+        if result is produced.get("value"):
+            self._last_meta = result["meta"]
+        else:
             self._last_meta = {"provider": "cache", "processing_time_ms": 0}
-            return cached_result
+        return result["text"]
 
+    async def _analyze_image_uncached(
+        self,
+        image: Union[str, Path, Image.Image, bytes],
+        prompt: str,
+        temperature: Optional[float],
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Run image analysis against the configured provider(s).
+
+        Returns the text and this run's provider metadata; it does not touch
+        last_metadata, since it may run for another caller or in the background.
+        """
         start = time.perf_counter()
         if self._provider == "deepseek" and self._deepseek is not None:
             try:
                 text = await self._deepseek.analyze_image(image=image, prompt=prompt, temperature=temperature)
                 # If DeepSeek returns, assume lower cost; confidence unknown unless caller parses JSON
-                self._set_meta("deepseek", start, cost_estimate=0.03, confidence=None)
-
-                # Cache the result
-                await self.cache_service.set(cache_key, text, cache_type="vision_analysis")
-                return text
+                return text, self._meta("deepseek", start, cost_estimate=0.03, confidence=None)
             except Exception as e:
                 # Fallback to Gemini
-                try:
-                    text = await self._gemini.analyze_image(image=image, prompt=prompt, temperature=temperature)
-                    self._set_meta("gemini", start, fallback_reason=str(e)[:200])
-
-                    # Cache the result
-                    await self.cache_service.set(cache_key, text, cache_type="vision_analysis")
-                    return text
-                except Exception as e2:
-                    self._set_meta("gemini", start, fallback_reason=f"gemini_failed: {str(e2)[:120]}")
-                    raise
+                text = await self._gemini.analyze_image(image=image, prompt=prompt, temperature=temperature)
+                return text, self._meta("gemini", start, fallback_reason=str(e)[:200])
         # Default: Gemini only
         text = await self._gemini.analyze_image(image=image, prompt=prompt, temperature=temperature)
-        self._set_meta("gemini", start)
-
-        # Cache the result
-        await self.cache_service.set(cache_key, text, cache_type="vision_analysis")
-        return text
+        return text, self._meta("gemini", start)
 
     async def analyze_floor_plan(
         self,
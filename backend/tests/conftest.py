@@ -0,0 +1,56 @@
+"""
+Shared fixtures for the backend tests.
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from backend.database import Base
+
+
+@pytest_asyncio.fixture
+async def db_engine():
+    """In-memory SQLite engine with all tables created."""
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    return async_sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest_asyncio.fixture
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def api_key(monkeypatch):
+    """Gemini clients refuse to construct without a key; tests never call them."""
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+
+
+@pytest.fixture
+def chat_workflow_env(api_key, monkeypatch):
+    """Chat workflow runs without event publishing and with post-response work inline.
+
+    Deferral tests pass ``defer_post_response=True`` explicitly.
+    """
+    monkeypatch.setattr("backend.workflows.chat_workflow.DEFER_POST_RESPONSE", False)
+    for name in ("publish_workflow_started", "publish_chat_message_received",
+                 "publish_chat_response_generated", "publish_workflow_completed",
+                 "publish_workflow_failed"):
+        monkeypatch.setattr(f"backend.workflows.chat_workflow.{name}", AsyncMock())
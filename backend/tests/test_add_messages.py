@@ -0,0 +1,97 @@
+"""
+Tests for single-round-trip message persistence.
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from backend.models.conversation import Conversation, ConversationMessage
+from backend.models.instrumentation import end_request_stats, instrument_engine, start_request_stats
+from backend.services.conversation_service import ConversationService
+
+
+@pytest.fixture
+def service(db, db_engine, api_key):
+    instrument_engine(db_engine.sync_engine)
+    return ConversationService(db)
+
+
+async def _create_conversation(db, **kwargs) -> Conversation:
+    conv = Conversation(id=uuid.uuid4(), message_count=0, **kwargs)
+    db.add(conv)
+    await db.commit()
+    return conv
+
+
+def _data_statements(stats):
+    return [shape for shape in stats.shapes.elements() if shape.split(" ", 1)[0] in ("INSERT", "UPDATE", "SELECT")]
+
+
+class TestAddMessages:
+    """Test batched add_messages and the add_message fast path."""
+
+    @pytest.mark.asyncio
+    async def test_pair_is_one_insert_and_one_update(self, db, service):
+        conv = await _create_conversation(db, title="Kitchen")
+
+        stats, token = start_request_stats()
+        try:
+            stored = await service.add_messages(str(conv.id), [
+                {"role": "user", "content": "How much is a new faucet?", "intent": "cost_estimate"},
+                {"role": "assistant", "content": "About $150-$400.", "metadata": {"intent": "cost_estimate"}},
+            ])
+        finally:
+            end_request_stats(token)
+
+        statements = _data_statements(stats)
+        assert len(statements) == 2
+        assert statements[0].startswith("INSERT INTO conversation_messages")
+        assert statements[1].startswith("UPDATE conversations") and "RETURNING" in statements[1]
+
+        assert [m.role for m in stored] == ["user", "assistant"]
+        assert stored[0].created_at < stored[1].created_at
+
+        rows = (await db.execute(
+            select(ConversationMessage)
+            .where(ConversationMessage.conversation_id == conv.id)
+            .order_by(ConversationMessage.created_at)
+        )).scalars().all()
+        assert [r.id for r in rows] == [m.id for m in stored]
+        assert rows[1].message_metadata == {"intent": "cost_estimate"}
+
+        await db.refresh(conv)
+        assert conv.message_count == 2
+        assert conv.last_message_at == stored[1].created_at
+
+    @pytest.mark.asyncio
+    async def test_add_message_increments_counter(self, db, service):
+        conv = await _create_conversation(db, title="Bath")
+
+        first = await service.add_message(str(conv.id), "user", "hi")
+        await service.add_message(str(conv.id), "assistant", "hello")
+
+        assert first.role == "user" and first.content == "hi"
+        await db.refresh(conv)
+        assert conv.message_count == 2
+
+    @pytest.mark.asyncio
+    async def test_first_user_message_sets_title(self, db, service):
+        conv = await _create_conversation(db)
+
+        await service.add_messages(str(conv.id), [
+            {"role": "user", "content": "Retile the shower"},
+            {"role": "assistant", "content": "Sure."},
+        ])
+        await db.refresh(conv)
+        assert conv.title == "Retile the shower"
+
+        await service.add_message(str(conv.id), "user", "Another question")
+        await db.refresh(conv)
+        assert conv.title == "Retile the shower"
+        assert conv.message_count == 3
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_is_noop(self, service):
+        assert await service.add_messages(str(uuid.uuid4()), []) == []
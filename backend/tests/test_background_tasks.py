@@ -0,0 +1,194 @@
+"""
+Tests for the post-response background task queue.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+
+from backend.services.background_tasks import BackgroundTaskQueue
+from backend.workflows.chat_workflow import CHAT_NODES, POST_RESPONSE_STAGES, ChatWorkflow, ChatWorkflowRuntime
+from backend.workflows.checkpointing import BoundedMemorySaver
+
+POST_RESPONSE_NODES = [name for stage in POST_RESPONSE_STAGES for name in stage]
+
+
+pytestmark = pytest.mark.usefixtures("chat_workflow_env")
+
+
+@pytest_asyncio.fixture
+async def queue(monkeypatch):
+    queue = BackgroundTaskQueue(workers=2, max_size=10, max_attempts=3, retry_backoff_ms=1)
+    monkeypatch.setattr("backend.workflows.chat_workflow.get_background_tasks", lambda: queue)
+    yield queue
+    await queue.stop(timeout=1)
+
+
+@asynccontextmanager
+async def _session():
+    yield MagicMock()
+
+
+def _workflow(runtime, calls, fail_once=None) -> ChatWorkflow:
+    """Workflow with recording stub nodes; ``fail_once`` raises on its first run."""
+    workflow = ChatWorkflow(MagicMock(), runtime=runtime)
+    failed = set()
+    for node_name, method_name in CHAT_NODES:
+        async def node(state, _node=node_name):
+            calls.append(_node)
+            if _node == fail_once and _node not in failed:
+                failed.add(_node)
+                raise RuntimeError("db blip")
+            if _node == "generate_response":
+                state["ai_response"] = f"reply to {state['user_message']}"
+            if _node == "suggest_actions":
+                state["suggested_questions"] = ["Budget?"]
+            return state
+        setattr(workflow, method_name, node)
+    return workflow
+
+
+async def _complete_event(workflow, **kwargs):
+    events = [e async for e in workflow.stream({"user_message": "q", "conversation_id": "c1"}, **kwargs)]
+    return events[-1]
+
+
+class TestBackgroundTaskQueue:
+    """Test bounded execution, retry and drain."""
+
+    @pytest.mark.asyncio
+    async def test_runs_jobs_and_returns_results(self, queue):
+        async def double(x):
+            return x * 2
+
+        futures = [queue.submit("double", double, i) for i in range(5)]
+
+        assert await asyncio.gather(*futures) == [0, 2, 4, 6, 8]
+        assert queue.get_stats()["completed"] == 5
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects(self):
+        queue = BackgroundTaskQueue(workers=1, max_size=1)
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+
+        running = queue.submit("blocked", blocked)
+        await asyncio.sleep(0)  # worker picks up the first job
+        queued = queue.submit("blocked", blocked)
+
+        assert queue.submit("blocked", blocked) is None
+        assert queue.get_stats()["rejected"] == 1
+        release.set()
+        await asyncio.gather(running, queued)
+        await queue.stop(timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_failing_job_is_retried_then_given_up(self, queue):
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 2:
+                raise RuntimeError("transient")
+            return "ok"
+
+        async def broken():
+            raise RuntimeError("permanent")
+
+        assert await queue.submit("flaky", flaky) == "ok"
+        with pytest.raises(RuntimeError, match="permanent"):
+            await queue.submit("broken", broken)
+        stats = queue.get_stats()
+        assert stats["retried"] == 3
+        assert stats["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_queued_jobs(self):
+        queue = BackgroundTaskQueue(workers=1, max_size=10)
+        done = []
+
+        async def job(i):
+            await asyncio.sleep(0.01)
+            done.append(i)
+
+        for i in range(3):
+            queue.submit("job", job, i)
+        await queue.stop(timeout=5)
+
+        assert done == [0, 1, 2]
+        assert queue.submit("job", job, 3) is None
+        assert not queue.running
+
+
+class TestDeferredPostResponse:
+    """Test the chat workflow returning before its post-response nodes."""
+
+    @pytest.mark.asyncio
+    async def test_response_returns_before_post_response_nodes(self, queue):
+        saver = BoundedMemorySaver()
+        runtime = ChatWorkflowRuntime(checkpointer=saver, session_factory=_session)
+        calls = []
+
+        complete = await _complete_event(_workflow(runtime, calls), defer_post_response=True)
+
+        assert complete["state"]["ai_response"] == "reply to q"
+        assert complete["state"]["suggested_questions"] == ["Budget?"]
+        # The turn is handed to the writer before the response completes
+        assert "save_conversation" in calls
+        assert not set(POST_RESPONSE_NODES) & set(calls)
+        assert len(complete["state"]["reserved_message_ids"]) == 2
+        assert saver.get_stats()["pinned_threads"] == 1
+
+        final_state = await complete["post_response"]
+        assert calls[-len(POST_RESPONSE_NODES):] == POST_RESPONSE_NODES
+        assert final_state["saved_message_ids"] == complete["state"]["saved_message_ids"]
+        assert set(final_state["node_timings"]) == {name for name, _ in CHAT_NODES}
+        assert saver.get_stats()["threads"] == 0
+        assert saver.get_stats()["pinned_threads"] == 0
+
+    @pytest.mark.asyncio
+    async def test_pending_thread_survives_eviction(self, queue):
+        saver = BoundedMemorySaver(max_threads=1)
+        runtime = ChatWorkflowRuntime(checkpointer=saver, session_factory=_session)
+        release = asyncio.Event()
+        blocker = queue.submit("blocker", release.wait)
+        queue.submit("blocker", release.wait)  # both workers busy: the chat job waits
+
+        first, second = [], []
+        pending = await _complete_event(_workflow(runtime, first), defer_post_response=True)
+        other = await _complete_event(_workflow(runtime, second), defer_post_response=True)
+        release.set()
+        await blocker
+
+        await asyncio.gather(pending["post_response"], other["post_response"])
+        assert first[-len(POST_RESPONSE_NODES):] == POST_RESPONSE_NODES
+        assert second[-len(POST_RESPONSE_NODES):] == POST_RESPONSE_NODES
+        assert saver.get_stats()["evicted_threads"] == 0
+
+    @pytest.mark.asyncio
+    async def test_retry_resumes_from_failed_node(self, queue):
+        runtime = ChatWorkflowRuntime(checkpointer=BoundedMemorySaver(), session_factory=_session)
+        calls = []
+
+        complete = await _complete_event(_workflow(runtime, calls, fail_once="update_journey_activity"), defer_post_response=True)
+        await complete["post_response"]
+
+        post_calls = [c for c in calls if c in POST_RESPONSE_NODES]
+        assert post_calls == ["update_journey_activity", "update_journey_activity", "finalize"]
+        assert queue.get_stats()["retried"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rejected_job_runs_inline(self, queue):
+        runtime = ChatWorkflowRuntime(checkpointer=BoundedMemorySaver(), session_factory=_session)
+        calls = []
+        queue._stopping = True
+
+        complete = await _complete_event(_workflow(runtime, calls), defer_post_response=True)
+
+        assert complete["post_response"].done()
+        assert calls[-1] == "finalize"
@@ -0,0 +1,94 @@
+"""
+Tests for the cache value codec.
+"""
+
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+
+from backend.services.cache_codec import CacheCodec, SERIALIZERS, COMPRESSORS
+from backend.services.cache_service import CacheService
+
+
+LARGE_VALUE = {
+    "products": [
+        {"name": f"Faucet {i}", "price": 199.99, "store": "Home Depot", "url": f"https://example.com/{i}"}
+        for i in range(50)
+    ]
+}
+
+
+class TestCacheCodec:
+    """Round-trip and compatibility tests for CacheCodec."""
+
+    @pytest.mark.parametrize("serializer", sorted(SERIALIZERS))
+    @pytest.mark.parametrize("compression", ["none"] + sorted(COMPRESSORS))
+    def test_round_trip(self, serializer, compression):
+        codec = CacheCodec(serializer=serializer, compression=compression, compress_min_bytes=64)
+
+        data, raw_size = codec.encode(LARGE_VALUE)
+
+        assert data[0] < 0x20
+        assert codec.decode(data) == LARGE_VALUE
+        if compression != "none":
+            assert len(data) < raw_size
+
+    def test_small_values_are_not_compressed(self):
+        codec = CacheCodec(compress_min_bytes=1024)
+        data, raw_size = codec.encode({"a": 1})
+
+        assert len(data) == raw_size + 1
+
+    def test_decodes_legacy_json_text(self):
+        codec = CacheCodec()
+        legacy = json.dumps({"matches": []})
+
+        assert codec.decode(legacy) == {"matches": []}
+        assert codec.decode(legacy.encode()) == {"matches": []}
+        assert codec.decode(b'"plain string"') == "plain string"
+
+    def test_decodes_values_written_by_another_configuration(self):
+        writer = CacheCodec(serializer="json", compression="zlib", compress_min_bytes=0)
+        reader = CacheCodec(serializer=sorted(SERIALIZERS)[-1], compression="none")
+
+        data, _ = writer.encode(LARGE_VALUE)
+        assert reader.decode(data) == LARGE_VALUE
+
+    def test_non_json_types_are_cacheable(self):
+        codec = CacheCodec()
+        uid = uuid.uuid4()
+        when = datetime(2025, 1, 2, 3, 4, 5)
+
+        data, _ = codec.encode({"id": uid, "at": when, "tags": {"a"}})
+
+        assert codec.decode(data) == {"id": str(uid), "at": when.isoformat(), "tags": ["a"]}
+
+
+class TestCodecStats:
+    """Codec metrics reported by CacheService."""
+
+    def test_records_bytes_and_ratio_per_cache_type(self):
+        class BytesRedis:
+            def __init__(self):
+                self.store = {}
+
+            def setex(self, key, ttl, value):
+                self.store[key] = value
+
+            def get(self, key):
+                return self.store.get(key)
+
+        service = CacheService(tiered=False, codec=CacheCodec(compress_min_bytes=64))
+        service.redis_client = BytesRedis()
+        service.use_redis = True
+
+        service.set("product_search:x", LARGE_VALUE, cache_type="product_search")
+        assert isinstance(service.redis_client.store["product_search:x"], bytes)
+        assert service.get("product_search:x") == LARGE_VALUE
+
+        stats = service.get_stats()["codec"]["by_type"]["product_search"]
+        assert stats["values"] == 1
+        assert stats["compressed"] == 1
+        assert stats["compression_ratio"] > 1
@@ -0,0 +1,311 @@
+"""
+Tests for the caching service.
+
+Covers the bounded in-memory LRU backend and the CacheService facade.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.services.cache_service import CacheService, InMemoryCache
+
+
+class TestInMemoryCache:
+    """Tests for the bounded in-memory LRU cache."""
+
+    def test_evicts_least_recently_used_when_full(self):
+        cache = InMemoryCache(max_entries=2, max_bytes=0)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        # Touch "a" so "b" becomes the LRU entry
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_memory_ceiling_is_enforced(self):
+        cache = InMemoryCache(max_entries=0, max_bytes=4096)
+        for i in range(50):
+            cache.set(f"key:{i}", "x" * 200)
+
+        stats = cache.get_stats()
+        assert stats["bytes"] <= 4096
+        assert stats["evictions"] > 0
+        assert cache.get("key:49") is not None
+
+    def test_oversized_value_is_not_cached(self):
+        cache = InMemoryCache(max_entries=0, max_bytes=1024)
+        cache.set("big", "x" * 4096)
+
+        assert cache.get("big") is None
+        assert cache.total_bytes == 0
+
+    def test_overwrite_releases_previous_size(self):
+        cache = InMemoryCache()
+        cache.set("k", "x" * 1000)
+        cache.set("k", "y")
+
+        assert len(cache) == 1
+        assert cache.total_bytes < 1000
+
+    def test_purge_expired(self):
+        cache = InMemoryCache()
+        cache.set("short", 1, ttl=1)
+        cache.set("forever", 2, ttl=0)
+        cache._cache["short"].expires_at = time.monotonic() - 1
+
+        assert cache.purge_expired() == 1
+        assert cache.get("forever") == 2
+        assert cache.expirations == 1
+
+    @pytest.mark.asyncio
+    async def test_background_sweeper(self):
+        cache = InMemoryCache(sweep_interval=0.01)
+        cache.set("short", 1, ttl=1)
+        cache._cache["short"].expires_at = time.monotonic() - 1
+
+        cache.start_sweeper()
+        await asyncio.sleep(0.05)
+        await cache.stop_sweeper()
+
+        assert len(cache) == 0
+        assert cache.get_stats()["sweeper_running"] is False
+
+
+class TestCacheService:
+    """Tests for the CacheService facade on the memory backend."""
+
+    def test_stats_include_memory_cache(self):
+        service = CacheService(memory_cache=InMemoryCache(max_entries=1))
+        service.set("a", {"v": 1})
+        service.set("b", {"v": 2})
+
+        assert service.get("a") is None
+        assert service.get("b") == {"v": 2}
+
+        stats = service.get_stats()
+        assert stats["backend"] == "memory"
+        assert stats["memory_cache"]["evictions"] == 1
+        assert stats["memory_cache_size"] == 1
+
+
+class FakeRedis:
+    """Minimal Redis stand-in shared between CacheService replicas."""
+
+    def __init__(self):
+        self.store = {}
+        self.subscribers = []
+        self.get_calls = 0
+
+    def get(self, key):
+        self.get_calls += 1
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.store.pop(key, None)
+
+    def publish(self, channel, data):
+        for handler in self.subscribers:
+            handler({"channel": channel, "data": data})
+
+
+def make_replica(redis_client):
+    service = CacheService(tiered=False)
+    service.redis_client = redis_client
+    service.use_redis = True
+    service.l1_cache = InMemoryCache(max_entries=100)
+    redis_client.subscribers.append(service._handle_invalidation)
+    return service
+
+
+class TestTieredCache:
+    """Tests for the L1/L2 tiered mode."""
+
+    def test_l1_serves_repeat_reads(self):
+        redis_client = FakeRedis()
+        service = make_replica(redis_client)
+        redis_client.store["persona:default"] = '"hello"'
+
+        assert service.get("persona:default") == "hello"
+        assert service.get("persona:default") == "hello"
+
+        assert redis_client.get_calls == 1
+        tiers = service.get_stats()["tiers"]
+        assert tiers["l1"]["hits"] == 1
+        assert tiers["l2"]["hits"] == 1
+
+    def test_writes_invalidate_other_replicas(self):
+        redis_client = FakeRedis()
+        a = make_replica(redis_client)
+        b = make_replica(redis_client)
+
+        a.set("template:x", {"v": 1})
+        assert b.get("template:x") == {"v": 1}
+
+        a.set("template:x", {"v": 2})
+        assert b.get("template:x") == {"v": 2}
+
+        a.delete("template:x")
+        assert b.get("template:x") is None
+        assert b.invalidations_received == 3
+        assert a.invalidations_received == 0
+
+
+class TestInvalidation:
+    """Tests for tag and pattern invalidation on the memory backend."""
+
+    def test_invalidate_tags_drops_only_tagged_keys(self):
+        service = CacheService(memory_cache=InMemoryCache())
+        service.set("rag_query:a:home1", {"m": 1}, cache_type="rag_query", tags=["home:1"])
+        service.set("rag_query:b:home1", {"m": 2}, cache_type="rag_query", tags=["home:1"])
+        service.set("rag_query:a:home2", {"m": 3}, cache_type="rag_query", tags=["home:2"])
+
+        assert service.invalidate_tags("home:1") == 2
+        assert service.get("rag_query:a:home1") is None
+        assert service.get("rag_query:a:home2") == {"m": 3}
+        assert service.memory_cache.get_stats()["tags"] == 1
+
+    def test_evicted_keys_leave_tag_index(self):
+        cache = InMemoryCache(max_entries=1)
+        cache.set("a", 1, tags=["t"])
+        cache.set("b", 2)
+
+        assert cache.get_stats()["tags"] == 0
+        assert cache.delete_tags(["t"]) == 0
+
+    def test_invalidate_pattern_on_memory_backend(self):
+        service = CacheService(memory_cache=InMemoryCache())
+        service.set("rag_query:x", 1)
+        service.set("rag_query:y", 2)
+        service.set("vision:z", 3)
+
+        assert service.invalidate_pattern("rag_query:*") == 2
+        assert service.get("vision:z") == 3
+
+    def test_set_uses_cache_type_ttl(self):
+        service = CacheService(memory_cache=InMemoryCache())
+        service.set("vision:k", "text", cache_type="vision_analysis")
+
+        entry = service.memory_cache._cache["vision:k"]
+        remaining = entry.expires_at - time.monotonic()
+        assert 3500 < remaining <= 3600
+
+
+class TestGetOrCompute:
+    """Tests for stampede-protected get_or_compute."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_compute_once(self):
+        service = CacheService(memory_cache=InMemoryCache())
+        calls = 0
+
+        async def factory():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"products": [1, 2]}
+
+        results = await asyncio.gather(*[
+            service.get_or_compute("product_search:x", factory, cache_type="product_search")
+            for _ in range(10)
+        ])
+
+        assert calls == 1
+        assert all(r == {"products": [1, 2]} for r in results)
+        assert service.get_stats()["stampede"]["coalesced"] == 9
+        assert service.get("product_search:x") == {"products": [1, 2]}
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_while_refreshing(self):
+        service = CacheService(memory_cache=InMemoryCache())
+        await service.get_or_compute("k", lambda: "v1", ttl=60, stale_ttl=60)
+
+        # Force logical expiry while the entry is still within its stale window
+        service.memory_cache._cache["k"].value["expires_at"] = time.time() - 1
+        assert service.get("k") is None
+
+        value = await service.get_or_compute("k", lambda: "v2", ttl=60, stale_ttl=60)
+        assert value == "v1"
+        assert service.stale_served == 1
+
+        await asyncio.gather(*service._refresh_tasks)
+        assert service.get("k") == "v2"
+
+    @pytest.mark.asyncio
+    async def test_xfetch_refreshes_expensive_keys_early(self):
+        service = CacheService(memory_cache=InMemoryCache())
+        await service.get_or_compute("k", lambda: "v1", ttl=60)
+
+        # A very expensive previous computation makes early refresh certain
+        service.memory_cache._cache["k"].value["delta"] = 10_000
+        value = await service.get_or_compute("k", lambda: "v2", ttl=60, background_refresh=False)
+
+        assert value == "v2"
+        assert service.early_refreshes == 1
+
+    @pytest.mark.asyncio
+    async def test_none_results_are_not_cached(self):
+        service = CacheService(memory_cache=InMemoryCache())
+        assert await service.get_or_compute("k", lambda: None) is None
+        assert len(service.memory_cache) == 0
+
+
+class TestTypeStats:
+    """Per-cache-type counters, latency histograms and Prometheus output."""
+
+    def test_counters_are_tracked_per_cache_type(self):
+        service = CacheService(memory_cache=InMemoryCache())
+        service.set("rag_query:a", {"m": 1}, cache_type="rag_query")
+        service.get("rag_query:a", cache_type="rag_query")
+        service.get("rag_query:b", cache_type="rag_query")
+        service.get("vision:x", cache_type="vision_analysis")
+
+        by_type = service.get_stats()["by_type"]
+        assert by_type["rag_query"]["hits"] == 1
+        assert by_type["rag_query"]["misses"] == 1
+        assert by_type["rag_query"]["hit_rate_percent"] == 50.0
+        assert by_type["rag_query"]["sets"] == 1
+        assert by_type["rag_query"]["bytes"] > 0
+        assert by_type["rag_query"]["get_latency_ms"]["count"] == 2
+        assert by_type["vision_analysis"]["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_envelope_counts_as_miss(self):
+        service = CacheService(memory_cache=InMemoryCache())
+        await service.get_or_compute("rag_query:a", lambda: "v1", ttl=60, cache_type="rag_query", stale_ttl=60)
+        service.memory_cache._cache["rag_query:a"].value["expires_at"] = time.time() - 1
+
+        assert service.get("rag_query:a", cache_type="rag_query") is None
+
+        by_type = service.get_type_stats()
+        assert by_type["rag_query"]["hits"] == 0
+        assert by_type["rag_query"]["misses"] == 2
+        assert service.get_stats()["hits"] == 0
+
+    def test_evictions_are_attributed_to_cache_type(self):
+        service = CacheService(memory_cache=InMemoryCache(max_entries=1))
+        service.set("vision:a", "x", cache_type="vision_analysis")
+        service.set("rag_query:b", "y", cache_type="rag_query")
+
+        assert service.get_type_stats()["vision_analysis"]["evictions"] == 1
+
+    def test_prometheus_output(self):
+        service = CacheService(memory_cache=InMemoryCache())
+        service.set("rag_query:a", 1, cache_type="rag_query")
+        service.get("rag_query:a", cache_type="rag_query")
+
+        text = service.get_prometheus_metrics()
+        assert 'homeview_cache_requests_total{cache_type="rag_query",result="hit"} 1' in text
+        assert "# TYPE homeview_cache_get_duration_seconds histogram" in text
+        assert 'homeview_cache_get_duration_seconds_bucket{cache_type="rag_query",le="+Inf"} 1' in text
+        assert 'homeview_cache_get_duration_seconds_count{cache_type="rag_query"} 1' in text
@@ -0,0 +1,79 @@
+"""
+Tests for response prompt assembly and token budgeting.
+"""
+
+from unittest.mock import MagicMock
+
+from backend.services.conversation_memory import estimate_tokens
+from backend.services.persona_service import get_persona_service
+from backend.workflows.chat_prompts import SYSTEM_PROMPT, ResponsePromptBuilder, allocate_budget
+
+
+def _history(turns: int, chars: int):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i} " + "x" * chars}
+        for i in range(turns)
+    ]
+
+
+class TestAllocateBudget:
+    """Test weighted max-min budget splitting."""
+
+    def test_everything_fits(self):
+        assert allocate_budget(1000, {"context": 300, "history": 200}) == {"context": 300, "history": 200}
+
+    def test_small_section_leaves_rest_to_large(self):
+        assert allocate_budget(1000, {"context": 100, "history": 5000}) == {"context": 100, "history": 900}
+
+    def test_both_over_share_split_by_weight(self):
+        grants = allocate_budget(900, {"context": 5000, "history": 5000}, {"context": 2.0, "history": 1.0})
+        assert grants == {"context": 600, "history": 300}
+
+    def test_no_budget(self):
+        assert allocate_budget(-50, {"context": 100, "history": 0}) == {"context": 0, "history": 0}
+
+
+class TestResponsePromptBuilder:
+    """Test cached blocks and budget trimming."""
+
+    def test_small_prompt_is_complete(self):
+        builder = ResponsePromptBuilder(get_persona_service())
+        history = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello!"},
+                   {"role": "user", "content": "Cost of a deck?"}]
+
+        prompt, tokens = builder.build(
+            "Cost of a deck?", {"context_text": "Home: 2 storey", "image_urls": ["a.jpg"]}, history,
+            persona="homeowner", scenario="contractor_quotes", intent="cost_estimate",
+        )
+
+        assert prompt.startswith(SYSTEM_PROMPT)
+        assert "Current focus: Contractor Quotes" in prompt
+        assert "**SKILL CONTEXT (concise):**" in prompt
+        assert "Home: 2 storey" in prompt and "- a.jpg" in prompt
+        assert "User: Hi\nAssistant: Hello!" in prompt
+        assert prompt.count("Cost of a deck?") == 1
+        assert prompt.endswith("**YOUR RESPONSE:**")
+        assert tokens["total"] == estimate_tokens(prompt)
+
+    def test_large_inputs_are_trimmed_to_budget(self):
+        builder = ResponsePromptBuilder(get_persona_service(), budget_tokens=1500)
+
+        prompt, tokens = builder.build(
+            "What next?", {"context_text": "room data " * 2000}, _history(40, 400), summary="s" * 4000,
+        )
+
+        assert tokens["total"] <= 1500 + 20  # joins add a few newlines
+        assert tokens["context"] > 0 and tokens["history"] > 0
+        assert "turn 39" in prompt  # newest turns are kept
+        assert "turn 0 " not in prompt
+
+    def test_persona_blocks_are_memoized(self):
+        persona_service = MagicMock()
+        persona_service.get_prompt_prefix.return_value = "Use a warm, supportive tone."
+        builder = ResponsePromptBuilder(persona_service)
+
+        for message in ("one", "two", "three"):
+            prompt, _ = builder.build(message, None, [], persona="homeowner", scenario="diy_project_plan")
+
+        assert persona_service.get_prompt_prefix.call_count == 1
+        assert "**Tone & Detail Guidance:** Use a warm, supportive tone." in prompt
@@ -0,0 +1,104 @@
+"""
+Tests for fan-out / fan-in execution of the chat workflow graph.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.workflows.base import state_update
+from backend.workflows.chat_workflow import (
+    CHAT_NODES,
+    CHAT_STAGES,
+    ChatWorkflow,
+    summarize_node_timings,
+)
+
+NODE_DELAY = 0.05
+
+
+pytestmark = pytest.mark.usefixtures("chat_workflow_env")
+
+
+def _slow_workflow() -> ChatWorkflow:
+    """Workflow whose nodes sleep and write one field each, through the orchestrator."""
+    workflow = ChatWorkflow(MagicMock())
+    writes = {
+        "_classify_intent": {"intent": "cost_estimate", "response_metadata": {"intent_confidence": 0.9}},
+        "_retrieve_context": {"retrieved_context": {"rooms": 3}, "context_sources": ["home"]},
+        "_load_conversation_history": {"conversation_history": [{"role": "user", "content": "hi"}]},
+        "_manage_journey": {"journey_id": "j1"},
+        "_generate_response": {"ai_response": "answer", "response_metadata": {"model": "gemini"}},
+    }
+    for node_name, method_name in CHAT_NODES:
+        async def node(state, _node=node_name, _method=method_name):
+            state = workflow.orchestrator.mark_node_start(state, _node)
+            await asyncio.sleep(NODE_DELAY)
+            if _method == "_generate_response":
+                # The response depends on every node of the previous stage
+                assert state["intent"] and state["retrieved_context"] and state["conversation_history"]
+            state.update(writes.get(_method, {}))
+            if _method in ("_retrieve_context", "_manage_journey"):
+                workflow.orchestrator.add_warning(state, f"{_node} degraded", _node)
+            return workflow.orchestrator.mark_node_complete(state, _node, {"ok": True})
+        setattr(workflow, method_name, node)
+    return workflow
+
+
+class TestParallelChatGraph:
+    """Test concurrent stages, state merging and timings."""
+
+    @pytest.mark.asyncio
+    async def test_independent_nodes_overlap(self):
+        final_state = await _slow_workflow().execute({"user_message": "q", "conversation_id": "c1"})
+
+        timings = final_state["node_timings"]
+        assert set(timings) == {name for name, _ in CHAT_NODES}
+        for stage in CHAT_STAGES:
+            starts = [timings[name]["start_ms"] for name in stage]
+            ends = [timings[name]["end_ms"] for name in stage]
+            assert max(starts) < min(ends)  # all nodes of a stage ran at the same time
+
+        timing = final_state["metadata"]["timing"]
+        assert timing["serial_ms"] >= len(CHAT_NODES) * NODE_DELAY * 1000
+        assert timing["wall_ms"] < timing["serial_ms"] - 2 * NODE_DELAY * 1000
+        assert timing["critical_path_ms"] <= timing["wall_ms"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_updates_are_merged(self):
+        final_state = await _slow_workflow().execute({"user_message": "q", "conversation_id": "c1"})
+
+        assert final_state["intent"] == "cost_estimate"
+        assert final_state["journey_id"] == "j1"
+        assert final_state["ai_response"] == "answer"
+        assert final_state["response_metadata"] == {"intent_confidence": 0.9, "model": "gemini"}
+        assert sorted(final_state["visited_nodes"]) == sorted(name for name, _ in CHAT_NODES)
+        assert len(final_state["visited_nodes"]) == len(CHAT_NODES)
+        assert sorted(w["node"] for w in final_state["warnings"]) == ["manage_journey", "retrieve_context"]
+        assert set(final_state["metadata"]["node_results"]) == {name for name, _ in CHAT_NODES}
+
+    def test_state_update_returns_only_changes(self):
+        before = {"visited_nodes": ["a"], "metadata": {"x": 1}, "intent": None, "user_message": "q"}
+        after = {"visited_nodes": ["a", "b"], "metadata": {"x": 1, "y": 2}, "intent": "faq", "user_message": "q"}
+
+        assert state_update(before, after) == {"visited_nodes": ["b"], "metadata": {"y": 2}, "intent": "faq"}
+
+    def test_state_update_appends_replaced_suggested_actions(self):
+        # manage_journey assigns a fresh list; only its new actions go to the reducer
+        before = {"suggested_actions": [{"action": "get_detailed_estimate"}]}
+        after = {"suggested_actions": [{"action": "journey_next_step"}]}
+
+        assert state_update(before, after) == {"suggested_actions": [{"action": "journey_next_step"}]}
+        assert state_update(after, after) == {}
+
+    def test_summarize_node_timings(self):
+        timings = {
+            "validate_input": {"start_ms": 0, "end_ms": 10, "duration_ms": 10},
+            "classify_intent": {"start_ms": 10, "end_ms": 40, "duration_ms": 30},
+            "retrieve_context": {"start_ms": 10, "end_ms": 30, "duration_ms": 20},
+        }
+
+        assert summarize_node_timings(timings) == {
+            "wall_ms": 40, "serial_ms": 60, "critical_path_ms": 40, "parallel_savings_ms": 20,
+        }
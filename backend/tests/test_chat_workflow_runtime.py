@@ -0,0 +1,62 @@
+"""
+Tests for the app-scoped chat workflow runtime.
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.workflows.chat_workflow import CHAT_NODES, ChatWorkflow, get_chat_workflow_runtime
+
+
+pytestmark = pytest.mark.usefixtures("chat_workflow_env")
+
+
+def _recording_workflow(db, calls):
+    workflow = ChatWorkflow(db)
+    for _, method_name in CHAT_NODES:
+        async def node(state, _name=method_name):
+            calls.append((id(workflow), _name))
+            if _name == "_generate_response":
+                state["ai_response"] = f"reply to {state['user_message']}"
+            return state
+        setattr(workflow, method_name, node)
+    return workflow
+
+
+class TestChatWorkflowRuntime:
+    """Test graph sharing and per-request session injection."""
+
+    def test_graph_and_services_are_shared(self):
+        first, second = ChatWorkflow(MagicMock()), ChatWorkflow(MagicMock())
+
+        runtime = get_chat_workflow_runtime()
+        assert first.graph is second.graph is runtime.graph
+        assert first.gemini_client is second.gemini_client
+        assert first.rag_service is second.rag_service
+
+    def test_session_bound_services_are_per_request(self):
+        db_a, db_b = MagicMock(), MagicMock()
+        first, second = ChatWorkflow(db_a), ChatWorkflow(db_b)
+
+        assert first.conversation_service.db is db_a
+        assert second.conversation_service.db is db_b
+        assert first.journey_persistence_service.db is db_a
+        assert first.conversation_service.gemini_client is first.gemini_client
+
+    @pytest.mark.asyncio
+    async def test_nodes_run_on_the_requesting_workflow(self, monkeypatch):
+        for name in ("publish_workflow_started", "publish_chat_message_received",
+                     "publish_chat_response_generated", "publish_workflow_completed"):
+            monkeypatch.setattr(f"backend.workflows.chat_workflow.{name}", AsyncMock())
+        calls = []
+        first = _recording_workflow(MagicMock(), calls)
+        second = _recording_workflow(MagicMock(), calls)
+
+        result_a = await first.execute({"user_message": "a", "conversation_id": "c1"})
+        result_b = await second.execute({"user_message": "b", "conversation_id": "c2"})
+
+        assert result_a["ai_response"] == "reply to a"
+        assert result_b["ai_response"] == "reply to b"
+        assert sorted(name for wf, name in calls if wf == id(first)) == sorted(m for _, m in CHAT_NODES)
+        assert sorted(name for wf, name in calls if wf == id(second)) == sorted(m for _, m in CHAT_NODES)
@@ -0,0 +1,147 @@
+"""
+Tests for streaming execution of the chat workflow.
+"""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.workflows.chat_workflow import CHAT_NODES, ChatWorkflow
+
+
+pytestmark = pytest.mark.usefixtures("chat_workflow_env")
+
+
+def _workflow(monkeypatch, tokens, fail_after=None, token_delay=0.0) -> ChatWorkflow:
+    """Workflow with stubbed nodes around the real generate_response."""
+    workflow = ChatWorkflow(MagicMock())
+    writes = {
+        "_classify_intent": {"intent": "cost_estimate"},
+        "_manage_journey": {"suggested_actions": [{"action": "journey_next_step"}]},
+        "_suggest_actions": {"suggested_actions": [{"action": "get_detailed_estimate"}]},
+        "_save_conversation": {"saved_message_ids": ["u1", "a1"], "assistant_message_id": "a1"},
+    }
+    for _, method_name in CHAT_NODES:
+        if method_name == "_generate_response":
+            continue
+        async def node(state, _method=method_name):
+            state.update(writes.get(_method, {}))
+            return state
+        setattr(workflow, method_name, node)
+
+    async def generate_text_stream(**kwargs):
+        for i, token in enumerate(tokens):
+            if fail_after is not None and i == fail_after:
+                raise RuntimeError("stream dropped")
+            await asyncio.sleep(token_delay)
+            yield token
+
+    # The Gemini client is shared across requests; patch it for this test only
+    monkeypatch.setattr(workflow.gemini_client, "generate_text_stream", generate_text_stream)
+    monkeypatch.setattr(workflow.gemini_client, "generate_text", AsyncMock(return_value="".join(tokens)))
+    return workflow
+
+
+async def _collect(workflow, **kwargs):
+    return [event async for event in workflow.stream({"user_message": "q", "conversation_id": "c1"}, **kwargs)]
+
+
+class TestChatWorkflowStream:
+    """Test token and node events."""
+
+    @pytest.mark.asyncio
+    async def test_tokens_precede_later_nodes(self, monkeypatch):
+        events = await _collect(_workflow(monkeypatch, ["Hel", "lo"]))
+
+        kinds = [(e["type"], e.get("node") or e.get("content")) for e in events]
+        assert kinds.index(("token", "Hel")) < kinds.index(("token", "lo")) < kinds.index(("node", "generate_response"))
+        assert kinds.index(("node", "generate_response")) < kinds.index(("node", "enrich_with_multimodal"))
+        assert events[-1]["type"] == "complete"
+        assert events[-1]["state"]["ai_response"] == "Hello"
+
+    @pytest.mark.asyncio
+    async def test_node_events_carry_client_fields(self, monkeypatch):
+        events = await _collect(_workflow(monkeypatch, ["ok"]))
+        nodes = {e["node"]: e for e in events if e["type"] == "node"}
+
+        assert set(nodes) == {name for name, _ in CHAT_NODES}
+        assert nodes["classify_intent"]["data"] == {"intent": "cost_estimate"}
+        assert nodes["suggest_actions"]["data"]["suggested_actions"] == [{"action": "get_detailed_estimate"}]
+        assert nodes["save_conversation"]["data"]["saved_message_ids"] == ["u1", "a1"]
+        assert nodes["save_conversation"]["data"]["assistant_message_id"] == "a1"
+        assert nodes["generate_response"]["duration_ms"] is not None
+
+    @pytest.mark.asyncio
+    async def test_suggestions_ready_while_tokens_stream(self, monkeypatch):
+        events = await _collect(_workflow(monkeypatch, ["a", "b", "c", "d"], token_delay=0.02))
+
+        kinds = [(e["type"], e.get("node") or e.get("content")) for e in events]
+        assert kinds.index(("node", "suggest_actions")) < kinds.index(("token", "d"))
+        assert events[-1]["state"]["suggested_actions"] == [
+            {"action": "journey_next_step"}, {"action": "get_detailed_estimate"}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_execute_shares_path_without_tokens(self, monkeypatch):
+        workflow = _workflow(monkeypatch, ["one ", "shot"])
+
+        result = await workflow.execute({"user_message": "q", "conversation_id": "c1"})
+
+        assert result["ai_response"] == "one shot"
+        assert result["saved_message_ids"] == ["u1", "a1"]
+        workflow.gemini_client.generate_text.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_interrupted_stream_keeps_partial_answer(self, monkeypatch):
+        events = await _collect(_workflow(monkeypatch, ["Part", "ial", "never"], fail_after=2))
+
+        assert [e["content"] for e in events if e["type"] == "token"] == ["Part", "ial"]
+        assert events[-1]["state"]["ai_response"] == "Partial"
+
+
+class TestSaveConversation:
+    """Test the ids the save node reports back to the response."""
+
+    def _save_state(self, workflow, ai_response):
+        state = workflow._initial_state(
+            {"user_message": "q", "conversation_id": "c1"}, "w1", "c1", datetime.utcnow()
+        )
+        state["ai_response"] = ai_response
+        return state
+
+    def _workflow(self, monkeypatch, enqueue):
+        workflow = ChatWorkflow(MagicMock())
+        workflow.conversation_service.get_conversation = AsyncMock(return_value=MagicMock())
+        writer = MagicMock(enqueue=enqueue)
+        monkeypatch.setattr("backend.workflows.chat_workflow.get_message_writer", lambda: writer)
+        return workflow
+
+    @pytest.mark.asyncio
+    async def test_assistant_id_reported_once_queued(self, monkeypatch):
+        workflow = self._workflow(monkeypatch, AsyncMock())
+        state = self._save_state(workflow, "answer")
+
+        state = await workflow._save_conversation(state)
+
+        assert state["saved_message_ids"] == state["reserved_message_ids"]
+        assert state["assistant_message_id"] == state["reserved_message_ids"][1]
+
+    @pytest.mark.asyncio
+    async def test_no_assistant_id_without_assistant_message(self, monkeypatch):
+        workflow = self._workflow(monkeypatch, AsyncMock())
+
+        state = await workflow._save_conversation(self._save_state(workflow, None))
+
+        assert state["saved_message_ids"] == state["reserved_message_ids"][:1]
+        assert state["assistant_message_id"] is None
+
+    @pytest.mark.asyncio
+    async def test_no_ids_when_save_fails(self, monkeypatch):
+        workflow = self._workflow(monkeypatch, AsyncMock(side_effect=OSError("spool not writable")))
+
+        state = await workflow._save_conversation(self._save_state(workflow, "answer"))
+
+        assert state["saved_message_ids"] == []
+        assert state["assistant_message_id"] is None
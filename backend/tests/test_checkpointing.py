@@ -0,0 +1,133 @@
+"""
+Tests for bounded chat workflow checkpointers.
+"""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import func, select
+
+from backend.models.checkpoint import WorkflowCheckpoint
+from backend.workflows.base import WorkflowStatus
+from backend.workflows.chat_workflow import CHAT_NODES, ChatWorkflow, ChatWorkflowRuntime
+from backend.workflows.checkpointing import BoundedMemorySaver, CompactSerializer, SQLCheckpointSaver
+
+
+pytestmark = pytest.mark.usefixtures("chat_workflow_env")
+
+
+def _workflow(runtime, calls, fail_at=None) -> ChatWorkflow:
+    """Workflow with recording stub nodes; ``fail_at`` raises like a crashed replica."""
+    workflow = ChatWorkflow(MagicMock(), runtime=runtime)
+    for node_name, method_name in CHAT_NODES:
+        async def node(state, _node=node_name):
+            if _node == fail_at:
+                raise RuntimeError("replica lost")
+            calls.append(_node)
+            if _node == "generate_response":
+                state["ai_response"] = f"reply to {state['user_message']}"
+            return state
+        setattr(workflow, method_name, node)
+    return workflow
+
+
+def _config(thread_id: str, checkpoint_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": "", "checkpoint_id": checkpoint_id}}
+
+
+def _checkpoint(checkpoint_id: str) -> dict:
+    return {"v": 1, "id": checkpoint_id, "ts": "", "channel_values": {"user_message": "x" * 2000},
+            "channel_versions": {}, "versions_seen": {}}
+
+
+class TestBoundedMemorySaver:
+    """Test per-thread, TTL and thread-count limits."""
+
+    def test_keeps_newest_checkpoints_per_thread(self):
+        saver = BoundedMemorySaver(max_per_thread=2)
+        for i in range(5):
+            config = saver.put(_config("t1", f"0{i - 1}" if i else None), _checkpoint(f"0{i}"), {}, {})
+            saver.put_writes(config, [("ai_response", "partial")], task_id=f"task{i}")
+
+        assert [c.config["configurable"]["checkpoint_id"] for c in saver.list(None)] == ["04", "03"]
+        assert saver.get_tuple({"configurable": {"thread_id": "t1"}}).pending_writes == [
+            ("task4", "ai_response", "partial")
+        ]
+        assert saver.get_stats()["pruned_checkpoints"] == 3
+
+    def test_threads_expire_and_are_capped(self, monkeypatch):
+        saver = BoundedMemorySaver(ttl_seconds=60, max_threads=2)
+        for thread_id in ("a", "b", "c"):
+            saver.put(_config(thread_id, None), _checkpoint("01"), {}, {})
+        assert saver.get_tuple({"configurable": {"thread_id": "a"}}) is None  # evicted (LRU)
+
+        later = time.monotonic() + 61
+        monkeypatch.setattr("backend.workflows.checkpointing.time.monotonic", lambda: later)
+        assert saver.get_tuple({"configurable": {"thread_id": "c"}}) is None  # expired
+        saver.put(_config("d", None), _checkpoint("01"), {}, {})
+
+        stats = saver.get_stats()
+        assert stats["threads"] == 1
+        assert stats["evicted_threads"] == 1 and stats["expired_threads"] == 2
+
+    def test_pinned_thread_is_not_evicted_or_expired(self, monkeypatch):
+        saver = BoundedMemorySaver(ttl_seconds=60, max_threads=1)
+        saver.put(_config("pending", None), _checkpoint("01"), {}, {})
+        saver.pin_thread("pending")
+        saver.put(_config("other", None), _checkpoint("01"), {}, {})
+
+        later = time.monotonic() + 61
+        monkeypatch.setattr("backend.workflows.checkpointing.time.monotonic", lambda: later)
+        assert saver.get_tuple({"configurable": {"thread_id": "pending"}}) is not None
+        assert saver.get_tuple({"configurable": {"thread_id": "other"}}) is None
+
+        saver.unpin_thread("pending")
+        assert saver.get_tuple({"configurable": {"thread_id": "pending"}}) is None
+        assert saver.get_stats()["pinned_threads"] == 0
+
+    def test_compact_serializer_round_trip(self):
+        serde = CompactSerializer()
+        state = {"status": WorkflowStatus.RUNNING, "ai_response": "word " * 500}
+
+        type_, data = serde.dumps_typed(state)
+
+        assert type_.startswith("z:")
+        assert len(data) < 500
+        assert serde.loads_typed((type_, data)) == state
+
+
+class TestChatWorkflowCheckpoints:
+    """Test memory stays flat and runs resume on another replica."""
+
+    @pytest.mark.asyncio
+    async def test_completed_runs_leave_no_checkpoints(self):
+        saver = BoundedMemorySaver()
+        runtime = ChatWorkflowRuntime(checkpointer=saver)
+
+        for i in range(20):
+            await _workflow(runtime, []).execute({"user_message": f"q{i}", "conversation_id": "c1"})
+
+        assert saver.get_stats()["threads"] == 0
+
+    @pytest.mark.asyncio
+    async def test_resume_on_another_replica(self, session_factory):
+        first = ChatWorkflowRuntime(checkpointer=SQLCheckpointSaver(session_factory=session_factory))
+        second = ChatWorkflowRuntime(checkpointer=SQLCheckpointSaver(session_factory=session_factory))
+        calls_first, calls_second = [], []
+
+        with pytest.raises(Exception):
+            await _workflow(first, calls_first, fail_at="update_journey_activity").execute(
+                {"user_message": "q", "conversation_id": "c1"}
+            )
+        async with session_factory() as db:
+            thread_id = (await db.execute(select(WorkflowCheckpoint.thread_id))).scalars().first()
+
+        final_state = await _workflow(second, calls_second).resume(thread_id)
+
+        assert "generate_response" in calls_first
+        assert calls_second == ["update_journey_activity", "finalize"]
+        assert final_state["ai_response"] == "reply to q"
+        assert final_state["status"] == WorkflowStatus.PENDING
+        async with session_factory() as db:
+            assert (await db.execute(select(func.count()).select_from(WorkflowCheckpoint))).scalar() == 0
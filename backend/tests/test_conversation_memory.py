@@ -0,0 +1,138 @@
+"""
+Tests for rolling conversation summaries and token-budgeted history.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.models.conversation import Conversation, ConversationMessage
+from backend.services.conversation_memory import (
+    SummaryUpdater,
+    budget_history,
+    drop_summarized,
+    estimate_tokens,
+)
+from backend.services.conversation_service import ConversationService
+
+
+pytestmark = pytest.mark.usefixtures("api_key")
+
+
+async def _conversation_with_messages(db, count: int) -> Conversation:
+    conv = Conversation(id=uuid.uuid4(), message_count=count)
+    db.add(conv)
+    base = datetime(2025, 1, 1, 12, 0, 0)
+    for i in range(count):
+        db.add(ConversationMessage(
+            id=uuid.uuid4(),
+            conversation_id=conv.id,
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"m{i}",
+            created_at=base + timedelta(seconds=i),
+        ))
+    await db.commit()
+    return conv
+
+
+class TestBudgetHistory:
+    """Test token budgeting of prompt history."""
+
+    def test_keeps_newest_turns_within_budget(self):
+        history = [{"role": "user", "content": "x" * 400} for _ in range(10)]  # 100 tokens each
+
+        summary, selected = budget_history(history, None, budget_tokens=350)
+
+        assert summary is None
+        assert len(selected) == 3
+        assert selected == history[-3:]
+
+    def test_summary_share_is_capped(self):
+        summary, selected = budget_history(
+            [{"role": "user", "content": "hi"}], "s" * 4000, budget_tokens=100
+        )
+
+        assert estimate_tokens(summary) <= 35
+        assert selected == [{"role": "user", "content": "hi"}]
+
+    def test_oversized_newest_turn_is_truncated(self):
+        history = [{"role": "user", "content": "short"}, {"role": "assistant", "content": "y" * 10000}]
+
+        _, selected = budget_history(history, None, budget_tokens=50)
+
+        assert len(selected) == 1
+        assert selected[0]["role"] == "assistant"
+        assert estimate_tokens(selected[0]["content"]) <= 50
+
+    def test_drop_summarized(self):
+        history = [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+
+        assert drop_summarized(history, "b") == [{"id": "c"}]
+        assert drop_summarized(history, "zzz") == history
+        assert drop_summarized(history, None) == history
+
+
+class TestRollingSummary:
+    """Test ConversationSummary roll-forward."""
+
+    @pytest.mark.asyncio
+    async def test_folds_messages_outside_recent_window(self, db):
+        conv = await _conversation_with_messages(db, 10)
+        service = ConversationService(db)
+        service.gemini_client.generate_text = AsyncMock(return_value="Summary one")
+
+        summary = await service.update_rolling_summary(str(conv.id), keep_recent=6, min_messages=4)
+
+        assert summary is not None
+        assert summary.message_count == 4
+        prompt = service.gemini_client.generate_text.call_args.kwargs["prompt"]
+        assert "USER: m0" in prompt and "ASSISTANT: m3" in prompt and "m4" not in prompt
+
+        context = await service.get_history_context(str(conv.id), max_messages=20)
+        assert context["summary"] == "Summary one"
+        assert [m["content"] for m in context["messages"]] == [f"m{i}" for i in range(4, 10)]
+
+    @pytest.mark.asyncio
+    async def test_rolls_forward_from_previous_summary(self, db):
+        conv = await _conversation_with_messages(db, 10)
+        service = ConversationService(db)
+        service.gemini_client.generate_text = AsyncMock(return_value="Summary one")
+        first = await service.update_rolling_summary(str(conv.id), keep_recent=6, min_messages=4)
+
+        # Not enough new messages outside the window yet
+        assert await service.update_rolling_summary(str(conv.id), keep_recent=6, min_messages=4) is None
+
+        base = datetime(2025, 1, 1, 13, 0, 0)
+        for i in range(10, 14):
+            db.add(ConversationMessage(
+                id=uuid.uuid4(), conversation_id=conv.id, role="user", content=f"m{i}",
+                created_at=base + timedelta(seconds=i),
+            ))
+        await db.commit()
+        service.gemini_client.generate_text = AsyncMock(return_value="Summary two")
+
+        second = await service.update_rolling_summary(str(conv.id), keep_recent=6, min_messages=4)
+
+        assert second.message_count == 8
+        assert second.start_message_id == first.start_message_id
+        prompt = service.gemini_client.generate_text.call_args.kwargs["prompt"]
+        assert "Summary one" in prompt and "m4" in prompt and "m3" not in prompt
+
+    @pytest.mark.asyncio
+    async def test_updater_uses_own_session(self, db, session_factory, monkeypatch):
+        conv = await _conversation_with_messages(db, 12)
+        monkeypatch.setattr(
+            "backend.integrations.gemini.client.GeminiClient.generate_text",
+            AsyncMock(return_value="Background summary"),
+        )
+        updater = SummaryUpdater(session_factory=session_factory)
+
+        task = updater.schedule(str(conv.id))
+        assert updater.schedule(str(conv.id)) is None  # already running
+        await task
+
+        assert updater.updates == 1
+        latest = await ConversationService(db).get_latest_summary(str(conv.id))
+        assert latest.summary_text == "Background summary"
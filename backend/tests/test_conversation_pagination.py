@@ -0,0 +1,101 @@
+"""
+Tests for keyset pagination of conversation messages.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+
+from backend.models.conversation import Conversation, ConversationMessage
+from backend.services.conversation_service import (
+    ConversationService,
+    decode_message_cursor,
+    encode_message_cursor,
+)
+
+MESSAGE_COUNT = 12
+
+
+@pytest_asyncio.fixture
+async def conversation(db):
+    conv = Conversation(id=uuid.uuid4(), message_count=MESSAGE_COUNT)
+    db.add(conv)
+    base = datetime(2025, 1, 1, 12, 0, 0)
+    for i in range(MESSAGE_COUNT):
+        # Pairs share a timestamp so ordering must fall back to id
+        db.add(ConversationMessage(
+            id=uuid.uuid4(),
+            conversation_id=conv.id,
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"m{i}",
+            created_at=base + timedelta(seconds=i // 2),
+        ))
+    await db.commit()
+    return conv
+
+
+@pytest.fixture
+def service(db, api_key):
+    return ConversationService(db)
+
+
+def ordered(messages):
+    return [m.id for m in messages]
+
+
+class TestMessagePagination:
+    """Tail fetches and keyset paging in both directions."""
+
+    @pytest.mark.asyncio
+    async def test_last_messages_returns_tail_oldest_first(self, service, conversation):
+        everything = await service.get_messages(str(conversation.id), limit=100)
+        last = await service.get_last_messages(str(conversation.id), count=4)
+
+        assert len(everything) == MESSAGE_COUNT
+        assert [m.created_at for m in last] == sorted(m.created_at for m in last)
+        assert {m.id for m in last} <= {m.id for m in everything}
+        assert max(m.created_at for m in last) == max(m.created_at for m in everything)
+
+        recent = await service.get_recent_messages(str(conversation.id), count=4)
+        assert [r["content"] for r in recent] == [m.content for m in last]
+
+    @pytest.mark.asyncio
+    async def test_paging_backwards_covers_thread_without_overlap(self, service, conversation):
+        seen = []
+        page = await service.get_messages_page(str(conversation.id), limit=5)
+        assert page["next_cursor"] is None
+        while True:
+            seen = ordered(page["messages"]) + seen
+            if not page["prev_cursor"]:
+                break
+            page = await service.get_messages_page(str(conversation.id), limit=5, before=page["prev_cursor"])
+
+        assert len(seen) == MESSAGE_COUNT
+        assert len(set(seen)) == MESSAGE_COUNT
+
+    @pytest.mark.asyncio
+    async def test_paging_forwards_from_older_page(self, service, conversation):
+        newest = await service.get_messages_page(str(conversation.id), limit=5)
+        older = await service.get_messages_page(str(conversation.id), limit=5, before=newest["prev_cursor"])
+        assert older["next_cursor"]
+
+        newer = await service.get_messages_page(str(conversation.id), limit=5, after=older["next_cursor"])
+        assert ordered(newer["messages"]) == ordered(newest["messages"])
+        assert newer["next_cursor"] is None
+        assert newer["prev_cursor"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_raises_value_error(self, service, conversation):
+        with pytest.raises(ValueError):
+            await service.get_messages_page(str(conversation.id), before="not-a-cursor")
+        with pytest.raises(ValueError):
+            await service.get_messages_page(str(conversation.id), before="a", after="b")
+
+    def test_cursor_round_trip(self):
+        msg = ConversationMessage(id=uuid.uuid4(), created_at=datetime(2025, 5, 6, 7, 8, 9, 123456))
+        cursor = encode_message_cursor(msg)
+
+        assert "=" not in cursor
+        assert decode_message_cursor(cursor) == (msg.created_at, msg.id)
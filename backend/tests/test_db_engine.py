@@ -0,0 +1,71 @@
+"""
+Tests for the environment-driven engine factory and pool status.
+"""
+
+import pytest
+from sqlalchemy import exc, text
+
+from backend.models import base
+from backend.models.base import (
+    TimedAsyncQueuePool,
+    TimedQueuePool,
+    create_db_engine,
+    engine_options,
+    get_pool_status,
+)
+
+
+class TestEngineOptions:
+    """Engine keyword arguments built from settings."""
+
+    def test_echo_is_off_by_default(self):
+        assert engine_options("sqlite:///./x.db")["echo"] is False
+
+    def test_postgres_pool_settings(self, monkeypatch):
+        monkeypatch.setattr(base, "DB_POOL_SIZE", 7)
+        monkeypatch.setattr(base, "DB_MAX_OVERFLOW", 3)
+        monkeypatch.setattr(base, "DB_STATEMENT_CACHE_SIZE", 0)
+
+        options = engine_options("postgresql+asyncpg://u:p@db/app", is_async=True)
+
+        assert options["pool_size"] == 7
+        assert options["max_overflow"] == 3
+        assert options["pool_timeout"] == base.DB_POOL_TIMEOUT
+        assert options["pool_recycle"] == base.DB_POOL_RECYCLE
+        assert options["poolclass"] is TimedAsyncQueuePool
+        assert options["connect_args"] == {"statement_cache_size": 0}
+
+    def test_sqlite_skips_pool_sizing(self):
+        options = engine_options("sqlite:///./x.db")
+
+        assert "pool_size" not in options
+        assert options["poolclass"] is TimedQueuePool
+        assert options["connect_args"] == {"check_same_thread": False}
+
+
+class TestPoolWaitStats:
+    """Checkout wait times and timeouts are recorded."""
+
+    def test_records_checkouts_and_timeouts(self, tmp_path):
+        eng = create_db_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}", pool_size=1, max_overflow=0, pool_timeout=0.05
+        )
+
+        with eng.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with pytest.raises(exc.TimeoutError):
+                eng.connect()
+
+        stats = eng.pool.wait_stats.to_dict()
+        assert stats["checkouts"] == 1
+        assert stats["timeouts"] == 1
+        eng.dispose()
+
+    def test_pool_status_reports_both_engines(self):
+        status = get_pool_status()
+
+        assert {"async", "sync"} <= set(status)
+        for info in status.values():
+            assert "checked_out" in info
+            assert "overflow" in info
+            assert "wait" in info
@@ -0,0 +1,117 @@
+"""
+Tests for per-request SQL instrumentation.
+"""
+
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from backend.middleware.db_instrumentation import QueryInstrumentationMiddleware
+from backend.models import instrumentation
+from backend.models.base import create_async_db_engine, create_db_engine
+from backend.models.instrumentation import (
+    QueryMetrics,
+    end_request_stats,
+    redact_parameters,
+    start_request_stats,
+    statement_shape,
+)
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    fresh = QueryMetrics()
+    monkeypatch.setattr(instrumentation, "_query_metrics", fresh)
+    return fresh
+
+
+class TestStatementShape:
+    """Normalization of statements for N+1 detection."""
+
+    def test_literals_and_in_lists_collapse(self):
+        a = statement_shape("SELECT * FROM rooms WHERE id IN (?, ?, ?) AND name = 'a'")
+        b = statement_shape("SELECT *\n  FROM rooms WHERE id IN (?) AND name = 'bb'")
+        assert a == b
+
+    def test_numbered_placeholders(self):
+        assert statement_shape("SELECT 1 FROM t WHERE id IN ($1, $2) LIMIT 10") == \
+            statement_shape("SELECT 2 FROM t WHERE id IN ($1) LIMIT 5")
+
+    def test_parameters_are_redacted(self):
+        redacted = redact_parameters({"email": "a@b.com", "n": 3, "blob": b"xyz", "none": None})
+        assert redacted == {"email": "<str:7>", "n": "<int>", "blob": "<bytes:3>", "none": None}
+        assert redact_parameters(("secret",)) == ["<str:6>"]
+
+
+class TestEngineHooks:
+    """Queries are timed and attributed to the active request."""
+
+    def test_counts_queries_for_request(self, metrics, tmp_path):
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'i.db'}")
+        stats, token = start_request_stats()
+        try:
+            with engine.connect() as conn:
+                for i in range(6):
+                    conn.execute(text("SELECT :i"), {"i": i})
+        finally:
+            end_request_stats(token)
+            engine.dispose()
+
+        assert stats.queries == 6
+        assert stats.total_ms > 0
+        assert stats.repeated_shapes(threshold=5) == [("SELECT ?", 6)]
+        assert metrics.queries >= 6
+
+    @pytest.mark.asyncio
+    async def test_async_engine_is_instrumented(self, metrics, tmp_path):
+        engine = create_async_db_engine(f"sqlite+aiosqlite:///{tmp_path / 'a.db'}")
+        stats, token = start_request_stats()
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        finally:
+            end_request_stats(token)
+            await engine.dispose()
+
+        assert stats.queries == 1
+
+    def test_slow_queries_logged_with_redacted_params(self, metrics, monkeypatch, tmp_path, caplog):
+        monkeypatch.setattr(instrumentation, "SLOW_QUERY_MS", 0.0)
+        engine = create_db_engine(f"sqlite:///{tmp_path / 's.db'}")
+        with caplog.at_level(logging.WARNING, logger=instrumentation.__name__):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT :secret"), {"secret": "hunter2"})
+        engine.dispose()
+
+        assert metrics.slow_queries >= 1
+        assert "Slow query" in caplog.text
+        assert "hunter2" not in caplog.text
+        assert "<str:7>" in caplog.text
+
+
+class TestQueryInstrumentationMiddleware:
+    """Per-request headers and N+1 reporting."""
+
+    def test_debug_headers_and_n_plus_one(self, metrics, tmp_path):
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'm.db'}")
+        app = FastAPI()
+        app.add_middleware(QueryInstrumentationMiddleware, debug_headers=True)
+
+        @app.get("/rooms/{home_id}")
+        def rooms(home_id: int):
+            with engine.connect() as conn:
+                for i in range(instrumentation.N_PLUS_ONE_THRESHOLD):
+                    conn.execute(text("SELECT :i"), {"i": i})
+            return {}
+
+        response = TestClient(app).get("/rooms/1")
+        engine.dispose()
+
+        assert response.headers["X-DB-Queries"] == str(instrumentation.N_PLUS_ONE_THRESHOLD)
+        assert response.headers["X-DB-Time"].endswith("ms")
+        stats = metrics.get_stats()
+        assert stats["n_plus_one_requests"] == 1
+        assert stats["n_plus_one_patterns"][0]["endpoint"] == "GET /rooms/{home_id}"
@@ -0,0 +1,151 @@
+"""
+Tests for request deadline propagation and optional step dropping.
+"""
+
+import asyncio
+import time
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from backend.services.deadline import (
+    DeadlineExceeded,
+    call_with_deadline,
+    deadline_after,
+    deadline_scope,
+    get_deadline,
+)
+from backend.services.monitoring_service import llm_timed
+from backend.workflows.base import WorkflowOrchestrator, state_update
+from backend.workflows.chat_workflow import CHAT_NODES, POST_RESPONSE_NODES, ChatWorkflow
+
+
+pytestmark = pytest.mark.usefixtures("api_key")
+
+
+@llm_timed
+async def slow_llm(delay: float) -> str:
+    await asyncio.sleep(delay)
+    return "ok"
+
+
+def _enrich_state(seconds_left: float, intent: str = "product_recommendation"):
+    return {
+        "workflow_id": "w1",
+        "user_message": f"best flooring {uuid.uuid4()}",  # unique product_search cache key
+        "intent": intent,
+        "mode": "agent",
+        "ai_response": "Try vinyl plank.",
+        "response_metadata": {},
+        "deadline": time.time() + seconds_left,
+        "dropped_steps": [],
+    }
+
+
+class TestCallWithDeadline:
+    """Test bounding calls by the current deadline."""
+
+    @pytest.mark.asyncio
+    async def test_no_deadline_is_unbounded(self):
+        assert get_deadline() is None
+        assert await call_with_deadline(asyncio.sleep(0.01, "done")) == "done"
+
+    @pytest.mark.asyncio
+    async def test_slow_call_is_cancelled(self):
+        with deadline_scope(deadline_after(0.05)):
+            started = time.perf_counter()
+            with pytest.raises(DeadlineExceeded):
+                await slow_llm(1.0)
+        assert time.perf_counter() - started < 0.5
+
+    @pytest.mark.asyncio
+    async def test_expired_deadline_fails_fast(self):
+        with deadline_scope(time.time() - 1):
+            with pytest.raises(DeadlineExceeded, match="No time left"):
+                await slow_llm(0.01)
+        assert get_deadline() is None
+
+
+class TestOrchestratorDeadline:
+    """Test the deadline reaching nodes and optional steps."""
+
+    @pytest.mark.asyncio
+    async def test_node_start_applies_run_deadline(self):
+        orchestrator = WorkflowOrchestrator(workflow_name="test_flow", timeout_seconds=30)
+        state = orchestrator.create_initial_state()
+
+        async def node():
+            orchestrator.mark_node_start(state, "analyze")
+            return get_deadline()
+
+        assert await asyncio.create_task(node()) == state["deadline"]
+        assert 29 < orchestrator.remaining_time(state) <= 30
+
+    def test_optional_step_dropped_when_time_is_short(self):
+        orchestrator = WorkflowOrchestrator(workflow_name="test_flow")
+        before = {"workflow_id": "w1", "deadline": time.time() + 1, "dropped_steps": [], "warnings": []}
+        after = {**before, "dropped_steps": [], "warnings": []}
+
+        assert not orchestrator.can_run_optional(after, "web_search", "enrich", min_seconds=3)
+        assert orchestrator.can_run_optional(after, "summary", "enrich", min_seconds=0.5)
+
+        update = state_update(before, after)
+        assert update["dropped_steps"] == ["web_search"]
+        assert "Dropped optional step web_search" in update["warnings"][0]["message"]
+
+    def test_optional_timeout_is_capped(self):
+        orchestrator = WorkflowOrchestrator(workflow_name="test_flow")
+
+        assert orchestrator.optional_step_timeout({}, 15) == 15
+        assert orchestrator.optional_step_timeout({"deadline": time.time() + 5}, 15) <= 5
+        assert orchestrator.optional_step_timeout({"deadline": time.time() - 5}, 15) == 0
+
+
+class TestChatEnrichmentDeadline:
+    """Test optional chat enrichments giving way to the deadline."""
+
+    @pytest.mark.asyncio
+    async def test_slow_enrichment_is_cancelled_and_reported(self, monkeypatch):
+        monkeypatch.setattr("backend.workflows.chat_workflow.CHAT_ENRICHMENT_TIMEOUT_SECONDS", 0.05)
+        workflow = ChatWorkflow(MagicMock())
+
+        async def slow_grounding(*args, **kwargs):
+            await asyncio.sleep(1.0)
+            return {"products": [{"name": "late"}], "sources": []}
+
+        monkeypatch.setattr(workflow.gemini_client, "suggest_products_with_grounding", slow_grounding)
+
+        started = time.perf_counter()
+        state = await workflow._enrich_with_multimodal(_enrich_state(seconds_left=30))
+
+        assert time.perf_counter() - started < 0.5
+        assert state["dropped_steps"] == ["web_search"]
+        assert state["web_search_results"] == []
+        assert not state.get("errors")
+
+    @pytest.mark.asyncio
+    async def test_enrichment_skipped_near_deadline(self, monkeypatch):
+        workflow = ChatWorkflow(MagicMock())
+        grounding = AsyncMock()
+        monkeypatch.setattr(workflow.gemini_client, "suggest_products_with_grounding", grounding)
+
+        state = await workflow._enrich_with_multimodal(_enrich_state(seconds_left=1, intent="diy_guide"))
+
+        grounding.assert_not_awaited()
+        assert state["dropped_steps"] == ["youtube_videos"]
+
+    @pytest.mark.asyncio
+    async def test_post_response_nodes_run_without_deadline(self, chat_workflow_env):
+        workflow = ChatWorkflow(MagicMock())
+        deadlines = {}
+        for node_name, method_name in CHAT_NODES:
+            async def node(state, _node=node_name):
+                deadlines[_node] = state.get("deadline")
+                return state
+            setattr(workflow, method_name, node)
+
+        await workflow.execute({"user_message": "q", "conversation_id": "c1"})
+
+        assert all(deadlines[name] is None for name in POST_RESPONSE_NODES)
+        assert deadlines["generate_response"] > time.time()
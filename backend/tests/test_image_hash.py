@@ -0,0 +1,83 @@
+"""
+Tests for content-addressed image hashing.
+"""
+
+import io
+
+from PIL import Image
+
+from backend.utils import image_hash
+from backend.utils.image_hash import (
+    content_hash,
+    file_content_hash,
+    image_content_hash,
+    perceptual_hash,
+    remember_file_hash,
+)
+
+
+def make_gradient(size=(64, 48)):
+    img = Image.new("RGB", size)
+    for x in range(size[0]):
+        for y in range(size[1]):
+            img.putpixel((x, y), (x * 4 % 256, y * 5 % 256, (x + y) % 256))
+    return img
+
+
+class TestContentHash:
+    """Checksums depend on content only."""
+
+    def test_same_bytes_different_paths_share_checksum(self, tmp_path):
+        a = tmp_path / "a.jpg"
+        b = tmp_path / "nested" / "b.jpg"
+        b.parent.mkdir()
+        a.write_bytes(b"image-bytes")
+        b.write_bytes(b"image-bytes")
+
+        assert file_content_hash(a) == file_content_hash(b) == content_hash(b"image-bytes")
+
+    def test_changed_content_changes_checksum(self, tmp_path):
+        path = tmp_path / "a.jpg"
+        path.write_bytes(b"one")
+        before = file_content_hash(path)
+        path.write_bytes(b"two!")
+
+        assert file_content_hash(path) != before
+
+    def test_missing_file_returns_none(self, tmp_path):
+        assert file_content_hash(tmp_path / "missing.jpg") is None
+
+    def test_remembered_hash_skips_reading_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "upload.jpg"
+        path.write_bytes(b"uploaded")
+        remember_file_hash(path, "precomputed")
+
+        def fail_open(*args, **kwargs):
+            raise AssertionError("file should not be re-read")
+
+        monkeypatch.setattr(image_hash, "open", fail_open, raising=False)
+        assert file_content_hash(path) == "precomputed"
+
+    def test_pil_image_hash_uses_pixels(self):
+        img = make_gradient()
+
+        assert image_content_hash(img) == image_content_hash(img.copy())
+        assert image_content_hash(img) != image_content_hash(img.rotate(90))
+
+
+class TestPerceptualHash:
+    """dHash tolerates re-encoding."""
+
+    def test_reencoded_image_is_near_duplicate(self):
+        img = make_gradient()
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=70)
+
+        original = perceptual_hash(img)
+        reencoded = perceptual_hash(buf.getvalue())
+
+        assert len(original) == 16
+        assert reencoded == original
+
+    def test_undecodable_input_returns_none(self):
+        assert perceptual_hash(b"not an image") is None
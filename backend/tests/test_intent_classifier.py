@@ -0,0 +1,92 @@
+"""
+Tests for the local intent classifier and its LLM fallback.
+"""
+
+import logging
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+
+from backend.models.conversation import Conversation, ConversationMessage
+from backend.services.intent_classifier import IntentClassifier
+
+
+class TestIntentClassifier:
+    """Test local predictions, fallback and agreement tracking."""
+
+    @pytest.mark.parametrize("message,intent", [
+        ("How much will a new roof cost?", "cost_estimate"),
+        ("Can you export this plan as a PDF", "pdf_request"),
+        ("Compare quartz vs granite countertops", "material_comparison"),
+        ("How do I replace a light switch, step by step", "diy_guide"),
+        ("Recommend a good kitchen faucet", "product_recommendation"),
+        ("Hello!", "general_chat"),
+    ])
+    def test_clear_messages_stay_local(self, message, intent):
+        prediction = IntentClassifier(threshold=0.7).predict(message)
+
+        assert prediction.intent == intent
+        assert prediction.confidence >= 0.7
+        assert prediction.latency_us < 10_000
+
+    @pytest.mark.asyncio
+    async def test_confident_prediction_skips_llm(self):
+        classifier = IntentClassifier(threshold=0.7)
+        llm = AsyncMock(return_value={"intent": "question", "confidence": 0.9})
+
+        prediction = await classifier.classify("How much will a new roof cost?", llm_classify=llm)
+
+        assert prediction.source == "local"
+        llm.assert_not_called()
+        assert classifier.get_stats()["fast_path_rate"] == 100.0
+
+    @pytest.mark.asyncio
+    async def test_ambiguous_message_falls_back_and_logs_agreement(self, caplog):
+        classifier = IntentClassifier(threshold=0.7)
+        llm = AsyncMock(return_value={"intent": "design_idea", "confidence": 0.8})
+        message = "I'm thinking about my backyard"
+        local = classifier.predict(message)
+        assert local.confidence < 0.7
+
+        with caplog.at_level(logging.INFO, logger="backend.services.intent_classifier.agreement"):
+            prediction = await classifier.classify(message, llm_classify=llm)
+
+        assert prediction.source == "llm"
+        assert prediction.intent == "design_idea"
+        assert prediction.local_intent == local.intent
+        assert '"llm_intent": "design_idea"' in caplog.text
+        assert message not in caplog.text  # user text stays out of logs by default
+        stats = classifier.get_stats()
+        assert stats["fallbacks"] == 1
+        assert stats["agreement_rate"] == (100.0 if local.intent == "design_idea" else 0.0)
+
+    @pytest.mark.asyncio
+    async def test_llm_failure_keeps_local_prediction(self):
+        classifier = IntentClassifier(threshold=1.1)
+        llm = AsyncMock(side_effect=RuntimeError("quota"))
+
+        prediction = await classifier.classify("Hello!", llm_classify=llm)
+
+        assert prediction.source == "local"
+        assert prediction.intent == "general_chat"
+        assert classifier.get_stats()["llm_failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fit_from_history_skips_fast_path_labels(self, db):
+        conv = Conversation(id=uuid.uuid4(), message_count=2)
+        db.add(conv)
+        db.add_all([
+            ConversationMessage(conversation_id=conv.id, role="user", content="gutter cleaning schedule",
+                                intent="question", message_metadata={"intent_source": "llm"}),
+            ConversationMessage(conversation_id=conv.id, role="user", content="gutter guards",
+                                intent="cost_estimate", message_metadata={"intent_source": "local"}),
+            ConversationMessage(conversation_id=conv.id, role="assistant", content="Sure",
+                                intent="question"),
+        ])
+        await db.commit()
+        classifier = IntentClassifier()
+        before = classifier.get_stats()["examples"]["question"]
+
+        assert await classifier.fit_from_history(db) == 1
+        assert classifier.get_stats()["examples"]["question"] == before + 1
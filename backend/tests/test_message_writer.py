@@ -0,0 +1,238 @@
+"""
+Tests for write-behind chat message persistence.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from backend.models.replica import ReplicaRouter, RequestDbContext, reset_request_db_context, set_request_db_context
+from backend.models.conversation import Conversation, ConversationMessage
+from backend.services.conversation_memory import SummaryUpdater
+from backend.services.conversation_service import ConversationService
+from backend.services.message_writer import MessageWriteBehind, is_transient_error, merge_pending
+
+
+@pytest_asyncio.fixture
+async def conversation_id(session_factory):
+    async with session_factory() as db:
+        conv = Conversation(id=uuid.uuid4(), message_count=0, title="Deck")
+        db.add(conv)
+        await db.commit()
+        return str(conv.id)
+
+
+@pytest.fixture(autouse=True)
+def no_rolling_summary(api_key, monkeypatch):
+    monkeypatch.setattr("backend.services.conversation_memory.ROLLING_SUMMARY_ENABLED", False)
+
+
+def _writer(tmp_path, session_factory, **kwargs) -> MessageWriteBehind:
+    kwargs.setdefault("flush_interval_ms", 10)
+    return MessageWriteBehind(
+        spool_path=str(tmp_path / "spool.jsonl"), session_factory=session_factory, fsync=False, **kwargs
+    )
+
+
+async def _stored(session_factory, conversation_id):
+    async with session_factory() as db:
+        messages = (await db.execute(
+            select(ConversationMessage)
+            .where(ConversationMessage.conversation_id == uuid.UUID(conversation_id))
+            .order_by(ConversationMessage.created_at, ConversationMessage.id)
+        )).scalars().all()
+        conv = await db.get(Conversation, uuid.UUID(conversation_id))
+        return messages, conv.message_count
+
+
+def _crash(writer: MessageWriteBehind) -> None:
+    """Simulate a process dying: stop the flusher without draining."""
+    writer._task.cancel()
+    writer._release_spool()
+
+
+class TestMessageWriteBehind:
+    """Test buffering, flushing and replay."""
+
+    @pytest.mark.asyncio
+    async def test_enqueue_is_durable_and_flushes_in_order(self, tmp_path, session_factory, conversation_id):
+        writer = _writer(tmp_path, session_factory)
+        user = await writer.enqueue(conversation_id, [{"role": "user", "content": "q1"}])
+        assistant = await writer.enqueue(conversation_id, [{"role": "assistant", "content": "a1"}])
+
+        spooled = [json.loads(line) for line in (tmp_path / "spool.jsonl").read_text().splitlines()]
+        assert [r["id"] for r in spooled] == [user[0]["id"], assistant[0]["id"]]
+        assert [m["content"] for m in writer.pending_messages(conversation_id)] == ["q1", "a1"]
+
+        assert await writer.wait_persisted([user[0]["id"], assistant[0]["id"]], timeout=5)
+        await writer.stop()
+
+        messages, count = await _stored(session_factory, conversation_id)
+        assert [m.content for m in messages] == ["q1", "a1"]
+        assert [str(m.id) for m in messages] == [user[0]["id"], assistant[0]["id"]]
+        assert count == 2
+        assert (tmp_path / "spool.jsonl").read_text() == ""
+
+    @pytest.mark.asyncio
+    async def test_restart_replays_spool(self, tmp_path, session_factory, conversation_id):
+        writer = _writer(tmp_path, session_factory, flush_interval_ms=60_000, batch_size=1000)
+        await writer.enqueue(conversation_id, [{"role": "user", "content": "q1"}, {"role": "assistant", "content": "a1"}])
+        _crash(writer)
+
+        restarted = _writer(tmp_path, session_factory)
+        await restarted.start()
+        await restarted.stop()
+
+        messages, count = await _stored(session_factory, conversation_id)
+        assert [m.content for m in messages] == ["q1", "a1"]
+        assert count == 2
+        assert restarted.replayed == 2
+
+    @pytest.mark.asyncio
+    async def test_replay_after_commit_does_not_duplicate(self, tmp_path, session_factory, conversation_id):
+        writer = _writer(tmp_path, session_factory, flush_interval_ms=60_000, batch_size=1000)
+        records = await writer.enqueue(conversation_id, [{"role": "user", "content": "q1"}])
+        spool = (tmp_path / "spool.jsonl").read_text()
+        await writer.flush()
+        _crash(writer)
+        # Crash between the DB commit and the spool rewrite
+        (tmp_path / "spool.jsonl").write_text(spool)
+
+        restarted = _writer(tmp_path, session_factory)
+        await restarted.start()
+        await restarted.enqueue(conversation_id, [{"role": "assistant", "content": "a1"}])
+        await restarted.stop()
+
+        messages, count = await _stored(session_factory, conversation_id)
+        assert [m.content for m in messages] == ["q1", "a1"]
+        assert str(messages[0].id) == records[0]["id"]
+        assert count == 2
+
+    @pytest.mark.asyncio
+    async def test_failing_batch_is_dead_lettered(self, tmp_path, session_factory, conversation_id, monkeypatch):
+        error = IntegrityError("INSERT", {}, Exception("conversation missing"))
+        monkeypatch.setattr(ConversationService, "add_messages", AsyncMock(side_effect=error))
+        writer = _writer(tmp_path, session_factory, flush_interval_ms=60_000, max_attempts=2, retry_backoff_ms=0)
+        records = await writer.enqueue(conversation_id, [{"role": "user", "content": "q1"}])
+
+        await writer.flush()
+        assert writer.get_stats()["pending"] == 1
+        await writer.flush()
+
+        assert writer.get_stats()["pending"] == 0
+        assert writer.dead_lettered == 1
+        assert "q1" in (tmp_path / "spool.jsonl.dead").read_text()
+        assert not await writer.wait_persisted([records[0]["id"]], timeout=1)
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_is_retried_with_backoff(self, tmp_path, session_factory, conversation_id, monkeypatch):
+        add_messages = ConversationService.add_messages
+        refused = AsyncMock(side_effect=ConnectionRefusedError("connection refused"))
+        monkeypatch.setattr(ConversationService, "add_messages", refused)
+        writer = _writer(tmp_path, session_factory, flush_interval_ms=60_000, max_attempts=1, retry_backoff_ms=50)
+        records = await writer.enqueue(conversation_id, [{"role": "user", "content": "q1"}])
+
+        await writer.flush()
+        # Backing off: the conversation is not retried straight away
+        assert await writer.flush() == 0
+        await asyncio.sleep(0.06)
+        await writer.flush()
+
+        assert refused.await_count == 2
+        assert writer.get_stats()["pending"] == 1
+        assert writer.dead_lettered == 0
+        assert not (tmp_path / "spool.jsonl.dead").exists()
+
+        monkeypatch.setattr(ConversationService, "add_messages", add_messages)
+        await asyncio.sleep(0.11)
+        assert await writer.flush() == 1
+        assert await writer.wait_persisted([records[0]["id"]], timeout=1)
+        await writer.stop()
+        messages, _ = await _stored(session_factory, conversation_id)
+        assert [m.content for m in messages] == ["q1"]
+
+    @pytest.mark.asyncio
+    async def test_title_is_generated_after_the_flush(self, tmp_path, session_factory, monkeypatch):
+        async with session_factory() as db:
+            conv = Conversation(id=uuid.uuid4(), message_count=0)
+            db.add(conv)
+            await db.commit()
+        conversation_id = str(conv.id)
+
+        async def slow_title(*args, **kwargs):
+            await asyncio.sleep(0.5)
+            return "Deck stain"
+
+        updater = SummaryUpdater(session_factory=session_factory)
+        monkeypatch.setattr("backend.services.conversation_memory.get_summary_updater", lambda: updater)
+        monkeypatch.setattr(updater.get_gemini_client(), "generate_text", slow_title)
+        writer = _writer(tmp_path, session_factory, flush_interval_ms=60_000)
+        question = "Which stain holds up best on an old cedar deck that gets full afternoon sun?"
+        await writer.enqueue(conversation_id, [{"role": "user", "content": question}])
+
+        started = time.perf_counter()
+        assert await writer.flush() == 1
+        assert time.perf_counter() - started < 0.4
+
+        await updater.wait_idle()
+        async with session_factory() as db:
+            assert (await db.get(Conversation, conv.id)).title == "Deck stain"
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_reserved_ids_are_kept_and_not_buffered_twice(self, tmp_path, session_factory, conversation_id):
+        writer = _writer(tmp_path, session_factory, flush_interval_ms=60_000)
+        message_id = str(uuid.uuid4())
+
+        first = await writer.enqueue(conversation_id, [{"id": message_id, "role": "user", "content": "q1"}])
+        again = await writer.enqueue(conversation_id, [{"id": message_id, "role": "user", "content": "q1"}])
+
+        assert [r["id"] for r in first] == [message_id]
+        assert again == []
+        await writer.stop()
+        messages, count = await _stored(session_factory, conversation_id)
+        assert [str(m.id) for m in messages] == [message_id]
+        assert count == 1
+
+    @pytest.mark.asyncio
+    async def test_enqueue_pins_client_to_primary(self, tmp_path, session_factory, conversation_id, monkeypatch):
+        router = ReplicaRouter(sticky_seconds=5)
+        monkeypatch.setattr("backend.services.message_writer.get_replica_router", lambda: router)
+        writer = _writer(tmp_path, session_factory, flush_interval_ms=60_000)
+
+        ctx = RequestDbContext(client_key="client-1")
+        token = set_request_db_context(ctx)
+        try:
+            await writer.enqueue(conversation_id, [{"role": "user", "content": "q1"}])
+        finally:
+            reset_request_db_context(token)
+
+        assert ctx.wrote
+        # A later request from the same client (e.g. refetching the messages) reads the primary
+        assert not router.use_replica(RequestDbContext(client_key="client-1"))
+        assert router.use_replica(RequestDbContext(client_key="client-2"))
+
+        writes = router.writes_recorded
+        await writer.flush()
+        assert router.writes_recorded == writes + 1
+        await writer.stop()
+
+    def test_transient_errors(self):
+        assert is_transient_error(ConnectionRefusedError())
+        assert is_transient_error(OperationalError("SELECT 1", {}, Exception("server closed the connection")))
+        assert not is_transient_error(IntegrityError("INSERT", {}, Exception("foreign key")))
+        assert not is_transient_error(ValueError("bad id"))
+
+    def test_merge_pending_skips_persisted(self):
+        history = [{"id": "a", "content": "x"}]
+        pending = [{"id": "a", "content": "x"}, {"id": "b", "content": "y"}]
+
+        assert [m["id"] for m in merge_pending(history, pending)] == ["a", "b"]
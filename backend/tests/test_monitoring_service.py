@@ -0,0 +1,43 @@
+"""
+Tests for monitoring primitives.
+"""
+
+from backend.services.monitoring_service import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """Tests for the fixed-bucket latency histogram."""
+
+    def test_percentiles_are_estimated_within_buckets(self):
+        histogram = LatencyHistogram(buckets=(10, 20, 50, 100))
+        for duration in [5] * 50 + [15] * 40 + [80] * 10:
+            histogram.observe(duration)
+
+        assert histogram.count == 100
+        assert 0 < histogram.percentile(50) <= 10
+        assert 10 < histogram.percentile(90) <= 20
+        assert 50 < histogram.percentile(99) <= 80
+
+    def test_overflow_bucket_is_capped_at_max(self):
+        histogram = LatencyHistogram(buckets=(1, 2))
+        histogram.observe(500)
+
+        assert 2 < histogram.percentile(99) <= 500
+        assert histogram.summary()["max_ms"] == 500
+
+    def test_empty_histogram(self):
+        summary = LatencyHistogram().summary()
+        assert summary["count"] == 0
+        assert summary["p95_ms"] == 0
+
+    def test_prometheus_buckets_are_cumulative_seconds(self):
+        histogram = LatencyHistogram(buckets=(1, 10))
+        histogram.observe(0.5)
+        histogram.observe(5)
+        histogram.observe(50)
+
+        lines = histogram.to_prometheus("op_duration_seconds", {"op": "get"})
+        assert 'op_duration_seconds_bucket{op="get",le="0.001"} 1' in lines
+        assert 'op_duration_seconds_bucket{op="get",le="0.01"} 2' in lines
+        assert 'op_duration_seconds_bucket{op="get",le="+Inf"} 3' in lines
+        assert 'op_duration_seconds_count{op="get"} 3' in lines
@@ -0,0 +1,132 @@
+"""
+Tests for read-replica routing and read-your-writes pinning.
+"""
+
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+
+from backend.middleware.read_your_writes import ReadYourWritesMiddleware
+from backend.models import replica
+from backend.models.replica import (
+    PRIMARY_PIN_COOKIE,
+    ReplicaRouter,
+    RequestDbContext,
+    WriteTrackingSession,
+    get_request_db_context,
+    reset_request_db_context,
+    set_request_db_context,
+)
+
+ItemBase = declarative_base()
+
+
+class Item(ItemBase):
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+@pytest.fixture
+def router(monkeypatch):
+    fresh = ReplicaRouter(sticky_seconds=0.2, max_lag_seconds=5)
+    monkeypatch.setattr(replica, "_replica_router", fresh)
+    return fresh
+
+
+class TestReplicaRouter:
+    """Routing decisions."""
+
+    def test_reads_go_to_replica_by_default(self, router):
+        assert router.use_replica(RequestDbContext(client_key="a")) is True
+        assert router.get_stats()["replica_reads"] == 1
+
+    def test_client_is_pinned_after_write(self, router):
+        router.record_write("a")
+
+        assert router.use_replica(RequestDbContext(client_key="a")) is False
+        assert router.use_replica(RequestDbContext(client_key="b")) is True
+
+        time.sleep(0.25)
+        assert router.use_replica(RequestDbContext(client_key="a")) is True
+        assert router.get_stats()["primary_reads_sticky"] == 1
+
+    def test_pin_cookie_and_same_request_write(self, router):
+        assert router.use_replica(RequestDbContext(pinned_until=time.time() + 5)) is False
+        assert router.use_replica(RequestDbContext(wrote=True)) is False
+
+    def test_lagging_replica_falls_back_to_primary(self, router):
+        router.lag_seconds = 30
+
+        assert router.use_replica(RequestDbContext()) is False
+        assert router.get_stats()["primary_reads_lagging"] == 1
+
+    @pytest.mark.asyncio
+    async def test_lag_check_failure_is_recorded(self, router, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'r.db'}")
+        try:
+            assert await router.check_lag(engine) is None
+        finally:
+            await engine.dispose()
+
+        assert router.get_stats()["lag"]["errors"] == 1
+
+
+class TestWriteTracking:
+    """Committed writes on the primary pin the client."""
+
+    @pytest.mark.asyncio
+    async def test_commit_records_write_for_request_client(self, router, tmp_path):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'w.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(ItemBase.metadata.create_all)
+        Session = async_sessionmaker(engine, class_=AsyncSession, sync_session_class=WriteTrackingSession)
+
+        ctx = RequestDbContext(client_key="client-1")
+        token = set_request_db_context(ctx)
+        try:
+            async with Session() as db:
+                await db.get(Item, 1)
+                await db.commit()
+                assert ctx.wrote is False
+
+                db.add(Item(name="x"))
+                await db.commit()
+        finally:
+            reset_request_db_context(token)
+            await engine.dispose()
+
+        assert ctx.wrote is True
+        assert router.use_replica(RequestDbContext(client_key="client-1")) is False
+
+
+class TestReadYourWritesMiddleware:
+    """Middleware binds routing state and sets the pin cookie."""
+
+    def test_sets_pin_cookie_after_write(self, router):
+        app = FastAPI()
+        app.add_middleware(ReadYourWritesMiddleware)
+
+        @app.get("/read")
+        async def read():
+            return {"key": get_request_db_context().client_key}
+
+        @app.post("/write")
+        async def write():
+            get_request_db_context().wrote = True
+            return {}
+
+        client = TestClient(app)
+
+        read_resp = client.get("/read", headers={"Authorization": "Bearer t"})
+        assert read_resp.json()["key"]
+        assert PRIMARY_PIN_COOKIE not in read_resp.cookies
+
+        write_resp = client.post("/write")
+        assert float(write_resp.cookies[PRIMARY_PIN_COOKIE]) > time.time()
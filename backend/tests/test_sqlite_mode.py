@@ -0,0 +1,112 @@
+"""
+Tests for SQLite production mode (pragmas, writer queue, read pool).
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import Column, Integer, String, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import declarative_base
+
+from backend.models.base import create_async_db_engine
+from backend.models.sqlite_mode import (
+    configure_sqlite_engine,
+    is_write_statement,
+    reader_pool_options,
+    routing_session_class,
+    writer_pool_options,
+)
+
+NoteBase = declarative_base()
+
+
+class Note(NoteBase):
+    __tablename__ = "notes"
+
+    id = Column(Integer, primary_key=True)
+    body = Column(String(100))
+
+
+@pytest_asyncio.fixture
+async def engines(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'prod.db'}"
+    writer = create_async_db_engine(url, **writer_pool_options())
+    reader = create_async_db_engine(url, **reader_pool_options())
+    for eng in (writer, reader):
+        configure_sqlite_engine(eng.sync_engine)
+    async with writer.begin() as conn:
+        await conn.run_sync(NoteBase.metadata.create_all)
+    yield writer, reader
+    await writer.dispose()
+    await reader.dispose()
+
+
+def make_sessionmaker(writer, reader):
+    return async_sessionmaker(
+        writer,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        sync_session_class=routing_session_class(writer.sync_engine, reader.sync_engine),
+    )
+
+
+class TestSQLiteMode:
+    """Pragmas and read/write routing."""
+
+    @pytest.mark.asyncio
+    async def test_pragmas_applied(self, engines):
+        writer, reader = engines
+        async with reader.connect() as conn:
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+            assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1  # NORMAL
+            assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() > 0
+
+    def test_write_statement_detection(self):
+        assert is_write_statement(insert(Note.__table__))
+        assert is_write_statement(text("UPDATE notes SET body = 'x'"))
+        assert not is_write_statement(select(Note))
+        assert not is_write_statement(text("  select 1"))
+        assert not is_write_statement(None)
+
+    @pytest.mark.asyncio
+    async def test_reads_use_reader_until_first_write(self, engines):
+        writer, reader = engines
+        Session = make_sessionmaker(writer, reader)
+
+        async with Session() as db:
+            await db.execute(select(Note))
+            assert writer.pool.checkedout() == 0
+            assert reader.pool.checkedout() == 1
+
+            db.add(Note(body="hello"))
+            await db.flush()
+            assert writer.pool.checkedout() == 1
+
+            # Same transaction reads its own uncommitted write
+            count = (await db.execute(select(func.count()).select_from(Note))).scalar()
+            assert count == 1
+            await db.commit()
+
+            await db.execute(select(Note))
+            assert writer.pool.checkedout() == 0
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writers_are_serialized(self, engines):
+        writer, reader = engines
+        Session = make_sessionmaker(writer, reader)
+
+        async def write(i):
+            async with Session() as db:
+                db.add(Note(body=f"note {i}"))
+                await db.flush()
+                await asyncio.sleep(0)
+                await db.commit()
+
+        await asyncio.gather(*(write(i) for i in range(20)))
+
+        async with Session() as db:
+            count = (await db.execute(select(func.count()).select_from(Note))).scalar()
+        assert count == 20
+        assert writer.pool.wait_stats.timeouts == 0
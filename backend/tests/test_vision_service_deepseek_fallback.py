@@ -3,6 +3,15 @@ import pytest
 from backend.services.vision_service import UnifiedVisionService
 from backend.integrations.deepseek.vision_client import DeepSeekVisionClient
 from backend.integrations.gemini import GeminiClient
+from backend.services.cache_service import get_cache_service
+
+
+@pytest.fixture(autouse=True)
+def clear_vision_cache():
+    # Analyses are cached by image+prompt; keep tests from seeing each other's results
+    get_cache_service().clear()
+    yield
+    get_cache_service().clear()
 
 
 @pytest.mark.asyncio
@@ -42,3 +51,35 @@ async def test_deepseek_used_when_available(monkeypatch):
     assert text.startswith("{")
     assert meta.get("provider") == "deepseek"
 
+
+
+@pytest.mark.asyncio
+async def test_coalesced_call_reports_cache_not_leader_metadata(monkeypatch):
+    import asyncio
+
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    calls = 0
+
+    async def fake_ds_analyze(self, image, prompt, temperature=0.2):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "{}"
+
+    monkeypatch.setattr(DeepSeekVisionClient, "analyze_image", fake_ds_analyze, raising=True)
+
+    leader = UnifiedVisionService(provider="deepseek")
+    waiter = UnifiedVisionService(provider="deepseek")
+    texts = await asyncio.gather(
+        leader.analyze_image(image=b"same-bytes", prompt="test"),
+        waiter.analyze_image(image=b"same-bytes", prompt="test"),
+    )
+
+    assert texts == ["{}", "{}"]
+    assert calls == 1
+    assert leader.last_metadata["provider"] == "deepseek"
+    assert waiter.last_metadata["provider"] == "cache"
+
+    # A later hit is served from the cache and says so
+    await leader.analyze_image(image=b"same-bytes", prompt="test")
+    assert leader.last_metadata["provider"] == "cache"
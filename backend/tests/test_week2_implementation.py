@@ -168,6 +168,9 @@ class TestConversationService:
             is_active=True
         )
         
+        # UPDATE ... RETURNING message_count, title
+        mock_db.execute.return_value = Mock(first=Mock(return_value=(1, "Hello!")))
+
         with patch.object(conversation_service, 'get_conversation', new_callable=AsyncMock) as mock_get:
             mock_get.return_value = mock_conversation
             
@@ -205,14 +208,16 @@ class TestConversationService:
             )
         ]
         
-        with patch.object(conversation_service, 'get_messages', new_callable=AsyncMock) as mock_get:
+        with patch.object(conversation_service, 'get_last_messages', new_callable=AsyncMock) as mock_get:
             mock_get.return_value = mock_messages
             
             messages = await conversation_service.get_recent_messages(conversation_id, count=10)
             
+            mock_get.assert_awaited_once_with(conversation_id, count=10)
             assert len(messages) == 2
             assert messages[0]["role"] == "user"
             assert messages[1]["role"] == "assistant"
+            assert messages[0]["id"] == str(mock_messages[0].id)
 
 
 class TestConversationManager:
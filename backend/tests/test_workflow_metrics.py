@@ -0,0 +1,115 @@
+"""
+Tests for per-node workflow latency metrics and tracing.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from backend.services.monitoring_service import llm_timed, start_llm_timer
+from backend.workflows.base import WorkflowMetrics, WorkflowOrchestrator
+
+
+@llm_timed
+async def fake_llm(delay: float) -> str:
+    await asyncio.sleep(delay)
+    return "ok"
+
+
+@llm_timed
+async def fake_llm_stream(chunks: int, delay: float):
+    for i in range(chunks):
+        await asyncio.sleep(delay)
+        yield str(i)
+
+
+def _orchestrator() -> WorkflowOrchestrator:
+    orchestrator = WorkflowOrchestrator(workflow_name="test_flow")
+    orchestrator.metrics = WorkflowMetrics()
+    return orchestrator
+
+
+async def _node(orchestrator, state, name, llm_delay=0.0, other_delay=0.0, fail=False):
+    state = orchestrator.mark_node_start(state, name)
+    if llm_delay:
+        await fake_llm(llm_delay)
+    await asyncio.sleep(other_delay)
+    if fail:
+        return orchestrator.add_error(state, RuntimeError("boom"), name, recoverable=True)
+    return orchestrator.mark_node_complete(state, name)
+
+
+class TestWorkflowNodeMetrics:
+    """Test node wall/LLM time measurement and export."""
+
+    @pytest.mark.asyncio
+    async def test_records_wall_and_llm_time(self):
+        orchestrator = _orchestrator()
+        state = {"workflow_id": "w1"}
+
+        state = await _node(orchestrator, state, "generate", llm_delay=0.03, other_delay=0.02)
+
+        latency = state["metadata"]["node_latency"]["generate"]
+        assert latency["llm_calls"] == 1
+        assert 25 <= latency["llm_ms"] < latency["wall_ms"]
+        stats = orchestrator.metrics.get_stats()["test_flow"]["generate"]
+        assert stats["wall_ms"]["count"] == 1
+        assert 0 < stats["llm_share"] < 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_nodes_keep_separate_llm_time(self):
+        orchestrator = _orchestrator()
+
+        llm_node, plain_node = await asyncio.gather(
+            _node(orchestrator, {"workflow_id": "w1"}, "rag", llm_delay=0.03),
+            _node(orchestrator, {"workflow_id": "w1"}, "history", other_delay=0.03),
+        )
+
+        assert llm_node["metadata"]["node_latency"]["rag"]["llm_ms"] >= 25
+        assert plain_node["metadata"]["node_latency"]["history"]["llm_ms"] == 0
+
+    @pytest.mark.asyncio
+    async def test_error_counts_once(self):
+        orchestrator = _orchestrator()
+
+        state = await _node(orchestrator, {"workflow_id": "w1"}, "save", fail=True)
+        orchestrator.mark_node_complete(state, "save")
+
+        stats = orchestrator.metrics.get_stats()["test_flow"]["save"]
+        assert stats["errors"] == 1
+        assert stats["wall_ms"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_time_excludes_consumer(self):
+        timer = start_llm_timer()
+
+        async for _ in fake_llm_stream(3, 0.01):
+            await asyncio.sleep(0.02)
+
+        assert timer.calls == 1
+        assert 25 <= timer.total_ms < 55
+
+    @pytest.mark.asyncio
+    async def test_prometheus_export(self):
+        orchestrator = _orchestrator()
+        await _node(orchestrator, {"workflow_id": "w1"}, "validate")
+
+        text = orchestrator.metrics.get_prometheus_metrics()
+
+        assert "# TYPE homeview_workflow_node_duration_seconds histogram" in text
+        assert 'homeview_workflow_node_llm_duration_seconds_count{workflow="test_flow",node="validate"} 1' in text
+        assert 'homeview_workflow_node_errors_total{workflow="test_flow",node="validate"} 0' in text
+
+    @pytest.mark.asyncio
+    async def test_spans_when_tracing(self, monkeypatch):
+        tracer = MagicMock()
+        monkeypatch.setattr("backend.workflows.base.get_workflow_tracer", lambda: tracer)
+        orchestrator = _orchestrator()
+
+        await _node(orchestrator, {"workflow_id": "w1"}, "classify", llm_delay=0.01)
+
+        assert tracer.start_span.call_args.args[0] == "test_flow.classify"
+        span = tracer.start_span.return_value
+        span.set_attribute.assert_any_call("workflow.node.llm_calls", 1)
+        span.end.assert_called_once()
@@ -0,0 +1,144 @@
+"""Content hashing for uploaded images.
+
+Image analyses are keyed by what the image *is*, not where it lives:
+- content_hash(): fast BLAKE2b digest of the raw bytes. Identical files
+  share one checksum regardless of filename, path or mtime.
+- perceptual_hash(): optional 64-bit difference hash (dHash) that stays
+  stable across re-encoding/resizing, used as an exact cache key so
+  re-encoded copies of an image share one entry.
+
+Hashing a file reads it once; the digest is memoized by (path, mtime, size)
+so repeated lookups of the same upload (cache key, DB checksum) are free.
+Upload handlers that already hold the bytes can record the digest with
+remember_file_hash() so the file is never re-read.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from PIL import Image
+
+CHECKSUM_ALGORITHM = "blake2b"
+DIGEST_SIZE = 16  # 128-bit digest -> 32 hex chars, fits FileAsset.checksum / RoomImage.checksum
+READ_CHUNK_BYTES = 1024 * 1024
+MAX_MEMOIZED_FILES = 4096
+
+_file_hashes: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_file_hashes_lock = threading.Lock()
+
+
+def new_hasher() -> "hashlib.blake2b":
+    """Create an incremental hasher producing content_hash()-compatible digests."""
+    return hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+
+def content_hash(data: bytes) -> str:
+    """Return the content checksum of raw bytes."""
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+
+
+def image_content_hash(image: Image.Image) -> str:
+    """Return a content checksum for a decoded PIL image.
+
+    Hashes mode, size and pixel buffer directly instead of re-encoding the
+    image to PNG first.
+    """
+    hasher = new_hasher()
+    hasher.update(f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode())
+    hasher.update(image.tobytes())
+    return hasher.hexdigest()
+
+
+def _memo_key(path: Union[str, Path]) -> Optional[Tuple[str, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+def remember_file_hash(path: Union[str, Path], checksum: str) -> None:
+    """Record the checksum of a file that was just written.
+
+    Args:
+        path: File path
+        checksum: content_hash() of the file's bytes
+    """
+    key = _memo_key(path)
+    if key is None:
+        return
+    with _file_hashes_lock:
+        _file_hashes[key] = checksum
+        _file_hashes.move_to_end(key)
+        while len(_file_hashes) > MAX_MEMOIZED_FILES:
+            _file_hashes.popitem(last=False)
+
+
+def file_content_hash(path: Union[str, Path]) -> Optional[str]:
+    """Return the content checksum of a file, or None if it cannot be read.
+
+    Args:
+        path: File path
+
+    Returns:
+        Hex digest of the file's bytes
+    """
+    key = _memo_key(path)
+    if key is None:
+        return None
+    with _file_hashes_lock:
+        cached = _file_hashes.get(key)
+        if cached is not None:
+            _file_hashes.move_to_end(key)
+            return cached
+
+    hasher = new_hasher()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(READ_CHUNK_BYTES), b""):
+                hasher.update(chunk)
+    except OSError:
+        return None
+
+    checksum = hasher.hexdigest()
+    remember_file_hash(path, checksum)
+    return checksum
+
+
+def perceptual_hash(image: Union[str, Path, bytes, Image.Image], hash_size: int = 8) -> Optional[str]:
+    """Compute a difference hash (dHash) of an image.
+
+    Near-identical images (re-encoded, resized, lightly compressed) usually
+    produce the same hash, so it can key a cache directly.
+
+    Args:
+        image: Image path, encoded bytes or PIL image
+        hash_size: Hash grid size; produces hash_size**2 bits
+
+    Returns:
+        Hex string, or None if the image could not be decoded
+    """
+    try:
+        if isinstance(image, Image.Image):
+            img = image
+        elif isinstance(image, bytes):
+            import io
+            img = Image.open(io.BytesIO(image))
+        else:
+            img = Image.open(image)
+        small = img.convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    except Exception:
+        return None
+
+    pixels = small.tobytes()  # one byte per pixel in "L" mode
+    bits = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            bits = (bits << 1) | (1 if pixels[offset + col] > pixels[offset + col + 1] else 0)
+    return f"{bits:0{hash_size * hash_size // 4}x}"
+
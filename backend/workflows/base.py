@@ -1,7 +1,11 @@
 """Base workflow infrastructure for LangGraph orchestration."""
 
 import logging
-from typing import Any, Dict, List, Optional, TypedDict, Literal
+import os
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, TypedDict, Literal
 from datetime import datetime
 from enum import Enum
 import uuid
@@ -12,9 +16,25 @@ from backend.services.error_handling_service import (
     ErrorResolution,
     RecoveryStrategy
 )
+from backend.services.deadline import deadline_after, remaining_seconds, set_deadline
+from backend.services.monitoring_service import (
+    LatencyHistogram,
+    LLMTimer,
+    start_llm_timer,
+    stop_llm_timer
+)
 
 logger = logging.getLogger(__name__)
 
+# Emit an OpenTelemetry span per workflow node (needs opentelemetry-api; with
+# opentelemetry-sdk and the OTLP exporter installed, spans go to the endpoint below)
+WORKFLOW_TRACING = os.getenv("WORKFLOW_TRACING", "false").lower() == "true"
+WORKFLOW_TRACING_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4317")
+
+# An optional step (enrichment, extra analysis) is skipped when less than this
+# is left before the workflow deadline
+OPTIONAL_STEP_MIN_SECONDS = float(os.getenv("WORKFLOW_OPTIONAL_STEP_MIN_SECONDS", "3"))
+
 
 class WorkflowStatus(str, Enum):
     """Workflow execution status."""
@@ -58,6 +78,8 @@ class BaseWorkflowState(TypedDict, total=False):
     visited_nodes: List[str]
     retry_count: int
     max_retries: int
+    deadline: Optional[float]  # unix time by which the run should be done
+    dropped_steps: List[str]  # optional steps skipped or cancelled at the deadline
     
     # Error handling
     errors: List[Dict[str, Any]]
@@ -68,6 +90,208 @@ class BaseWorkflowState(TypedDict, total=False):
     metadata: Dict[str, Any]
 
 
+def keep_last(current: Any, update: Any) -> Any:
+    """State reducer: the last write wins (for fields concurrent nodes both set)."""
+    return update
+
+
+def merge_dicts(current: Optional[Dict[str, Any]], update: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """State reducer: merge dict updates from concurrent nodes, nested dicts included."""
+    merged = dict(current or {})
+    for key, value in (update or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = merge_dicts(merged[key], value)
+        merged[key] = value
+    return merged
+
+
+# Bookkeeping fields concurrent nodes accumulate into rather than overwrite;
+# graphs that fan out declare them with operator.add / merge_dicts reducers
+APPEND_KEYS = ("visited_nodes", "errors", "warnings", "dropped_steps", "suggested_actions")
+MERGE_KEYS = ("metadata", "response_metadata", "node_timings")
+
+_MISSING = object()
+
+
+def state_update(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a node's full returned state to the update it actually made.
+
+    Nodes written against a linear graph mutate and return the whole state.
+    When nodes run concurrently that would make each branch overwrite the
+    other's writes, so only changed keys are returned: new items for
+    APPEND_KEYS, changed entries for MERGE_KEYS, other keys whole.
+
+    Args:
+        before: State the node received (not mutated by the node)
+        after: State the node returned
+
+    Returns:
+        Partial state update for the graph's reducers
+    """
+    update: Dict[str, Any] = {}
+    for key, value in after.items():
+        old = before.get(key, _MISSING)
+        if key in APPEND_KEYS:
+            old = old if isinstance(old, list) else []
+            value = value or []
+            if value[:len(old)] == old:
+                added = value[len(old):]
+            else:
+                added = [item for item in value if item not in old]
+            if added:
+                update[key] = added
+        elif key in MERGE_KEYS:
+            old = old if isinstance(old, dict) else {}
+            changed = {k: v for k, v in (value or {}).items() if k not in old or old[k] != v}
+            if changed:
+                update[key] = changed
+        elif old is _MISSING or old != value:
+            update[key] = value
+    return update
+
+
+@dataclass
+class NodeLatencyStats:
+    """Wall-time and LLM-time histograms of one workflow node."""
+    wall: LatencyHistogram = field(default_factory=LatencyHistogram)
+    llm: LatencyHistogram = field(default_factory=LatencyHistogram)
+    errors: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Summarize for JSON APIs."""
+        return {
+            "wall_ms": self.wall.summary(),
+            "llm_ms": self.llm.summary(),
+            "llm_share": round(self.llm.sum_ms / self.wall.sum_ms, 3) if self.wall.sum_ms else 0.0,
+            "errors": self.errors,
+        }
+
+
+class WorkflowMetrics:
+    """Process-wide per-workflow, per-node latency histograms."""
+
+    def __init__(self):
+        self.nodes: Dict[Tuple[str, str], NodeLatencyStats] = {}
+
+    def observe(self, workflow_name: str, node_name: str, wall_ms: float, llm_ms: float, failed: bool = False):
+        """Record one node execution."""
+        stats = self.nodes.get((workflow_name, node_name))
+        if stats is None:
+            stats = self.nodes[(workflow_name, node_name)] = NodeLatencyStats()
+        stats.wall.observe(wall_ms)
+        stats.llm.observe(llm_ms)
+        if failed:
+            stats.errors += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get node latency summaries grouped by workflow.
+
+        Returns:
+            {workflow_name: {node_name: summary}}, nodes slowest (p95) first
+        """
+        result: Dict[str, Dict[str, Any]] = {}
+        ordered = sorted(self.nodes.items(), key=lambda item: -item[1].wall.percentile(95))
+        for (workflow_name, node_name), stats in ordered:
+            result.setdefault(workflow_name, {})[node_name] = stats.summary()
+        return result
+
+    def get_prometheus_metrics(self) -> str:
+        """
+        Render node latency histograms in the Prometheus text exposition format.
+
+        Returns:
+            Prometheus text format payload
+        """
+        lines = [
+            "# HELP homeview_workflow_node_errors_total Workflow node executions that recorded an error.",
+            "# TYPE homeview_workflow_node_errors_total counter",
+        ]
+        for (workflow_name, node_name), stats in sorted(self.nodes.items()):
+            lines.append(
+                f'homeview_workflow_node_errors_total{{workflow="{workflow_name}",node="{node_name}"}} {stats.errors}'
+            )
+        for kind, description in (("duration", "Workflow node wall time"), ("llm_duration", "LLM call time within workflow nodes")):
+            name = f"homeview_workflow_node_{kind}_seconds"
+            lines += [f"# HELP {name} {description}.", f"# TYPE {name} histogram"]
+            for (workflow_name, node_name), stats in sorted(self.nodes.items()):
+                histogram = stats.wall if kind == "duration" else stats.llm
+                lines += histogram.to_prometheus(name, {"workflow": workflow_name, "node": node_name})
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Drop all recorded histograms."""
+        self.nodes.clear()
+
+
+_workflow_metrics: Optional[WorkflowMetrics] = None
+
+
+def get_workflow_metrics() -> WorkflowMetrics:
+    """Get or create global workflow node metrics."""
+    global _workflow_metrics
+    if _workflow_metrics is None:
+        _workflow_metrics = WorkflowMetrics()
+    return _workflow_metrics
+
+
+_tracer: Any = None
+_tracing_unavailable = False
+
+
+def get_workflow_tracer():
+    """OpenTelemetry tracer for node spans, or None when tracing is off or unavailable."""
+    global _tracer, _tracing_unavailable
+    if not WORKFLOW_TRACING or _tracing_unavailable:
+        return None
+    if _tracer is None:
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            logger.warning("WORKFLOW_TRACING is on but opentelemetry-api is not installed; tracing disabled")
+            _tracing_unavailable = True
+            return None
+        _configure_tracer_provider(trace)
+        _tracer = trace.get_tracer("homeview.workflows")
+    return _tracer
+
+
+def _configure_tracer_provider(trace) -> None:
+    """Export to the local OTLP collector unless the app already set up a provider."""
+    if type(trace.get_tracer_provider()).__name__ != "ProxyTracerProvider":
+        return
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+    except ImportError:
+        logger.warning(
+            "opentelemetry-sdk / OTLP exporter not installed; workflow spans go to the global "
+            "tracer provider (a no-op unless one is configured)"
+        )
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": "homeview-api"}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=WORKFLOW_TRACING_ENDPOINT)))
+    trace.set_tracer_provider(provider)
+    logger.info(f"Exporting workflow spans to {WORKFLOW_TRACING_ENDPOINT}")
+
+
+@dataclass
+class _NodeRun:
+    """A node execution between mark_node_start and its completion or error."""
+    workflow_id: Optional[str]
+    node_name: str
+    started: float
+    llm: LLMTimer
+    span: Any = None
+
+
+# Node running in the current task; concurrently running nodes are separate tasks
+_current_node_run: ContextVar[Optional[_NodeRun]] = ContextVar("current_node_run", default=None)
+
+
 class WorkflowOrchestrator:
     """
     Base orchestrator for LangGraph workflows.
@@ -85,6 +309,7 @@ class WorkflowOrchestrator:
         self.timeout_seconds = timeout_seconds
         self.logger = logging.getLogger(f"workflow.{workflow_name}")
         self.error_service = get_error_handling_service()
+        self.metrics = get_workflow_metrics()
     
     def create_initial_state(
         self,
@@ -101,6 +326,8 @@ class WorkflowOrchestrator:
             visited_nodes=[],
             retry_count=0,
             max_retries=self.max_retries,
+            deadline=deadline_after(self.timeout_seconds),
+            dropped_steps=[],
             errors=[],
             warnings=[],
             result=None,
@@ -112,8 +339,14 @@ class WorkflowOrchestrator:
         state: BaseWorkflowState,
         node_name: str
     ) -> BaseWorkflowState:
-        """Mark the start of a node execution."""
+        """
+        Mark the start of a node execution.
+
+        The run's deadline becomes the node's: LLM and HTTP calls made from
+        here on are bounded by the time left (see backend.services.deadline).
+        """
         state["current_node"] = node_name
+        set_deadline(state.get("deadline"))
         if node_name not in state.get("visited_nodes", []):
             state.setdefault("visited_nodes", []).append(node_name)
         
@@ -121,6 +354,7 @@ class WorkflowOrchestrator:
             f"[{state['workflow_id']}] Starting node: {node_name} "
             f"(visited: {len(state.get('visited_nodes', []))})"
         )
+        self._start_node_run(state, node_name)
         return state
     
     def mark_node_complete(
@@ -133,6 +367,7 @@ class WorkflowOrchestrator:
         self.logger.info(
             f"[{state['workflow_id']}] Completed node: {node_name}"
         )
+        self._finish_node_run(state, node_name)
         
         if result:
             state.setdefault("metadata", {}).setdefault("node_results", {})[node_name] = result
@@ -190,6 +425,8 @@ class WorkflowOrchestrator:
         }
 
         state.setdefault("errors", []).append(error_entry)
+        if node_name:
+            self._finish_node_run(state, node_name, failed=True)
 
         self.logger.error(
             f"[{state['workflow_id']}] Error in {node_name}: {str(error)} | "
@@ -200,6 +437,55 @@ class WorkflowOrchestrator:
 
         return state
     
+    def _start_node_run(self, state: BaseWorkflowState, node_name: str) -> None:
+        """Start timing a node (wall time and the LLM calls made inside it)."""
+        span = None
+        tracer = get_workflow_tracer()
+        if tracer is not None:
+            span = tracer.start_span(
+                f"{self.workflow_name}.{node_name}",
+                attributes={
+                    "workflow.name": self.workflow_name,
+                    "workflow.id": state.get("workflow_id") or "",
+                    "workflow.node": node_name,
+                },
+            )
+        _current_node_run.set(_NodeRun(
+            workflow_id=state.get("workflow_id"),
+            node_name=node_name,
+            started=time.perf_counter(),
+            llm=start_llm_timer(),
+            span=span,
+        ))
+
+    def _finish_node_run(self, state: BaseWorkflowState, node_name: str, failed: bool = False) -> None:
+        """
+        Record a node's wall and LLM time in the histograms and the state.
+
+        Only the first completion or error of a started node counts.
+        """
+        run = _current_node_run.get()
+        if run is None or run.node_name != node_name or run.workflow_id != state.get("workflow_id"):
+            return
+        _current_node_run.set(None)
+        stop_llm_timer(run.llm)
+
+        wall_ms = (time.perf_counter() - run.started) * 1000
+        self.metrics.observe(self.workflow_name, node_name, wall_ms, run.llm.total_ms, failed=failed)
+        state.setdefault("metadata", {}).setdefault("node_latency", {})[node_name] = {
+            "wall_ms": round(wall_ms, 2),
+            "llm_ms": round(run.llm.total_ms, 2),
+            "llm_calls": run.llm.calls,
+        }
+
+        if run.span is not None:
+            run.span.set_attribute("workflow.node.llm_ms", run.llm.total_ms)
+            run.span.set_attribute("workflow.node.llm_calls", run.llm.calls)
+            if failed:
+                from opentelemetry.trace import Status, StatusCode
+                run.span.set_status(Status(StatusCode.ERROR))
+            run.span.end()
+
     def add_warning(
         self,
         state: BaseWorkflowState,
@@ -221,6 +507,60 @@ class WorkflowOrchestrator:
         
         return state
     
+    def remaining_time(self, state: BaseWorkflowState) -> Optional[float]:
+        """Seconds left before the run's deadline (None without one)."""
+        return remaining_seconds(state.get("deadline"))
+
+    def optional_step_timeout(
+        self,
+        state: BaseWorkflowState,
+        max_seconds: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        Timeout for an optional step: the time left, capped at ``max_seconds``.
+
+        Returns:
+            Seconds, or None if neither a deadline nor a cap applies
+        """
+        remaining = self.remaining_time(state)
+        if remaining is None:
+            return max_seconds
+        return max(min(remaining, max_seconds or remaining), 0.0)
+
+    def can_run_optional(
+        self,
+        state: BaseWorkflowState,
+        step: str,
+        node_name: Optional[str] = None,
+        min_seconds: float = OPTIONAL_STEP_MIN_SECONDS
+    ) -> bool:
+        """
+        Whether there is time left for an optional step; if not, record it as dropped.
+
+        Args:
+            state: Workflow state
+            step: Name of the optional step (reported in ``dropped_steps``)
+            node_name: Node the step belongs to
+            min_seconds: Least time the step needs to be worth starting
+        """
+        remaining = self.remaining_time(state)
+        if remaining is None or remaining >= min_seconds:
+            return True
+        self.drop_optional(state, step, node_name, f"{max(remaining, 0):.1f}s left")
+        return False
+
+    def drop_optional(
+        self,
+        state: BaseWorkflowState,
+        step: str,
+        node_name: Optional[str] = None,
+        reason: str = "deadline reached"
+    ) -> BaseWorkflowState:
+        """Record an optional step that was skipped or cancelled for lack of time."""
+        if step not in state.get("dropped_steps", []):
+            state.setdefault("dropped_steps", []).append(step)
+        return self.add_warning(state, f"Dropped optional step {step}: {reason}", node_name)
+
     def should_retry(self, state: BaseWorkflowState) -> bool:
         """Determine if the workflow should retry."""
         retry_count = state.get("retry_count", 0)
@@ -0,0 +1,299 @@
+"""Response prompt assembly for the chat workflow.
+
+The static system text is joined once at import. Persona/scenario blocks and
+skill context depend only on a few labels, so they are rendered once per
+combination and memoized. Only the per-request parts are built per call.
+
+Those parts (home data, conversation summary and history) go through a
+token budget: whatever CHAT_PROMPT_TOKEN_BUDGET leaves after the fixed
+sections is split between home data and history by ``allocate_budget``,
+and each is trimmed to its share. History additionally stays within
+CHAT_HISTORY_TOKEN_BUDGET. Token counts use the same ~4 chars/token
+estimate as conversation memory.
+"""
+
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.services.conversation_memory import (
+    HISTORY_TOKEN_BUDGET,
+    budget_history,
+    estimate_tokens,
+    truncate_to_tokens,
+)
+from backend.services.skill_manager import SkillManager
+
+logger = logging.getLogger(__name__)
+
+PROMPT_TOKEN_BUDGET = int(os.getenv("CHAT_PROMPT_TOKEN_BUDGET", "4000"))
+PROMPT_BLOCK_CACHE_SIZE = 256
+
+# Relative claim of each trimmable section on the budget left after the fixed ones
+SECTION_WEIGHTS = {"context": 1.0, "history": 1.0}
+MAX_CONTEXT_IMAGES = 5
+
+SYSTEM_PROMPT = "\n".join([
+    """You are HomeView AI, an intelligent home improvement assistant. You help homeowners, DIY enthusiasts, and contractors understand their homes and plan improvements.
+
+Your capabilities (available platform actions you can guide to):
+- Estimate renovation costs (detailed cost breakdowns)
+- Create DIY project plans with tools, materials, safety, and effort
+- Generate a shopping list from a DIY plan
+- Open the Design Studio to generate/edit visuals (paint, flooring, cabinets, furniture, staging) from user photos
+- Recommend products (prefer Canadian/.ca vendors when possible)
+- Prepare a contractor-quote brief
+- Export DIY plans or summaries as downloadable PDFs
+
+Guidelines:
+- Be concise, clear, and professional; avoid fluff.
+- Ground answers in the conversation history; don't repeat long lists already given.
+- Prefer 3–6 short bullets or 1–3 short paragraphs; aim for 60–120 words unless the user asks for more.
+- If critical info is missing, ask 1–2 specific clarifying questions in a friendly tone (e.g., “I can run that — could you share X and Y?”).
+- End with one decisive next step (A/B style), matching the user’s goal.
+- Keep Canadian context in mind; prefer .ca vendors when mentioning products.
+- Do not reference any Digital Twin or home_id unless explicitly provided by the user.
+- CRITICAL: You CAN create and export PDFs. Never say "I cannot create PDF documents" or similar. When asked for a PDF, confirm you can do it and guide the user to provide any missing content (e.g., create a DIY plan first if needed).
+- Avoid repeating the same suggestion chips every message. If an action was just offered, propose the next logical step instead.
+""",
+    # Universal guidance (persona-agnostic - respond based on user's actual questions)
+    """
+Respond universally to all users based on their questions and needs, not their persona label:
+- If they ask about costs or budgets → provide estimates and offer contractor quotes if they want professional help
+- If they ask "how to" or want to DIY → provide step-by-step guidance and offer to create a detailed DIY plan
+- If they ask about products → recommend products with Canadian/.ca vendors preferred
+- If they ask about design/visuals → offer to generate mockups in the Design Studio
+- If they want to hire help → guide them to prepare a contractor brief
+- Always offer BOTH pathways (DIY and contractor) neutrally unless the user has clearly chosen one
+
+Adapt your tone and detail level to match what the user is asking for, not what their persona label says.
+""",
+])
+
+# Scenario-specific guidance (only if explicitly set)
+SCENARIO_GUIDANCE = {
+    "contractor_quotes": (
+        "\nCurrent focus: Contractor Quotes. Gather key project details (scope, dimensions, materials, constraints), propose a concise brief the user can send to contractors."
+    ),
+    "diy_project_plan": (
+        "\nCurrent focus: DIY Project Plan. Produce a concise, ordered plan with tools, materials, estimated effort, safety notes, and dependencies."
+    ),
+}
+
+# Safety rule -> message keywords that trigger it (DIY plans only)
+SAFETY_KEYWORDS = [
+    ("electrical", ["electrical", "wiring", "outlet", "circuit"]),
+    ("gas", ["gas", "gas line"]),
+    ("structural", ["load bearing", "wall removal", "structural"]),
+    ("roof", ["roof", "roofing"]),
+    ("asbestos", ["asbestos"]),
+]
+SAFETY_PERSONAS = ("diy_worker", "homeowner")
+
+
+def allocate_budget(
+    available: int,
+    demands: Dict[str, int],
+    weights: Optional[Dict[str, float]] = None
+) -> Dict[str, int]:
+    """
+    Split a token budget between sections by weighted max-min fairness.
+
+    A section that needs less than its weighted share gets what it needs
+    and the rest is shared among the others, so nothing is trimmed unless
+    the total demand exceeds the budget.
+
+    Args:
+        available: Tokens to hand out
+        demands: Tokens each section would use untrimmed
+        weights: Relative share per section (default equal)
+
+    Returns:
+        Tokens granted per section (never more than its demand)
+    """
+    weights = weights or {}
+    grants = {name: 0 for name in demands}
+    open_sections = {name for name, demand in demands.items() if demand > 0}
+    remaining = max(available, 0)
+
+    while open_sections and remaining > 0:
+        total_weight = sum(weights.get(name, 1.0) for name in open_sections)
+        shares = {name: int(remaining * weights.get(name, 1.0) / total_weight) for name in open_sections}
+        satisfied = {name for name in open_sections if demands[name] - grants[name] <= shares[name]}
+        if not satisfied:
+            # Everyone is over their share: each gets exactly its share
+            for name in open_sections:
+                grants[name] += shares[name]
+            break
+        for name in satisfied:
+            remaining -= demands[name] - grants[name]
+            grants[name] = demands[name]
+        open_sections -= satisfied
+
+    return grants
+
+
+class ResponsePromptBuilder:
+    """Builds the generate_response prompt from cached blocks within a token budget."""
+
+    def __init__(self, persona_service, budget_tokens: int = PROMPT_TOKEN_BUDGET):
+        """
+        Initialize builder.
+
+        Args:
+            persona_service: PersonaService for tone prefixes and safety warnings
+            budget_tokens: Target size of the whole prompt
+        """
+        self.persona_service = persona_service
+        self.budget_tokens = budget_tokens
+        self.skill_manager = SkillManager()
+        # Bounded: persona/scenario labels come from clients
+        self.persona_block = lru_cache(maxsize=PROMPT_BLOCK_CACHE_SIZE)(self._persona_block)
+        self._intent_skill_block = lru_cache(maxsize=PROMPT_BLOCK_CACHE_SIZE)(self._skill_block)
+
+    def _persona_block(self, persona: Optional[str], scenario: Optional[str]) -> str:
+        """Tone/detail guidance and scenario focus for a persona/scenario pair."""
+        parts = []
+        if persona:
+            persona_prefix = self.persona_service.get_prompt_prefix(persona, scenario)
+            if persona_prefix:
+                parts.append(f"\n**Tone & Detail Guidance:** {persona_prefix}")
+        if scenario in SCENARIO_GUIDANCE:
+            parts.append(SCENARIO_GUIDANCE[scenario])
+        return "\n".join(parts)
+
+    def _skill_block(
+        self,
+        intent: Optional[str],
+        persona: Optional[str],
+        scenario: Optional[str],
+        user_message: Optional[str] = None
+    ) -> str:
+        try:
+            return self.skill_manager.get_context(intent, persona, scenario, user_message)
+        except Exception:
+            # Non-fatal if skills are unavailable
+            return ""
+
+    def skill_block(
+        self,
+        intent: Optional[str],
+        persona: Optional[str],
+        scenario: Optional[str],
+        user_message: str
+    ) -> str:
+        """Skill context; only a missing intent makes it depend on the message text."""
+        if intent:
+            return self._intent_skill_block(intent, persona, scenario)
+        return self._skill_block(intent, persona, scenario, user_message)
+
+    def safety_block(self, persona: Optional[str], scenario: Optional[str], user_message: str) -> str:
+        """Safety warnings for hazardous DIY tasks mentioned in the message."""
+        if persona not in SAFETY_PERSONAS or scenario != "diy_project_plan":
+            return ""
+        message_lower = user_message.lower()
+        warnings = []
+        for rule, keywords in SAFETY_KEYWORDS:
+            if any(word in message_lower for word in keywords):
+                warning = self.persona_service.get_safety_warning(rule)
+                if warning:
+                    warnings.append(f"⚠️ {warning.title}: {warning.description}")
+        if not warnings:
+            return ""
+        return "\n".join(["\n**SAFETY WARNINGS - Include these in your response:**", *warnings])
+
+    def build(
+        self,
+        user_message: str,
+        context: Optional[Dict[str, Any]],
+        history: List[Dict[str, str]],
+        persona: Optional[str] = None,
+        scenario: Optional[str] = None,
+        intent: Optional[str] = None,
+        summary: Optional[str] = None,
+    ) -> Tuple[str, Dict[str, int]]:
+        """
+        Build the response prompt.
+
+        Args:
+            user_message: Current user message (never trimmed)
+            context: Retrieved context (``context_text``, ``image_urls``)
+            history: Conversation messages, oldest first
+            persona: Persona label
+            scenario: Scenario label
+            intent: Classified intent
+            summary: Rolling summary of older turns
+
+        Returns:
+            (prompt, estimated tokens per section plus ``total``)
+        """
+        fixed = [
+            SYSTEM_PROMPT,
+            self.persona_block(persona, scenario),
+            self.safety_block(persona, scenario, user_message),
+            self.skill_block(intent, persona, scenario, user_message),
+        ]
+        fixed = [part for part in fixed if part]
+        closing = [f"\n**CURRENT USER MESSAGE:**\n{user_message}", "\n**YOUR RESPONSE:**"]
+
+        # Home data
+        context_text = (context or {}).get("context_text") or ""
+        image_urls = ((context or {}).get("image_urls") or []) if context_text else []
+        image_lines = [f"- {url}" for url in image_urls[:MAX_CONTEXT_IMAGES]]
+
+        # The current message is sent separately, not as history
+        if history and history[-1].get("role") == "user" and history[-1].get("content") == user_message:
+            history = history[:-1]
+
+        fixed_tokens = sum(estimate_tokens(part) for part in fixed + closing)
+        history_demand = sum(estimate_tokens(m.get("content")) for m in history) + estimate_tokens(summary)
+        grants = allocate_budget(
+            self.budget_tokens - fixed_tokens,
+            {
+                "context": estimate_tokens(context_text) + sum(estimate_tokens(line) for line in image_lines),
+                "history": min(history_demand, HISTORY_TOKEN_BUDGET),
+            },
+            SECTION_WEIGHTS,
+        )
+
+        prompt_parts = list(fixed)
+        if context_text and grants["context"] > 0:
+            image_tokens = sum(estimate_tokens(line) for line in image_lines)
+            if image_tokens > grants["context"] // 2:
+                image_lines, image_tokens = [], 0
+            prompt_parts.append("\n**CURRENT HOME DATA:**\n")
+            prompt_parts.append(truncate_to_tokens(context_text, grants["context"] - image_tokens))
+            if image_lines:
+                prompt_parts.append("\n**Available Images:**")
+                prompt_parts.extend(image_lines)
+            prompt_parts.append("\nUse this home data to provide accurate, specific answers.")
+        context_end = len(prompt_parts)
+
+        summary, history = budget_history(history, summary, budget_tokens=grants["history"]) if grants["history"] else (None, [])
+        if summary:
+            prompt_parts.append("\n**EARLIER CONVERSATION SUMMARY:**\n")
+            prompt_parts.append(summary)
+        if history:
+            prompt_parts.append("\n**CONVERSATION HISTORY:**\n")
+            for msg in history:
+                role = "User" if msg.get("role") == "user" else "Assistant"
+                prompt_parts.append(f"{role}: {msg.get('content', '')}")
+        history_end = len(prompt_parts)
+
+        prompt_parts.extend(closing)
+        prompt = "\n".join(prompt_parts)
+
+        tokens = {
+            "fixed": fixed_tokens,
+            "context": sum(estimate_tokens(p) for p in prompt_parts[len(fixed):context_end]),
+            "history": sum(estimate_tokens(p) for p in prompt_parts[context_end:history_end]),
+            "total": estimate_tokens(prompt),
+        }
+        logger.info(
+            f"Response prompt: {tokens['total']} tokens (fixed {tokens['fixed']}, "
+            f"context {tokens['context']}, history {tokens['history']}, budget {self.budget_tokens})"
+        )
+        if tokens["total"] > self.budget_tokens:
+            logger.warning(f"Response prompt over budget: {tokens['total']} > {self.budget_tokens} tokens")
+        return prompt, tokens
@@ -1,22 +1,41 @@
 """Chat Orchestration Workflow - Production-ready conversational AI with context retrieval."""
 
+import asyncio
+import copy
 import logging
-from typing import Any, Dict, List, Optional, TypedDict
+import operator
+import os
+import time
+from typing import Annotated, Any, AsyncIterator, Callable, Dict, List, Optional
 from datetime import datetime
 import uuid
 
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from backend.workflows.checkpointing import (
+    CHECKPOINT_DURABILITY,
+    BoundedCheckpointSaver,
+    create_checkpointer
+)
 from backend.workflows.base import (
     BaseWorkflowState,
     WorkflowOrchestrator,
     WorkflowStatus,
-    WorkflowError
+    WorkflowError,
+    keep_last,
+    merge_dicts,
+    state_update
 )
 from backend.services.rag_service import RAGService
 from backend.services.conversation_service import ConversationService
+from backend.services.conversation_memory import HISTORY_MAX_MESSAGES
+from backend.workflows.chat_prompts import ResponsePromptBuilder
+from backend.services.message_writer import get_message_writer, merge_pending
+from backend.services.background_tasks import get_background_tasks
+from backend.services.deadline import deadline_after
 from backend.integrations.gemini.client import GeminiClient
 from backend.integrations.agentlightning.tracker import AgentTracker
 from backend.integrations.agentlightning.rewards import RewardCalculator
@@ -32,6 +51,7 @@ from backend.services.persona_service import get_persona_service, SafetyLevel
 from backend.services.cache_service import get_cache_service
 from backend.services.journey_manager import get_journey_manager, JourneyStatus
 from backend.services.journey_persistence_service import JourneyPersistenceService
+from backend.services.intent_classifier import build_intent_prompt, get_intent_classifier
 import hashlib
 
 logger = logging.getLogger(__name__)
@@ -40,6 +60,15 @@ logger = logging.getLogger(__name__)
 class ChatState(BaseWorkflowState, total=False):
     """State for chat workflow."""
 
+    # Fields written by concurrently running nodes, with their merge reducers
+    current_node: Annotated[Optional[str], keep_last]
+    visited_nodes: Annotated[List[str], operator.add]
+    errors: Annotated[List[Dict[str, Any]], operator.add]
+    warnings: Annotated[List[Dict[str, Any]], operator.add]
+    dropped_steps: Annotated[List[str], operator.add]
+    metadata: Annotated[Dict[str, Any], merge_dicts]
+    node_timings: Annotated[Dict[str, Dict[str, float]], merge_dicts]  # node -> start/end/duration ms
+
     # Input
     user_message: str
     home_id: Optional[str]
@@ -55,15 +84,17 @@ class ChatState(BaseWorkflowState, total=False):
 
     # Conversation history
     conversation_history: List[Dict[str, str]]
+    conversation_summary: Optional[str]  # Rolling summary of turns older than the history
 
     # Response generation
     ai_response: Optional[str]
-    response_metadata: Dict[str, Any]
+    response_metadata: Annotated[Dict[str, Any], merge_dicts]
 
     # Intent classification
     intent: Optional[str]
     requires_action: bool
-    suggested_actions: List[Dict[str, Any]]
+    # suggest_actions and manage_journey (next journey steps) each contribute theirs
+    suggested_actions: Annotated[List[Dict[str, Any]], operator.add]
     suggested_questions: List[str]
 
     # Multimodal features (Agent mode only)
@@ -80,6 +111,233 @@ class ChatState(BaseWorkflowState, total=False):
     current_step: Optional[Dict[str, Any]]
     next_steps: Optional[List[Dict[str, Any]]]
 
+    # Persistence
+    reserved_message_ids: List[str]  # [user, assistant] ids fixed up front, so a re-run save is idempotent
+    saved_message_ids: List[str]  # Ids actually handed to the write-behind writer
+    assistant_message_id: Optional[str]  # Set only once the assistant message is queued
+
+
+# Graph config key carrying the per-request ChatWorkflow into node functions
+WORKFLOW_CONFIG_KEY = "chat_workflow"
+
+# Node name -> ChatWorkflow method
+CHAT_NODES = [
+    ("validate_input", "_validate_input"),
+    ("classify_intent", "_classify_intent"),
+    ("retrieve_context", "_retrieve_context"),
+    ("load_conversation_history", "_load_conversation_history"),
+    ("manage_journey", "_manage_journey"),
+    ("generate_response", "_generate_response"),
+    ("suggest_actions", "_suggest_actions"),
+    ("enrich_with_multimodal", "_enrich_with_multimodal"),
+    ("save_conversation", "_save_conversation"),
+    ("update_journey_activity", "_update_journey_activity"),
+    ("finalize", "_finalize"),
+]
+
+# Execution stages: nodes within a stage are independent and run concurrently,
+# each stage waits for the whole previous one (fan-out / fan-in).
+# - intent, RAG context and history only read the validated input; history
+#   is the only one that touches the DB session
+# - the journey update (DB, needs intent), the LLM response (needs intent,
+#   context, history) and the follow-up suggestions (need intent and history,
+#   not the answer) don't read each other's output, so suggestions are ready
+#   by the time the last response token is out
+# - the turn is handed to the write-behind writer before the response is
+#   complete, so it is durable (spooled) and visible to the next turn's history
+RESPONSE_STAGES = [
+    ["validate_input"],
+    ["classify_intent", "retrieve_context", "load_conversation_history"],
+    ["manage_journey", "generate_response", "suggest_actions"],
+    ["enrich_with_multimodal"],
+    ["save_conversation"],
+]
+# Work the user doesn't wait for: journey activity, tracking
+POST_RESPONSE_STAGES = [
+    ["update_journey_activity"],
+    ["finalize"],
+]
+CHAT_STAGES = RESPONSE_STAGES + POST_RESPONSE_STAGES
+POST_RESPONSE_NODES = {name for stage in POST_RESPONSE_STAGES for name in stage}
+
+# Time budget of the response stages; LLM calls are bounded by what is left and
+# optional enrichments are skipped or cancelled (reported in dropped_steps)
+CHAT_TIMEOUT_SECONDS = float(os.getenv("CHAT_TIMEOUT_SECONDS", "60"))
+# Most any single optional enrichment may take, even with more time left
+CHAT_ENRICHMENT_TIMEOUT_SECONDS = float(os.getenv("CHAT_ENRICHMENT_TIMEOUT_SECONDS", "15"))
+
+# Run POST_RESPONSE_STAGES on the background task queue after the response
+# (needs a checkpointer: the background job resumes the run's checkpoint,
+# which is pinned against eviction and expiry until the job is done)
+DEFER_POST_RESPONSE = os.getenv("CHAT_DEFER_POST_RESPONSE", "true").lower() == "true"
+# How long /chat/stream stays open after its complete event for the deferred save
+POST_RESPONSE_WAIT_SECONDS = float(os.getenv("CHAT_POST_RESPONSE_WAIT_SECONDS", "10"))
+
+
+def _request_node(node_name: str, method_name: str):
+    """
+    Stateless graph node that runs ``method_name`` on the request's ChatWorkflow.
+
+    The method works on a private copy of the state and only its changes are
+    returned, so nodes of the same stage don't overwrite each other. Start
+    and end offsets are recorded in ``node_timings``. Post-response nodes
+    don't see the request deadline: they run after the response anyway.
+    """
+    async def node(state: ChatState, config: RunnableConfig) -> Dict[str, Any]:
+        workflow = config["configurable"][WORKFLOW_CONFIG_KEY]
+        started = time.perf_counter()
+        if workflow._started_perf is None:
+            workflow._started_perf = started
+        origin = workflow._started_perf
+        node_state = copy.deepcopy(state)
+        if node_name in POST_RESPONSE_NODES:
+            node_state.pop("deadline", None)
+        result = await getattr(workflow, method_name)(node_state)
+        finished = time.perf_counter()
+
+        update = state_update(state, result)
+        update["node_timings"] = {
+            node_name: {
+                "start_ms": round((started - origin) * 1000, 2),
+                "end_ms": round((finished - origin) * 1000, 2),
+                "duration_ms": round((finished - started) * 1000, 2),
+            }
+        }
+        return update
+
+    node.__name__ = method_name.lstrip("_")
+    return node
+
+
+def summarize_node_timings(node_timings: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    """
+    Compare a run's wall time with what running its nodes serially would take.
+
+    Args:
+        node_timings: Per-node timings from ChatState["node_timings"]
+
+    Returns:
+        wall_ms (first start to last end), serial_ms (sum of node durations),
+        critical_path_ms (sum of the slowest node per stage) and the
+        parallel_savings_ms of wall over serial
+    """
+    if not node_timings:
+        return {"wall_ms": 0.0, "serial_ms": 0.0, "critical_path_ms": 0.0, "parallel_savings_ms": 0.0}
+
+    wall = max(t["end_ms"] for t in node_timings.values()) - min(t["start_ms"] for t in node_timings.values())
+    serial = sum(t["duration_ms"] for t in node_timings.values())
+    critical_path = sum(
+        max((node_timings[name]["duration_ms"] for name in stage if name in node_timings), default=0.0)
+        for stage in CHAT_STAGES
+    )
+    return {
+        "wall_ms": round(wall, 2),
+        "serial_ms": round(serial, 2),
+        "critical_path_ms": round(critical_path, 2),
+        "parallel_savings_ms": round(serial - wall, 2),
+    }
+
+
+# Client-facing state fields reported in a node's streaming event
+NODE_EVENT_FIELDS = {
+    "classify_intent": ["intent"],
+    "retrieve_context": ["context_sources"],
+    "manage_journey": ["journey_id", "journey_status", "current_step", "next_steps", "suggested_actions"],
+    "enrich_with_multimodal": [
+        "web_search_results", "web_sources", "youtube_videos", "contractors", "generated_images"
+    ],
+    "suggest_actions": ["suggested_actions", "suggested_questions"],
+    "save_conversation": ["conversation_id", "saved_message_ids", "assistant_message_id"],
+}
+
+
+def node_event(node_name: str, update: Dict[str, Any]) -> Dict[str, Any]:
+    """Streaming event for a completed node, from the state update it returned."""
+    return {
+        "type": "node",
+        "node": node_name,
+        "data": {key: update[key] for key in NODE_EVENT_FIELDS.get(node_name, ()) if key in update},
+        "duration_ms": (update.get("node_timings") or {}).get(node_name, {}).get("duration_ms"),
+    }
+
+
+def build_chat_graph(checkpointer: Optional[BoundedCheckpointSaver] = None):
+    """
+    Build and compile the chat LangGraph.
+
+    Nodes hold no request state; the DB session and session-bound services
+    arrive through ``config["configurable"][WORKFLOW_CONFIG_KEY]``, so one
+    compiled graph serves every request. Stages of CHAT_STAGES run in
+    sequence; the nodes inside a stage run concurrently and their updates
+    are merged by the ChatState reducers.
+
+    Args:
+        checkpointer: Bounded checkpointer; each run is its own thread
+            (thread_id = workflow_id), so runs never share state
+    """
+    workflow = StateGraph(ChatState)
+
+    for node_name, method_name in CHAT_NODES:
+        workflow.add_node(node_name, _request_node(node_name, method_name))
+
+    workflow.set_entry_point(CHAT_STAGES[0][0])
+    for current, following in zip(CHAT_STAGES, CHAT_STAGES[1:]):
+        for node_name in following:
+            # A list of sources waits for all of them before running the target
+            workflow.add_edge(current if len(current) > 1 else current[0], node_name)
+    workflow.add_edge(CHAT_STAGES[-1][0], END)
+
+    return workflow.compile(checkpointer=checkpointer)
+
+
+class ChatWorkflowRuntime:
+    """App-scoped parts of the chat workflow: compiled graph and stateless services."""
+
+    def __init__(
+        self,
+        checkpointer: Optional[BoundedCheckpointSaver] = None,
+        session_factory: Optional[Callable[[], Any]] = None
+    ):
+        """
+        Build the shared services and compile the graph.
+
+        Args:
+            checkpointer: Graph checkpointer (defaults to CHAT_CHECKPOINTER)
+            session_factory: Async session factory for post-response jobs
+                (defaults to AsyncSessionLocal)
+        """
+        self.orchestrator = WorkflowOrchestrator(
+            workflow_name="chat_orchestration",
+            max_retries=2,
+            timeout_seconds=CHAT_TIMEOUT_SECONDS
+        )
+        self.rag_service = RAGService(use_gemini=True)
+        self.gemini_client = GeminiClient()
+        self.tracker = AgentTracker(agent_name="chat_agent")
+        self.reward_calculator = RewardCalculator()
+        self.prompt_builder = ResponsePromptBuilder(get_persona_service())
+        self.checkpointer = checkpointer if checkpointer is not None else create_checkpointer()
+        self.graph = build_chat_graph(self.checkpointer)
+        self._session_factory = session_factory
+
+    def get_session_factory(self) -> Callable[[], Any]:
+        """Session factory for work that outlives the request's session."""
+        if self._session_factory is None:
+            from backend.models.base import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory
+
+
+_chat_workflow_runtime: Optional[ChatWorkflowRuntime] = None
+
+
+def get_chat_workflow_runtime() -> ChatWorkflowRuntime:
+    """Get or create the app-wide chat workflow runtime."""
+    global _chat_workflow_runtime
+    if _chat_workflow_runtime is None:
+        _chat_workflow_runtime = ChatWorkflowRuntime()
+    return _chat_workflow_runtime
+
 
 class ChatWorkflow:
     """
@@ -94,75 +352,109 @@ class ChatWorkflow:
     - Comprehensive error handling
     """
 
-    def __init__(self, db_session: AsyncSession):
-        self.db = db_session
-        self.orchestrator = WorkflowOrchestrator(
-            workflow_name="chat_orchestration",
-            max_retries=2,
-            timeout_seconds=60
-        )
-        self.rag_service = RAGService(use_gemini=True)
-        self.conversation_service = ConversationService(db_session)
-        self.gemini_client = GeminiClient()
+    def __init__(self, db_session: AsyncSession, runtime: Optional["ChatWorkflowRuntime"] = None):
+        """
+        Bind the app-scoped workflow to a request's DB session.
 
-        # Initialize Agent Lightning tracker
-        self.tracker = AgentTracker(agent_name="chat_agent")
-        self.reward_calculator = RewardCalculator()
+        Construction is cheap: the compiled graph and the stateless services
+        come from the shared ChatWorkflowRuntime; only the session-bound
+        services are created here.
 
-        # Initialize event bus
+        Args:
+            db_session: Request database session
+            runtime: Shared runtime (defaults to the app-wide one)
+        """
+        runtime = runtime or get_chat_workflow_runtime()
+        self.runtime = runtime
+        self.orchestrator = runtime.orchestrator
+        self.rag_service = runtime.rag_service
+        self.gemini_client = runtime.gemini_client
+        self._bind_session(db_session)
+
+        # Agent Lightning tracker
+        self.tracker = runtime.tracker
+        self.reward_calculator = runtime.reward_calculator
+        self.prompt_builder = runtime.prompt_builder
+
+        # Process-wide singletons
         self.event_bus = get_event_bus()
-
-        # Initialize persona service
         self.persona_service = get_persona_service()
-
-        # Initialize cache service
         self.cache_service = get_cache_service()
+        self.journey_manager = get_journey_manager()  # in-memory
+        self.intent_classifier = get_intent_classifier()
 
-        # Initialize journey manager (in-memory)
-        self.journey_manager = get_journey_manager()
+        self.graph = runtime.graph
+        self.checkpointer = runtime.checkpointer
+        self._started_perf: Optional[float] = None  # perf_counter origin for node_timings
+        self._stream_tokens = False  # set by stream(); generate_response streams from Gemini
 
-        # Initialize journey persistence service (database)
+    def _bind_session(self, db_session: AsyncSession) -> None:
+        """Create the session-bound services (per request)."""
+        self.db = db_session
+        self.conversation_service = ConversationService(db_session, gemini_client=self.gemini_client)
         self.journey_persistence_service = JourneyPersistenceService(db_session)
 
-        self.graph = self._build_graph()
-
-    def _build_graph(self) -> StateGraph:
-        """Build the LangGraph workflow."""
-        workflow = StateGraph(ChatState)
-
-        # Add nodes
-        workflow.add_node("validate_input", self._validate_input)
-        workflow.add_node("classify_intent", self._classify_intent)
-        workflow.add_node("manage_journey", self._manage_journey)  # NEW: Journey management
-        workflow.add_node("retrieve_context", self._retrieve_context)
-        workflow.add_node("load_conversation_history", self._load_conversation_history)
-        workflow.add_node("generate_response", self._generate_response)
-        workflow.add_node("enrich_with_multimodal", self._enrich_with_multimodal)  # NEW: Multimodal enrichment
-        workflow.add_node("suggest_actions", self._suggest_actions)
-        workflow.add_node("save_conversation", self._save_conversation)
-        workflow.add_node("finalize", self._finalize)
-
-        # Define edges
-        workflow.set_entry_point("validate_input")
-        workflow.add_edge("validate_input", "classify_intent")
-        workflow.add_edge("classify_intent", "manage_journey")  # NEW: Journey management after intent
-        workflow.add_edge("manage_journey", "retrieve_context")
-        workflow.add_edge("retrieve_context", "load_conversation_history")
-        workflow.add_edge("load_conversation_history", "generate_response")
-        workflow.add_edge("generate_response", "enrich_with_multimodal")  # NEW: Add multimodal content
-        workflow.add_edge("enrich_with_multimodal", "suggest_actions")
-        workflow.add_edge("suggest_actions", "save_conversation")
-        workflow.add_edge("save_conversation", "finalize")
-        workflow.add_edge("finalize", END)
-
-        # Compile with checkpointing
-        return workflow.compile(checkpointer=MemorySaver())
-
-    async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute the chat workflow."""
+    def with_session(self, db_session: AsyncSession) -> "ChatWorkflow":
+        """Copy of this workflow bound to another DB session (for background work)."""
+        workflow = copy.copy(self)
+        workflow._bind_session(db_session)
+        return workflow
+
+    async def execute(
+        self,
+        input_data: Dict[str, Any],
+        defer_post_response: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute the chat workflow and return its final state.
+
+        With deferred post-response work the state is returned as soon as the
+        response and its suggestions are ready and the turn is spooled for
+        persistence; the journey update and tracking follow on the background
+        task queue.
+        """
+        final_state: Dict[str, Any] = {}
+        async for event in self.stream(input_data, stream_tokens=False, defer_post_response=defer_post_response):
+            if event["type"] == "complete":
+                final_state = event["state"]
+        return final_state
+
+    async def stream(
+        self,
+        input_data: Dict[str, Any],
+        stream_tokens: bool = True,
+        defer_post_response: Optional[bool] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the chat workflow, yielding events as it progresses.
+
+        Events:
+            {"type": "token", "content": str} - response chunks from generate_response
+            {"type": "node", "node": str, "data": dict, "duration_ms": float} - after
+                each node, with the client-facing fields it produced (NODE_EVENT_FIELDS)
+            {"type": "complete", "state": dict, "post_response": Future | None} - once,
+                with the final state; when post-response work was deferred, the state
+                ends at the saved response and ``post_response`` resolves to the full
+                state once the turn is persisted and the run finished
+
+        Args:
+            input_data: Workflow input (user_message, conversation_id, ...)
+            stream_tokens: Stream the response from Gemini as token events
+                (False generates it in one call and emits no token events)
+            defer_post_response: Run POST_RESPONSE_STAGES on the background
+                task queue (defaults to CHAT_DEFER_POST_RESPONSE)
+
+        Raises:
+            WorkflowError: If the workflow fails
+        """
         workflow_id = str(uuid.uuid4())
         conversation_id = input_data.get("conversation_id", str(uuid.uuid4()))
         start_time = datetime.utcnow()
+        if defer_post_response is None:
+            defer_post_response = DEFER_POST_RESPONSE
+        # Deferred work resumes the run from its checkpoint
+        defer_post_response = defer_post_response and self.checkpointer is not None
+        post_response: Optional[asyncio.Future] = None
 
         try:
             # Publish workflow started event
@@ -188,51 +480,33 @@ class ChatWorkflow:
                 }
             )
 
-            # Create initial state as ChatState TypedDict
-            state: ChatState = {
-                # Workflow metadata
-                "workflow_id": workflow_id,
-                "workflow_name": self.orchestrator.workflow_name,
-                "status": WorkflowStatus.PENDING,
-                "started_at": start_time.isoformat(),
-                "completed_at": None,
-                "current_node": None,
-                "visited_nodes": [],
-                "retry_count": 0,
-                "max_retries": self.orchestrator.max_retries,
-                "errors": [],
-                "warnings": [],
-                "result": None,
-                "metadata": {},
-                # Chat-specific fields
-                "user_message": input_data.get("user_message", ""),
-                "home_id": input_data.get("home_id"),
-                "conversation_id": conversation_id,
-                "user_id": input_data.get("user_id"),
-                "persona": input_data.get("persona"),
-                "scenario": input_data.get("scenario"),
-                "mode": input_data.get("mode", "agent"),  # Default to agent mode
-                "conversation_history": input_data.get("conversation_history", []),
-                "context_sources": [],
-                "requires_action": False,
-                "suggested_actions": [],
-                "suggested_questions": [],
-                "response_metadata": {},
-                "retrieved_context": None,
-                "ai_response": None,
-                "intent": None,
-                # Multimodal fields
-                "web_search_results": None,
-                "web_sources": None,
-                "youtube_videos": None,
-                "contractors": None,
-                "generated_images": None,
-                "visual_aids": None
-            }
-
-            # Execute workflow
-            config = {"configurable": {"thread_id": conversation_id}}
-            final_state = await self.graph.ainvoke(state, config=config)
+            state = self._initial_state(input_data, workflow_id, conversation_id, start_time)
+            if defer_post_response:
+                # The background job resumes this thread: keep it until the job is done
+                self.checkpointer.pin_thread(workflow_id)
+
+            # Execute workflow; nodes get this request's workflow through the config
+            # (one checkpoint thread per run, resumable by workflow_id)
+            config = {"configurable": {"thread_id": workflow_id, WORKFLOW_CONFIG_KEY: self}}
+            self._stream_tokens = stream_tokens
+            self._started_perf = time.perf_counter()
+            final_state: Dict[str, Any] = dict(state)
+            async for mode, chunk in self.graph.astream(
+                state,
+                config=config,
+                stream_mode=["custom", "updates", "values"],
+                durability=CHECKPOINT_DURABILITY,
+                # Stop at the response; the checkpoint holds the rest of the run
+                interrupt_after=[RESPONSE_STAGES[-1][0]] if defer_post_response else None
+            ):
+                if mode == "custom":
+                    yield chunk
+                elif mode == "updates":
+                    for node_name, update in chunk.items():
+                        if not node_name.startswith("__"):
+                            yield node_event(node_name, update or {})
+                else:
+                    final_state = chunk
 
             # Publish chat response generated event
             if final_state.get("ai_response"):
@@ -247,23 +521,29 @@ class ChatWorkflow:
                     }
                 )
 
-            # Publish workflow completed event
-            duration = (datetime.utcnow() - start_time).total_seconds()
-            await publish_workflow_completed(
-                workflow_id=workflow_id,
-                workflow_name=self.orchestrator.workflow_name,
-                duration_seconds=duration,
-                metadata={
-                    "conversation_id": conversation_id,
-                    "nodes_visited": len(final_state.get("visited_nodes", [])),
-                    "errors_count": len(final_state.get("errors", []))
-                }
-            )
+            if defer_post_response:
+                timing = summarize_node_timings(final_state.get("node_timings", {}))
+                final_state.setdefault("metadata", {})["timing"] = timing
+                logger.debug(f"Chat workflow {workflow_id}: response ready after {timing['wall_ms']}ms")
 
-            return final_state
+                post_response = get_background_tasks().submit(
+                    f"chat_post_response:{workflow_id}",
+                    self._run_post_response, workflow_id, start_time
+                )
+                if post_response is not None:
+                    # Also on failure: a failed run's checkpoint then expires as usual
+                    post_response.add_done_callback(lambda _: self.checkpointer.unpin_thread(workflow_id))
+                else:
+                    # Queue full or shutting down: finish in the request instead
+                    post_response = asyncio.get_running_loop().create_future()
+                    post_response.set_result(await self._run_post_response(workflow_id, start_time))
+            else:
+                final_state = await self._complete_run(final_state, workflow_id, start_time)
 
         except Exception as e:
             logger.error(f"Chat workflow execution failed: {e}", exc_info=True)
+            if defer_post_response and post_response is None:
+                self.checkpointer.unpin_thread(workflow_id)
 
             # Publish workflow failed event
             await publish_workflow_failed(
@@ -282,6 +562,152 @@ class ChatWorkflow:
                 recoverable=False
             )
 
+        yield {"type": "complete", "state": final_state, "post_response": post_response}
+
+    async def _run_post_response(self, workflow_id: str, start_time: datetime) -> Dict[str, Any]:
+        """
+        Background job: finish a run from its post-response checkpoint.
+
+        Runs on its own DB session, since the request's is closed by then.
+        A retry resumes from the last checkpoint, so nodes that already
+        completed (e.g. update_journey_activity) don't run twice.
+
+        Returns:
+            Final state (empty if the checkpoint is gone, e.g. after a restart;
+            the turn itself was spooled before the response)
+        """
+        async with self.runtime.get_session_factory()() as db:
+            workflow = self.with_session(db)
+            config = {"configurable": {"thread_id": workflow_id, WORKFLOW_CONFIG_KEY: workflow}}
+            snapshot = await self.graph.aget_state(config)
+            if not snapshot.values:
+                logger.warning(f"No checkpoint for chat workflow {workflow_id}; skipping post-response work")
+                return {}
+            final_state = await self.graph.ainvoke(None, config=config, durability=CHECKPOINT_DURABILITY)
+            return await workflow._complete_run(final_state, workflow_id, start_time)
+
+    async def _complete_run(
+        self,
+        final_state: Dict[str, Any],
+        workflow_id: str,
+        start_time: datetime
+    ) -> Dict[str, Any]:
+        """Drop the run's checkpoints and report its timing once all nodes are done."""
+        # Only failed or interrupted runs need their checkpoints
+        if self.checkpointer is not None:
+            await self.checkpointer.adelete_thread(workflow_id)
+            self.checkpointer.unpin_thread(workflow_id)
+
+        timing = summarize_node_timings(final_state.get("node_timings", {}))
+        final_state.setdefault("metadata", {})["timing"] = timing
+        logger.debug(
+            f"Chat workflow {workflow_id}: wall {timing['wall_ms']}ms, "
+            f"serial {timing['serial_ms']}ms, critical path {timing['critical_path_ms']}ms"
+        )
+
+        # Publish workflow completed event
+        duration = (datetime.utcnow() - start_time).total_seconds()
+        await publish_workflow_completed(
+            workflow_id=workflow_id,
+            workflow_name=self.orchestrator.workflow_name,
+            duration_seconds=duration,
+            metadata={
+                "conversation_id": final_state.get("conversation_id"),
+                "nodes_visited": len(final_state.get("visited_nodes", [])),
+                "errors_count": len(final_state.get("errors", [])),
+                "timing": timing
+            }
+        )
+        return final_state
+
+    async def resume(self, workflow_id: str) -> Dict[str, Any]:
+        """
+        Finish a failed or interrupted run from its last checkpoint.
+
+        With the SQL checkpointer this works on any replica, not just the one
+        that started the run.
+
+        Args:
+            workflow_id: ID of the run (its checkpoint thread)
+
+        Returns:
+            Final state
+
+        Raises:
+            WorkflowError: If checkpointing is off or the run has no checkpoint
+        """
+        if self.checkpointer is None:
+            raise WorkflowError("Chat workflow checkpointing is disabled (CHAT_CHECKPOINTER=none)")
+
+        config = {"configurable": {"thread_id": workflow_id, WORKFLOW_CONFIG_KEY: self}}
+        snapshot = await self.graph.aget_state(config)
+        if not snapshot.values:
+            raise WorkflowError(f"No checkpoint for chat workflow {workflow_id}")
+
+        final_state = snapshot.values
+        if snapshot.next:
+            logger.info(f"Resuming chat workflow {workflow_id} at {list(snapshot.next)}")
+            self._started_perf = time.perf_counter()
+            final_state = await self.graph.ainvoke(None, config=config, durability=CHECKPOINT_DURABILITY)
+
+        await self.checkpointer.adelete_thread(workflow_id)
+        return final_state
+
+    def _initial_state(
+        self,
+        input_data: Dict[str, Any],
+        workflow_id: str,
+        conversation_id: str,
+        start_time: datetime
+    ) -> ChatState:
+        """Create the initial ChatState for a request."""
+        return {
+            # Workflow metadata
+            "workflow_id": workflow_id,
+            "workflow_name": self.orchestrator.workflow_name,
+            "status": WorkflowStatus.PENDING,
+            "started_at": start_time.isoformat(),
+            "completed_at": None,
+            "current_node": None,
+            "visited_nodes": [],
+            "retry_count": 0,
+            "max_retries": self.orchestrator.max_retries,
+            "deadline": deadline_after(self.orchestrator.timeout_seconds),
+            "dropped_steps": [],
+            "errors": [],
+            "warnings": [],
+            "result": None,
+            "metadata": {},
+            "node_timings": {},
+            # Chat-specific fields
+            "user_message": input_data.get("user_message", ""),
+            "home_id": input_data.get("home_id"),
+            "conversation_id": conversation_id,
+            "user_id": input_data.get("user_id"),
+            "persona": input_data.get("persona"),
+            "scenario": input_data.get("scenario"),
+            "mode": input_data.get("mode", "agent"),  # Default to agent mode
+            "conversation_history": input_data.get("conversation_history", []),
+            "context_sources": [],
+            "requires_action": False,
+            "suggested_actions": [],
+            "suggested_questions": [],
+            "response_metadata": {},
+            "retrieved_context": None,
+            "ai_response": None,
+            "intent": None,
+            # Multimodal fields
+            "web_search_results": None,
+            "web_sources": None,
+            "youtube_videos": None,
+            "contractors": None,
+            "generated_images": None,
+            "visual_aids": None,
+            "reserved_message_ids": [str(uuid.uuid4()), str(uuid.uuid4())],
+            "saved_message_ids": [],
+            "assistant_message_id": None
+        }
+
     async def _validate_input(self, state: ChatState) -> ChatState:
         """Validate input parameters."""
         state = self.orchestrator.mark_node_start(state, "validate_input")
@@ -319,52 +745,18 @@ class ChatWorkflow:
         state = self.orchestrator.mark_node_start(state, "classify_intent")
 
         try:
-            user_message = state["user_message"]
-
-            # Use Gemini to classify intent
-            classification_prompt = f"""Classify the user's intent from this message. Return ONLY a JSON object.
-
-User message: "{user_message}"
-
-Classify into ONE of these intents:
-- "question": User is asking a question about their home
-- "cost_estimate": User wants cost estimation for a project
-- "product_recommendation": User wants product recommendations
-- "design_idea": User wants design or style suggestions
-- "design_visualization": User wants to SEE/VISUALIZE design options (keywords: "show me", "visualize", "what would it look like", "generate", "create mockup")
-- "design_transformation": User requests transforming an image (paint, flooring, cabinets, furniture, staging)
-- "before_after": User wants to see before/after comparisons or transformations
-- "material_comparison": User wants to compare materials or finishes visually
-- "diy_guide": User wants a step-by-step DIY guide with materials/tools/safety
-- "pdf_request": User wants a PDF export of a plan/guide or the conversation
-- "general_chat": General conversation or greeting
-
-Return JSON:
-{{
-    "intent": "<intent>",
-    "confidence": <0.0-1.0>,
-    "requires_home_data": <true/false>
-}}"""
-
-            try:
-                response = await self.gemini_client.generate_text(
-                    prompt=classification_prompt,
-                    temperature=0.1
-                )
-
-                # Parse JSON response
-                import json
-                classification = self._parse_json_response(response)
-
-                state["intent"] = classification.get("intent", "question")
-                state["response_metadata"]["intent_confidence"] = classification.get("confidence", 0.5)
-
-                logger.info(f"Intent classified: {state['intent']}")
+            # Local fast path; the LLM only sees low-confidence messages
+            prediction = await self.intent_classifier.classify(
+                state["user_message"], llm_classify=self._llm_classify_intent
+            )
+            state["intent"] = prediction.intent
+            state["response_metadata"]["intent_confidence"] = prediction.confidence
+            state["response_metadata"]["intent_source"] = prediction.source
 
-            except Exception as e:
-                logger.warning(f"Intent classification failed, defaulting to 'question': {e}")
-                state["intent"] = "question"
-                state["response_metadata"]["intent_confidence"] = 0.5
+            logger.info(
+                f"Intent classified: {prediction.intent} ({prediction.source}, "
+                f"confidence {prediction.confidence:.2f})"
+            )
 
             state = self.orchestrator.mark_node_complete(state, "classify_intent")
 
@@ -375,6 +767,14 @@ Return JSON:
 
         return state
 
+    async def _llm_classify_intent(self, user_message: str) -> Dict[str, Any]:
+        """Classify intent with Gemini (fallback for the local classifier)."""
+        response = await self.gemini_client.generate_text(
+            prompt=build_intent_prompt(user_message),
+            temperature=0.1
+        )
+        return self._parse_json_response(response)
+
     async def _manage_journey(self, state: ChatState) -> ChatState:
         """Manage user journey - detect start, track progress, suggest next steps."""
         state = self.orchestrator.mark_node_start(state, "manage_journey")
@@ -548,6 +948,17 @@ Return JSON:
 
                 logger.debug(f"Tracking journey '{journey.id}' for user {user_id}")
 
+            # Journey next steps as suggested actions (added to suggest_actions' ones)
+            state["suggested_actions"] = [
+                {
+                    "action": "journey_next_step",
+                    "label": f"Next: {step['name']}",
+                    "description": step['description'],
+                    "step_id": step['step_id']
+                }
+                for step in state["next_steps"]
+            ]
+
             state = self.orchestrator.mark_node_complete(state, "manage_journey")
 
         except Exception as e:
@@ -577,33 +988,40 @@ Return JSON:
         return state
 
     async def _load_conversation_history(self, state: ChatState) -> ChatState:
-        """Load conversation history from database."""
+        """Load the rolling summary and recent conversation history from database."""
         state = self.orchestrator.mark_node_start(state, "load_conversation_history")
 
         try:
             conversation_id = state["conversation_id"]
 
-            # Try to load from database
-            history = await self.conversation_service.get_recent_messages(
+            # Load from database plus turns still buffered by the write-behind
+            # writer (snapshotted first so none fall in between)
+            pending = get_message_writer().pending_messages(conversation_id)
+            memory = await self.conversation_service.get_history_context(
                 conversation_id=conversation_id,
-                count=10
+                max_messages=HISTORY_MAX_MESSAGES
             )
+            history = merge_pending(memory["messages"], pending)[-HISTORY_MAX_MESSAGES:]
+            state["conversation_summary"] = memory["summary"]
 
             # If no history in DB, use provided history
-            if not history:
+            if not history and not memory["summary"]:
                 history = state.get("conversation_history", [])
-                history = history[-10:] if len(history) > 10 else history
+                history = history[-HISTORY_MAX_MESSAGES:]
 
             state["conversation_history"] = history
 
-            logger.info(f"Loaded {len(state['conversation_history'])} messages from history")
+            logger.info(
+                f"Loaded {len(state['conversation_history'])} messages from history"
+                f"{' plus summary' if memory['summary'] else ''}"
+            )
             state = self.orchestrator.mark_node_complete(state, "load_conversation_history")
 
         except Exception as e:
             state = self.orchestrator.add_error(state, e, "load_conversation_history", recoverable=True)
             # Fallback to provided history
             history = state.get("conversation_history", [])
-            state["conversation_history"] = history[-10:] if len(history) > 10 else history
+            state["conversation_history"] = history[-HISTORY_MAX_MESSAGES:]
 
         return state
 
@@ -616,22 +1034,27 @@ Return JSON:
             context = state.get("retrieved_context")
             history = state.get("conversation_history", [])
 
-            # Build comprehensive prompt
-            prompt = self._build_response_prompt(
+            # Build comprehensive prompt (token-budgeted)
+            prompt, prompt_tokens = self.prompt_builder.build(
                 user_message,
                 context,
                 history,
                 state.get("persona"),
                 state.get("scenario"),
-                state.get("intent")
+                state.get("intent"),
+                summary=state.get("conversation_summary"),
             )
+            state["response_metadata"]["prompt_tokens"] = prompt_tokens["total"]
 
-            # Generate response
-            response = await self.gemini_client.generate_text(
-                prompt=prompt,
-                temperature=0.7,
-                max_tokens=2048
-            )
+            # Generate response; in streaming mode tokens go out as they arrive
+            if self._stream_tokens:
+                response = await self._stream_response(prompt)
+            else:
+                response = await self.gemini_client.generate_text(
+                    prompt=prompt,
+                    temperature=0.7,
+                    max_tokens=2048
+                )
 
             state["ai_response"] = response
             state["response_metadata"]["generated_at"] = datetime.utcnow().isoformat()
@@ -647,9 +1070,30 @@ Return JSON:
                 "I apologize, but I'm having trouble generating a response right now. "
                 "Please try rephrasing your question or try again in a moment."
             )
+            if self._stream_tokens:
+                get_stream_writer()({"type": "token", "content": state["ai_response"]})
 
         return state
 
+    async def _stream_response(self, prompt: str) -> str:
+        """Stream a response from Gemini, emitting each chunk as a token event."""
+        writer = get_stream_writer()
+        chunks: List[str] = []
+        try:
+            async for token in self.gemini_client.generate_text_stream(
+                prompt=prompt,
+                temperature=0.7,
+                max_tokens=2048
+            ):
+                chunks.append(token)
+                writer({"type": "token", "content": token})
+        except Exception:
+            if not chunks:
+                raise
+            # Tokens already reached the client; keep the partial answer
+            logger.warning(f"Response stream interrupted after {len(chunks)} chunks", exc_info=True)
+        return "".join(chunks)
+
     async def _enrich_with_multimodal(self, state: ChatState) -> ChatState:
         """
         Enrich response with multimodal content (Agent mode only).
@@ -682,8 +1126,15 @@ Return JSON:
             youtube_videos = []
             generated_images = []
 
+            # Optional parts are skipped when the deadline is near and cancelled
+            # when they outlast it (reported in dropped_steps)
+            node_name = "enrich_with_multimodal"
+
             # 1. Web Search (Google Grounding) for product recommendations and cost estimates
-            if intent in ["product_recommendation", "cost_estimate", "material_selection"]:
+            if (
+                intent in ["product_recommendation", "cost_estimate", "material_selection"]
+                and self.orchestrator.can_run_optional(state, "web_search", node_name)
+            ):
                 try:
                     logger.info(f"Adding web search for intent: {intent}")
 
@@ -694,39 +1145,39 @@ Return JSON:
                         "location_hint": "Canada",  # Prefer Canadian sources
                     }
 
-                    # Check cache first
-                    cache_key = f"product_search:{hashlib.md5(user_message.encode()).hexdigest()[:16]}:{intent}"
-                    cached_result = await self.cache_service.get(cache_key, cache_type="product_search")
-
-                    if cached_result:
-                        logger.info(f"Product search cache hit for intent: {intent}")
-                        web_search_results = cached_result.get("products", [])
-                        web_sources = cached_result.get("sources", [])
-                    else:
+                    async def search_products():
                         # Use existing Gemini grounding capability
                         grounding_result = await self.gemini_client.suggest_products_with_grounding(
                             grounding_input,
                             max_items=5
                         )
+                        return {
+                            "products": grounding_result.get("products", []),
+                            "sources": grounding_result.get("sources", []),
+                        }
 
-                        web_search_results = grounding_result.get("products", [])
-                        web_sources = grounding_result.get("sources", [])
-
-                        # Cache the result
-                        await self.cache_service.set(
-                            cache_key,
-                            {"products": web_search_results, "sources": web_sources},
-                            cache_type="product_search"
+                    # Cached with stampede protection: concurrent misses share one grounding call
+                    cache_key = f"product_search:{hashlib.md5(user_message.encode()).hexdigest()[:16]}:{intent}"
+                    async with asyncio.timeout(self._enrichment_timeout(state)):
+                        search_result = await self.cache_service.get_or_compute(
+                            cache_key, search_products, cache_type="product_search"
                         )
+                    web_search_results = search_result.get("products", [])
+                    web_sources = search_result.get("sources", [])
 
                     logger.info(f"Found {len(web_search_results)} products, {len(web_sources)} sources")
 
+                except TimeoutError:
+                    self.orchestrator.drop_optional(state, "web_search", node_name)
                 except Exception as e:
                     logger.warning(f"Web search failed: {e}")
                     # Continue without web search
 
             # 2. YouTube Videos for DIY guides and tutorials (using Google Grounding)
-            if intent in ["diy_guide", "how_to", "installation_guide"]:
+            if (
+                intent in ["diy_guide", "how_to", "installation_guide"]
+                and self.orchestrator.can_run_optional(state, "youtube_videos", node_name)
+            ):
                 try:
                     logger.info(f"Adding YouTube videos for intent: {intent}")
 
@@ -746,10 +1197,11 @@ Return JSON:
                     }
 
                     # Use Gemini grounding to search YouTube
-                    grounding_result = await self.gemini_client.suggest_products_with_grounding(
-                        grounding_input,
-                        max_items=5
-                    )
+                    async with asyncio.timeout(self._enrichment_timeout(state)):
+                        grounding_result = await self.gemini_client.suggest_products_with_grounding(
+                            grounding_input,
+                            max_items=5
+                        )
 
                     # Parse grounding results into YouTube video format
                     raw_results = grounding_result.get("products", [])
@@ -780,12 +1232,17 @@ Return JSON:
 
                     logger.info(f"Found {len(youtube_videos)} YouTube tutorials via Google Grounding")
 
+                except TimeoutError:
+                    self.orchestrator.drop_optional(state, "youtube_videos", node_name)
                 except Exception as e:
                     logger.warning(f"YouTube search via grounding failed: {e}")
                     # Continue without YouTube videos
 
             # 3. Contractor Search (Google Maps Grounding) for contractor quotes
-            if intent in ["contractor_quotes", "find_contractor", "get_quote"]:
+            if (
+                intent in ["contractor_quotes", "find_contractor", "get_quote"]
+                and self.orchestrator.can_run_optional(state, "contractors", node_name)
+            ):
                 try:
                     logger.info(f"Adding contractor search for intent: {intent}")
 
@@ -816,7 +1273,7 @@ Return JSON:
 
                     # Check cache first
                     cache_key = f"contractor_search:{job_type}:vancouver"
-                    cached_contractors = await self.cache_service.get(cache_key, cache_type="contractor_search")
+                    cached_contractors = self.cache_service.get(cache_key, cache_type="contractor_search")
 
                     if cached_contractors:
                         logger.info(f"Contractor search cache hit for job type: {job_type}")
@@ -829,21 +1286,22 @@ Return JSON:
                         # Create a separate client for Maps grounding
                         maps_client = google_genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
-                        maps_response = await maps_client.aio.models.generate_content(
-                            model='gemini-2.0-flash-exp',
-                            contents=f"Find the top 5 {job_type} in Vancouver, BC and surrounding areas (Burnaby, Richmond, Surrey). Include their ratings, specialties, and contact information.",
-                            config=types.GenerateContentConfig(
-                                tools=[types.Tool(google_maps=types.GoogleMaps())],
-                                tool_config=types.ToolConfig(
-                                    retrieval_config=types.RetrievalConfig(
-                                        lat_lng=types.LatLng(
-                                            latitude=vancouver_lat,
-                                            longitude=vancouver_lng
+                        async with asyncio.timeout(self._enrichment_timeout(state)):
+                            maps_response = await maps_client.aio.models.generate_content(
+                                model='gemini-2.0-flash-exp',
+                                contents=f"Find the top 5 {job_type} in Vancouver, BC and surrounding areas (Burnaby, Richmond, Surrey). Include their ratings, specialties, and contact information.",
+                                config=types.GenerateContentConfig(
+                                    tools=[types.Tool(google_maps=types.GoogleMaps())],
+                                    tool_config=types.ToolConfig(
+                                        retrieval_config=types.RetrievalConfig(
+                                            lat_lng=types.LatLng(
+                                                latitude=vancouver_lat,
+                                                longitude=vancouver_lng
+                                            )
                                         )
                                     )
                                 )
                             )
-                        )
 
                         # Parse Maps grounding results
                         contractors = []
@@ -863,19 +1321,24 @@ Return JSON:
 
                         # Cache the result
                         if contractors:
-                            await self.cache_service.set(cache_key, contractors, cache_type="contractor_search")
+                            self.cache_service.set(cache_key, contractors, cache_type="contractor_search")
 
                     # Store in state
                     state["response_metadata"]["contractors"] = contractors
 
                     logger.info(f"Found {len(contractors)} contractors via Google Maps Grounding")
 
+                except TimeoutError:
+                    self.orchestrator.drop_optional(state, "contractors", node_name)
                 except Exception as e:
                     logger.warning(f"Contractor search via Maps grounding failed: {e}")
                     # Continue without contractor results
 
             # 4. Image Generation for design concepts and visual aids
-            if intent in ["design_idea", "design_visualization", "before_after", "design_transformation", "material_comparison"]:
+            if (
+                intent in ["design_idea", "design_visualization", "before_after", "design_transformation", "material_comparison"]
+                and self.orchestrator.can_run_optional(state, "generated_images", node_name)
+            ):
                 try:
                     logger.info(f"Generating images for intent: {intent}")
 
@@ -892,11 +1355,12 @@ Return JSON:
 
                         # Use transform_room_style method
                         try:
-                            images = await design_service.transform_room_style(
-                                image=uploaded_image,
-                                target_style=style,
-                                num_variations=3
-                            )
+                            async with asyncio.timeout(self._enrichment_timeout(state)):
+                                images = await design_service.transform_room_style(
+                                    image=uploaded_image,
+                                    target_style=style,
+                                    num_variations=3
+                                )
 
                             generated_images = [
                                 {
@@ -909,6 +1373,8 @@ Return JSON:
                             ]
 
                             logger.info(f"Successfully transformed image into {len(generated_images)} variations")
+                        except TimeoutError:
+                            raise
                         except Exception as transform_error:
                             logger.warning(f"Image transformation failed: {transform_error}")
                             # Fall back to text-only response
@@ -928,7 +1394,8 @@ Return JSON:
                             aspect_ratio="16:9"
                         )
 
-                        result = await imagen_service.generate_images(request)
+                        async with asyncio.timeout(self._enrichment_timeout(state)):
+                            result = await imagen_service.generate_images(request)
 
                         if result.success:
                             generated_images = [
@@ -947,6 +1414,8 @@ Return JSON:
 
                     logger.info(f"Total generated images: {len(generated_images)}")
 
+                except TimeoutError:
+                    self.orchestrator.drop_optional(state, "generated_images", node_name)
                 except Exception as e:
                     logger.warning(f"Image generation failed: {e}", exc_info=True)
                     # Continue without images
@@ -983,7 +1452,12 @@ Return JSON:
         return state
 
     async def _suggest_actions(self, state: ChatState) -> ChatState:
-        """Suggest follow-up actions based on intent and response."""
+        """
+        Suggest follow-up actions and questions based on intent and conversation.
+
+        Runs alongside generate_response, so it must not read the answer;
+        journey next steps are added to the actions by manage_journey.
+        """
         state = self.orchestrator.mark_node_start(state, "suggest_actions")
 
         try:
@@ -1094,17 +1568,6 @@ Return JSON:
                 })
 
 
-            # Add journey next steps as suggested actions
-            next_steps = state.get("next_steps", [])
-            if next_steps:
-                for step in next_steps:
-                    suggested_actions.append({
-                        "action": "journey_next_step",
-                        "label": f"Next: {step['name']}",
-                        "description": step['description'],
-                        "step_id": step['step_id']
-                    })
-
             # Default suggested questions for general queries
             if not suggested_questions:
                 suggested_questions.extend([
@@ -1115,21 +1578,23 @@ Return JSON:
                 ])
 
             # Context-aware refinement of follow-up questions using conversation history
-            try:
-                hist = state.get("conversation_history", []) or []
-                # Build minimal history text (last 6 messages)
-                history_lines = []
-                for msg in hist[-6:]:
-                    role = "User" if msg.get("role") == "user" else "Assistant"
-                    content = (msg.get("content") or "")[:400]
-                    history_lines.append(f"{role}: {content}")
-                history_text = "\n".join(history_lines)
-                user_message = state.get("user_message", "")
-                intent_label = state.get("intent") or "question"
-                persona_label = state.get("persona") or ""
-                scenario_label = state.get("scenario") or ""
-
-                gen_prompt = f"""Given the conversation and latest message, propose 3-4 short follow-up questions that move the user forward.
+            # (optional: the default questions stand when time is short)
+            if self.orchestrator.can_run_optional(state, "follow_up_questions", "suggest_actions"):
+                try:
+                    hist = state.get("conversation_history", []) or []
+                    # Build minimal history text (last 6 messages)
+                    history_lines = []
+                    for msg in hist[-6:]:
+                        role = "User" if msg.get("role") == "user" else "Assistant"
+                        content = (msg.get("content") or "")[:400]
+                        history_lines.append(f"{role}: {content}")
+                    history_text = "\n".join(history_lines)
+                    user_message = state.get("user_message", "")
+                    intent_label = state.get("intent") or "question"
+                    persona_label = state.get("persona") or ""
+                    scenario_label = state.get("scenario") or ""
+
+                    gen_prompt = f"""Given the conversation and latest message, propose 3-4 short follow-up questions that move the user forward.
 They must be context-aware, <= 80 characters each, and easy to tap as chips.
 Return ONLY a JSON array of strings.
 
@@ -1141,31 +1606,34 @@ Intent: {intent_label}
 Persona: {persona_label}
 Scenario: {scenario_label}
 """
-                resp = await self.gemini_client.generate_text(
-                    prompt=gen_prompt,
-                    temperature=0.2,
-                    max_tokens=200,
-                )
-                import json, re
-                m = re.search(r'```(?:json)?\s*(\[.*?\])\s*```', resp, re.DOTALL)
-                arr_text = m.group(1) if m else resp.strip()
-                arr = json.loads(arr_text)
-                if isinstance(arr, list):
-                    cleaned = []
-                    for q in arr:
-                        if isinstance(q, str):
-                            q = q.strip()
-                            if q and len(q) <= 100 and q not in cleaned:
-                                cleaned.append(q)
-                    if cleaned:
-                        # Merge with existing, keep order, cap at 4
-                        merged = []
-                        for q in cleaned + suggested_questions:
-                            if q not in merged:
-                                merged.append(q)
-                        suggested_questions = merged[:4]
-            except Exception as fe:
-                logger.debug(f"Contextual follow-up generation skipped: {fe}")
+                    async with asyncio.timeout(self._enrichment_timeout(state)):
+                        resp = await self.gemini_client.generate_text(
+                            prompt=gen_prompt,
+                            temperature=0.2,
+                            max_tokens=200,
+                        )
+                    import json, re
+                    m = re.search(r'```(?:json)?\s*(\[.*?\])\s*```', resp, re.DOTALL)
+                    arr_text = m.group(1) if m else resp.strip()
+                    arr = json.loads(arr_text)
+                    if isinstance(arr, list):
+                        cleaned = []
+                        for q in arr:
+                            if isinstance(q, str):
+                                q = q.strip()
+                                if q and len(q) <= 100 and q not in cleaned:
+                                    cleaned.append(q)
+                        if cleaned:
+                            # Merge with existing, keep order, cap at 4
+                            merged = []
+                            for q in cleaned + suggested_questions:
+                                if q not in merged:
+                                    merged.append(q)
+                            suggested_questions = merged[:4]
+                except TimeoutError:
+                    self.orchestrator.drop_optional(state, "follow_up_questions", "suggest_actions")
+                except Exception as fe:
+                    logger.debug(f"Contextual follow-up generation skipped: {fe}")
 
             state["suggested_actions"] = suggested_actions
             state["suggested_questions"] = suggested_questions
@@ -1211,13 +1679,17 @@ Scenario: {scenario_label}
             journey_status = state.get("journey_status")
             current_step = state.get("current_step")
 
-            # Save user message
-            await self.conversation_service.add_message(
-                conversation_id=conversation_id,
-                role="user",
-                content=user_message,
-                intent=intent,
-                metadata={
+            # Save user message and AI response in one transaction
+            reserved_ids = state.get("reserved_message_ids") or []
+            if len(reserved_ids) < 2:
+                reserved_ids = [str(uuid.uuid4()), str(uuid.uuid4())]
+            user_message_id, assistant_message_id = reserved_ids[:2]
+            messages = [{
+                "id": user_message_id,
+                "role": "user",
+                "content": user_message,
+                "intent": intent,
+                "metadata": {
                     **state.get("response_metadata", {}),
                     "persona": state.get("persona"),
                     "scenario": state.get("scenario"),
@@ -1225,16 +1697,15 @@ Scenario: {scenario_label}
                     "journey_status": journey_status,
                     "current_step": current_step,
                 },
-                context_sources=context_sources
-            )
-
-            # Save AI response
+                "context_sources": context_sources,
+            }]
             if ai_response:
-                await self.conversation_service.add_message(
-                    conversation_id=conversation_id,
-                    role="assistant",
-                    content=ai_response,
-                    metadata={
+                messages.append({
+                    "id": assistant_message_id,
+                    "role": "assistant",
+                    "content": ai_response,
+                    "metadata": {
+                        "intent": intent,
                         "suggested_actions": state.get("suggested_actions", []),
                         "suggested_questions": state.get("suggested_questions", []),
                         "persona": state.get("persona"),
@@ -1243,12 +1714,41 @@ Scenario: {scenario_label}
                         "journey_status": journey_status,
                         "current_step": current_step,
                         "next_steps": state.get("next_steps", []),
+                        "dropped_steps": state.get("dropped_steps", []),
                         **state.get("response_metadata", {})
                     },
-                    context_sources=context_sources
-                )
+                    "context_sources": context_sources,
+                })
+            # Durably spooled, then batched into the DB by the write-behind writer
+            # (which also rolls the summary forward); the next turn's history
+            # reads it from the buffer until then
+            await get_message_writer().enqueue(conversation_id, messages)
+            state["saved_message_ids"] = [m["id"] for m in messages]
+            if ai_response:
+                state["assistant_message_id"] = assistant_message_id
+
+            logger.info(f"Saved conversation {conversation_id} to the write-behind spool")
+            state = self.orchestrator.mark_node_complete(state, "save_conversation")
+
+        except Exception as e:
+            state = self.orchestrator.add_error(state, e, "save_conversation", recoverable=True)
+            # Non-critical error, continue
+            logger.warning(f"Failed to save conversation, continuing: {e}")
+
+        return state
+
+    async def _update_journey_activity(self, state: ChatState) -> ChatState:
+        """Wait for the turn to reach the database and touch the journey's last activity."""
+        state = self.orchestrator.mark_node_start(state, "update_journey_activity")
+
+        try:
+            # Callers that re-read the conversation once the run is done
+            # (/chat/stream's [DONE], non-deferred execute) should see the turn
+            if state.get("saved_message_ids"):
+                await get_message_writer().wait_persisted(state["saved_message_ids"])
 
             # Update journey's last_activity_at if journey exists
+            journey_id = state.get("journey_id")
             if journey_id:
                 try:
                     journey = await self.journey_persistence_service.get_journey(journey_id)
@@ -1269,13 +1769,11 @@ Scenario: {scenario_label}
                 except Exception as e:
                     logger.warning(f"Failed to update journey last_activity_at: {e}")
 
-            logger.info(f"Saved conversation {conversation_id} to database")
-            state = self.orchestrator.mark_node_complete(state, "save_conversation")
+            state = self.orchestrator.mark_node_complete(state, "update_journey_activity")
 
         except Exception as e:
-            state = self.orchestrator.add_error(state, e, "save_conversation", recoverable=True)
-            # Non-critical error, continue
-            logger.warning(f"Failed to save conversation, continuing: {e}")
+            state = self.orchestrator.add_error(state, e, "update_journey_activity", recoverable=True)
+            logger.warning(f"Failed to update journey activity, continuing: {e}")
 
         return state
 
@@ -1297,6 +1795,7 @@ Scenario: {scenario_label}
                 "suggested_actions": state.get("suggested_actions", []),
                 "suggested_questions": state.get("suggested_questions", []),
                 "context_sources": state.get("context_sources", []),
+                "dropped_steps": state.get("dropped_steps", []),
                 "metadata": {
                     **state.get("response_metadata", {}),
                     "persona": state.get("persona"),
@@ -1351,6 +1850,10 @@ Scenario: {scenario_label}
 
         return state
 
+    def _enrichment_timeout(self, state: ChatState) -> Optional[float]:
+        """Time an optional enrichment may take: what is left, capped per enrichment."""
+        return self.orchestrator.optional_step_timeout(state, CHAT_ENRICHMENT_TIMEOUT_SECONDS)
+
     def _build_response_prompt(
         self,
         user_message: str,
@@ -1359,136 +1862,17 @@ Scenario: {scenario_label}
         persona: Optional[str] = None,
         scenario: Optional[str] = None,
         intent: Optional[str] = None,
+        summary: Optional[str] = None,
     ) -> str:
-        """Build comprehensive prompt for response generation."""
-        prompt_parts = []
-
-        # System prompt
-        prompt_parts.append("""You are HomeView AI, an intelligent home improvement assistant. You help homeowners, DIY enthusiasts, and contractors understand their homes and plan improvements.
-
-Your capabilities (available platform actions you can guide to):
-- Estimate renovation costs (detailed cost breakdowns)
-- Create DIY project plans with tools, materials, safety, and effort
-- Generate a shopping list from a DIY plan
-- Open the Design Studio to generate/edit visuals (paint, flooring, cabinets, furniture, staging) from user photos
-- Recommend products (prefer Canadian/.ca vendors when possible)
-- Prepare a contractor-quote brief
-- Export DIY plans or summaries as downloadable PDFs
-
-Guidelines:
-- Be concise, clear, and professional; avoid fluff.
-- Ground answers in the conversation history; don't repeat long lists already given.
-- Prefer 3–6 short bullets or 1–3 short paragraphs; aim for 60–120 words unless the user asks for more.
-- If critical info is missing, ask 1–2 specific clarifying questions in a friendly tone (e.g., “I can run that — could you share X and Y?”).
-- End with one decisive next step (A/B style), matching the user’s goal.
-- Keep Canadian context in mind; prefer .ca vendors when mentioning products.
-- Do not reference any Digital Twin or home_id unless explicitly provided by the user.
-- CRITICAL: You CAN create and export PDFs. Never say "I cannot create PDF documents" or similar. When asked for a PDF, confirm you can do it and guide the user to provide any missing content (e.g., create a DIY plan first if needed).
-- Avoid repeating the same suggestion chips every message. If an action was just offered, propose the next logical step instead.
-""")
-
-        # Universal guidance (persona-agnostic - respond based on user's actual questions)
-        prompt_parts.append("""
-Respond universally to all users based on their questions and needs, not their persona label:
-- If they ask about costs or budgets → provide estimates and offer contractor quotes if they want professional help
-- If they ask "how to" or want to DIY → provide step-by-step guidance and offer to create a detailed DIY plan
-- If they ask about products → recommend products with Canadian/.ca vendors preferred
-- If they ask about design/visuals → offer to generate mockups in the Design Studio
-- If they want to hire help → guide them to prepare a contractor brief
-- Always offer BOTH pathways (DIY and contractor) neutrally unless the user has clearly chosen one
-
-Adapt your tone and detail level to match what the user is asking for, not what their persona label says.
-""")
-
-        # Add persona-specific tone/detail guidance (subtle, not restrictive)
-        if persona:
-            persona_prefix = self.persona_service.get_prompt_prefix(persona, scenario)
-            if persona_prefix:
-                prompt_parts.append(f"\n**Tone & Detail Guidance:** {persona_prefix}")
-
-        # Scenario-specific guidance (only if explicitly set)
-        if scenario == "contractor_quotes":
-            prompt_parts.append(
-                "\nCurrent focus: Contractor Quotes. Gather key project details (scope, dimensions, materials, constraints), propose a concise brief the user can send to contractors."
-            )
-        elif scenario == "diy_project_plan":
-            prompt_parts.append(
-                "\nCurrent focus: DIY Project Plan. Produce a concise, ordered plan with tools, materials, estimated effort, safety notes, and dependencies."
-            )
+        """Build comprehensive prompt for response generation.
 
-        # Add safety warnings for DIY tasks if applicable
-        if persona in ["diy_worker", "homeowner"] and scenario == "diy_project_plan":
-            # Check if message contains hazardous keywords
-            message_lower = user_message.lower()
-            safety_warnings = []
-
-            if any(word in message_lower for word in ["electrical", "wiring", "outlet", "circuit"]):
-                warning = self.persona_service.get_safety_warning("electrical")
-                if warning:
-                    safety_warnings.append(f"⚠️ {warning.title}: {warning.description}")
-
-            if any(word in message_lower for word in ["gas", "gas line"]):
-                warning = self.persona_service.get_safety_warning("gas")
-                if warning:
-                    safety_warnings.append(f"⚠️ {warning.title}: {warning.description}")
-
-            if any(word in message_lower for word in ["load bearing", "wall removal", "structural"]):
-                warning = self.persona_service.get_safety_warning("structural")
-                if warning:
-                    safety_warnings.append(f"⚠️ {warning.title}: {warning.description}")
-
-            if any(word in message_lower for word in ["roof", "roofing"]):
-                warning = self.persona_service.get_safety_warning("roof")
-                if warning:
-                    safety_warnings.append(f"⚠️ {warning.title}: {warning.description}")
-
-            if any(word in message_lower for word in ["asbestos"]):
-                warning = self.persona_service.get_safety_warning("asbestos")
-                if warning:
-                    safety_warnings.append(f"⚠️ {warning.title}: {warning.description}")
-
-            if safety_warnings:
-                prompt_parts.append("\n**SAFETY WARNINGS - Include these in your response:**")
-                for warning in safety_warnings:
-                    prompt_parts.append(warning)
-
-        # Inject Skills context (concise)
-        try:
-            from backend.services.skill_manager import SkillManager  # local import
-            sm = SkillManager()
-            skill_context = sm.get_context(intent, persona, scenario, user_message)
-            if skill_context:
-                prompt_parts.append(skill_context)
-        except Exception:
-            # Non-fatal if skills are unavailable
-            pass
-
-        # Add context if available
-        if context and context.get("context_text"):
-            prompt_parts.append("\n**CURRENT HOME DATA:**\n")
-            prompt_parts.append(context["context_text"])
-
-            # Add image URLs if available
-            if context.get("image_urls"):
-                prompt_parts.append("\n**Available Images:**")
-                for img_url in context["image_urls"][:5]:  # Limit to 5
-                    prompt_parts.append(f"- {img_url}")
-
-            prompt_parts.append("\nUse this home data to provide accurate, specific answers.")
-
-        # Add conversation history
-        if history:
-            prompt_parts.append("\n**CONVERSATION HISTORY:**\n")
-            for msg in history[-6:]:  # Last 6 messages (3 exchanges)
-                role = "User" if msg.get("role") == "user" else "Assistant"
-                prompt_parts.append(f"{role}: {msg.get('content', '')}")
-
-        # Add current user message
-        prompt_parts.append(f"\n**CURRENT USER MESSAGE:**\n{user_message}")
-
-        prompt_parts.append("\n**YOUR RESPONSE:**")
-
-        return "\n".join(prompt_parts)
+        Static sections are precompiled and the prompt is token-budgeted
+        (CHAT_PROMPT_TOKEN_BUDGET); see ResponsePromptBuilder.
+        """
+        prompt, _ = self.prompt_builder.build(
+            user_message, context, history, persona, scenario, intent, summary=summary
+        )
+        return prompt
 
     def _parse_json_response(self, response: str) -> Dict[str, Any]:
         """Parse JSON from LLM response, handling markdown code blocks."""
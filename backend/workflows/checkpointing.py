@@ -0,0 +1,623 @@
+"""Bounded LangGraph checkpointers for workflow state.
+
+LangGraph's MemorySaver keeps every checkpoint of every thread for the life
+of the process. The savers here bound that:
+
+- at most ``max_per_thread`` checkpoints per thread (and namespace); older
+  ones are dropped together with their pending writes
+- threads expire ``ttl_seconds`` after their last checkpoint
+- BoundedMemorySaver additionally caps the number of threads (LRU)
+
+A thread that other work still has to resume (e.g. a chat run interrupted
+for its deferred post-response job) can be pinned: pinned threads are
+neither evicted nor expired until they are unpinned.
+
+SQLCheckpointSaver stores checkpoints in the application database through
+the existing async engine, so a run interrupted on one replica can be
+resumed on another. Both serialize checkpoints with CompactSerializer:
+LangGraph's msgpack serde plus zlib for larger payloads.
+"""
+
+import logging
+import os
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINTER_BACKEND = os.getenv("CHAT_CHECKPOINTER", "memory").lower()  # memory | sql | none
+CHECKPOINT_TTL_SECONDS = int(os.getenv("CHAT_CHECKPOINT_TTL_SECONDS", "3600"))
+CHECKPOINT_MAX_PER_THREAD = int(os.getenv("CHAT_CHECKPOINT_MAX_PER_THREAD", "2"))
+CHECKPOINT_MAX_THREADS = int(os.getenv("CHAT_CHECKPOINT_MAX_THREADS", "1000"))
+# LangGraph durability: "exit" persists only when a run ends (or fails),
+# "async"/"sync" after every step
+CHECKPOINT_DURABILITY = os.getenv("CHAT_CHECKPOINT_DURABILITY", "exit")
+
+COMPRESS_MIN_BYTES = 512
+COMPRESSED_PREFIX = "z:"
+SQL_SWEEP_INTERVAL_SECONDS = 60
+
+# (checkpoint_ns, checkpoint_id) -> (task_id, idx) -> (task_id, channel, typed value, task_path)
+PendingWrites = Dict[Tuple[str, int], Tuple[str, str, Tuple[str, bytes], str]]
+
+
+class CompactSerializer:
+    """LangGraph serde wrapper that zlib-compresses payloads above a size threshold."""
+
+    def __init__(self, serde: Optional[Any] = None, min_bytes: int = COMPRESS_MIN_BYTES):
+        self.serde = serde or JsonPlusSerializer()
+        self.min_bytes = min_bytes
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) >= self.min_bytes:
+            compressed = zlib.compress(data, 6)
+            if len(compressed) < len(data):
+                return COMPRESSED_PREFIX + type_, compressed
+        return type_, data
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.startswith(COMPRESSED_PREFIX):
+            return self.serde.loads_typed((type_[len(COMPRESSED_PREFIX):], zlib.decompress(payload)))
+        return self.serde.loads_typed((type_, payload))
+
+
+class BoundedCheckpointSaver(BaseCheckpointSaver):
+    """Shared limits and (de)serialization for the bounded savers."""
+
+    def __init__(
+        self,
+        ttl_seconds: int = CHECKPOINT_TTL_SECONDS,
+        max_per_thread: int = CHECKPOINT_MAX_PER_THREAD,
+        serde: Optional[Any] = None,
+    ):
+        super().__init__(serde=serde or CompactSerializer())
+        self.ttl_seconds = ttl_seconds
+        self.max_per_thread = max(max_per_thread, 1)
+        self.puts = 0
+        self.pruned_checkpoints = 0
+        self.expired_threads = 0
+        self._pinned: Set[str] = set()
+
+    def pin_thread(self, thread_id: str) -> None:
+        """Keep a thread from being evicted or expired (in this process) until unpinned."""
+        self._pinned.add(thread_id)
+
+    def unpin_thread(self, thread_id: str) -> None:
+        """Subject a pinned thread to the limits again."""
+        self._pinned.discard(thread_id)
+
+    def _encode(
+        self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata
+    ) -> Tuple[Tuple[str, bytes], Tuple[str, bytes]]:
+        return (
+            self.serde.dumps_typed(checkpoint),
+            self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+        )
+
+    def _tuple(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        checkpoint_id: str,
+        checkpoint: Tuple[str, bytes],
+        metadata: Tuple[str, bytes],
+        parent_checkpoint_id: Optional[str],
+        writes: List[Tuple[str, str, Tuple[str, bytes], str]],
+    ) -> CheckpointTuple:
+        writes = sorted(writes, key=lambda w: writes_sort_key(w[3], w[0], 0))
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id,
+            }},
+            checkpoint=self.serde.loads_typed(checkpoint),
+            metadata=self.serde.loads_typed(metadata),
+            parent_config=(
+                {"configurable": {
+                    "thread_id": thread_id, "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_checkpoint_id,
+                }}
+                if parent_checkpoint_id else None
+            ),
+            pending_writes=[(task_id, channel, self.serde.loads_typed(value)) for task_id, channel, value, _ in writes],
+        )
+
+    def _matches(self, metadata: Tuple[str, bytes], filter: Optional[Dict[str, Any]]) -> bool:
+        if not filter:
+            return True
+        loaded = self.serde.loads_typed(metadata)
+        return all(loaded.get(k) == v for k, v in filter.items())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Limits and pruning counters."""
+        return {
+            "backend": type(self).__name__,
+            "ttl_seconds": self.ttl_seconds,
+            "max_per_thread": self.max_per_thread,
+            "puts": self.puts,
+            "pruned_checkpoints": self.pruned_checkpoints,
+            "expired_threads": self.expired_threads,
+            "pinned_threads": len(self._pinned),
+        }
+
+
+@dataclass
+class _ThreadCheckpoints:
+    """Checkpoints and pending writes of one thread."""
+    touched_at: float
+    # checkpoint_ns -> checkpoint_id -> (checkpoint, metadata, parent_checkpoint_id)
+    checkpoints: Dict[str, Dict[str, Tuple[Tuple[str, bytes], Tuple[str, bytes], Optional[str]]]] = field(
+        default_factory=dict
+    )
+    writes: Dict[Tuple[str, str], PendingWrites] = field(default_factory=dict)
+
+
+class BoundedMemorySaver(BoundedCheckpointSaver):
+    """In-process checkpointer with per-thread count, TTL and thread-count limits."""
+
+    def __init__(
+        self,
+        ttl_seconds: int = CHECKPOINT_TTL_SECONDS,
+        max_per_thread: int = CHECKPOINT_MAX_PER_THREAD,
+        max_threads: int = CHECKPOINT_MAX_THREADS,
+        serde: Optional[Any] = None,
+    ):
+        """
+        Initialize saver.
+
+        Args:
+            ttl_seconds: Drop a thread this long after its last checkpoint
+            max_per_thread: Checkpoints kept per thread and namespace
+            max_threads: Threads kept; the least recently written are evicted
+            serde: Serializer (defaults to CompactSerializer)
+        """
+        super().__init__(ttl_seconds=ttl_seconds, max_per_thread=max_per_thread, serde=serde)
+        self.max_threads = max_threads
+        self.evicted_threads = 0
+        self._threads: "OrderedDict[str, _ThreadCheckpoints]" = OrderedDict()
+
+    def _live_thread(self, thread_id: str) -> Optional[_ThreadCheckpoints]:
+        thread = self._threads.get(thread_id)
+        if (
+            thread is not None
+            and thread_id not in self._pinned
+            and time.monotonic() - thread.touched_at > self.ttl_seconds
+        ):
+            del self._threads[thread_id]
+            self.expired_threads += 1
+            return None
+        return thread
+
+    def _evict(self) -> None:
+        # Threads are ordered by last write, so expired ones are at the front
+        cutoff = time.monotonic() - self.ttl_seconds
+        expired = []
+        for thread_id, thread in self._threads.items():
+            if thread.touched_at >= cutoff:
+                break
+            if thread_id not in self._pinned:
+                expired.append(thread_id)
+        for thread_id in expired:
+            del self._threads[thread_id]
+        self.expired_threads += len(expired)
+
+        excess = len(self._threads) - self.max_threads
+        evicted = []
+        for thread_id in self._threads:
+            if len(evicted) >= excess:
+                break
+            if thread_id not in self._pinned:
+                evicted.append(thread_id)
+        for thread_id in evicted:
+            del self._threads[thread_id]
+        self.evicted_threads += len(evicted)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        thread = self._live_thread(thread_id)
+        checkpoints = thread.checkpoints.get(checkpoint_ns) if thread else None
+        if not checkpoints:
+            return None
+
+        checkpoint_id = get_checkpoint_id(config) or max(checkpoints)
+        saved = checkpoints.get(checkpoint_id)
+        if saved is None:
+            return None
+        checkpoint, metadata, parent_checkpoint_id = saved
+        writes = list(thread.writes.get((checkpoint_ns, checkpoint_id), {}).values())
+        return self._tuple(thread_id, checkpoint_ns, checkpoint_id, checkpoint, metadata, parent_checkpoint_id, writes)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        thread_ids = [config["configurable"]["thread_id"]] if config else list(self._threads)
+        config_ns = config["configurable"].get("checkpoint_ns") if config else None
+        config_checkpoint_id = get_checkpoint_id(config) if config else None
+        before_id = get_checkpoint_id(before) if before else None
+
+        for thread_id in thread_ids:
+            thread = self._live_thread(thread_id)
+            if thread is None:
+                continue
+            for checkpoint_ns, checkpoints in list(thread.checkpoints.items()):
+                if config_ns is not None and checkpoint_ns != config_ns:
+                    continue
+                for checkpoint_id in sorted(checkpoints, reverse=True):
+                    if config_checkpoint_id and checkpoint_id != config_checkpoint_id:
+                        continue
+                    if before_id and checkpoint_id >= before_id:
+                        continue
+                    checkpoint, metadata, parent_checkpoint_id = checkpoints[checkpoint_id]
+                    if not self._matches(metadata, filter):
+                        continue
+                    if limit is not None:
+                        if limit <= 0:
+                            return
+                        limit -= 1
+                    writes = list(thread.writes.get((checkpoint_ns, checkpoint_id), {}).values())
+                    yield self._tuple(
+                        thread_id, checkpoint_ns, checkpoint_id, checkpoint, metadata, parent_checkpoint_id, writes
+                    )
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        encoded_checkpoint, encoded_metadata = self._encode(config, checkpoint, metadata)
+
+        thread = self._live_thread(thread_id)
+        if thread is None:
+            thread = self._threads[thread_id] = _ThreadCheckpoints(touched_at=time.monotonic())
+        thread.touched_at = time.monotonic()
+        self._threads.move_to_end(thread_id)
+
+        checkpoints = thread.checkpoints.setdefault(checkpoint_ns, {})
+        checkpoints[checkpoint["id"]] = (
+            encoded_checkpoint, encoded_metadata, config["configurable"].get("checkpoint_id")
+        )
+        # Checkpoint ids are time-ordered; keep the newest
+        for old_id in sorted(checkpoints)[:-self.max_per_thread]:
+            del checkpoints[old_id]
+            thread.writes.pop((checkpoint_ns, old_id), None)
+            self.pruned_checkpoints += 1
+
+        self.puts += 1
+        self._evict()
+        return {"configurable": {
+            "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"],
+        }}
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread = self._live_thread(config["configurable"]["thread_id"])
+        if thread is None:
+            return
+        key = (config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        stored = thread.writes.setdefault(key, {})
+        for idx, (channel, value) in enumerate(writes):
+            inner_key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+            if inner_key[1] >= 0 and inner_key in stored:
+                continue
+            stored[inner_key] = (task_id, channel, self.serde.dumps_typed(value), task_path)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._threads.pop(thread_id, None)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Limits, pruning counters and current size."""
+        return {
+            **super().get_stats(),
+            "max_threads": self.max_threads,
+            "threads": len(self._threads),
+            "checkpoints": sum(
+                len(c) for thread in self._threads.values() for c in thread.checkpoints.values()
+            ),
+            "evicted_threads": self.evicted_threads,
+        }
+
+
+class SQLCheckpointSaver(BoundedCheckpointSaver):
+    """
+    Checkpointer on the application database (async only).
+
+    Each call uses its own short session, never the request's: LangGraph
+    may save checkpoints from background tasks while nodes use the request
+    session.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = CHECKPOINT_TTL_SECONDS,
+        max_per_thread: int = CHECKPOINT_MAX_PER_THREAD,
+        session_factory: Optional[Callable[[], Any]] = None,
+        serde: Optional[Any] = None,
+    ):
+        """
+        Initialize saver.
+
+        Args:
+            ttl_seconds: Checkpoints older than this are ignored and swept
+            max_per_thread: Checkpoints kept per thread and namespace
+            session_factory: Async session factory (defaults to AsyncSessionLocal)
+            serde: Serializer (defaults to CompactSerializer)
+        """
+        super().__init__(ttl_seconds=ttl_seconds, max_per_thread=max_per_thread, serde=serde)
+        self._session_factory = session_factory
+        self._last_sweep = time.monotonic()
+
+    def _get_session_factory(self) -> Callable[[], Any]:
+        if self._session_factory is None:
+            from backend.models.base import AsyncSessionLocal
+            self._session_factory = AsyncSessionLocal
+        return self._session_factory
+
+    def _cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+
+    async def _load_writes(self, db, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> List[Tuple]:
+        from sqlalchemy import select
+        from backend.models.checkpoint import WorkflowCheckpointWrite as W
+
+        rows = (await db.execute(
+            select(W.task_id, W.channel, W.value_type, W.value, W.task_path, W.idx)
+            .where(W.thread_id == thread_id, W.checkpoint_ns == checkpoint_ns, W.checkpoint_id == checkpoint_id)
+            .order_by(W.task_path, W.task_id, W.idx)
+        )).all()
+        return [(r.task_id, r.channel, (r.value_type, r.value), r.task_path) for r in rows]
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        from sqlalchemy import select
+        from backend.models.checkpoint import WorkflowCheckpoint as C
+
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = select(C).where(C.thread_id == thread_id, C.checkpoint_ns == checkpoint_ns)
+        if thread_id not in self._pinned:
+            query = query.where(C.created_at >= self._cutoff())
+        if checkpoint_id := get_checkpoint_id(config):
+            query = query.where(C.checkpoint_id == checkpoint_id)
+        else:
+            query = query.order_by(C.checkpoint_id.desc()).limit(1)
+
+        async with self._get_session_factory()() as db:
+            row = (await db.execute(query)).scalars().first()
+            if row is None:
+                return None
+            writes = await self._load_writes(db, thread_id, checkpoint_ns, row.checkpoint_id)
+        return self._tuple(
+            thread_id, checkpoint_ns, row.checkpoint_id,
+            (row.checkpoint_type, row.checkpoint), (row.metadata_type, row.checkpoint_metadata),
+            row.parent_checkpoint_id, writes,
+        )
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        from sqlalchemy import select
+        from backend.models.checkpoint import WorkflowCheckpoint as C
+
+        query = select(C).where(C.created_at >= self._cutoff()).order_by(C.checkpoint_id.desc())
+        if config:
+            query = query.where(C.thread_id == config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                query = query.where(C.checkpoint_ns == checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                query = query.where(C.checkpoint_id == checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            query = query.where(C.checkpoint_id < before_id)
+
+        async with self._get_session_factory()() as db:
+            rows = (await db.execute(query)).scalars().all()
+            for row in rows:
+                metadata = (row.metadata_type, row.checkpoint_metadata)
+                if not self._matches(metadata, filter):
+                    continue
+                if limit is not None:
+                    if limit <= 0:
+                        return
+                    limit -= 1
+                writes = await self._load_writes(db, row.thread_id, row.checkpoint_ns, row.checkpoint_id)
+                yield self._tuple(
+                    row.thread_id, row.checkpoint_ns, row.checkpoint_id,
+                    (row.checkpoint_type, row.checkpoint), metadata, row.parent_checkpoint_id, writes,
+                )
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        from sqlalchemy import delete, select
+        from backend.models.checkpoint import WorkflowCheckpoint as C, WorkflowCheckpointWrite as W
+
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        (checkpoint_type, checkpoint_blob), (metadata_type, metadata_blob) = self._encode(config, checkpoint, metadata)
+
+        async with self._get_session_factory()() as db:
+            await db.merge(C(
+                thread_id=thread_id,
+                checkpoint_ns=checkpoint_ns,
+                checkpoint_id=checkpoint["id"],
+                parent_checkpoint_id=config["configurable"].get("checkpoint_id"),
+                checkpoint_type=checkpoint_type,
+                checkpoint=checkpoint_blob,
+                metadata_type=metadata_type,
+                checkpoint_metadata=metadata_blob,
+                created_at=datetime.utcnow(),
+            ))
+
+            # Keep the newest max_per_thread checkpoints of this thread/namespace
+            ids = (await db.execute(
+                select(C.checkpoint_id)
+                .where(C.thread_id == thread_id, C.checkpoint_ns == checkpoint_ns)
+                .order_by(C.checkpoint_id.desc())
+            )).scalars().all()
+            stale = ids[self.max_per_thread:]
+            if stale:
+                for model in (C, W):
+                    await db.execute(delete(model).where(
+                        model.thread_id == thread_id,
+                        model.checkpoint_ns == checkpoint_ns,
+                        model.checkpoint_id.in_(stale),
+                    ))
+                self.pruned_checkpoints += len(stale)
+
+            if time.monotonic() - self._last_sweep > SQL_SWEEP_INTERVAL_SECONDS:
+                self._last_sweep = time.monotonic()
+                cutoff = self._cutoff()
+                pinned = list(self._pinned)
+                result = await db.execute(delete(C).where(C.created_at < cutoff, C.thread_id.notin_(pinned)))
+                await db.execute(delete(W).where(W.created_at < cutoff, W.thread_id.notin_(pinned)))
+                self.expired_threads += result.rowcount or 0
+
+            await db.commit()
+
+        self.puts += 1
+        return {"configurable": {
+            "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"],
+        }}
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        from sqlalchemy import select
+        from backend.models.checkpoint import WorkflowCheckpointWrite as W
+
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        async with self._get_session_factory()() as db:
+            existing = {
+                row.idx: row for row in (await db.execute(
+                    select(W).where(
+                        W.thread_id == thread_id, W.checkpoint_ns == checkpoint_ns,
+                        W.checkpoint_id == checkpoint_id, W.task_id == task_id,
+                    )
+                )).scalars().all()
+            }
+            for idx, (channel, value) in enumerate(writes):
+                idx = WRITES_IDX_MAP.get(channel, idx)
+                if idx >= 0 and idx in existing:
+                    continue
+                value_type, value_blob = self.serde.dumps_typed(value)
+                row = existing.get(idx)
+                if row is None:
+                    db.add(W(
+                        thread_id=thread_id, checkpoint_ns=checkpoint_ns, checkpoint_id=checkpoint_id,
+                        task_id=task_id, idx=idx, channel=channel, value_type=value_type,
+                        value=value_blob, task_path=task_path, created_at=datetime.utcnow(),
+                    ))
+                else:
+                    row.channel, row.value_type, row.value, row.task_path = channel, value_type, value_blob, task_path
+            await db.commit()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        from sqlalchemy import delete
+        from backend.models.checkpoint import WorkflowCheckpoint as C, WorkflowCheckpointWrite as W
+
+        async with self._get_session_factory()() as db:
+            await db.execute(delete(C).where(C.thread_id == thread_id))
+            await db.execute(delete(W).where(W.thread_id == thread_id))
+            await db.commit()
+
+
+def create_checkpointer(backend: str = CHECKPOINTER_BACKEND) -> Optional[BoundedCheckpointSaver]:
+    """
+    Create the configured workflow checkpointer.
+
+    Args:
+        backend: "memory", "sql" or "none"
+
+    Returns:
+        Checkpointer, or None to compile graphs without one
+    """
+    if backend == "none":
+        return None
+    if backend == "sql":
+        return SQLCheckpointSaver()
+    if backend != "memory":
+        logger.warning(f"Unknown CHAT_CHECKPOINTER '{backend}', using memory")
+    return BoundedMemorySaver()
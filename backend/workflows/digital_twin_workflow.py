@@ -1,5 +1,6 @@
 """Digital Twin Creation Workflow using LangGraph."""
 
+import asyncio
 import logging
 from typing import Any, Dict, List, Optional, TypedDict, Annotated
 from datetime import datetime
@@ -351,8 +352,14 @@ class DigitalTwinWorkflow:
             images_analyzed = 0
 
             for img_data in room_images:
+                image_url = img_data.get("url")
+                # Each image is optional: when the deadline is near, the rest are
+                # skipped and the twin is finished with what was analyzed
+                if image_url and not self.orchestrator.can_run_optional(
+                    state, f"room_image:{image_url}", "analyze_room_images"
+                ):
+                    continue
                 try:
-                    image_url = img_data.get("url")
                     room_hint = img_data.get("room_hint")
 
                     if not image_url:
@@ -364,11 +371,12 @@ class DigitalTwinWorkflow:
                         continue
 
                     # Analyze room image
-                    result = await self.room_analysis_agent.execute({
-                        "image": image_url,
-                        "room_type": room_hint,
-                        "analysis_type": "comprehensive"
-                    })
+                    async with asyncio.timeout(self.orchestrator.optional_step_timeout(state)):
+                        result = await self.room_analysis_agent.execute({
+                            "image": image_url,
+                            "room_type": room_hint,
+                            "analysis_type": "comprehensive"
+                        })
 
                     if result.success:
                         analysis_data = result.data
@@ -382,6 +390,9 @@ class DigitalTwinWorkflow:
                             "analyze_room_images"
                         )
 
+                except TimeoutError:
+                    self.orchestrator.drop_optional(state, f"room_image:{image_url}", "analyze_room_images")
+                    continue
                 except Exception as e:
                     state = self.orchestrator.add_warning(
                         state,
@@ -560,6 +571,7 @@ class DigitalTwinWorkflow:
                 "confidence_score": state.get("confidence_score", 0.0),
                 "rooms_created": state.get("rooms_created", 0),
                 "images_analyzed": state.get("images_analyzed", 0),
+                "dropped_steps": state.get("dropped_steps", []),
                 "summary": {
                     "total_rooms": len(state.get("room_ids", [])),
                     "total_materials": len(state.get("material_ids", [])),
@@ -0,0 +1,77 @@
+"""Microbenchmark: per-request ChatWorkflow setup cost.
+
+Compares the old per-request setup (compile the LangGraph and build every
+service for each request) with binding the app-scoped runtime to a
+request session, which is what ChatWorkflow(db) does now.
+
+Usage:
+    GOOGLE_API_KEY=... python -m scripts.bench_chat_workflow_setup [--iterations 200]
+"""
+
+import argparse
+import statistics
+import time
+from unittest.mock import MagicMock
+
+from backend.workflows.chat_workflow import ChatWorkflow, build_chat_graph, get_chat_workflow_runtime
+from backend.integrations.agentlightning.rewards import RewardCalculator
+from backend.integrations.agentlightning.tracker import AgentTracker
+from backend.integrations.gemini.client import GeminiClient
+from backend.services.conversation_service import ConversationService
+from backend.services.journey_manager import JourneyManager
+from backend.services.rag_service import RAGService
+from backend.workflows.base import WorkflowOrchestrator
+
+
+def per_request_setup(db) -> None:
+    """What every chat request paid before the runtime became app-scoped."""
+    WorkflowOrchestrator(workflow_name="chat_orchestration", max_retries=2, timeout_seconds=60)
+    RAGService(use_gemini=True)
+    ConversationService(db)
+    GeminiClient()
+    AgentTracker(agent_name="chat_agent")
+    RewardCalculator()
+    JourneyManager()  # built by JourneyPersistenceService.__init__
+    build_chat_graph()
+
+
+def app_scoped_setup(db) -> None:
+    ChatWorkflow(db)
+
+
+def measure(fn, db, iterations: int) -> list:
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(db)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name: str, samples: list) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<22} mean {statistics.mean(samples):8.3f} ms   p50 {statistics.median(samples):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    db = MagicMock()  # construction never touches the session
+
+    # Warm-up: imports, the app-wide runtime and lazy module state
+    get_chat_workflow_runtime()
+    per_request_setup(db)
+
+    legacy = measure(per_request_setup, db, args.iterations)
+    scoped = measure(app_scoped_setup, db, args.iterations)
+
+    report("per-request (before)", legacy)
+    report("app-scoped (now)", scoped)
+    print(f"saved per request: {statistics.mean(legacy) - statistics.mean(scoped):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import uuid
+
+from sqlalchemy import select
+
+from backend.models.base import init_db_async, AsyncSessionLocal
+from backend.models.home import Home, Room, RoomImage
+from backend.models.user import User
+from backend.models.analysis import ImageAnalysis
+from backend.services.digital_twin_service import DigitalTwinService
+
+
+class CountingRoomAgent:
+    def __init__(self):
+        self.calls = 0
+
+    async def execute(self, inputs):
+        self.calls += 1
+        data = {
+            "room_type": "kitchen",
+            "room_style": "modern",
+            "keywords": ["bright"],
+            "detected_materials": [{"category": "flooring", "material_type": "tile"}],
+            "detected_fixtures": [],
+            "detected_products": [],
+            "confidence_score": 0.9,
+        }
+
+        class Resp:
+            success = True
+            error = None
+
+        resp = Resp()
+        resp.data = data
+        return resp
+
+
+def test_identical_room_images_reuse_prior_analysis(tmp_path, monkeypatch):
+    import asyncio
+
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    first = tmp_path / "kitchen_a.jpg"
+    copy = tmp_path / "kitchen_copy.jpg"
+    first.write_bytes(b"same image bytes " + uuid.uuid4().bytes)
+    copy.write_bytes(first.read_bytes())
+
+    async def _run():
+        await init_db_async()
+
+        async with AsyncSessionLocal() as db:
+            user = User(email=f"ri_{uuid.uuid4().hex[:8]}@test.local", user_type="homeowner")
+            db.add(user)
+            await db.flush()
+            home = Home(owner_id=user.id, name="Reuse Home", address={}, home_type="single_family")
+            db.add(home)
+            await db.flush()
+            kitchen = Room(home_id=home.id, name="Kitchen", room_type="kitchen", floor_level=1)
+            den = Room(home_id=home.id, name="Den", room_type="living_room", floor_level=1)
+            db.add_all([kitchen, den])
+            await db.commit()
+
+            svc = DigitalTwinService()
+            agent = CountingRoomAgent()
+            svc.room_analysis_agent = agent
+
+            res1 = await svc.analyze_and_save_room_image(db, kitchen.id, str(first))
+            assert agent.calls == 1
+            assert res1["reused"] is False
+            assert res1["materials_created"] == 1
+
+            # Same bytes under another name, same room: existing record is returned
+            res2 = await svc.analyze_and_save_room_image(db, kitchen.id, str(copy))
+            assert agent.calls == 1
+            assert res2["reused"] is True
+            assert res2["image_id"] == res1["image_id"]
+            assert res2["materials_created"] == 0
+
+            # Same bytes for another room: analysis reused, records created without AI
+            res3 = await svc.analyze_and_save_room_image(db, den.id, str(copy))
+            assert agent.calls == 1
+            assert res3["reused"] is True
+            assert res3["image_id"] != res1["image_id"]
+            assert res3["materials_created"] == 1
+            assert res3["analysis"]["room_style"] == "modern"
+
+            images = (await db.execute(
+                select(RoomImage).where(RoomImage.room_id.in_([kitchen.id, den.id]))
+            )).scalars().all()
+            assert len(images) == 2
+            assert len({img.checksum for img in images}) == 1
+
+            analyses = (await db.execute(
+                select(ImageAnalysis).where(ImageAnalysis.room_image_id.in_([img.id for img in images]))
+            )).scalars().all()
+            assert len(analyses) == 2
+
+    asyncio.run(_run())